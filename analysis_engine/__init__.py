@@ -1,6 +1,15 @@
-import pkg_resources
+try:
+    # pkg_resources scans every installed distribution when imported.
+    from importlib.metadata import PackageNotFoundError, version
+except ImportError:  # Python 3.7
+    import pkg_resources
 
-requirement = pkg_resources.Requirement.parse('FlightDataAnalyzer')
-distribution = pkg_resources.working_set.find(requirement)
+    requirement = pkg_resources.Requirement.parse('FlightDataAnalyzer')
+    distribution = pkg_resources.working_set.find(requirement)
 
-__version__ = distribution.version if distribution else 'N/A'
+    __version__ = distribution.version if distribution else 'N/A'
+else:
+    try:
+        __version__ = version('FlightDataAnalyzer')
+    except PackageNotFoundError:
+        __version__ = 'N/A'
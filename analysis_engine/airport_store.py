@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+# vim:et:ft=python:nowrap:sts=4:sw=4:ts=4
+##############################################################################
+
+'''
+Flight Data Analyzer: Airport Store
+
+Parsed and spatially indexed airport and runway data used by the API
+handlers to look up airports by code and by position.
+'''
+
+##############################################################################
+# Imports
+
+
+import numpy as np
+import os
+
+from math import sin
+from scipy.spatial import cKDTree
+
+from analysis_engine import library
+
+
+##############################################################################
+# Globals
+
+
+EARTH_RADIUS = 6371000  # metres, as used by library.bearings_and_distances
+
+# Memoized stores keyed by file paths, invalidated by file size and mtime.
+_STORES = {}
+
+
+##############################################################################
+# Functions
+
+
+def unit_vectors(latitudes, longitudes):
+    '''
+    Convert latitudes and longitudes to coordinates on the unit sphere.
+
+    :param latitudes: latitudes in decimal degrees.
+    :type latitudes: np.array
+    :param longitudes: longitudes in decimal degrees.
+    :type longitudes: np.array
+    :returns: array of shape (n, 3) of x, y, z coordinates.
+    :rtype: np.array
+    '''
+    lat = np.radians(np.asarray(latitudes, dtype=float))
+    lon = np.radians(np.asarray(longitudes, dtype=float))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+
+def chord_length(distance):
+    '''
+    Convert a great circle distance into the straight line distance between
+    the two points on the unit sphere.
+
+    :param distance: great circle distance in metres.
+    :type distance: float
+    :rtype: float
+    '''
+    return 2 * sin(min(distance / EARTH_RADIUS, np.pi) / 2)
+
+
+def get_airport_store(load, airports_path, runways_path=None):
+    '''
+    Returns the memoized airport store for the data files, building it if a
+    file has changed since it was last parsed.
+
+    :param load: callable which returns the parsed contents of a data file.
+    :type load: callable
+    :param airports_path: path to the airports data file.
+    :type airports_path: str
+    :param runways_path: optional path to the runways data file.
+    :type runways_path: str
+    :rtype: AirportStore
+    '''
+    paths = (airports_path, runways_path)
+    key = tuple((s.st_size, s.st_mtime) for s in (os.stat(p) for p in paths if p))
+    try:
+        cached_key, store = _STORES[paths]
+    except KeyError:
+        pass
+    else:
+        if cached_key == key:
+            return store
+    runways = load(runways_path) if runways_path else ()
+    store = AirportStore(load(airports_path), runways=runways)
+    _STORES[paths] = (key, store)
+    return store
+
+
+##############################################################################
+# Classes
+
+
+class AirportStore(object):
+    '''
+    Airports indexed by id, ICAO and IATA codes and by position.
+
+    Positions are indexed with a k-d tree on unit sphere coordinates so that
+    radius and k-nearest queries do not need to calculate the distance to
+    every airport.
+    '''
+
+    def __init__(self, airports, runways=()):
+        '''
+        :param airports: airport info dictionaries.
+        :type airports: list of dict
+        :param runways: runway info dictionaries. Runways with an 'airport' id
+            are attached to airports which do not include their own runways.
+        :type runways: list of dict
+        '''
+        self.airports = list(airports or [])
+        self._codes = {}
+        for airport in self.airports:
+            codes = airport.get('code') or {}
+            for code in (airport.get('id'), codes.get('iata'), codes.get('icao')):
+                if code is not None:
+                    # The first airport in the data takes precedence.
+                    self._codes.setdefault(code, airport)
+
+        self._runways = {}
+        for runway in runways or ():
+            airport_id = runway.get('airport')
+            if airport_id is not None:
+                self._runways.setdefault(airport_id, []).append(runway)
+
+        self._located = [a for a in self.airports if 'latitude' in a and 'longitude' in a]
+        self._latitudes = np.ma.array([a['latitude'] for a in self._located], dtype=float)
+        self._longitudes = np.ma.array([a['longitude'] for a in self._located], dtype=float)
+        self._tree = cKDTree(unit_vectors(self._latitudes, self._longitudes)) if self._located else None
+
+    def __len__(self):
+        return len(self.airports)
+
+    def get(self, code):
+        '''
+        Returns the airport matching the provided code.
+
+        :param code: airport id, ICAO code or IATA code.
+        :type code: int or str
+        :returns: airport info dictionary
+        :rtype: dict
+        :raises: KeyError -- if the airport cannot be found.
+        '''
+        airport = self._codes[code]
+        if 'runways' not in airport and airport.get('id') in self._runways:
+            airport = dict(airport, runways=self._runways[airport['id']])
+        return airport
+
+    def get_runways(self, airport):
+        '''
+        Returns the runways for an airport, either included with the airport
+        or attached from the runway data.
+
+        :param airport: airport info dictionary.
+        :type airport: dict
+        :rtype: list of dict or None
+        '''
+        return airport.get('runways', self._runways.get(airport.get('id')))
+
+    def _with_distances(self, indexes, latitude, longitude):
+        '''
+        Returns copies of the located airports at indexes, in data order, with
+        the distance in metres from the provided coordinates.
+        '''
+        indexes = np.sort(np.asarray(indexes, dtype=int))
+        if not len(indexes):
+            return []
+        distances = library.bearings_and_distances(
+            self._latitudes[indexes], self._longitudes[indexes],
+            {'latitude': latitude, 'longitude': longitude})[1]
+        airports = []
+        for index, distance in zip(indexes, distances):
+            airport = dict(self._located[index], distance=float(distance))
+            runways = self.get_runways(airport)
+            if runways is not None:
+                airport['runways'] = runways
+            airports.append(airport)
+        return airports
+
+    def within(self, latitude, longitude, radius=None):
+        '''
+        Returns the airports within a radius of the provided coordinates.
+
+        :param latitude: latitude in decimal degrees.
+        :type latitude: float
+        :param longitude: longitude in decimal degrees.
+        :type longitude: float
+        :param radius: search radius in metres. All airports are returned if None.
+        :type radius: float or None
+        :returns: airport info dictionaries with the distance in metres.
+        :rtype: list of dict
+        '''
+        if self._tree is None:
+            return []
+        if radius is None:
+            indexes = np.arange(len(self._located))
+        else:
+            point = unit_vectors([latitude], [longitude])[0]
+            indexes = self._tree.query_ball_point(point, chord_length(radius))
+        return self._with_distances(indexes, latitude, longitude)
+
+    def nearest(self, latitude, longitude, k=1):
+        '''
+        Returns the k airports nearest to the provided coordinates.
+
+        :param latitude: latitude in decimal degrees.
+        :type latitude: float
+        :param longitude: longitude in decimal degrees.
+        :type longitude: float
+        :param k: number of airports to return.
+        :type k: int
+        :returns: airport info dictionaries with the distance in metres, nearest first.
+        :rtype: list of dict
+        '''
+        if self._tree is None:
+            return []
+        k = min(k, len(self._located))
+        point = unit_vectors([latitude], [longitude])[0]
+        indexes = np.atleast_1d(self._tree.query(point, k=k)[1])
+        airports = self._with_distances(indexes, latitude, longitude)
+        return sorted(airports, key=lambda airport: airport['distance'])
@@ -11,13 +11,25 @@ Flight Data Analyzer: API Handler
 
 
 import abc
+import copy
+import hashlib
 import logging
 import numpy as np
+import os
+import simplejson as json
 import six
+import tempfile
+import threading
+import time
+
+from collections import OrderedDict
+from six.moves import http_client
+from six.moves.urllib.parse import urlencode, urlsplit
 
 from flightdatautilities import api
 
-from analysis_engine import library, settings
+from analysis_engine import settings
+from analysis_engine.airport_store import get_airport_store
 
 
 ##############################################################################
@@ -203,6 +215,73 @@ class HTTPHandler(MethodInterface, api.HTTPHandler):
         return self.request(url, params=params)
 
 
+class PooledHTTPHandler(HTTPHandler):
+    '''
+    HTTP API handler which reuses persistent connections to the API server.
+
+    Connections are kept per thread and per host, and are re-established once
+    if the server has closed an idle connection.
+    '''
+
+    _local = threading.local()
+
+    def _get_connection(self, scheme, netloc, timeout):
+        connections = self._local.__dict__.setdefault('connections', {})
+        connection = connections.get((scheme, netloc))
+        if connection is None:
+            cls = http_client.HTTPSConnection if scheme == 'https' else http_client.HTTPConnection
+            connection = connections[(scheme, netloc)] = cls(netloc, timeout=timeout)
+        return connection
+
+    def _close_connection(self, scheme, netloc):
+        connection = self._local.__dict__.get('connections', {}).pop((scheme, netloc), None)
+        if connection is not None:
+            connection.close()
+
+    def request(self, url, params=None, timeout=None):
+        '''
+        Make a GET request to the API over a persistent connection.
+
+        :param url: URL of the API resource.
+        :type url: str
+        :param params: query parameters.
+        :type params: dict
+        :param timeout: socket timeout in seconds, settings.API_HTTP_TIMEOUT by default.
+        :type timeout: float
+        :returns: the decoded JSON response.
+        :raises: api.NotFoundError -- if the resource cannot be found.
+        :raises: IOError -- if the request fails.
+        '''
+        parts = urlsplit(url)
+        path = parts.path or '/'
+        query = '&'.join(q for q in (parts.query, urlencode(sorted((params or {}).items()))) if q)
+        if query:
+            path = '%s?%s' % (path, query)
+        timeout = settings.API_HTTP_TIMEOUT if timeout is None else timeout
+
+        for attempt in (1, 2):
+            connection = self._get_connection(parts.scheme, parts.netloc, timeout)
+            try:
+                connection.request('GET', path, headers={'Accept': 'application/json'})
+                response = connection.getresponse()
+                content = response.read()
+            except (http_client.HTTPException, OSError) as err:
+                self._close_connection(parts.scheme, parts.netloc)
+                if attempt == 1:
+                    logger.debug('Retrying request to %s on a new connection: %s', url, err)
+                    continue
+                raise IOError('API request failed: %s: %s' % (url, err))
+            break
+
+        if response.will_close:
+            self._close_connection(parts.scheme, parts.netloc)
+        if response.status == 404:
+            raise api.NotFoundError('API resource not found: %s' % url)
+        if not 200 <= response.status < 300:
+            raise IOError('API request failed with status %d: %s' % (response.status, url))
+        return json.loads(content.decode('utf-8'))
+
+
 class FileHandler(MethodInterface, api.FileHandler):
 
     def __init__(self):
@@ -263,16 +342,19 @@ class FileHandler(MethodInterface, api.FileHandler):
         :rtype: dict
         :raises: api.NotFoundError -- if the aircraft cannot be found.
         '''
-        data = self.request(settings.API_FILE_PATHS['airports'])
-        for airport in data:
-            if code in (airport.get('id'), airport['code'].get('iata'), airport['code'].get('icao')):
-                return airport
-        raise api.NotFoundError('Airport not found using Local File API: %s' % code)
+        try:
+            return self.get_airport_store().get(code)
+        except KeyError:
+            raise api.NotFoundError('Airport not found using Local File API: %s' % code)
 
     def get_nearest_airport(self, latitude, longitude):
         '''
         Returns the nearest airports to the provided latitude and longitude.
 
+        Airports within settings.AIRPORT_SEARCH_RADIUS are found with the
+        spatial index of the airport store, or all airports are returned if
+        the radius is None.
+
         :param latitude: latitude in decimal degrees.
         :type latitude: float
         :param longitude: longitude in decimal degrees.
@@ -281,15 +363,193 @@ class FileHandler(MethodInterface, api.FileHandler):
         :rtype: dict
         :raises: api.NotFoundError -- if the aircraft cannot be found.
         '''
-        data = self.request(settings.API_FILE_PATHS['airports'])
-        airports = []
-        for airport in data:
-            if 'latitude' not in airport or 'longitude' not in airport:
-                continue
-            args = (latitude, longitude, airport['latitude'], airport['longitude'])
-            airport['distance'] = library.bearing_and_distance(*args)[1]
-            airports.append(airport)
+        return self.get_airport_store().within(latitude, longitude, settings.AIRPORT_SEARCH_RADIUS)
+
+    def get_airport_store(self):
+        '''
+        Returns the parsed and spatially indexed airport data, which is only
+        re-read when the data files change.
+
+        :rtype: analysis_engine.airport_store.AirportStore
+        '''
+        return get_airport_store(self.request, settings.API_FILE_PATHS['airports'],
+                                 settings.API_FILE_PATHS.get('runways'))
+
+
+##############################################################################
+# Caching
+
+
+class TTLCache(object):
+    '''
+    Thread-safe in-memory least recently used cache whose entries expire
+    after a time to live.
+    '''
+
+    def __init__(self, maxsize, ttl, timer=time.time):
+        '''
+        :param maxsize: maximum number of entries to hold.
+        :type maxsize: int
+        :param ttl: time to live of each entry in seconds.
+        :type ttl: float
+        :param timer: callable returning the current time in seconds.
+        :type timer: callable
+        '''
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        '''
+        :returns: the cached value.
+        :raises: KeyError -- if the key is not cached or has expired.
+        '''
+        with self._lock:
+            expires, value = self._data[key]
+            if expires < self.timer():
+                del self._data[key]
+                raise KeyError(key)
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (self.timer() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class DiskCache(object):
+    '''
+    On-disk cache of JSON serialisable values which can be shared between
+    worker processes. Each entry is written atomically to its own file.
+    '''
+
+    def __init__(self, path, ttl, timer=time.time):
+        '''
+        :param path: directory to store the cache entries within.
+        :type path: str
+        :param ttl: time to live of each entry in seconds.
+        :type ttl: float
+        :param timer: callable returning the current time in seconds.
+        :type timer: callable
+        '''
+        self.path = path
+        self.ttl = ttl
+        self.timer = timer
+        if not os.path.isdir(path):
+            os.makedirs(path)
+
+    def _filename(self, key):
+        return os.path.join(self.path, hashlib.sha256(repr(key).encode('utf-8')).hexdigest() + '.json')
+
+    def get(self, key):
+        '''
+        :returns: the cached value.
+        :raises: KeyError -- if the key is not cached or has expired.
+        '''
         try:
-            return airports
-        except:
-            raise api.NotFoundError('Airport not found using Local File API: %f,%f' % (latitude, longitude))
+            with open(self._filename(key), 'r') as f:
+                entry = json.load(f)
+        except (IOError, OSError, ValueError):
+            raise KeyError(key)
+        if entry['time'] + self.ttl < self.timer():
+            raise KeyError(key)
+        return entry['value']
+
+    def set(self, key, value):
+        entry = {'time': self.timer(), 'value': value}
+        with tempfile.NamedTemporaryFile('w', dir=self.path, suffix='.tmp', delete=False) as f:
+            json.dump(entry, f)
+        os.replace(f.name, self._filename(key))
+
+
+class CachingHandler(MethodInterface):
+    '''
+    Caches the responses of another API handler.
+
+    Responses are held in an in-memory LRU cache and optionally in an on-disk
+    cache shared between workers, both bounded by settings.API_CACHE_TTL.
+    Nearest airport lookups are quantised to
+    settings.API_CACHE_COORDINATE_PRECISION decimal places so that nearby
+    coordinates share a cache entry. Errors are never cached.
+    '''
+
+    def __init__(self, handler, memory=None, disk=None):
+        '''
+        :param handler: the API handler to cache.
+        :type handler: MethodInterface
+        :param memory: in-memory cache, created from settings if not provided.
+        :type memory: TTLCache
+        :param disk: on-disk cache, created from settings.API_CACHE_DIR if not provided.
+        :type disk: DiskCache
+        '''
+        self.handler = handler
+        if memory is None:
+            memory = TTLCache(settings.API_CACHE_SIZE, settings.API_CACHE_TTL)
+        self.memory = memory
+        if disk is None and settings.API_CACHE_DIR:
+            disk = DiskCache(settings.API_CACHE_DIR, settings.API_CACHE_TTL)
+        self.disk = disk
+
+    def _cached(self, method, *args):
+        key = (method,) + args
+        try:
+            value = self.memory.get(key)
+        except KeyError:
+            try:
+                if self.disk is None:
+                    raise KeyError(key)
+                value = self.disk.get(key)
+            except KeyError:
+                value = getattr(self.handler, method)(*args)
+                if self.disk is not None:
+                    self.disk.set(key, value)
+            self.memory.set(key, value)
+        # Callers may annotate the returned structures.
+        return copy.deepcopy(value)
+
+    def get_aircraft(self, aircraft):
+        return self._cached('get_aircraft', aircraft)
+
+    def get_analyser_profiles(self, aircraft):
+        return self._cached('get_analyser_profiles', aircraft)
+
+    def get_data_exports(self, aircraft):
+        return self._cached('get_data_exports', aircraft)
+
+    def get_airport(self, code):
+        return self._cached('get_airport', code)
+
+    def get_nearest_airport(self, latitude, longitude):
+        if any(x is None or x is np.ma.masked or np.isnan(x) for x in (latitude, longitude)):
+            # Let the handler reject invalid coordinates.
+            return self.handler.get_nearest_airport(latitude, longitude)
+        precision = settings.API_CACHE_COORDINATE_PRECISION
+        return self._cached('get_nearest_airport',
+                            round(float(latitude), precision), round(float(longitude), precision))
+
+
+class CachingHTTPHandler(CachingHandler):
+    '''
+    HTTP API handler with response caching and persistent connections.
+
+    The caches are shared by all instances within a process.
+    '''
+
+    _memory = None
+
+    def __init__(self):
+        if CachingHTTPHandler._memory is None:
+            CachingHTTPHandler._memory = TTLCache(settings.API_CACHE_SIZE, settings.API_CACHE_TTL)
+        super(CachingHTTPHandler, self).__init__(PooledHTTPHandler(), memory=CachingHTTPHandler._memory)
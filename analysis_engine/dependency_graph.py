@@ -4,12 +4,12 @@ import os
 import sys
 import logging
 import networkx as nx # pip install networkx or /opt/epd/bin/easy_install networkx
-import six
 import copy
+import fnmatch
+import numpy as np
+import weakref
 
-from collections import deque, Counter
-
-from flightdatautilities.dict_helpers import dict_filter
+from collections import deque, Counter, OrderedDict
 
 from analysis_engine.node import (
     ApproachNode,
@@ -19,6 +19,7 @@ from analysis_engine.node import (
     FlightPhaseNode,
     KeyPointValueNode,
     KeyTimeInstanceNode,
+    NodeRegistry,
 )
 
 logger = logging.getLogger(__name__)
@@ -28,6 +29,20 @@ CALCULATE_NODE_LAST = [
     '2 Deg Pitch To 35 Ft Duration',
 ]
 
+# Group into node types to apply colour. TODO: Make colours less garish.
+NODE_COLORS = {
+    ApproachNode: '#663399', # purple
+    MultistateDerivedParameterNode: '#2aa52a', # dark green
+    DerivedParameterNode: '#72cdf4',  # fds-blue
+    FlightAttributeNode: '#b88a00',  # brown
+    FlightPhaseNode: '#d93737',  # red
+    KeyPointValueNode: '#bed630',  # fds-green
+    KeyTimeInstanceNode: '#fdbb30',  # fds-orange
+}
+
+# Static graphs by id of their node registry, see get_static_graph.
+_STATIC_GRAPHS = {}
+
 """
 TODO:
 =====
@@ -187,6 +202,49 @@ def print_tree(graph, node='root', **kwargs):
     print('\n'.join(indent_tree(graph, node, **kwargs)))
 
 
+def ordered_successors(di_graph, node):
+    '''
+    The dependencies of a node in the order of the arguments of its derive
+    method, which allows the class to define the best path through the
+    dependency tree. Nodes within CALCULATE_NODE_LAST at the start of the
+    successors of root are moved to the end, see rotate_calculate_last.
+
+    :param di_graph: Directed graph of all nodes and their dependencies.
+    :type di_graph: nx.DiGraph
+    :param node: Name of the node.
+    :type node: str
+    :rtype: [str]
+    '''
+    successors = [name for (name, d) in sorted(di_graph[node].items(), key=lambda a: a[1].get('order', False))]
+    if node == 'root':
+        successors = rotate_calculate_last(successors)
+    return successors
+
+
+def rotate_calculate_last(successors):
+    '''
+    Move troublesome nodes to the end of the successors of root. The first
+    node traversed can have a big impact on the processing order. In Python 2
+    dictionaries are unordered and meaning ordered_successors is unordered
+    too. In Python 3, it's now ordered. Instead of starting with 'Airspeed
+    Top Of Descent To 4000 Ft Min' it is now starting with '2 Deg Pitch To 35
+    Ft Duration' causing a node process order issue for TouchDown kti.
+
+    Only nodes within CALCULATE_NODE_LAST which are traversed first are
+    rotated to the end, otherwise the order is unchanged.
+
+    :param successors: Names of the successors of root.
+    :type successors: [str]
+    :rtype: [str]
+    '''
+    count = 0
+    while count < len(successors) and successors[count] in CALCULATE_NODE_LAST:
+        count += 1
+    if count == len(successors):
+        return successors
+    return successors[count:] + successors[:count]
+
+
 def dependencies3(di_graph, root, node_mgr, raise_cir_dep=False):
     '''
     Performs a Depth First Search down each dependency node in the tree
@@ -243,21 +301,7 @@ def dependencies3(di_graph, root, node_mgr, raise_cir_dep=False):
             return True
 
         layer = set()  # layer of current node's available dependencies
-        # order the successors based on the order in the derive method; this allows the
-        # class to define the best path through the dependency tree.
-        ordered_successors = [name for (name, d) in sorted(di_graph[node].items(), key=lambda a: a[1].get('order', False))]
-
-        # Move troublesome nodes to the end of ordered_successors list. The first node traversed
-        # can have a big impact on the processing order. In Python 2 dictionaries are unordered
-        # and meaning ordered_successors is unordered too. In Python 3, it's now ordered.
-        # Instead of starting with 'Airspeed Top Of Descent To 4000 Ft Min' it
-        # is now starting with '2 Deg Pitch To 35 Ft Duration' causing a
-        # node process order issue for TouchDown kti.
-        if node == 'root':
-            while ordered_successors[0] in CALCULATE_NODE_LAST:
-                ordered_successors.append(ordered_successors.pop(0))
-
-        for dependency in ordered_successors:
+        for dependency in ordered_successors(di_graph, node):
             # traverse again, 'like we did last summer'
             if traverse_tree(dependency):
                 layer.add(dependency)
@@ -290,6 +334,153 @@ def dependencies3(di_graph, root, node_mgr, raise_cir_dep=False):
     return ordering, tree_path
 
 
+def dependencies4(di_graph, root, node_mgr, raise_cir_dep=False):
+    '''
+    Resolves the processing order as dependencies3, without recursion and
+    without repeatedly traversing the same subtrees, see
+    resolve_dependencies.
+
+    :param di_graph: Directed graph of all nodes and their dependencies.
+    :type di_graph: nx.DiGraph
+    :param root: Root node to start traversing from, usually named 'root'
+    :type root: String
+    :param node_mgr: Node manager which can assess whether nodes are
+                     operational with the available dependencies at each
+                     layer of the tree.
+    :type node_mgr: analysis_engine.node.NodeManager
+    :raise_cir_dep: Stop and raise a CircularDependency error if a circular
+                    dependency on the node is encountered.
+    :returns: The processing order and the tree path, see dependencies3.
+    :rtype: ([str], [[str]])
+    '''
+    return resolve_dependencies(
+        lambda node: ordered_successors(di_graph, node),
+        nx.strongly_connected_components(di_graph), root, node_mgr,
+        raise_cir_dep=raise_cir_dep)
+
+
+def resolve_dependencies(successors, components, root, node_mgr,
+                         raise_cir_dep=False):
+    '''
+    Resolves the processing order of the nodes depended upon by root.
+
+    The graph is condensed into its strongly connected components. The
+    result of a node outside of any circular dependency cannot depend upon
+    the branch path, so whether it is operational is determined once. Within
+    a component, a node which is in the branch path is unavailable as within
+    dependencies3 and a node which is not operational is not traversed again
+    until another node of its component becomes operational.
+
+    :param successors: Returns the dependencies of a node in the order in
+        which they are traversed, see ordered_successors.
+    :type successors: callable
+    :param components: Strongly connected components of the graph.
+    :type components: iterable of sets of str
+    :param root: Root node to start traversing from, usually named 'root'
+    :type root: String
+    :param node_mgr: Node manager which can assess whether nodes are
+                     operational with the available dependencies at each
+                     layer of the tree.
+    :type node_mgr: analysis_engine.node.NodeManager
+    :raise_cir_dep: Stop and raise a CircularDependency error if a circular
+                    dependency on the node is encountered.
+    :returns: The processing order and the tree path, see dependencies3.
+    :rtype: ([str], [[str]])
+    '''
+    log_stuff = logger.getEffectiveLevel() <= logging.DEBUG
+    circular_log = Counter()
+    # component index of each node within a circular dependency
+    component_indexes = {}
+    for index, component in enumerate(components):
+        if len(component) > 1:
+            component_indexes.update(dict.fromkeys(component, index))
+    # number of nodes of each component which are operational
+    generations = Counter()
+    # generation of the component of each node when it was not operational
+    inoperable = {}
+
+    ordering = []
+    path = deque()  # current branch path
+    in_path = set()
+    active_nodes = set()  # operational nodes visited for fast lookup
+    tree_path = [] # For viewing the tree in which nodes are add to path
+    stack = []  # node, successors, index of next successor, layer
+
+    def visit(node):
+        '''
+        Begin visiting the node. Returns whether the node is operational if
+        known, otherwise None and the node's successors are traversed.
+        '''
+        if node in in_path:
+            path.append(node)
+            # we've met this node before; start of circular dependency
+            tree_path.append(list(path) + ['CIRCULAR',])
+            if log_stuff:
+                circular_log.update(
+                    ["Circular dependency avoided at node '%s'" % (node,),]
+                )
+            if raise_cir_dep:
+                raise CircularDependency("Circular Dependency In Path (node: '%s', path: '%s')"
+                                         % (node,"' > '".join(path)))
+            return False  # establishing if available; cannot yet be available
+        path.append(node)
+        if node in active_nodes:
+            # node already discovered operational
+            return True
+        if node in inoperable and inoperable[node] == generations[component_indexes.get(node)]:
+            # not operational and nothing has changed since
+            return False
+        in_path.add(node)
+        stack.append([node, successors(node), 0, set()])
+        return None
+
+    def leave(node, layer):
+        "Finish visiting the node, returning whether it is operational."
+        in_path.discard(node)
+        if node_mgr.operational(node, layer):
+            # node will work at this level with the available dependencies
+            active_nodes.add(node)
+            ordering.append(node)
+            if node in component_indexes:
+                generations[component_indexes[node]] += 1
+            if node not in node_mgr.hdf_keys:
+                tree_path.append(list(path))
+            return True
+        # node will not work with available dependencies
+        tree_path.append(list(path) + ['NOT OPERATIONAL',])
+        inoperable[node] = generations[component_indexes.get(node)]
+        return False
+
+    result = visit(root)
+    while stack:
+        frame = stack[-1]
+        node, dependencies, index, layer = frame
+        if index < len(dependencies):
+            frame[2] += 1
+            dependency = dependencies[index]
+            result = visit(dependency)
+            if result is None:
+                # traverse the dependency's successors first
+                continue
+        else:
+            stack.pop()
+            dependency = node
+            result = leave(node, layer)
+            if not stack:
+                break
+        if result:
+            stack[-1][3].add(dependency)
+        # each time a node is visited, remove it from the branch path
+        path.pop()
+
+    # log any circular dependencies caught
+    if log_stuff and circular_log:
+        logger.debug('Circular dependency avoided %s times.', sum(circular_log.values()))
+        for l, v in circular_log.items():
+            logger.debug("%s (%s times)", l, v)
+    return ordering, tree_path
+
+
 def draw_graph(graph, name, horizontal=False):
     """
     Draws a graph to file with label and filename taken from name argument.
@@ -390,39 +581,27 @@ def graph_nodes(node_mgr):
     # (limitation of add_node_attribute())
     gr_all.add_nodes_from(node_mgr.hdf_keys, color='#72f4eb', # turquoise
                           node_type='HDFNode')
-    derived_minus_lfl = dict_filter(node_mgr.derived_nodes,
-                                    remove=node_mgr.hdf_keys)
-    # Group into node types to apply colour. TODO: Make colours less garish.
-    colors = {
-        ApproachNode: '#663399', # purple
-        MultistateDerivedParameterNode: '#2aa52a', # dark green
-        DerivedParameterNode: '#72cdf4',  # fds-blue
-        FlightAttributeNode: '#b88a00',  # brown
-        FlightPhaseNode: '#d93737',  # red
-        KeyPointValueNode: '#bed630',  # fds-green
-        KeyTimeInstanceNode: '#fdbb30',  # fds-orange
-    }
+    # names rather than classes so that node modules are not imported
+    registry = node_mgr.derived_nodes
+    hdf_keys = set(node_mgr.hdf_keys)
+    derived_minus_lfl = [name for name in registry if name not in hdf_keys]
     derived_nodes = []
-    for name, node in derived_minus_lfl.items():
+    for name in derived_minus_lfl:
         # the default is gray, if you see it, something is wrong
-        color = '#888888'
-        for base in node.__bases__:
-            if base in colors:
-                color = colors[base]
-                break
-
+        color = NODE_COLORS.get(registry.node_type(name), '#888888')
         node_info = (name, {'color': color,
-                            'node_type': node.__base__.__name__})
+                            'node_type': registry.base_name(name)})
         derived_nodes.append(node_info)
     gr_all.add_nodes_from(derived_nodes)
 
     # build list of dependencies
     derived_deps = set()  # list of derived dependencies
-    for node_name, node_obj in six.iteritems(derived_minus_lfl):
-        derived_deps.update(node_obj.get_dependency_names())
+    for node_name in derived_minus_lfl:
+        dependency_names = registry.dependency_names(node_name)
+        derived_deps.update(dependency_names)
         # Create edges between node and its dependencies
         edges = []
-        for (n, dep) in enumerate(node_obj.get_dependency_names()):
+        for (n, dep) in enumerate(dependency_names):
             edges.append((node_name, dep, {'order':n}))
         gr_all.add_edges_from(edges)
 
@@ -460,11 +639,7 @@ def graph_nodes(node_mgr):
     # Missing dependencies which are requested.
     missing_requested = list(set(node_mgr.requested) - available_nodes)
 
-    if missing_derived_dep:
-        logger.warning("Found %s dependencies which don't exist in LFL or Node modules.", len(missing_derived_dep))
-        logger.debug("The missing dependencies: %s", missing_derived_dep)
-    if missing_requested:
-        raise ValueError("Missing requested parameters: %s" % missing_requested)
+    check_missing(missing_derived_dep, missing_requested)
 
     # Add missing nodes to graph so it shows everything. These should all be
     # RAW parameters missing from the LFL unless something has gone wrong with
@@ -474,6 +649,307 @@ def graph_nodes(node_mgr):
     return gr_all
 
 
+def check_missing(missing_dependencies, missing_requested):
+    '''
+    Warn of dependencies which don't exist and raise if any requested nodes
+    don't exist.
+
+    :type missing_dependencies: [str]
+    :type missing_requested: [str]
+    :raises ValueError: If any requested nodes are missing.
+    '''
+    if missing_dependencies:
+        logger.warning("Found %s dependencies which don't exist in LFL or Node modules.", len(missing_dependencies))
+        logger.debug("The missing dependencies: %s", missing_dependencies)
+    if missing_requested:
+        raise ValueError("Missing requested parameters: %s" % missing_requested)
+
+
+class StaticGraph(object):
+    '''
+    The dependencies of the nodes within a node registry compiled into
+    integer adjacency arrays. The graph is built once per registry and
+    shared by every flight, see FlightGraph.
+
+    Nodes are indexes into names: the derived nodes of the registry in
+    order, followed by their dependencies which are not derived nodes.
+    '''
+    def __init__(self, registry):
+        '''
+        :type registry: NodeRegistry
+        '''
+        names = list(registry)
+        index = {name: n for n, name in enumerate(names)}
+        self.derived_count = len(names)
+        offsets = [0]
+        targets = []
+        for name in names[:self.derived_count]:
+            for dependency in registry.dependency_names(name):
+                if dependency not in index:
+                    index[dependency] = len(names)
+                    names.append(dependency)
+                targets.append(index[dependency])
+            offsets.append(len(targets))
+        self.names = names
+        self.index = index
+        # dependencies of node n are targets[offsets[n]:offsets[n + 1]]
+        self.offsets = np.array(offsets, dtype=np.int32)
+        self.targets = np.array(targets, dtype=np.int32)
+        # nodes depending upon each node, in order of the registry
+        sources = np.repeat(np.arange(self.derived_count, dtype=np.int32),
+                            np.diff(self.offsets))
+        order = np.argsort(self.targets, kind='mergesort')
+        self.dependent_offsets = np.searchsorted(
+            self.targets[order], np.arange(len(names) + 1)).astype(np.int32)
+        self.dependents = sources[order]
+        self.node_types = [registry.base_name(name) for name in names[:self.derived_count]]
+        self.colors = [NODE_COLORS.get(registry.node_type(name), '#888888')
+                       for name in names[:self.derived_count]]
+
+    def dependencies(self, node):
+        '''
+        :param node: Index of a derived node.
+        :type node: int
+        :returns: Indexes of the node's dependencies in the order of its
+            derive method's arguments.
+        :rtype: [int]
+        '''
+        return self.targets[self.offsets[node]:self.offsets[node + 1]].tolist()
+
+    def first_dependent(self, node, recorded):
+        '''
+        :param node: Index of a node.
+        :type node: int
+        :param recorded: Whether each node is recorded.
+        :type recorded: np.ndarray of bool
+        :returns: Index of the first derived node which is not recorded and
+            depends upon the node, or None.
+        :rtype: int or None
+        '''
+        if node >= len(self.names):
+            return None
+        for dependent in self.dependents[self.dependent_offsets[node]:self.dependent_offsets[node + 1]]:
+            if not recorded[dependent]:
+                return int(dependent)
+        return None
+
+
+def get_static_graph(registry):
+    '''
+    :param registry: Derived nodes by name.
+    :type registry: NodeRegistry or dict
+    :returns: The static graph of the registry, built when first needed.
+    :rtype: StaticGraph
+    '''
+    if not isinstance(registry, NodeRegistry):
+        return StaticGraph(NodeRegistry(classes=registry))
+    key = id(registry)
+    graph = _STATIC_GRAPHS.get(key)
+    if graph is None:
+        graph = _STATIC_GRAPHS[key] = StaticGraph(registry)
+        # forget the graph with the registry, whose id may then be reused
+        weakref.finalize(registry, _STATIC_GRAPHS.pop, key, None)
+    return graph
+
+
+class FlightGraph(object):
+    '''
+    The dependency graph of a flight: the static graph of the node registry
+    overlaid with the flight's recorded parameters and requested nodes.
+    Derived nodes which are recorded do not depend on other nodes, as within
+    graph_nodes.
+    '''
+    def __init__(self, static, node_mgr):
+        '''
+        :type static: StaticGraph
+        :type node_mgr: NodeManager
+        '''
+        self.static = static
+        self.node_mgr = node_mgr
+        names = static.names
+        index = static.index
+        self.recorded_names = set(node_mgr.hdf_keys)
+        extra = [name for name in node_mgr.hdf_keys if name not in index]
+        extra.append('root')
+        names = names + list(OrderedDict.fromkeys(extra))
+        index = dict(index)
+        index.update((name, n) for n, name in enumerate(names) if n >= len(static.names))
+        self.names = names
+        self.index = index
+        self.root = index['root']
+        self.recorded = np.zeros(len(names), dtype=bool)
+        self.recorded[[index[name] for name in node_mgr.hdf_keys]] = True
+
+        # Link root to each requested node unless another requested node is
+        # linked and depends upon it, as within graph_nodes.
+        requested = set(node_mgr.requested)
+        for name in node_mgr.requested:
+            if name not in static.index and name not in self.recorded_names:
+                # as raised by graph_nodes
+                raise nx.NetworkXError("The node %s is not in the digraph." % (name,))
+        root_successors = [name for name in node_mgr.requested
+                           if not self._dependent_requested(index[name], requested)]
+        self.root_successors = [index[name] for name in rotate_calculate_last(root_successors)]
+
+        # Missing dependencies of the derived nodes which are not recorded.
+        available = set(node_mgr.keys())
+        derived_recorded = self.recorded[:static.derived_count]
+        sources = np.repeat(~derived_recorded, np.diff(static.offsets))
+        dependencies = np.unique(static.targets[sources])
+        self.missing = [names[n] for n in dependencies[dependencies >= static.derived_count]
+                        if names[n] not in available]
+        self.missing_requested = [name for name in requested if name not in available]
+
+    def _dependent_requested(self, node, requested):
+        '''
+        Follows the first dependent of each node towards the top of the tree
+        as any_predecessors_in_requested.
+        '''
+        visited = set()
+        dependent = self.static.first_dependent(node, self.recorded)
+        while dependent is not None and dependent not in visited:
+            if self.names[dependent] in requested:
+                return True
+            visited.add(dependent)
+            dependent = self.static.first_dependent(dependent, self.recorded)
+        return False
+
+    def successor_indexes(self, node):
+        '''
+        :param node: Index of a node.
+        :type node: int
+        :returns: Indexes of the node's dependencies in traversal order.
+        :rtype: [int]
+        '''
+        if node == self.root:
+            return self.root_successors
+        if node < self.static.derived_count and not self.recorded[node]:
+            return self.static.dependencies(node)
+        return []
+
+    def ordered_successors(self, name):
+        '''
+        :param name: Name of a node.
+        :type name: str
+        :returns: Names of the node's dependencies in traversal order, see
+            ordered_successors.
+        :rtype: [str]
+        '''
+        return [self.names[n] for n in self.successor_indexes(self.index[name])]
+
+    def strongly_connected_components(self):
+        '''
+        Tarjan's algorithm, iteratively from root.
+
+        :returns: Names of the nodes of each strongly connected component of
+            the nodes reachable from root.
+        :rtype: [set of str]
+        '''
+        indexes = {}
+        lowlinks = {}
+        stack = []
+        on_stack = set()
+        components = []
+        work = [(self.root, iter(self.successor_indexes(self.root)))]
+        indexes[self.root] = lowlinks[self.root] = 0
+        stack.append(self.root)
+        on_stack.add(self.root)
+        while work:
+            node, successors = work[-1]
+            for successor in successors:
+                if successor not in indexes:
+                    indexes[successor] = lowlinks[successor] = len(indexes)
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(self.successor_indexes(successor))))
+                    break
+                elif successor in on_stack:
+                    lowlinks[node] = min(lowlinks[node], indexes[successor])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlinks[parent] = min(lowlinks[parent], lowlinks[node])
+                if lowlinks[node] == indexes[node]:
+                    component = set()
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.add(self.names[member])
+                        if member == node:
+                            break
+                    components.append(component)
+        return components
+
+    def spanning_tree(self, order):
+        '''
+        The graph of the operational nodes, as returned by process_order.
+
+        :param order: Processing order of the nodes including root.
+        :type order: [str]
+        :rtype: nx.DiGraph
+        '''
+        active = set(order)
+        static = self.static
+        gr_st = nx.DiGraph()
+        gr_st.add_nodes_from((name for name in self.node_mgr.hdf_keys if name in active),
+                             color='#72f4eb', # turquoise
+                             node_type='HDFNode')
+        derived = [n for n in range(static.derived_count)
+                   if not self.recorded[n] and static.names[n] in active]
+        gr_st.add_nodes_from((static.names[n], {'color': static.colors[n],
+                                                'node_type': static.node_types[n]})
+                             for n in derived)
+        gr_st.add_node('root', color='#ffffff')
+        for n in derived:
+            gr_st.add_edges_from(
+                (static.names[n], static.names[dependency], {'order': position})
+                for position, dependency in enumerate(static.dependencies(n))
+                if static.names[dependency] in active)
+        gr_st.add_edges_from(('root', self.names[n]) for n in self.root_successors
+                             if self.names[n] in active)
+        for n, node in enumerate(order):
+            gr_st.add_node(node, label='%d: %s' % (n, node), active=True)
+        return gr_st
+
+
+def check_order(process_order, node_mgr, gr_all=None,
+                raise_inoperable_requested=False):
+    """
+    Warn of requested nodes which are not operational and raise if any
+    required nodes are not operational.
+
+    :param process_order: Processing order of the operational nodes.
+    :type process_order: [str]
+    :type node_mgr: NodeManager
+    :param gr_all: Graph of all nodes, marked as active or not, to log the
+        trees of inoperable nodes when debugging.
+    :type gr_all: nx.DiGraph or None
+    :raises InoperableDependencies: If raise_inoperable_requested and any
+        requested nodes are not operational.
+    :raises RequiredNodesMissing: If any required nodes are not operational.
+    """
+    inoperable_requested = list(set(node_mgr.requested) - set(process_order))
+    if inoperable_requested:
+        logger.warning("Found %s inoperable requested parameters.", len(inoperable_requested))
+        if gr_all is not None and logging.NOTSET < logger.getEffectiveLevel() <= logging.DEBUG:
+            # only build this massive tree if in debug!
+            items = []
+            for n in sorted(inoperable_requested):
+                tree = indent_tree(gr_all, n, recurse_active=False)
+                if tree:
+                    items.append('------- INOPERABLE -------')
+                    items.extend(tree)
+            logger.debug('\n'+'\n'.join(items))
+        if raise_inoperable_requested:
+            raise InoperableDependencies(inoperable_requested)
+
+    required_missing = set(node_mgr.required) - set(process_order)
+    if required_missing:
+        raise RequiredNodesMissing(
+            "Required nodes missing: %s" % ', '.join(required_missing))
+
+
 def process_order(gr_all, node_mgr, raise_inoperable_requested=False,
                   raise_cir_dep=False, dependency_tree_log=None):
     """
@@ -484,7 +960,7 @@ def process_order(gr_all, node_mgr, raise_inoperable_requested=False,
     :returns:
     :rtype:
     """
-    process_order, tree_path = dependencies3(gr_all, 'root', node_mgr, raise_cir_dep=raise_cir_dep)
+    process_order, tree_path = dependencies4(gr_all, 'root', node_mgr, raise_cir_dep=raise_cir_dep)
     logger.debug("Processing order of %d nodes is: %s", len(process_order), process_order)
     if dependency_tree_log:
         ordered_tree_to_file(tree_path, name=dependency_tree_log)
@@ -504,25 +980,8 @@ def process_order(gr_all, node_mgr, raise_inoperable_requested=False,
         inactive_edges = gr_all.in_edges(node)
         gr_all.add_edges_from(inactive_edges, color='#c0c0c0')  # silver
 
-    inoperable_requested = list(set(node_mgr.requested) - set(process_order))
-    if inoperable_requested:
-        logger.warning("Found %s inoperable requested parameters.", len(inoperable_requested))
-        if logging.NOTSET < logger.getEffectiveLevel() <= logging.DEBUG:
-            # only build this massive tree if in debug!
-            items = []
-            for n in sorted(inoperable_requested):
-                tree = indent_tree(gr_all, n, recurse_active=False)
-                if tree:
-                    items.append('------- INOPERABLE -------')
-                    items.extend(tree)
-            logger.debug('\n'+'\n'.join(items))
-        if raise_inoperable_requested:
-            raise InoperableDependencies(inoperable_requested)
-
-    required_missing = set(node_mgr.required) - set(process_order)
-    if required_missing:
-        raise RequiredNodesMissing(
-            "Required nodes missing: %s" % ', '.join(required_missing))
+    check_order(process_order, node_mgr, gr_all=gr_all,
+                raise_inoperable_requested=raise_inoperable_requested)
 
     return gr_all, gr_st, process_order[:-1] # exclude 'root'
 
@@ -553,6 +1012,19 @@ def dependency_order(node_mgr, draw=not_windows,
     :returns: List of Nodes determining the order for processing and the spanning tree graph.
     :rtype: (list of strings, dict)
     """
+    if not draw and not logging.NOTSET < logger.getEffectiveLevel() <= logging.DEBUG:
+        # The graph of all nodes is only needed to draw or debug.
+        graph = FlightGraph(get_static_graph(node_mgr.derived_nodes), node_mgr)
+        check_missing(graph.missing, graph.missing_requested)
+        order, tree_path = resolve_dependencies(
+            graph.ordered_successors, graph.strongly_connected_components(),
+            'root', node_mgr, raise_cir_dep=raise_cir_dep)
+        if dependency_tree_log:
+            ordered_tree_to_file(tree_path, name=dependency_tree_log)
+        check_order(order, node_mgr,
+                    raise_inoperable_requested=raise_inoperable_requested)
+        return order[:-1], graph.spanning_tree(order) # exclude 'root'
+
     _graph = graph_nodes(node_mgr)
     gr_all, gr_st, order = process_order(_graph, node_mgr,
                                          raise_inoperable_requested=raise_inoperable_requested,
@@ -569,3 +1041,45 @@ def dependency_order(node_mgr, draw=not_windows,
     return order, gr_st
 
 
+def transient_parameters(gr_st, node_mgr, patterns, persisted=()):
+    """
+    Derived parameters which are only read by other nodes while processing
+    and therefore do not need to be written to the HDF file.
+
+    A derived parameter is transient if its name matches one of the patterns
+    and it is consumed by other nodes within the spanning tree. Parameters
+    which are persisted (e.g. requested, required or exported) and top level
+    nodes of the tree, which no other node consumes, are never transient.
+
+    :param gr_st: Spanning tree of the nodes to process.
+    :type gr_st: nx.DiGraph
+    :param node_mgr:
+    :type node_mgr: NodeManager
+    :param patterns: fnmatch patterns of parameter names which may be transient.
+    :type patterns: [str]
+    :param persisted: Names of parameters which must be written.
+    :type persisted: iterable of str
+    :returns: Names of the nodes consuming each transient parameter by name.
+    :rtype: dict
+    """
+    transient = {}
+    if not patterns:
+        return transient
+    persisted = set(persisted)
+    registry = node_mgr.derived_nodes
+    if not isinstance(registry, NodeRegistry):
+        registry = NodeRegistry(classes=registry)
+    for name in gr_st.nodes():
+        if name in persisted or name in node_mgr.hdf_keys:
+            continue
+        if name not in registry:
+            continue
+        node_type = registry.node_type(name)
+        if node_type is None or not issubclass(node_type, DerivedParameterNode):
+            continue
+        if not any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns):
+            continue
+        consumers = set(gr_st.predecessors(name))
+        if consumers and 'root' not in consumers:
+            transient[name] = consumers
+    return transient
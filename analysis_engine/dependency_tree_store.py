@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+# vim:et:ft=python:nowrap:sts=4:sw=4:ts=4
+##############################################################################
+
+'''
+Flight Data Analyzer: Dependency Tree Store
+
+The dependency tree of each flight is stored with its HDF file. Trees are
+identical for the flights of the same frame and version of the analyser, so
+when settings.DEPENDENCY_TREE_STORE_DIR is set each tree is stored once
+within the directory, named by the sha256 hash of its JSON, and the HDF file
+only holds a reference to it:
+
+{"dependency_tree_hash": "<sha256>"}
+
+Otherwise the JSON of the tree is stored within the HDF file. Use
+load_dependency_tree to read either.
+'''
+
+##############################################################################
+# Imports
+
+
+import gzip
+import hashlib
+import logging
+import os
+import simplejson as json
+
+from networkx.readwrite import json_graph
+
+from analysis_engine import settings
+
+
+##############################################################################
+# Globals
+
+
+logger = logging.getLogger(name=__name__)
+
+# Key of the hash of the tree within the reference stored in HDF files.
+HASH_KEY = 'dependency_tree_hash'
+
+# Hashes of the trees known to be within each store directory.
+_STORED = set()
+
+
+##############################################################################
+# Functions
+
+
+def dependency_tree_json(gr_st):
+    '''
+    :param gr_st: Dependency tree.
+    :type gr_st: nx.DiGraph
+    :returns: Compact JSON of the tree, which is the same for equal trees.
+    :rtype: str
+    '''
+    return json.dumps(json_graph.node_link_data(gr_st), sort_keys=True,
+                      separators=(',', ':'))
+
+
+def tree_path(tree_hash, directory):
+    '''
+    :type tree_hash: str
+    :type directory: str
+    :returns: Path of the tree within the store directory.
+    :rtype: str
+    '''
+    return os.path.join(directory, tree_hash[:2], '%s.json.gz' % tree_hash)
+
+
+def save_tree(tree_json, directory):
+    '''
+    Save the JSON of a tree within the store directory unless it is already
+    stored.
+
+    :type tree_json: str
+    :type directory: str
+    :returns: Hash of the tree.
+    :rtype: str
+    :raises IOError, OSError: If the tree cannot be saved.
+    '''
+    data = tree_json.encode('utf-8')
+    tree_hash = hashlib.sha256(data).hexdigest()
+    if (directory, tree_hash) in _STORED:
+        return tree_hash
+    path = tree_path(tree_hash, directory)
+    if not os.path.isfile(path):
+        if not os.path.isdir(os.path.dirname(path)):
+            try:
+                os.makedirs(os.path.dirname(path))
+            except OSError:
+                # Created by another worker.
+                if not os.path.isdir(os.path.dirname(path)):
+                    raise
+        # Replace atomically as workers may save the same tree concurrently.
+        temp_path = '%s.%d.tmp' % (path, os.getpid())
+        with gzip.open(temp_path, 'wb') as f:
+            f.write(data)
+        os.rename(temp_path, path)
+        logger.info("Saved dependency tree '%s'.", path)
+    _STORED.add((directory, tree_hash))
+    return tree_hash
+
+
+def store_dependency_tree(hdf, gr_st, directory=None):
+    '''
+    Store the dependency tree of a flight with its HDF file.
+
+    The tree is stored within the HDF file if it cannot be saved within the
+    store directory.
+
+    :param hdf: HDF file of the flight.
+    :type hdf: hdf_file
+    :param gr_st: Dependency tree.
+    :type gr_st: nx.DiGraph
+    :param directory: Store directory, defaults to
+        settings.DEPENDENCY_TREE_STORE_DIR.
+    :type directory: str or None
+    '''
+    tree_json = dependency_tree_json(gr_st)
+    directory = directory or settings.DEPENDENCY_TREE_STORE_DIR
+    if directory:
+        try:
+            tree_hash = save_tree(tree_json, directory)
+        except (IOError, OSError):
+            logger.warning("Unable to save dependency tree within '%s'.", directory)
+        else:
+            hdf.dependency_tree = json.dumps({HASH_KEY: tree_hash})
+            return
+    hdf.dependency_tree = tree_json
+
+
+def load_dependency_tree(hdf, directory=None):
+    '''
+    Load the dependency tree of a flight stored with its HDF file, whether
+    stored within the HDF file or the store directory.
+
+    :param hdf: HDF file of the flight.
+    :type hdf: hdf_file
+    :param directory: Store directory, defaults to
+        settings.DEPENDENCY_TREE_STORE_DIR.
+    :type directory: str or None
+    :returns: Dependency tree or None if the HDF file has none.
+    :rtype: nx.DiGraph or None
+    :raises IOError: If the tree referenced is not within the store directory.
+    '''
+    if not hdf.dependency_tree:
+        return None
+    data = json.loads(hdf.dependency_tree)
+    if HASH_KEY in data:
+        directory = directory or settings.DEPENDENCY_TREE_STORE_DIR
+        if not directory:
+            raise IOError("Dependency tree '%s' is stored outside of the HDF "
+                          "file and there is no store directory." % data[HASH_KEY])
+        with gzip.open(tree_path(data[HASH_KEY], directory), 'rb') as f:
+            data = json.loads(f.read().decode('utf-8'))
+    return json_graph.node_link_graph(data)
@@ -106,7 +106,8 @@ from analysis_engine.library import (
     straighten_headings,
     track_linking,
     value_at_index,
-    vstack_params
+    vstack_params,
+    vstack_params_reduced,
 )
 
 from analysis_engine.settings import (
@@ -1937,7 +1938,8 @@ class DistanceTravelled(DerivedParameterNode):
     def derive(self, gspd=P('Groundspeed')):
         gspdarray = repair_mask(gspd.array, gspd.frequency,
                                 repair_duration=None)
-        self.array = integrate(gspdarray, gspd.frequency, scale=1.0 / 3600.0)
+        self.array = integrate(gspdarray, gspd.frequency, scale=1.0 / 3600.0,
+                               segmented=True)
 
 
 class Drift(DerivedParameterNode):
@@ -2103,6 +2105,7 @@ class Brake_TempAvg(DerivedParameterNode):
     '''
 
     name = 'Brake (*) Temp Avg'
+    output_group = 'Brake (*) Temp'
     align = False
     units = ut.CELSIUS
 
@@ -2129,8 +2132,8 @@ class Brake_TempAvg(DerivedParameterNode):
 
         brake_params = (brake1, brake2, brake3, brake4, brake5, brake6, brake7, brake8,
                         brake9, brake10, brake11, brake12, brakeC, brakeL, brakeR)
-        brakes = vstack_params(*brake_params)
-        self.array = np.ma.average(brakes, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+                            *brake_params)
         self.offset = offset_select('mean', brake_params)
 
 
@@ -2142,6 +2145,7 @@ class Brake_TempMax(DerivedParameterNode):
     '''
 
     name = 'Brake (*) Temp Max'
+    output_group = 'Brake (*) Temp'
     align = False
     units = ut.CELSIUS
 
@@ -2169,8 +2173,8 @@ class Brake_TempMax(DerivedParameterNode):
 
         brake_params = (brake1, brake2, brake3, brake4, brake5, brake6, brake7, brake8,
                         brake9, brake10, brake11, brake12, brakeC, brakeL, brakeR)
-        brakes = vstack_params(*brake_params)
-        self.array = np.ma.max(brakes, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+                            *brake_params)
         self.offset = offset_select('mean', brake_params)
 
 
@@ -2182,6 +2186,7 @@ class Brake_TempMin(DerivedParameterNode):
     '''
 
     name = 'Brake (*) Temp Min'
+    output_group = 'Brake (*) Temp'
     align = False
     units = ut.CELSIUS
 
@@ -2209,8 +2214,8 @@ class Brake_TempMin(DerivedParameterNode):
 
         brake_params = (brake1, brake2, brake3, brake4, brake5, brake6, brake7, brake8,
                         brake9, brake10, brake11, brake12, brakeC, brakeL, brakeR)
-        brakes = vstack_params(*brake_params)
-        self.array = np.ma.min(brakes, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+                            *brake_params)
         self.offset = offset_select('mean', brake_params)
 
 
@@ -2223,6 +2228,7 @@ class Eng_EPRAvg(DerivedParameterNode):
     '''
 
     name = 'Eng (*) EPR Avg'
+    output_group = 'Eng (*) EPR'
     align = False
     units = None
 
@@ -2237,8 +2243,8 @@ class Eng_EPRAvg(DerivedParameterNode):
                eng3=P('Eng (3) EPR'),
                eng4=P('Eng (4) EPR')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        self.array = np.ma.average(engines, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+                            eng1, eng2, eng3, eng4)
         self.offset = offset_select('mean', [eng1, eng2, eng3, eng4])
 
 
@@ -2247,6 +2253,7 @@ class Eng_EPRMax(DerivedParameterNode):
     '''
 
     name = 'Eng (*) EPR Max'
+    output_group = 'Eng (*) EPR'
     align = False
     units = None
 
@@ -2261,8 +2268,8 @@ class Eng_EPRMax(DerivedParameterNode):
                eng3=P('Eng (3) EPR'),
                eng4=P('Eng (4) EPR')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        self.array = np.ma.max(engines, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+                            eng1, eng2, eng3, eng4)
         self.offset = offset_select('mean', [eng1, eng2, eng3, eng4])
 
 
@@ -2271,6 +2278,7 @@ class Eng_EPRMin(DerivedParameterNode):
     '''
 
     name = 'Eng (*) EPR Min'
+    output_group = 'Eng (*) EPR'
     align = False
     units = None
 
@@ -2285,8 +2293,8 @@ class Eng_EPRMin(DerivedParameterNode):
                eng3=P('Eng (3) EPR'),
                eng4=P('Eng (4) EPR')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        self.array = np.ma.min(engines, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+                            eng1, eng2, eng3, eng4)
         self.offset = offset_select('mean', [eng1, eng2, eng3, eng4])
 
 
@@ -2336,6 +2344,7 @@ class Eng_TPRMax(DerivedParameterNode):
     '''
 
     name = 'Eng (*) TPR Max'
+    output_group = 'Eng (*) TPR'
     align = False
     units = None
 
@@ -2350,8 +2359,8 @@ class Eng_TPRMax(DerivedParameterNode):
                eng3=P('Eng (3) TPR'),
                eng4=P('Eng (4) TPR')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        self.array = np.ma.max(engines, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Max', 'Min'),
+                            eng1, eng2, eng3, eng4)
         self.offset = offset_select('mean', [eng1, eng2, eng3, eng4])
 
 
@@ -2360,6 +2369,7 @@ class Eng_TPRMin(DerivedParameterNode):
     '''
 
     name = 'Eng (*) TPR Min'
+    output_group = 'Eng (*) TPR'
     align = False
     units = None
 
@@ -2374,8 +2384,8 @@ class Eng_TPRMin(DerivedParameterNode):
                eng3=P('Eng (3) TPR'),
                eng4=P('Eng (4) TPR')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        self.array = np.ma.min(engines, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Max', 'Min'),
+                            eng1, eng2, eng3, eng4)
         self.offset = offset_select('mean', [eng1, eng2, eng3, eng4])
 
 
@@ -2417,6 +2427,7 @@ class Eng_FuelFlowMin(DerivedParameterNode):
     '''
 
     name = 'Eng (*) Fuel Flow Min'
+    output_group = 'Eng (*) Fuel Flow'
     align_frequency = 4
     align_offset = 0
     units = ut.KG_H
@@ -2432,8 +2443,8 @@ class Eng_FuelFlowMin(DerivedParameterNode):
                eng3=P('Eng (3) Fuel Flow'),
                eng4=P('Eng (4) Fuel Flow')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        self.array = np.ma.min(engines, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Max', 'Min'),
+                            eng1, eng2, eng3, eng4)
 
 
 class Eng_FuelFlowMax(DerivedParameterNode):
@@ -2445,6 +2456,7 @@ class Eng_FuelFlowMax(DerivedParameterNode):
     '''
 
     name = 'Eng (*) Fuel Flow Max'
+    output_group = 'Eng (*) Fuel Flow'
     align_frequency = 4
     align_offset = 0
     units = ut.KG_H
@@ -2460,8 +2472,8 @@ class Eng_FuelFlowMax(DerivedParameterNode):
                eng3=P('Eng (3) Fuel Flow'),
                eng4=P('Eng (4) Fuel Flow')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        self.array = np.ma.max(engines, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Max', 'Min'),
+                            eng1, eng2, eng3, eng4)
 
 
 ##############################################################################
@@ -2561,6 +2573,7 @@ class Eng_GasTempAvg(DerivedParameterNode):
     '''
 
     name = 'Eng (*) Gas Temp Avg'
+    output_group = 'Eng (*) Gas Temp'
     align = False
     units = ut.CELSIUS
 
@@ -2575,8 +2588,8 @@ class Eng_GasTempAvg(DerivedParameterNode):
                eng3=P('Eng (3) Gas Temp'),
                eng4=P('Eng (4) Gas Temp')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        self.array = np.ma.average(engines, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+                            eng1, eng2, eng3, eng4)
         self.offset = offset_select('mean', [eng1, eng2, eng3, eng4])
 
 
@@ -2585,6 +2598,7 @@ class Eng_GasTempMax(DerivedParameterNode):
     '''
 
     name = 'Eng (*) Gas Temp Max'
+    output_group = 'Eng (*) Gas Temp'
     align = False
     units = ut.CELSIUS
 
@@ -2599,8 +2613,8 @@ class Eng_GasTempMax(DerivedParameterNode):
                eng3=P('Eng (3) Gas Temp'),
                eng4=P('Eng (4) Gas Temp')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        self.array = np.ma.max(engines, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+                            eng1, eng2, eng3, eng4)
         self.offset = offset_select('mean', [eng1, eng2, eng3, eng4])
 
 
@@ -2609,6 +2623,7 @@ class Eng_GasTempMin(DerivedParameterNode):
     '''
 
     name = 'Eng (*) Gas Temp Min'
+    output_group = 'Eng (*) Gas Temp'
     align = False
     units = ut.CELSIUS
 
@@ -2623,8 +2638,8 @@ class Eng_GasTempMin(DerivedParameterNode):
                eng3=P('Eng (3) Gas Temp'),
                eng4=P('Eng (4) Gas Temp')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        self.array = np.ma.min(engines, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+                            eng1, eng2, eng3, eng4)
         self.offset = offset_select('mean', [eng1, eng2, eng3, eng4])
 
 
@@ -2641,6 +2656,7 @@ class Eng_N1Avg(DerivedParameterNode):
     '''
 
     name = 'Eng (*) N1 Avg'
+    output_group = 'Eng (*) N1'
     align_frequency = 4
     align_offset = 0
     units = ut.PERCENT
@@ -2656,8 +2672,8 @@ class Eng_N1Avg(DerivedParameterNode):
                eng3=P('Eng (3) N1'),
                eng4=P('Eng (4) N1')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        self.array = np.ma.average(engines, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+                            eng1, eng2, eng3, eng4)
 
 
 class Eng_N1AvgFor10Sec(DerivedParameterNode):
@@ -2682,6 +2698,7 @@ class Eng_N1Max(DerivedParameterNode):
     '''
 
     name = 'Eng (*) N1 Max'
+    output_group = 'Eng (*) N1'
     align_frequency = 4
     align_offset = 0
     units = ut.PERCENT
@@ -2697,8 +2714,8 @@ class Eng_N1Max(DerivedParameterNode):
                eng3=P('Eng (3) N1'),
                eng4=P('Eng (4) N1')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        self.array = np.ma.max(engines, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+                            eng1, eng2, eng3, eng4)
 
 
 class Eng_N1Min(DerivedParameterNode):
@@ -2710,6 +2727,7 @@ class Eng_N1Min(DerivedParameterNode):
     '''
 
     name = 'Eng (*) N1 Min'
+    output_group = 'Eng (*) N1'
     align_frequency = 4
     align_offset = 0
     units = ut.PERCENT
@@ -2725,8 +2743,8 @@ class Eng_N1Min(DerivedParameterNode):
                eng3=P('Eng (3) N1'),
                eng4=P('Eng (4) N1')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        self.array = np.ma.min(engines, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+                            eng1, eng2, eng3, eng4)
 
 
 class Eng_N1Split(DerivedParameterNode):
@@ -2782,6 +2800,7 @@ class Eng_N2Avg(DerivedParameterNode):
     '''
 
     name = 'Eng (*) N2 Avg'
+    output_group = 'Eng (*) N2'
     align_frequency = 4
     align_offset = 0
     units = ut.PERCENT
@@ -2797,8 +2816,8 @@ class Eng_N2Avg(DerivedParameterNode):
                eng3=P('Eng (3) N2'),
                eng4=P('Eng (4) N2')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        self.array = np.ma.average(engines, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+                            eng1, eng2, eng3, eng4)
 
 
 class Eng_N2Max(DerivedParameterNode):
@@ -2810,6 +2829,7 @@ class Eng_N2Max(DerivedParameterNode):
     '''
 
     name = 'Eng (*) N2 Max'
+    output_group = 'Eng (*) N2'
     align_frequency = 4
     align_offset = 0
     units = ut.PERCENT
@@ -2825,8 +2845,8 @@ class Eng_N2Max(DerivedParameterNode):
                eng3=P('Eng (3) N2'),
                eng4=P('Eng (4) N2')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        self.array = np.ma.max(engines, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+                            eng1, eng2, eng3, eng4)
 
 
 class Eng_N2Min(DerivedParameterNode):
@@ -2838,6 +2858,7 @@ class Eng_N2Min(DerivedParameterNode):
     '''
 
     name = 'Eng (*) N2 Min'
+    output_group = 'Eng (*) N2'
     align_frequency = 4
     align_offset = 0
     units = ut.PERCENT
@@ -2853,8 +2874,8 @@ class Eng_N2Min(DerivedParameterNode):
                eng3=P('Eng (3) N2'),
                eng4=P('Eng (4) N2')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        self.array = np.ma.min(engines, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+                            eng1, eng2, eng3, eng4)
 
 
 ##############################################################################
@@ -2870,6 +2891,7 @@ class Eng_N3Avg(DerivedParameterNode):
     '''
 
     name = 'Eng (*) N3 Avg'
+    output_group = 'Eng (*) N3'
     align_frequency = 4
     align_offset = 0
     units = ut.PERCENT
@@ -2885,8 +2907,8 @@ class Eng_N3Avg(DerivedParameterNode):
                eng3=P('Eng (3) N3'),
                eng4=P('Eng (4) N3')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        self.array = np.ma.average(engines, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+                            eng1, eng2, eng3, eng4)
 
 
 class Eng_N3Max(DerivedParameterNode):
@@ -2898,6 +2920,7 @@ class Eng_N3Max(DerivedParameterNode):
     '''
 
     name = 'Eng (*) N3 Max'
+    output_group = 'Eng (*) N3'
     align_frequency = 4
     align_offset = 0
     units = ut.PERCENT
@@ -2913,8 +2936,8 @@ class Eng_N3Max(DerivedParameterNode):
                eng3=P('Eng (3) N3'),
                eng4=P('Eng (4) N3')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        self.array = np.ma.max(engines, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+                            eng1, eng2, eng3, eng4)
 
 
 class Eng_N3Min(DerivedParameterNode):
@@ -2926,6 +2949,7 @@ class Eng_N3Min(DerivedParameterNode):
     '''
 
     name = 'Eng (*) N3 Min'
+    output_group = 'Eng (*) N3'
     align_frequency = 4
     align_offset = 0
     units = ut.PERCENT
@@ -2941,8 +2965,8 @@ class Eng_N3Min(DerivedParameterNode):
                eng3=P('Eng (3) N3'),
                eng4=P('Eng (4) N3')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        self.array = np.ma.min(engines, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+                            eng1, eng2, eng3, eng4)
 
 
 ##############################################################################
@@ -2958,6 +2982,7 @@ class Eng_NpAvg(DerivedParameterNode):
     '''
 
     name = 'Eng (*) Np Avg'
+    output_group = 'Eng (*) Np'
     align_frequency = 4
     align_offset = 0
     units = ut.PERCENT
@@ -2973,8 +2998,8 @@ class Eng_NpAvg(DerivedParameterNode):
                eng3=P('Eng (3) Np'),
                eng4=P('Eng (4) Np')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        self.array = np.ma.average(engines, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+                            eng1, eng2, eng3, eng4)
 
 
 class Eng_NpMax(DerivedParameterNode):
@@ -2986,6 +3011,7 @@ class Eng_NpMax(DerivedParameterNode):
     '''
 
     name = 'Eng (*) Np Max'
+    output_group = 'Eng (*) Np'
     align_frequency = 4
     align_offset = 0
     units = ut.PERCENT
@@ -3001,8 +3027,8 @@ class Eng_NpMax(DerivedParameterNode):
                eng3=P('Eng (3) Np'),
                eng4=P('Eng (4) Np')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        self.array = np.ma.max(engines, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+                            eng1, eng2, eng3, eng4)
 
 
 class Eng_NpMin(DerivedParameterNode):
@@ -3014,6 +3040,7 @@ class Eng_NpMin(DerivedParameterNode):
     '''
 
     name = 'Eng (*) Np Min'
+    output_group = 'Eng (*) Np'
     align_frequency = 4
     align_offset = 0
     units = ut.PERCENT
@@ -3029,8 +3056,8 @@ class Eng_NpMin(DerivedParameterNode):
                eng3=P('Eng (3) Np'),
                eng4=P('Eng (4) Np')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        self.array = np.ma.min(engines, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+                            eng1, eng2, eng3, eng4)
 
 
 ##############################################################################
@@ -3042,6 +3069,7 @@ class Eng_OilPressAvg(DerivedParameterNode):
     '''
 
     name = 'Eng (*) Oil Press Avg'
+    output_group = 'Eng (*) Oil Press'
     align = False
     units = ut.PSI
 
@@ -3056,8 +3084,8 @@ class Eng_OilPressAvg(DerivedParameterNode):
                eng3=P('Eng (3) Oil Press'),
                eng4=P('Eng (4) Oil Press')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        self.array = np.ma.average(engines, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+                            eng1, eng2, eng3, eng4)
         self.offset = offset_select('mean', [eng1, eng2, eng3, eng4])
 
 
@@ -3066,6 +3094,7 @@ class Eng_OilPressMax(DerivedParameterNode):
     '''
 
     name = 'Eng (*) Oil Press Max'
+    output_group = 'Eng (*) Oil Press'
     align = False
     units = ut.PSI
 
@@ -3080,8 +3109,8 @@ class Eng_OilPressMax(DerivedParameterNode):
                eng3=P('Eng (3) Oil Press'),
                eng4=P('Eng (4) Oil Press')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        self.array = np.ma.max(engines, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+                            eng1, eng2, eng3, eng4)
         self.offset = offset_select('mean', [eng1, eng2, eng3, eng4])
 
 
@@ -3090,6 +3119,7 @@ class Eng_OilPressMin(DerivedParameterNode):
     '''
 
     name = 'Eng (*) Oil Press Min'
+    output_group = 'Eng (*) Oil Press'
     align = False
     units = ut.PSI
 
@@ -3104,8 +3134,8 @@ class Eng_OilPressMin(DerivedParameterNode):
                eng3=P('Eng (3) Oil Press'),
                eng4=P('Eng (4) Oil Press')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        self.array = np.ma.min(engines, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+                            eng1, eng2, eng3, eng4)
         self.offset = offset_select('mean', [eng1, eng2, eng3, eng4])
 
 
@@ -3118,6 +3148,7 @@ class Eng_OilQtyAvg(DerivedParameterNode):
     '''
 
     name = 'Eng (*) Oil Qty Avg'
+    output_group = 'Eng (*) Oil Qty'
     align = False
     units = ut.QUART
 
@@ -3132,8 +3163,8 @@ class Eng_OilQtyAvg(DerivedParameterNode):
                eng3=P('Eng (3) Oil Qty'),
                eng4=P('Eng (4) Oil Qty')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        self.array = np.ma.average(engines, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+                            eng1, eng2, eng3, eng4)
         self.offset = offset_select('mean', [eng1, eng2, eng3, eng4])
 
 
@@ -3142,6 +3173,7 @@ class Eng_OilQtyMax(DerivedParameterNode):
     '''
 
     name = 'Eng (*) Oil Qty Max'
+    output_group = 'Eng (*) Oil Qty'
     align = False
     units = ut.QUART
 
@@ -3156,8 +3188,8 @@ class Eng_OilQtyMax(DerivedParameterNode):
                eng3=P('Eng (3) Oil Qty'),
                eng4=P('Eng (4) Oil Qty')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        self.array = np.ma.max(engines, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+                            eng1, eng2, eng3, eng4)
         self.offset = offset_select('mean', [eng1, eng2, eng3, eng4])
 
 
@@ -3166,6 +3198,7 @@ class Eng_OilQtyMin(DerivedParameterNode):
     '''
 
     name = 'Eng (*) Oil Qty Min'
+    output_group = 'Eng (*) Oil Qty'
     align = False
     units = ut.QUART
 
@@ -3180,8 +3213,8 @@ class Eng_OilQtyMin(DerivedParameterNode):
                eng3=P('Eng (3) Oil Qty'),
                eng4=P('Eng (4) Oil Qty')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        self.array = np.ma.min(engines, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+                            eng1, eng2, eng3, eng4)
         self.offset = offset_select('mean', [eng1, eng2, eng3, eng4])
 
 
@@ -3194,6 +3227,7 @@ class Eng_OilTempAvg(DerivedParameterNode):
     '''
 
     name = 'Eng (*) Oil Temp Avg'
+    output_group = 'Eng (*) Oil Temp'
     align = False
     units = ut.CELSIUS
 
@@ -3208,15 +3242,17 @@ class Eng_OilTempAvg(DerivedParameterNode):
                eng3=P('Eng (3) Oil Temp'),
                eng4=P('Eng (4) Oil Temp')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        avg_array = np.ma.average(engines, axis=0)
-        if np.ma.count(avg_array) != 0:
-            self.array = avg_array
+        outputs = self.derive_outputs(
+            vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+            eng1, eng2, eng3, eng4)
+        if np.ma.count(self.array) != 0:
             self.offset = offset_select('mean', [eng1, eng2, eng3, eng4])
         else:
             # Some aircraft have no oil temperature sensors installed, so
             # quit now if there is no valid result.
-            self.array = np_ma_masked_zeros_like(avg_array)
+            for name, array in outputs.items():
+                outputs[name] = np_ma_masked_zeros_like(array)
+            self.array = outputs[self.name]
 
 
 class Eng_OilTempMax(DerivedParameterNode):
@@ -3224,6 +3260,7 @@ class Eng_OilTempMax(DerivedParameterNode):
     '''
 
     name = 'Eng (*) Oil Temp Max'
+    output_group = 'Eng (*) Oil Temp'
     align = False
     units = ut.CELSIUS
 
@@ -3238,15 +3275,17 @@ class Eng_OilTempMax(DerivedParameterNode):
                eng3=P('Eng (3) Oil Temp'),
                eng4=P('Eng (4) Oil Temp')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        max_array = np.ma.max(engines, axis=0)
-        if np.ma.count(max_array) != 0:
-            self.array = max_array
+        outputs = self.derive_outputs(
+            vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+            eng1, eng2, eng3, eng4)
+        if np.ma.count(self.array) != 0:
             self.offset = offset_select('mean', [eng1, eng2, eng3, eng4])
         else:
             # Some aircraft have no oil temperature sensors installed, so
             # quit now if there is no valid result.
-            self.array = np_ma_masked_zeros_like(max_array)
+            for name, array in outputs.items():
+                outputs[name] = np_ma_masked_zeros_like(array)
+            self.array = outputs[self.name]
 
 
 class Eng_OilTempMin(DerivedParameterNode):
@@ -3254,6 +3293,7 @@ class Eng_OilTempMin(DerivedParameterNode):
     '''
 
     name = 'Eng (*) Oil Temp Min'
+    output_group = 'Eng (*) Oil Temp'
     align = False
     units = ut.CELSIUS
 
@@ -3268,15 +3308,17 @@ class Eng_OilTempMin(DerivedParameterNode):
                eng3=P('Eng (3) Oil Temp'),
                eng4=P('Eng (4) Oil Temp')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        min_array = np.ma.min(engines, axis=0)
-        if np.ma.count(min_array) != 0:
-            self.array = min_array
+        outputs = self.derive_outputs(
+            vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+            eng1, eng2, eng3, eng4)
+        if np.ma.count(self.array) != 0:
             self.offset = offset_select('mean', [eng1, eng2, eng3, eng4])
         else:
             # Some aircraft have no oil temperature sensors installed, so
             # quit now if there is no valid result.
-            self.array = np_ma_masked_zeros_like(min_array)
+            for name, array in outputs.items():
+                outputs[name] = np_ma_masked_zeros_like(array)
+            self.array = outputs[self.name]
 
 
 ##############################################################################
@@ -3288,6 +3330,7 @@ class Eng_TorqueAvg(DerivedParameterNode):
     '''
 
     name = 'Eng (*) Torque Avg'
+    output_group = 'Eng (*) Torque'
     align = False
     units = ut.PERCENT
 
@@ -3302,8 +3345,8 @@ class Eng_TorqueAvg(DerivedParameterNode):
                eng3=P('Eng (3) Torque'),
                eng4=P('Eng (4) Torque')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        self.array = np.ma.average(engines, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+                            eng1, eng2, eng3, eng4)
         self.offset = offset_select('mean', [eng1, eng2, eng3, eng4])
 
 
@@ -3312,6 +3355,7 @@ class Eng_TorqueMax(DerivedParameterNode):
     '''
 
     name = 'Eng (*) Torque Max'
+    output_group = 'Eng (*) Torque'
     align = False
     units = ut.PERCENT
 
@@ -3326,8 +3370,8 @@ class Eng_TorqueMax(DerivedParameterNode):
                eng3=P('Eng (3) Torque'),
                eng4=P('Eng (4) Torque')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        self.array = np.ma.max(engines, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+                            eng1, eng2, eng3, eng4)
         self.offset = offset_select('mean', [eng1, eng2, eng3, eng4])
 
 
@@ -3336,6 +3380,7 @@ class Eng_TorqueMin(DerivedParameterNode):
     '''
 
     name = 'Eng (*) Torque Min'
+    output_group = 'Eng (*) Torque'
     align = False
     units = ut.PERCENT
 
@@ -3349,8 +3394,8 @@ class Eng_TorqueMin(DerivedParameterNode):
                eng3=P('Eng (3) Torque'),
                eng4=P('Eng (4) Torque')):
 
-        engines = vstack_params(eng1, eng2, eng3, eng4)
-        self.array = np.ma.min(engines, axis=0)
+        self.derive_outputs(vstack_params_reduced, self.output_group, ('Avg', 'Max', 'Min'),
+                            eng1, eng2, eng3, eng4)
         self.offset = offset_select('mean', [eng1, eng2, eng3, eng4])
 
 
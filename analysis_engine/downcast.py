@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+# vim:et:ft=python:nowrap:sts=4:sw=4:ts=4
+##############################################################################
+
+'''
+Flight Data Analyzer: Downcast
+
+Downcasting of derived parameters written to the HDF file. A policy chooses
+the data type the array is downcast to by parameter class, e.g. multistates
+are stored as the smallest integer type holding their states and other
+parameters as float32 where their values are within tolerance.
+
+Only the data type is chosen. The downcast array is written by
+hdf_file.set_param, which does not accept dataset options, so chunk shapes
+and compression remain those of the HDF file.
+
+Policies are configured by settings.DOWNCAST_POLICIES, which is empty by
+default as derived parameters are read back from the HDF file by the nodes
+which depend upon them.
+'''
+
+##############################################################################
+# Imports
+
+
+import copy
+import fnmatch
+import logging
+import numpy as np
+
+from hdfaccess.parameter import MappedArray
+
+from analysis_engine import settings
+from analysis_engine.precision import is_float64_parameter
+
+
+##############################################################################
+# Globals
+
+
+logger = logging.getLogger(name=__name__)
+
+# Integer data types in order of preference when downcasting to the smallest.
+INTEGER_DTYPES = (np.uint8, np.int8, np.uint16, np.int16, np.uint32, np.int32,
+                  np.int64)
+
+
+##############################################################################
+# Classes
+
+
+class DowncastPolicy(object):
+    '''
+    The data type a class of derived parameters is stored as within the HDF
+    file.
+
+    Parameters match the policy if they match each of the criteria which are
+    set: multistate, parameters, min_frequency and max_frequency.
+    '''
+
+    def __init__(self, name, multistate=None, parameters=None,
+                 min_frequency=None, max_frequency=None, dtype=None,
+                 tolerance=None):
+        '''
+        :param name: Name of the policy.
+        :type name: str
+        :param multistate: Match only multistates (True) or only other
+            parameters (False).
+        :type multistate: bool or None
+        :param parameters: fnmatch patterns of parameter names.
+        :type parameters: [str] or None
+        :param min_frequency: Match parameters of this frequency and above.
+        :type min_frequency: float or None
+        :param max_frequency: Match parameters of this frequency and below.
+        :type max_frequency: float or None
+        :param dtype: Data type to downcast arrays to, or 'integer' for the
+            smallest integer type holding the values. None keeps the data type.
+        :type dtype: str or None
+        :param tolerance: Maximum absolute error of valid values introduced by
+            downcasting, otherwise the data type is kept. Defaults to
+            settings.DOWNCAST_TOLERANCE.
+        :type tolerance: float or None
+        '''
+        self.name = name
+        self.multistate = multistate
+        self.parameters = parameters
+        self.min_frequency = min_frequency
+        self.max_frequency = max_frequency
+        self.dtype = dtype
+        self.tolerance = tolerance
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, self.name)
+
+    def matches(self, param):
+        '''
+        :param param: Parameter to store.
+        :type param: DerivedParameterNode
+        :rtype: bool
+        '''
+        if self.multistate is not None and \
+           self.multistate != isinstance(param.array, MappedArray):
+            return False
+        if self.parameters is not None and not any(
+                fnmatch.fnmatchcase(param.name, pattern) for pattern in self.parameters):
+            return False
+        if self.min_frequency is not None and param.frequency < self.min_frequency:
+            return False
+        if self.max_frequency is not None and param.frequency > self.max_frequency:
+            return False
+        return True
+
+    def downcast_dtype(self, array):
+        '''
+        The data type to store the array as, if smaller than its own and the
+        valid values are within tolerance.
+
+        :param array: Array of a parameter.
+        :type array: np.ma.MaskedArray
+        :returns: Data type to downcast to or None.
+        :rtype: np.dtype or None
+        '''
+        if self.dtype is None or array.dtype.kind not in 'biuf':
+            return None
+        data = np.ma.getdata(array)
+        valid = data[~np.ma.getmaskarray(array)]
+        if self.dtype == 'integer':
+            if not len(valid):
+                dtype = np.dtype(np.int8)
+            elif not np.all(np.isfinite(valid)) or np.any(valid % 1):
+                return None
+            else:
+                lower, upper = valid.min(), valid.max()
+                for dtype in INTEGER_DTYPES:
+                    info = np.iinfo(dtype)
+                    if info.min <= lower and upper <= info.max:
+                        break
+                dtype = np.dtype(dtype)
+            tolerance = 0
+        else:
+            dtype = np.dtype(self.dtype)
+            tolerance = self.tolerance
+            if tolerance is None:
+                tolerance = settings.DOWNCAST_TOLERANCE
+        if dtype.itemsize >= array.dtype.itemsize:
+            return None
+        with np.errstate(over='ignore', invalid='ignore'):
+            error = np.abs(valid.astype(dtype).astype(valid.dtype) - valid)
+            # NaN values remain NaN whereas overflow is infinite.
+            if np.any(error > tolerance):
+                return None
+        return dtype
+
+
+##############################################################################
+# Functions
+
+
+def get_downcast_policy(param, policies=None):
+    '''
+    The first policy the parameter matches, otherwise a default policy which
+    keeps the data type.
+
+    :param param: Parameter to store.
+    :type param: DerivedParameterNode
+    :param policies: Keyword arguments of each DowncastPolicy in order of
+        precedence. Defaults to settings.DOWNCAST_POLICIES.
+    :type policies: [dict] or None
+    :rtype: DowncastPolicy
+    '''
+    if policies is None:
+        policies = settings.DOWNCAST_POLICIES
+    for kwargs in policies:
+        policy = DowncastPolicy(**kwargs)
+        if policy.matches(param):
+            return policy
+    return DowncastPolicy('default')
+
+
+def downcast_param(param, policy=None):
+    '''
+    Downcast the array of a parameter to the data type of its policy.
+
+    The parameter is returned unchanged if the policy keeps its data type or
+    it is a floating point parameter matching settings.FLOAT64_PARAMETERS,
+    otherwise a copy is returned so that the derived node is not modified.
+
+    :param param: Parameter to store.
+    :type param: DerivedParameterNode
+    :param policy: Downcast policy, otherwise chosen by get_downcast_policy.
+    :type policy: DowncastPolicy or None
+    :rtype: DerivedParameterNode
+    '''
+    if policy is None:
+        policy = get_downcast_policy(param)
+    array = param.array
+    dtype = policy.downcast_dtype(array)
+    if dtype is None or (dtype.kind == 'f' and is_float64_parameter(param.name)):
+        return param
+    downcast = np.ma.MaskedArray(np.ma.getdata(array).astype(dtype),
+                                 mask=np.ma.getmaskarray(array))
+    if isinstance(array, MappedArray):
+        downcast = MappedArray(downcast, values_mapping=array.values_mapping)
+    result = copy.copy(param)
+    result.array = downcast
+    logger.debug("Downcast '%s' from %s to %s for policy '%s'.",
+                 param.name, array.dtype, dtype, policy.name)
+    return result
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+# vim:et:ft=python:nowrap:sts=4:sw=4:ts=4
+##############################################################################
+
+'''
+Flight Data Analyzer: Fingerprints
+
+Hashes of arrays and files which identify segments, e.g. the speed hash of
+segments which go fast and the hash of the segment file otherwise.
+
+Arrays and files are hashed in chunks of settings.FINGERPRINT_CHUNK_SIZE
+through memoryviews rather than copies. The digest is chosen by
+settings.FINGERPRINT_ALGORITHM; 'sha256' fingerprints are the same as those
+of library.hash_array and sha_hash_file.
+'''
+
+##############################################################################
+# Imports
+
+
+import hashlib
+import numpy as np
+import os
+import threading
+
+from collections import OrderedDict
+
+from analysis_engine import settings
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+
+##############################################################################
+# Globals
+
+
+ALGORITHMS = {
+    'sha256': hashlib.sha256,
+    'blake2b': lambda: hashlib.blake2b(digest_size=32),
+}
+if xxhash:
+    ALGORITHMS['xxh64'] = xxhash.xxh64
+
+# File fingerprints by path, size, modification time and algorithm.
+_FILE_FINGERPRINTS = OrderedDict()
+_FILE_FINGERPRINTS_LOCK = threading.Lock()
+
+
+##############################################################################
+# Functions
+
+
+def new_hash(algorithm=None):
+    '''
+    :param algorithm: Name of the digest, defaults to
+        settings.FINGERPRINT_ALGORITHM.
+    :type algorithm: str or None
+    :returns: Hash object with update and hexdigest methods.
+    :raises ValueError: If the algorithm is unknown or unavailable.
+    '''
+    algorithm = algorithm or settings.FINGERPRINT_ALGORITHM
+    try:
+        return ALGORITHMS[algorithm]()
+    except KeyError:
+        raise ValueError("Fingerprint algorithm '%s' is not available." % algorithm)
+
+
+def update_hash(checksum, buffer, chunk_size=None):
+    '''
+    Update a hash with a buffer in chunks without copying it.
+
+    :param checksum: Hash object.
+    :param buffer: Object supporting the buffer protocol, e.g. bytes or a
+        contiguous numpy array.
+    :param chunk_size: Size of the chunks in bytes, defaults to
+        settings.FINGERPRINT_CHUNK_SIZE.
+    :type chunk_size: int or None
+    '''
+    chunk_size = chunk_size or settings.FINGERPRINT_CHUNK_SIZE
+    view = memoryview(buffer).cast('B')
+    for start in range(0, len(view), chunk_size):
+        checksum.update(view[start:start + chunk_size])
+
+
+def hash_array(array, sections, min_samples, algorithm=None):
+    '''
+    Hash the sections of an array which have at least min_samples samples.
+
+    The bytes hashed are those of array[section].tostring() for each section.
+
+    :param array: Array to hash, e.g. the data of a masked array.
+    :type array: np.ndarray
+    :param sections: Sections of the array to hash.
+    :type sections: [slice]
+    :param min_samples: Minimum number of samples of a section to hash.
+    :type min_samples: int
+    :param algorithm: Name of the digest, defaults to
+        settings.FINGERPRINT_ALGORITHM.
+    :type algorithm: str or None
+    :returns: Hexadecimal digest.
+    :rtype: str
+    '''
+    checksum = new_hash(algorithm)
+    for section in sections:
+        if section.stop - section.start < min_samples:
+            continue
+        section_array = array[section]
+        if isinstance(section_array, np.ma.MaskedArray):
+            # Masked values are hashed as the fill value, as by tostring().
+            section_array = section_array.filled()
+        section_array = np.ascontiguousarray(section_array)
+        update_hash(checksum, section_array.reshape(-1).view(np.uint8))
+    return checksum.hexdigest()
+
+
+def hash_file(path, algorithm=None):
+    '''
+    Hash the contents of a file. Fingerprints are cached by path, size and
+    modification time, so unchanged files are only read once.
+
+    :param path: Path of the file.
+    :type path: str
+    :param algorithm: Name of the digest, defaults to
+        settings.FINGERPRINT_ALGORITHM.
+    :type algorithm: str or None
+    :returns: Hexadecimal digest.
+    :rtype: str
+    '''
+    algorithm = algorithm or settings.FINGERPRINT_ALGORITHM
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns, algorithm)
+    with _FILE_FINGERPRINTS_LOCK:
+        fingerprint = _FILE_FINGERPRINTS.get(key)
+        if fingerprint is not None:
+            _FILE_FINGERPRINTS.move_to_end(key)
+            return fingerprint
+
+    checksum = new_hash(algorithm)
+    chunk = bytearray(settings.FINGERPRINT_CHUNK_SIZE)
+    view = memoryview(chunk)
+    with open(path, 'rb') as f:
+        while True:
+            size = f.readinto(chunk)
+            if not size:
+                break
+            checksum.update(view[:size])
+    fingerprint = checksum.hexdigest()
+
+    with _FILE_FINGERPRINTS_LOCK:
+        _FILE_FINGERPRINTS[key] = fingerprint
+        while len(_FILE_FINGERPRINTS) > settings.FINGERPRINT_CACHE_SIZE:
+            _FILE_FINGERPRINTS.popitem(last=False)
+    return fingerprint
+
+
+def clear_cache():
+    '''
+    Clear the cached file fingerprints.
+    '''
+    with _FILE_FINGERPRINTS_LOCK:
+        _FILE_FINGERPRINTS.clear()
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+# vim:et:ft=python:nowrap:sts=4:sw=4:ts=4
+##############################################################################
+
+'''
+Flight Data Analyzer: HDF Writer
+
+Write-behind of derived parameters to an HDF file so that deriving nodes is
+not blocked by compressing and writing the previous parameters.
+'''
+
+##############################################################################
+# Imports
+
+
+import copy
+import logging
+import six
+import sys
+import threading
+
+from six.moves import queue
+
+from analysis_engine import settings
+
+
+##############################################################################
+# Globals
+
+
+logger = logging.getLogger(name=__name__)
+
+
+##############################################################################
+# Classes
+
+
+class WriteBehindHDF(object):
+    '''
+    Proxy of an open hdf_file which writes parameters in a background thread.
+
+    set_param queues the parameter and returns immediately. The background
+    thread owns writes to the HDF file and access to the file from other
+    threads is serialised with a lock. Parameters which are queued are read
+    from the queue rather than the file.
+
+    Errors raised while writing are raised by the next call to set_param,
+    get_param or flush, and by close. Any other attribute of the HDF file is
+    accessed after flushing the queue, so the proxy can be passed wherever
+    an hdf_file is expected:
+
+    with WriteBehindHDF(hdf) as writer:
+        writer.set_param(node)
+        writer.get_param(node.name)
+    '''
+
+    def __init__(self, hdf, queue_size=None):
+        '''
+        :param hdf: Open HDF file to write to.
+        :type hdf: hdfaccess.file.hdf_file
+        :param queue_size: Maximum number of parameters waiting to be
+            written, after which set_param blocks to limit memory usage.
+            Defaults to settings.HDF_WRITE_BEHIND_QUEUE_SIZE.
+        :type queue_size: int or None
+        '''
+        if queue_size is None:
+            queue_size = settings.HDF_WRITE_BEHIND_QUEUE_SIZE
+        self.hdf = hdf
+        self._lock = threading.RLock()
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._error = None
+        self._thread = threading.Thread(target=self._write, name='WriteBehindHDF')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Do not replace an exception raised within the block.
+        self.close(raise_errors=exc_type is None)
+
+    def __getattr__(self, name):
+        if name == 'hdf' or name.startswith('_'):
+            # Not yet set within __init__ or private to the proxy.
+            raise AttributeError(name)
+        self.flush()
+        with self._lock:
+            return getattr(self.hdf, name)
+
+    def __getitem__(self, name):
+        return self.get_param(name)
+
+    def __contains__(self, name):
+        with self._pending_lock:
+            if name in self._pending:
+                return True
+        with self._lock:
+            return name in self.hdf
+
+    def _write(self):
+        '''
+        Write queued parameters until None is queued.
+        '''
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                param, kwargs = item
+                if self._error is None:
+                    try:
+                        with self._lock:
+                            self.hdf.set_param(param, **kwargs)
+                    except Exception:
+                        logger.exception("Failed to write parameter '%s'.", param.name)
+                        self._error = sys.exc_info()
+                with self._pending_lock:
+                    if self._pending.get(param.name) is param:
+                        del self._pending[param.name]
+            finally:
+                self._queue.task_done()
+
+    def _raise_error(self):
+        '''
+        Raise the first error raised while writing.
+        '''
+        if self._error is not None:
+            error, self._error = self._error, None
+            six.reraise(*error)
+
+    def set_param(self, param, **kwargs):
+        '''
+        Queue a parameter to be written.
+
+        :param param: Parameter to write.
+        :type param: DerivedParameterNode
+        :param kwargs: Keyword arguments of hdf_file.set_param.
+        '''
+        self._raise_error()
+        with self._pending_lock:
+            self._pending[param.name] = param
+        self._queue.put((param, kwargs))
+
+    def get_param(self, name, valid_only=False, **kwargs):
+        '''
+        Get a parameter, from the queue if it has not been written yet.
+
+        Parameters from the queue are copies, as parameters read from the
+        HDF file may be modified by the caller.
+
+        :param name: Name of the parameter.
+        :type name: str
+        :param valid_only: Raise KeyError if the parameter is invalid.
+        :type valid_only: bool
+        :param kwargs: Keyword arguments of hdf_file.get_param.
+        :raises KeyError: If the parameter does not exist or is invalid.
+        '''
+        self._raise_error()
+        with self._pending_lock:
+            param = self._pending.get(name)
+        if param is None:
+            with self._lock:
+                return self.hdf.get_param(name, valid_only=valid_only, **kwargs)
+        if valid_only and getattr(param, 'invalid', False):
+            raise KeyError("%s is marked as invalid" % name)
+        result = copy.copy(param)
+        result.array = param.array.copy()
+        return result
+
+    def get(self, name, default=None):
+        '''
+        :param name: Name of the parameter.
+        :type name: str
+        :param default: Returned if the parameter does not exist.
+        '''
+        try:
+            return self.get_param(name)
+        except KeyError:
+            return default
+
+    def flush(self):
+        '''
+        Wait until every queued parameter has been written.
+
+        :raises: The first error raised while writing.
+        '''
+        self._queue.join()
+        self._raise_error()
+
+    def close(self, raise_errors=True):
+        '''
+        Write the queued parameters and stop the background thread. The HDF
+        file remains open.
+
+        :param raise_errors: Whether to raise errors raised while writing.
+        :type raise_errors: bool
+        '''
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if raise_errors:
+            self._raise_error()
@@ -14,6 +14,7 @@ from analysis_engine.library import (
     cycle_finder,
     is_index_within_slice,
     index_at_value,
+    indexes_at_values,
     mask_outside_slices,
     max_abs_value,
     max_value,
@@ -202,7 +203,7 @@ class AirspeedAbove101PercentRotorSpeed(KeyPointValueNode):
         airborne_slices = airborne.get_slices()
         slices_above_101_pct = runs_of_ones(nr_above_101)
         above_101_while_airborne = slices_and(airborne_slices, slices_above_101_pct)
-        self.create_kpvs_within_slices(airspeed.array, above_101_while_airborne, max_value)
+        self.create_extreme_kpvs(airspeed, above_101_while_airborne, max_value)
 
 
 class AirspeedAbove500FtMin(KeyPointValueNode):
@@ -348,7 +349,7 @@ class AirspeedDuringAutorotationMax(KeyPointValueNode):
     can_operate = helicopter_only
 
     def derive(self, airspeed=P('Airspeed'), phase=S('Autorotation')):
-        self.create_kpvs_within_slices(airspeed.array, phase, max_value)
+        self.create_extreme_kpvs(airspeed, phase, max_value)
 
 
 class AirspeedDuringAutorotationMin(KeyPointValueNode):
@@ -361,7 +362,7 @@ class AirspeedDuringAutorotationMin(KeyPointValueNode):
     can_operate = helicopter_only
 
     def derive(self, airspeed=P('Airspeed'), phase=S('Autorotation')):
-        self.create_kpvs_within_slices(airspeed.array, phase, min_value)
+        self.create_extreme_kpvs(airspeed, phase, min_value)
 
 
 ########################################
@@ -395,7 +396,7 @@ class AltitudeRadioDuringAutorotationMin(KeyPointValueNode):
     can_operate = helicopter_only
 
     def derive(self, alt_rad=P('Altitude Radio'), autorotation=S('Autorotation')):
-        self.create_kpvs_within_slices(alt_rad.array, autorotation, min_value)
+        self.create_extreme_kpvs(alt_rad, autorotation, min_value)
 
 
 class AltitudeDuringCruiseMin(KeyPointValueNode):
@@ -407,7 +408,7 @@ class AltitudeDuringCruiseMin(KeyPointValueNode):
     can_operate = helicopter_only
 
     def derive(self, alt_agl=P('Altitude AGL'), cruise=S('Cruise')):
-        self.create_kpvs_within_slices(alt_agl.array, cruise, min_value)
+        self.create_extreme_kpvs(alt_agl, cruise, min_value)
 
 
 
@@ -608,7 +609,7 @@ class EngN2DuringMaximumContinuousPowerMin(KeyPointValueNode):
                eng_n2_min=P('Eng (*) N2 Min'),
                mcp=S('Maximum Continuous Power')):
 
-        self.create_kpvs_within_slices(eng_n2_min.array, mcp, min_value)
+        self.create_extreme_kpvs(eng_n2_min, mcp, min_value)
 
 
 ##############################################################################
@@ -631,7 +632,7 @@ class EngTorqueWithOneEngineInoperativeMax(KeyPointValueNode):
                one_eng=M('One Engine Inoperative')):
 
         phases = slices_and(runs_of_ones(one_eng.array == 'OEI'), airborne.get_slices())
-        self.create_kpvs_within_slices(eng_trq_max.array, phases, max_value)
+        self.create_extreme_kpvs(eng_trq_max, phases, max_value)
 
 
 class EngTorqueAbove90KtsMax(KeyPointValueNode):
@@ -788,7 +789,7 @@ class CGBOilTempMax(KeyPointValueNode):
     can_operate = helicopter_only
 
     def derive(self, cgb=P('CGB Oil Temp'), airborne=S('Airborne')):
-        self.create_kpvs_within_slices(cgb.array, airborne, max_value)
+        self.create_extreme_kpvs(cgb, airborne, max_value)
 
 
 class CGBOilPressMax(KeyPointValueNode):
@@ -800,7 +801,7 @@ class CGBOilPressMax(KeyPointValueNode):
     can_operate = helicopter_only
 
     def derive(self, cgb=P('CGB Oil Press'), airborne=S('Airborne')):
-        self.create_kpvs_within_slices(cgb.array, airborne, max_value)
+        self.create_extreme_kpvs(cgb, airborne, max_value)
 
 
 class CGBOilPressMin(KeyPointValueNode):
@@ -812,7 +813,7 @@ class CGBOilPressMin(KeyPointValueNode):
     can_operate = helicopter_only
 
     def derive(self, cgb=P('CGB Oil Press'), airborne=S('Airborne')):
-        self.create_kpvs_within_slices(cgb.array, airborne, min_value)
+        self.create_extreme_kpvs(cgb, airborne, min_value)
 
 
 class IGBOilTempMax(KeyPointValueNode):
@@ -830,7 +831,7 @@ class IGBOilTempMax(KeyPointValueNode):
         return aircraft and gearbox and airborne
 
     def derive(self, igb=P('IGB Oil Temp'), airborne=S('Airborne')):
-        self.create_kpvs_within_slices(igb.array, airborne, max_value)
+        self.create_extreme_kpvs(igb, airborne, max_value)
 
 
 class TGBOilTempMax(KeyPointValueNode):
@@ -848,7 +849,7 @@ class TGBOilTempMax(KeyPointValueNode):
         return aircraft and gearbox and airborne
 
     def derive(self, tgb=P('TGB Oil Temp'), airborne=S('Airborne')):
-        self.create_kpvs_within_slices(tgb.array, airborne, max_value)
+        self.create_extreme_kpvs(tgb, airborne, max_value)
 
 
 ##############################################################################
@@ -1089,7 +1090,7 @@ class GroundspeedWhileAirborneWithASEOff(KeyPointValueNode):
 
     def derive(self, gnd_spd=P('Groundspeed'), ase=M('ASE Engaged'), airborne=S('Airborne')):
         sections = clump_multistate(ase.array, 'Engaged', airborne.get_slices(), False)
-        self.create_kpvs_within_slices(gnd_spd.array, sections, max_value)
+        self.create_extreme_kpvs(gnd_spd, sections, max_value)
 
 
 class GroundspeedWhileHoverTaxiingMax(KeyPointValueNode):
@@ -1128,7 +1129,7 @@ class GroundspeedWithZeroAirspeedFor5SecMax(KeyPointValueNode):
                                     slices_below(headwind, 0)[1])
             zero_airspeed = slices_remove_small_slices(zero_airspeed, time_limit=5,
                                                       hz=self.frequency)
-            self.create_kpvs_within_slices(gnd_spd.array, zero_airspeed, max_value)
+            self.create_extreme_kpvs(gnd_spd, zero_airspeed, max_value)
 
 
 class GroundspeedBelow100FtMax(KeyPointValueNode):
@@ -1188,7 +1189,7 @@ class PitchBelow5FtMax(KeyPointValueNode):
     def derive(self, pitch=P('Pitch'), alt_agl=P('Altitude AGL'),
                airborne=S('Airborne')):
         slices = slices_and(airborne.get_slices(), alt_agl.slices_below(5))
-        self.create_kpvs_within_slices(pitch.array, slices, max_value)
+        self.create_extreme_kpvs(pitch, slices, max_value)
 
 
 class Pitch5To10FtMax(KeyPointValueNode):
@@ -1203,7 +1204,7 @@ class Pitch5To10FtMax(KeyPointValueNode):
                airborne=S('Airborne')):
         slices = slices_and(airborne.get_slices(),
                             alt_agl.slices_from_to(5, 10))
-        self.create_kpvs_within_slices(pitch.array, slices, max_value)
+        self.create_extreme_kpvs(pitch, slices, max_value)
 
 
 class Pitch10To5FtMax(KeyPointValueNode):
@@ -1218,7 +1219,7 @@ class Pitch10To5FtMax(KeyPointValueNode):
                airborne=S('Airborne')):
         slices = slices_and(airborne.get_slices(),
                             alt_agl.slices_from_to(10, 5))
-        self.create_kpvs_within_slices(pitch.array, slices, max_value)
+        self.create_extreme_kpvs(pitch, slices, max_value)
 
 
 class Pitch500To100FtMax(KeyPointValueNode):
@@ -1534,7 +1535,7 @@ class RateOfDescentBelow30KtsWithPowerOnMax(KeyPointValueNode):
                                   slices_below(air_spd.array, 30)[1])
         speed_bands = slices_and(speed_bands,
                                  slices_above(power.array, 20.0)[1])
-        self.create_kpvs_within_slices(vrt_spd.array, speed_bands, min_value)
+        self.create_extreme_kpvs(vrt_spd, speed_bands, min_value)
 
 
 class VerticalSpeedAtAltitude(KeyPointValueNode):
@@ -1548,10 +1549,11 @@ class VerticalSpeedAtAltitude(KeyPointValueNode):
 
     def derive(self, vert_spd=P('Vertical Speed'), alt_agl=P('Altitude AGL'),
                approaches=S('Approach')):
-        for approach in approaches:
-            for altitude in self.NAME_VALUES['altitude']:
-                index = index_at_value(alt_agl.array, altitude,
-                                       approach.slice, 'nearest')
+        altitudes = self.NAME_VALUES['altitude']
+        approach_slices = [approach.slice for approach in approaches]
+        for indexes in indexes_at_values(alt_agl.array, altitudes,
+                                         approach_slices, 'nearest'):
+            for altitude, index in zip(altitudes, indexes):
                 if not index:
                     continue
                 value = value_at_index(vert_spd.array, index)
@@ -1595,7 +1597,7 @@ class RollAbove300FtMax(KeyPointValueNode):
 
     def derive(self, roll=P('Roll'), alt_agl=P('Altitude AGL For Flight Phases')):
         _, height_bands = slices_above(alt_agl.array, 300)
-        self.create_kpvs_within_slices(roll.array, height_bands, max_abs_value)
+        self.create_extreme_kpvs(roll, height_bands, max_abs_value)
 
 
 class RollBelow300FtMax(KeyPointValueNode):
@@ -1611,7 +1613,7 @@ class RollBelow300FtMax(KeyPointValueNode):
                airborne=S('Airborne')):
         alt_slices = slices_and(airborne.get_slices(),
                                 slices_below(alt_agl.array, 300)[1])
-        self.create_kpvs_within_slices(roll.array, alt_slices, max_abs_value)
+        self.create_extreme_kpvs(roll, alt_slices, max_abs_value)
 
 
 class RollWithAFCSDisengagedMax(KeyPointValueNode):
@@ -1628,7 +1630,7 @@ class RollWithAFCSDisengagedMax(KeyPointValueNode):
                                          (afcs2, 'Engaged')).any(axis=0)
 
         afcs_slices = np.ma.clump_unmasked(np.ma.masked_equal(afcs, 1))
-        self.create_kpvs_within_slices(roll.array, afcs_slices, max_abs_value)
+        self.create_extreme_kpvs(roll, afcs_slices, max_abs_value)
 
 
 class RollAbove500FtMax(KeyPointValueNode):
@@ -1642,7 +1644,7 @@ class RollAbove500FtMax(KeyPointValueNode):
 
     def derive(self, roll=P('Roll'), alt_agl=P('Altitude AGL For Flight Phases')):
         height_bands = slices_above(alt_agl.array, 500)[1]
-        self.create_kpvs_within_slices(roll.array, height_bands, max_abs_value)
+        self.create_extreme_kpvs(roll, height_bands, max_abs_value)
 
 
 class RollBelow500FtMax(KeyPointValueNode):
@@ -1656,7 +1658,7 @@ class RollBelow500FtMax(KeyPointValueNode):
 
     def derive(self, roll=P('Roll'), alt_agl=P('Altitude AGL For Flight Phases')):
         height_bands = slices_below(alt_agl.array, 500)[1]
-        self.create_kpvs_within_slices(roll.array, height_bands, max_abs_value)
+        self.create_extreme_kpvs(roll, height_bands, max_abs_value)
 
 
 class RollOnGroundMax(KeyPointValueNode):
@@ -1731,7 +1733,7 @@ class RotorSpeedDuringAutorotationAbove108KtsMin(KeyPointValueNode):
     def derive(self, nr=P('Nr'), air_spd=P('Airspeed'), autorotation=S('Autorotation')):
         speed_bands = slices_and(autorotation.get_slices(),
                                   slices_above(air_spd.array, 108)[1])
-        self.create_kpvs_within_slices(nr.array, speed_bands, min_value)
+        self.create_extreme_kpvs(nr, speed_bands, min_value)
 
 
 class RotorSpeedDuringAutorotationBelow108KtsMin(KeyPointValueNode):
@@ -1747,7 +1749,7 @@ class RotorSpeedDuringAutorotationBelow108KtsMin(KeyPointValueNode):
     def derive(self, nr=P('Nr'), air_spd=P('Airspeed'), autorotation=S('Autorotation')):
         speed_bands = slices_and(autorotation.get_slices(),
                                   slices_below(air_spd.array, 108)[1])
-        self.create_kpvs_within_slices(nr.array, speed_bands, min_value)
+        self.create_extreme_kpvs(nr, speed_bands, min_value)
 
 
 class RotorSpeedDuringAutorotationMax(KeyPointValueNode):
@@ -1985,7 +1987,7 @@ class SATMin(KeyPointValueNode):
                rotors_turning=S('Rotors Turning')):
 
         if family and family.value == 'S92':
-            self.create_kpvs_within_slices(sat.array, rotors_turning, min_value)
+            self.create_extreme_kpvs(sat, rotors_turning, min_value)
         else:
             self.create_kpv(*min_value(sat.array))
 
@@ -8,7 +8,7 @@ from copy import deepcopy
 from datetime import datetime
 
 from analysis_engine import settings
-from analysis_engine.utils import get_derived_nodes
+from analysis_engine.node_registry import get_node_registry
 
 
 # VERSION will be included in json output. Only json matching the current VERSION number will be loaded.
@@ -193,7 +193,7 @@ def process_flight_to_nodes(pf_results):
     '''
     from analysis_engine import node
     
-    derived_nodes = get_derived_nodes(settings.NODE_MODULES)
+    derived_nodes = get_node_registry(settings.NODE_MODULES)
     
     params = {}
     
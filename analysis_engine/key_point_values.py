@@ -42,6 +42,7 @@ from analysis_engine.library import (
     hysteresis,
     ils_established,
     index_at_value,
+    indexes_at_values,
     index_of_first_start,
     index_of_last_stop,
     integrate,
@@ -1130,7 +1131,7 @@ class AccelerationNormalLiftoffTo35FtMax(KeyPointValueNode):
                              'Altitude data may be missing/invalid at Takeoff.')
                 continue
             slices.append(slice(liftoff.index, takeoff[0].stop_edge))
-        self.create_kpvs_within_slices(acc_norm.array, slices, max_value)
+        self.create_extreme_kpvs(acc_norm, slices, max_value)
 
 
 class AccelerationNormalOffset(KeyPointValueNode):
@@ -1216,7 +1217,7 @@ class AirspeedMax(KeyPointValueNode):
                air_spd=P('Airspeed'),
                airborne=S('Airborne')):
 
-        self.create_kpvs_within_slices(air_spd.array, airborne, max_value)
+        self.create_extreme_kpvs(air_spd, airborne, max_value)
 
 
 class AirspeedAt8000FtDescending(KeyPointValueNode):
@@ -1249,7 +1250,7 @@ class AirspeedDuringCruiseMax(KeyPointValueNode):
                air_spd=P('Airspeed'),
                cruises=S('Cruise')):
 
-        self.create_kpvs_within_slices(air_spd.array, cruises, max_value)
+        self.create_extreme_kpvs(air_spd, cruises, max_value)
 
 
 class AirspeedDuringCruiseMin(KeyPointValueNode):
@@ -1263,7 +1264,7 @@ class AirspeedDuringCruiseMin(KeyPointValueNode):
                air_spd=P('Airspeed'),
                cruises=S('Cruise')):
 
-        self.create_kpvs_within_slices(air_spd.array, cruises, min_value)
+        self.create_extreme_kpvs(air_spd, cruises, min_value)
 
 
 class AirspeedGustsDuringFinalApproach(KeyPointValueNode):
@@ -2651,7 +2652,7 @@ class AirspeedMinusMinimumAirspeedDuringGoAroundMin(KeyPointValueNode):
                air_spd=P('Airspeed Minus Minimum Airspeed'),
                phases=S('Go Around And Climbout')):
 
-        self.create_kpvs_within_slices(air_spd.array, phases, min_value)
+        self.create_extreme_kpvs(air_spd, phases, min_value)
 
 
 ########################################
@@ -3815,7 +3816,7 @@ class AirspeedWhileGearRetractingMax(KeyPointValueNode):
                air_spd=P('Airspeed'),
                gear_ret=S('Gear Retracting')):
 
-        self.create_kpvs_within_slices(air_spd.array, gear_ret, max_value)
+        self.create_extreme_kpvs(air_spd, gear_ret, max_value)
 
 
 class AirspeedWhileGearExtendingMax(KeyPointValueNode):
@@ -3829,7 +3830,7 @@ class AirspeedWhileGearExtendingMax(KeyPointValueNode):
                air_spd=P('Airspeed'),
                gear_ext=S('Gear Extending')):
 
-        self.create_kpvs_within_slices(air_spd.array, gear_ext, max_value)
+        self.create_extreme_kpvs(air_spd, gear_ext, max_value)
 
 
 class AirspeedAtGearUpSelection(KeyPointValueNode):
@@ -3931,7 +3932,7 @@ class AirspeedWithConfiguration1FExcludingTransitionMax(KeyPointValueNode):
                conf=M('Configuration Excluding Transition'),):
 
         conf_slices = runs_of_ones(conf.array=='1+F')
-        self.create_kpvs_within_slices(airspeed.array, conf_slices, max_value)
+        self.create_extreme_kpvs(airspeed, conf_slices, max_value)
 
 
 class AirspeedRelativeWithConfigurationDuringDescentMin(KeyPointValueNode, FlapOrConfigurationMaxOrMin):
@@ -4015,7 +4016,7 @@ class AirspeedWithThrustReversersDeployedMin(KeyPointValueNode):
                 power = eng_n1
                 threshold = REVERSE_THRUST_EFFECTIVE_N1
             high_rev = thrust_reversers_working(landing, power, tr, threshold)
-            self.create_kpvs_within_slices(air_spd.array, high_rev, min_value)
+            self.create_extreme_kpvs(air_spd, high_rev, min_value)
 
 
 class AirspeedAtThrustReversersSelection(KeyPointValueNode):
@@ -4091,7 +4092,7 @@ class AirspeedDuringRejectedTakeoffMax(KeyPointValueNode):
 
     def derive(self, air_spd=P('Airspeed'), rtos=S('Rejected Takeoff')):
         #NOTE: Use 'Groundspeed During Rejected Takeoff Max' in preference
-        self.create_kpvs_within_slices(air_spd.array, rtos, max_value)
+        self.create_extreme_kpvs(air_spd, rtos, max_value)
 
 
 class AirspeedBelow10000FtDuringDescentMax(KeyPointValueNode):
@@ -4126,7 +4127,7 @@ class AirspeedBelow10000FtDuringDescentMax(KeyPointValueNode):
 
         height_bands = np.ma.clump_unmasked(np.ma.masked_greater(alt, 10000))
         descent_bands = slices_and(height_bands, descent.get_slices())
-        self.create_kpvs_within_slices(air_spd.array, descent_bands, max_value)
+        self.create_extreme_kpvs(air_spd, descent_bands, max_value)
 
 
 class AirspeedTopOfDescentTo10000FtMax(KeyPointValueNode):
@@ -4163,7 +4164,7 @@ class AirspeedTopOfDescentTo10000FtMax(KeyPointValueNode):
             height_bands = np.ma.clump_unmasked(np.ma.masked_less(repair_mask(alt),
                                                                   10000))
             descent_bands = slices_and(height_bands, descent.get_slices())
-            self.create_kpvs_within_slices(air_spd.array, descent_bands, max_value)
+            self.create_extreme_kpvs(air_spd, descent_bands, max_value)
 
 
 class AirspeedTopOfDescentTo4000FtMax(KeyPointValueNode):
@@ -4200,7 +4201,7 @@ class AirspeedTopOfDescentTo4000FtMax(KeyPointValueNode):
             height_bands = np.ma.clump_unmasked(np.ma.masked_less(repair_mask(alt),
                                                                   4000))
             descent_bands = slices_and(height_bands, descent.get_slices())
-            self.create_kpvs_within_slices(air_spd.array, descent_bands, max_value)
+            self.create_extreme_kpvs(air_spd, descent_bands, max_value)
 
 
 class AirspeedTopOfDescentTo4000FtMin(KeyPointValueNode):
@@ -4238,7 +4239,7 @@ class AirspeedTopOfDescentTo4000FtMin(KeyPointValueNode):
             height_bands = np.ma.clump_unmasked(np.ma.masked_less(repair_mask(alt),
                                                                   4000))
             descent_bands = slices_and(height_bands, descent.get_slices())
-            self.create_kpvs_within_slices(air_spd.array, descent_bands, min_value)
+            self.create_extreme_kpvs(air_spd, descent_bands, min_value)
 
 
 class AirspeedDuringLevelFlightMax(KeyPointValueNode):
@@ -4343,7 +4344,7 @@ class AOADuringGoAroundMax(KeyPointValueNode):
                aoa=P('AOA'),
                go_arounds=S('Go Around And Climbout')):
 
-        self.create_kpvs_within_slices(aoa.array, go_arounds, max_value)
+        self.create_extreme_kpvs(aoa, go_arounds, max_value)
 
 
 class AOAWithFlapMax(KeyPointValueNode, FlapOrConfigurationMaxOrMin):
@@ -4946,7 +4947,7 @@ class BrakeTempDuringTaxiInMax(KeyPointValueNode):
     units = ut.CELSIUS
 
     def derive(self, brakes=P('Brake (*) Temp Max'), taxiin=S('Taxi In')):
-        self.create_kpvs_within_slices(brakes.array, taxiin, max_value)
+        self.create_extreme_kpvs(brakes, taxiin, max_value)
 
 
 class BrakeTempAfterTouchdownDelta(KeyPointValueNode):
@@ -4998,7 +4999,7 @@ class BrakePressureInTakeoffRollMax(KeyPointValueNode):
         "Excursions - Take off (Lateral)". Primary Brake pressure during ground
         roll. Could also be applicable to longitudinal excursions on take-off.
         '''
-        self.create_kpvs_within_slices(bp.array, rolls, max_value)
+        self.create_extreme_kpvs(bp, rolls, max_value)
 
 
 # TODO: Consider renaming this as 'delayed' implies it is already late!
@@ -5124,7 +5125,7 @@ class AltitudeMax(KeyPointValueNode):
                alt_std=P('Altitude STD Smoothed'),
                airborne=S('Airborne')):
 
-        self.create_kpvs_within_slices(alt_std.array, airborne, max_value)
+        self.create_extreme_kpvs(alt_std, airborne, max_value)
 
 
 class AltitudeDuringGoAroundMin(KeyPointValueNode):
@@ -5143,7 +5144,7 @@ class AltitudeDuringGoAroundMin(KeyPointValueNode):
         is not the lowest altitude point if the go-around occurs over uneven
         ground.
         '''
-        self.create_kpvs_within_slices(alt_aal.array, go_arounds, min_value)
+        self.create_extreme_kpvs(alt_aal, go_arounds, min_value)
 
 
 class HeightAtGoAround(KeyPointValueNode):
@@ -5280,7 +5281,7 @@ class AltitudeDuringCabinAltitudeWarningMax(KeyPointValueNode):
         # TODO: warns = runs_of_ones(cab_warn.array == 'Warning')
         warns = np.ma.clump_unmasked(np.ma.masked_equal(cab_warn.array, 0))
         air_warns = slices_and(warns, airborne.get_slices())
-        self.create_kpvs_within_slices(alt.array, air_warns, max_value)
+        self.create_extreme_kpvs(alt, air_warns, max_value)
 
 
 class CabinAltitudeMax(KeyPointValueNode):
@@ -5294,7 +5295,7 @@ class CabinAltitudeMax(KeyPointValueNode):
                cab_alt=P('Cabin Altitude'),
                airborne=S('Airborne')):
 
-        self.create_kpvs_within_slices(cab_alt.array, airborne, max_value)
+        self.create_extreme_kpvs(cab_alt, airborne, max_value)
 
 
 class AltitudeSTDMax(KeyPointValueNode):
@@ -7657,7 +7658,7 @@ class ElevatorDuringLandingMin(KeyPointValueNode):
 
     def derive(self, elev=P('Elevator'), landing=S('Landing')):
 
-        self.create_kpvs_within_slices(elev.array, landing, min_value)
+        self.create_extreme_kpvs(elev, landing, min_value)
 
 
 ##############################################################################
@@ -9042,7 +9043,7 @@ class MachMax(KeyPointValueNode):
                mach=P('Mach'),
                airs=S('Airborne')):
 
-        self.create_kpvs_within_slices(mach.array, airs, max_value)
+        self.create_extreme_kpvs(mach, airs, max_value)
 
 
 class MachDuringCruiseAvg(KeyPointValueNode):
@@ -9162,7 +9163,7 @@ class MachWhileGearRetractingMax(KeyPointValueNode):
                mach=P('Mach'),
                gear_ret=S('Gear Retracting')):
 
-        self.create_kpvs_within_slices(mach.array, gear_ret, max_value)
+        self.create_extreme_kpvs(mach, gear_ret, max_value)
 
 
 class MachWhileGearExtendingMax(KeyPointValueNode):
@@ -9176,7 +9177,7 @@ class MachWhileGearExtendingMax(KeyPointValueNode):
                mach=P('Mach'),
                gear_ext=S('Gear Extending')):
 
-        self.create_kpvs_within_slices(mach.array, gear_ext, max_value)
+        self.create_extreme_kpvs(mach, gear_ext, max_value)
 
 
 ##############################################################################
@@ -9788,7 +9789,7 @@ class EngEPRDuringTakeoff5MinRatingMax(KeyPointValueNode):
                eng_epr_max=P('Eng (*) EPR Max'),
                ratings=S('Takeoff 5 Min Rating')):
 
-        self.create_kpvs_within_slices(eng_epr_max.array, ratings, max_value)
+        self.create_extreme_kpvs(eng_epr_max, ratings, max_value)
 
 
 class EngEPRFor5SecDuringTakeoff5MinRatingMax(KeyPointValueNode):
@@ -9823,7 +9824,7 @@ class EngTPRDuringTakeoff5MinRatingMax(KeyPointValueNode):
                eng_tpr_limit=P('Eng TPR Limit Difference'),
                ratings=S('Takeoff 5 Min Rating')):
 
-        self.create_kpvs_within_slices(eng_tpr_limit.array, ratings, max_value)
+        self.create_extreme_kpvs(eng_tpr_limit, ratings, max_value)
 
 
 class EngTPRFor5SecDuringTakeoff5MinRatingMax(KeyPointValueNode):
@@ -9857,7 +9858,7 @@ class EngEPRDuringGoAround5MinRatingMax(KeyPointValueNode):
                eng_epr_max=P('Eng (*) EPR Max'),
                ratings=S('Go Around 5 Min Rating')):
 
-        self.create_kpvs_within_slices(eng_epr_max.array, ratings, max_value)
+        self.create_extreme_kpvs(eng_epr_max, ratings, max_value)
 
 
 class EngEPRFor5SecDuringGoAround5MinRatingMax(KeyPointValueNode):
@@ -9891,7 +9892,7 @@ class EngTPRDuringGoAround5MinRatingMax(KeyPointValueNode):
                eng_tpr_limit=P('Eng TPR Limit Difference'),
                ratings=S('Go Around 5 Min Rating')):
 
-        self.create_kpvs_within_slices(eng_tpr_limit.array, ratings, max_value)
+        self.create_extreme_kpvs(eng_tpr_limit, ratings, max_value)
 
 
 class EngTPRFor5SecDuringGoAround5MinRatingMax(KeyPointValueNode):
@@ -9928,7 +9929,7 @@ class EngEPRDuringMaximumContinuousPowerMax(KeyPointValueNode):
                eng_epr_max=P('Eng (*) EPR Max'),
                mcp=S('Maximum Continuous Power')):
 
-        self.create_kpvs_within_slices(eng_epr_max.array, mcp, max_value)
+        self.create_extreme_kpvs(eng_epr_max, mcp, max_value)
 
 
 class EngEPRFor5SecDuringMaximumContinuousPowerMax(KeyPointValueNode):
@@ -9968,7 +9969,7 @@ class EngTPRDuringMaximumContinuousPowerMax(KeyPointValueNode):
                eng_tpr_max=P('Eng (*) TPR Max'),
                mcp=S('Maximum Continuous Power')):
 
-        self.create_kpvs_within_slices(eng_tpr_max.array, mcp, max_value)
+        self.create_extreme_kpvs(eng_tpr_max, mcp, max_value)
 
 
 class EngTPRFor5SecDuringMaximumContinuousPowerMax(KeyPointValueNode):
@@ -10265,7 +10266,7 @@ class EngGasTempDuringTakeoff5MinRatingMax(KeyPointValueNode):
                eng_egt_max=P('Eng (*) Gas Temp Max'),
                ratings=S('Takeoff 5 Min Rating')):
 
-        self.create_kpvs_within_slices(eng_egt_max.array, ratings, max_value)
+        self.create_extreme_kpvs(eng_egt_max, ratings, max_value)
 
 
 class EngGasTempFor5SecDuringTakeoff5MinRatingMax(KeyPointValueNode):
@@ -10297,7 +10298,7 @@ class EngGasTempDuringGoAround5MinRatingMax(KeyPointValueNode):
                eng_egt_max=P('Eng (*) Gas Temp Max'),
                ratings=S('Go Around 5 Min Rating')):
 
-        self.create_kpvs_within_slices(eng_egt_max.array, ratings, max_value)
+        self.create_extreme_kpvs(eng_egt_max, ratings, max_value)
 
 
 class EngGasTempFor5SecDuringGoAround5MinRatingMax(KeyPointValueNode):
@@ -10336,7 +10337,7 @@ class EngGasTempDuringMaximumContinuousPowerMax(KeyPointValueNode):
         periods and inverting these from the start of the first airborne section to
         the end of the last, we have the required periods of flight.
         '''
-        self.create_kpvs_within_slices(eng_egt_max.array, mcp, max_value)
+        self.create_extreme_kpvs(eng_egt_max, mcp, max_value)
 
 
 class EngGasTempFor5SecDuringMaximumContinuousPowerMax(KeyPointValueNode):
@@ -10811,7 +10812,7 @@ class EngN1DuringTakeoff5MinRatingMax(KeyPointValueNode):
                eng_n1_max=P('Eng (*) N1 Max'),
                ratings=S('Takeoff 5 Min Rating')):
 
-        self.create_kpvs_within_slices(eng_n1_max.array, ratings, max_value)
+        self.create_extreme_kpvs(eng_n1_max, ratings, max_value)
 
 
 class EngN1For5SecDuringTakeoff5MinRatingMax(KeyPointValueNode):
@@ -10844,7 +10845,7 @@ class EngN1DuringGoAround5MinRatingMax(KeyPointValueNode):
                eng_n1_max=P('Eng (*) N1 Max'),
                ratings=S('Go Around 5 Min Rating')):
 
-        self.create_kpvs_within_slices(eng_n1_max.array, ratings, max_value)
+        self.create_extreme_kpvs(eng_n1_max, ratings, max_value)
 
 
 class EngN1For5SecDuringGoAround5MinRatingMax(KeyPointValueNode):
@@ -10880,7 +10881,7 @@ class EngN1DuringMaximumContinuousPowerMax(KeyPointValueNode):
                eng_n1_max=P('Eng (*) N1 Max'),
                mcp=S('Maximum Continuous Power')):
 
-        self.create_kpvs_within_slices(eng_n1_max.array, mcp, max_value)
+        self.create_extreme_kpvs(eng_n1_max, mcp, max_value)
 
 
 class EngN1For5SecDuringMaximumContinuousPowerMax(KeyPointValueNode):
@@ -11402,7 +11403,7 @@ class EngN2DuringTakeoff5MinRatingMax(KeyPointValueNode):
                eng_n2_max=P('Eng (*) N2 Max'),
                ratings=S('Takeoff 5 Min Rating')):
 
-        self.create_kpvs_within_slices(eng_n2_max.array, ratings, max_value)
+        self.create_extreme_kpvs(eng_n2_max, ratings, max_value)
 
 
 class EngN2For5SecDuringTakeoff5MinRatingMax(KeyPointValueNode):
@@ -11435,7 +11436,7 @@ class EngN2DuringGoAround5MinRatingMax(KeyPointValueNode):
                eng_n2_max=P('Eng (*) N2 Max'),
                ratings=S('Go Around 5 Min Rating')):
 
-        self.create_kpvs_within_slices(eng_n2_max.array, ratings, max_value)
+        self.create_extreme_kpvs(eng_n2_max, ratings, max_value)
 
 
 class EngN2For5SecDuringGoAround5MinRatingMax(KeyPointValueNode):
@@ -11471,7 +11472,7 @@ class EngN2DuringMaximumContinuousPowerMax(KeyPointValueNode):
                eng_n2_max=P('Eng (*) N2 Max'),
                mcp=S('Maximum Continuous Power')):
 
-        self.create_kpvs_within_slices(eng_n2_max.array, mcp, max_value)
+        self.create_extreme_kpvs(eng_n2_max, mcp, max_value)
 
 
 
@@ -11577,7 +11578,7 @@ class EngN3DuringTakeoff5MinRatingMax(KeyPointValueNode):
                eng_n3_max=P('Eng (*) N3 Max'),
                ratings=S('Takeoff 5 Min Rating')):
 
-        self.create_kpvs_within_slices(eng_n3_max.array, ratings, max_value)
+        self.create_extreme_kpvs(eng_n3_max, ratings, max_value)
 
 
 class EngN3For5SecDuringTakeoff5MinRatingMax(KeyPointValueNode):
@@ -11610,7 +11611,7 @@ class EngN3DuringGoAround5MinRatingMax(KeyPointValueNode):
                eng_n3_max=P('Eng (*) N3 Max'),
                ratings=S('Go Around 5 Min Rating')):
 
-        self.create_kpvs_within_slices(eng_n3_max.array, ratings, max_value)
+        self.create_extreme_kpvs(eng_n3_max, ratings, max_value)
 
 
 class EngN3For5SecDuringGoAround5MinRatingMax(KeyPointValueNode):
@@ -11646,7 +11647,7 @@ class EngN3DuringMaximumContinuousPowerMax(KeyPointValueNode):
                eng_n3_max=P('Eng (*) N3 Max'),
                mcp=S('Maximum Continuous Power')):
 
-        self.create_kpvs_within_slices(eng_n3_max.array, mcp, max_value)
+        self.create_extreme_kpvs(eng_n3_max, mcp, max_value)
 
 
 class EngN3For5SecDuringMaximumContinuousPowerMax(KeyPointValueNode):
@@ -11750,8 +11751,8 @@ class EngNpDuringTakeoff5MinRatingMax(KeyPointValueNode):
                takeoffs=S('Takeoff 5 Min Rating'),
                go_arounds=S('Go Around 5 Min Rating')):
 
-        self.create_kpvs_within_slices(eng_np_max.array, takeoffs, max_value)
-        self.create_kpvs_within_slices(eng_np_max.array, go_arounds, max_value)
+        self.create_extreme_kpvs(eng_np_max, takeoffs, max_value)
+        self.create_extreme_kpvs(eng_np_max, go_arounds, max_value)
 
 
 class EngNpFor5SecDuringTakeoff5MinRatingMax(KeyPointValueNode):
@@ -11785,7 +11786,7 @@ class EngNpDuringGoAround5MinRatingMax(KeyPointValueNode):
                eng_np_max=P('Eng (*) Np Max'),
                ratings=S('Go Around 5 Min Rating')):
 
-        self.create_kpvs_within_slices(eng_np_max.array, ratings, max_value)
+        self.create_extreme_kpvs(eng_np_max, ratings, max_value)
 
 
 class EngNpFor5SecDuringGoAround5MinRatingMax(KeyPointValueNode):
@@ -11821,7 +11822,7 @@ class EngNpDuringMaximumContinuousPowerMax(KeyPointValueNode):
                eng_np_max=P('Eng (*) Np Max'),
                mcp=S('Maximum Continuous Power')):
 
-        self.create_kpvs_within_slices(eng_np_max.array, mcp, max_value)
+        self.create_extreme_kpvs(eng_np_max, mcp, max_value)
 
 
 class EngNpForXSecDuringMaximumContinuousPowerMax(KeyPointValueNode):
@@ -12049,7 +12050,7 @@ class EngOilQtyMax(KeyPointValueNode):
                oil_qty=P('Eng (*) Oil Qty Max'),
                airborne=S('Airborne')):
 
-        self.create_kpvs_within_slices(oil_qty.array, airborne, max_value)
+        self.create_extreme_kpvs(oil_qty, airborne, max_value)
 
 
 class EngOilQtyMin(KeyPointValueNode):
@@ -12063,7 +12064,7 @@ class EngOilQtyMin(KeyPointValueNode):
                oil_qty=P('Eng (*) Oil Qty Min'),
                airborne=S('Airborne')):
 
-        self.create_kpvs_within_slices(oil_qty.array, airborne, min_value)
+        self.create_extreme_kpvs(oil_qty, airborne, min_value)
 
 
 class EngOilQtyDuringTaxiInMax(KeyPointValueNode):
@@ -12147,7 +12148,7 @@ class EngOilTempMax(KeyPointValueNode):
                oil_temp=P('Eng (*) Oil Temp Max'),
                airborne=S('Airborne')):
 
-        self.create_kpvs_within_slices(oil_temp.array, airborne, max_value)
+        self.create_extreme_kpvs(oil_temp, airborne, max_value)
 
 
 class EngOilTempForXMinMax(KeyPointValueNode):
@@ -12215,7 +12216,7 @@ class EngTorqueDuringTakeoff5MinRatingMax(KeyPointValueNode):
         phases = ratings.get_slices()
         if all_eng:
             phases = slices_and(runs_of_ones(all_eng.array == 'AEO'), phases)
-        self.create_kpvs_within_slices(eng_trq_max.array, phases, max_value)
+        self.create_extreme_kpvs(eng_trq_max, phases, max_value)
 
 
 class EngTorqueFor5SecDuringTakeoff5MinRatingMax(KeyPointValueNode):
@@ -12271,7 +12272,7 @@ class EngTorqueDuringGoAround5MinRatingMax(KeyPointValueNode):
                eng_trq_max=P('Eng (*) Torque Max'),
                ratings=S('Go Around 5 Min Rating')):
 
-        self.create_kpvs_within_slices(eng_trq_max.array, ratings, max_value)
+        self.create_extreme_kpvs(eng_trq_max, ratings, max_value)
 
 
 class EngTorqueFor5SecDuringGoAround5MinRatingMax(KeyPointValueNode):
@@ -12317,7 +12318,7 @@ class EngTorqueDuringMaximumContinuousPowerMax(KeyPointValueNode):
         phases = mcp.get_slices()
         if all_eng:
             phases = slices_and(runs_of_ones(all_eng.array == 'AEO'), phases)
-        self.create_kpvs_within_slices(eng_trq_max.array, phases, max_value)
+        self.create_extreme_kpvs(eng_trq_max, phases, max_value)
 
 
 class EngTorqueFor5SecDuringMaximumContinuousPowerMax(KeyPointValueNode):
@@ -12471,7 +12472,7 @@ class EngVibN1Max(KeyPointValueNode):
                eng_vib_n1=P('Eng (*) Vib N1 Max'),
                airborne=S('Airborne')):
 
-        self.create_kpvs_within_slices(eng_vib_n1.array, airborne, max_value)
+        self.create_extreme_kpvs(eng_vib_n1, airborne, max_value)
 
 
 class EngVibN2Max(KeyPointValueNode):
@@ -12486,7 +12487,7 @@ class EngVibN2Max(KeyPointValueNode):
                eng_vib_n2=P('Eng (*) Vib N2 Max'),
                airborne=S('Airborne')):
 
-        self.create_kpvs_within_slices(eng_vib_n2.array, airborne, max_value)
+        self.create_extreme_kpvs(eng_vib_n2, airborne, max_value)
 
 
 class EngVibN3Max(KeyPointValueNode):
@@ -12501,7 +12502,7 @@ class EngVibN3Max(KeyPointValueNode):
                eng_vib_n3=P('Eng (*) Vib N3 Max'),
                airborne=S('Airborne')):
 
-        self.create_kpvs_within_slices(eng_vib_n3.array, airborne, max_value)
+        self.create_extreme_kpvs(eng_vib_n3, airborne, max_value)
 
 
 # Engine Vibrations (Filters)
@@ -12519,7 +12520,7 @@ class EngVibAMax(KeyPointValueNode):
                eng_vib_a=P('Eng (*) Vib A Max'),
                airborne=S('Airborne')):
 
-        self.create_kpvs_within_slices(eng_vib_a.array, airborne, max_value)
+        self.create_extreme_kpvs(eng_vib_a, airborne, max_value)
 
 
 class EngVibBMax(KeyPointValueNode):
@@ -12534,7 +12535,7 @@ class EngVibBMax(KeyPointValueNode):
                eng_vib_b=P('Eng (*) Vib B Max'),
                airborne=S('Airborne')):
 
-        self.create_kpvs_within_slices(eng_vib_b.array, airborne, max_value)
+        self.create_extreme_kpvs(eng_vib_b, airborne, max_value)
 
 
 class EngVibCMax(KeyPointValueNode):
@@ -12549,7 +12550,7 @@ class EngVibCMax(KeyPointValueNode):
                eng_vib_c=P('Eng (*) Vib C Max'),
                airborne=S('Airborne')):
 
-        self.create_kpvs_within_slices(eng_vib_c.array, airborne, max_value)
+        self.create_extreme_kpvs(eng_vib_c, airborne, max_value)
 
 
 class EngVibNpMax(KeyPointValueNode):
@@ -12564,7 +12565,7 @@ class EngVibNpMax(KeyPointValueNode):
                eng_vib_np=P('Eng (*) Vib Np Max'),
                airborne=S('Airborne')):
 
-        self.create_kpvs_within_slices(eng_vib_np.array, airborne, max_value)
+        self.create_extreme_kpvs(eng_vib_np, airborne, max_value)
 
 
 ##############################################################################
@@ -12862,7 +12863,7 @@ class HeightOfBouncedLanding(KeyPointValueNode):
                alt_aal=P('Altitude AAL'),
                bounced_ldg=S('Bounced Landing')):
 
-        self.create_kpvs_within_slices(alt_aal.array, bounced_ldg, max_value)
+        self.create_extreme_kpvs(alt_aal, bounced_ldg, max_value)
 
 
 ##############################################################################
@@ -13984,7 +13985,7 @@ class GroundspeedDuringRejectedTakeoffMax(KeyPointValueNode):
                gnd_spd=P('Groundspeed Signed'),
                rtos=S('Rejected Takeoff')):
         if gnd_spd:
-            self.create_kpvs_within_slices(gnd_spd.array, rtos, max_value)
+            self.create_extreme_kpvs(gnd_spd, rtos, max_value)
             return
         # Without groundspeed, we only calculate an estimated Groundspeed for RTOs.
         scale = ut.convert(GRAVITY_IMPERIAL, ut.FPS, ut.KT)
@@ -14104,7 +14105,7 @@ class GroundspeedWithThrustReversersDeployedMin(KeyPointValueNode):
         for landing in aligned_landings:
             # handle difference in frequencies
             high_rev = thrust_reversers_working(landing, power, tr, threshold)
-            self.create_kpvs_within_slices(gnd_spd.array, high_rev, min_value)
+            self.create_extreme_kpvs(gnd_spd, high_rev, min_value)
 
 class GroundspeedStabilizerOutOfTrimDuringTakeoffMax(KeyPointValueNode):
     '''
@@ -14320,7 +14321,7 @@ class PitchAfterFlapRetractionMax(KeyPointValueNode):
             if not slices:
                 continue
             scope.append(slice(air.slice.start + slices[0].start, air.slice.stop))
-        self.create_kpvs_within_slices(pitch.array, scope, max_value)
+        self.create_extreme_kpvs(pitch, scope, max_value)
 
 
 class PitchAtLiftoff(KeyPointValueNode):
@@ -14402,7 +14403,7 @@ class PitchTakeoffMax(KeyPointValueNode):
                pitch=P('Pitch'),
                takeoffs=S('Takeoff')):
 
-        self.create_kpvs_within_slices(pitch.array, takeoffs, max_value)
+        self.create_extreme_kpvs(pitch, takeoffs, max_value)
 
 
 class Pitch35ToClimbAccelerationStartMin(KeyPointValueNode):
@@ -14950,7 +14951,7 @@ class PitchDuringGoAroundMax(KeyPointValueNode):
                pitch=P('Pitch'),
                go_arounds=S('Go Around And Climbout')):
 
-        self.create_kpvs_within_slices(pitch.array, go_arounds, max_value)
+        self.create_extreme_kpvs(pitch, go_arounds, max_value)
 
 
 class PitchWhileAirborneMax(KeyPointValueNode):
@@ -14961,7 +14962,7 @@ class PitchWhileAirborneMax(KeyPointValueNode):
     units = ut.DEGREE
 
     def derive(self, pitch=P('Pitch'), airborne=S('Airborne')):
-        self.create_kpvs_within_slices(pitch.array, airborne, max_value)
+        self.create_extreme_kpvs(pitch, airborne, max_value)
 
 
 class PitchWhileAirborneMin(KeyPointValueNode):
@@ -14972,7 +14973,7 @@ class PitchWhileAirborneMin(KeyPointValueNode):
     units = ut.DEGREE
 
     def derive(self, pitch=P('Pitch'), airborne=S('Airborne')):
-        self.create_kpvs_within_slices(pitch.array, airborne, min_value)
+        self.create_extreme_kpvs(pitch, airborne, min_value)
 
 
 class PitchTouchdownTo60KtsAirspeedMax(KeyPointValueNode):
@@ -15037,7 +15038,7 @@ class PitchRateWhileAirborneMax(KeyPointValueNode):
     units = ut.DEGREE_S
 
     def derive(self, pitch_rate=P('Pitch Rate'), airborne=S('Airborne')):
-        self.create_kpvs_within_slices(pitch_rate.array, airborne, max_abs_value)
+        self.create_extreme_kpvs(pitch_rate, airborne, max_abs_value)
 
 
 class PitchRate35To1000FtMax(KeyPointValueNode):
@@ -15255,7 +15256,7 @@ class RateOfClimb35To1000FtMin(KeyPointValueNode):
     def derive(self,
                vrt_spd=P('Vertical Speed'),
                climbs=S('Initial Climb')):
-        self.create_kpvs_within_slices(vrt_spd.array, climbs, min_value)
+        self.create_extreme_kpvs(vrt_spd, climbs, min_value)
 
 
 class RateOfClimbBelow10000FtMax(KeyPointValueNode):
@@ -15351,7 +15352,7 @@ class RateOfDescentTopOfDescentTo10000FtMax(KeyPointValueNode):
 
         alt_band = np.ma.masked_less(alt_aal.array, 10000)
         alt_descent_sections = valid_slices_within_array(alt_band, descents)
-        self.create_kpvs_within_slices(vrt_spd.array, alt_descent_sections, min_value)
+        self.create_extreme_kpvs(vrt_spd, alt_descent_sections, min_value)
 
 
 class RateOfDescentBelow10000FtMax(KeyPointValueNode):
@@ -16206,7 +16207,7 @@ class RudderDuringTakeoffMax(KeyPointValueNode):
                rudder=P('Rudder'),
                to_rolls=S('Takeoff Roll Or Rejected Takeoff')):
 
-        self.create_kpvs_within_slices(rudder.array, to_rolls, max_abs_value)
+        self.create_extreme_kpvs(rudder, to_rolls, max_abs_value)
 
 
 class RudderCyclesAbove50Ft(KeyPointValueNode):
@@ -16333,7 +16334,7 @@ class AltitudeWithSpeedbrakeDeployedDuringFinalApproachMin(KeyPointValueNode):
                fin_app=S('Final Approach')):
         slices = clump_multistate(spd_brk.array, 'Deployed/Cmd Up',
                                   fin_app.get_slices())
-        self.create_kpvs_within_slices(alt_aal.array, slices, min_value)
+        self.create_extreme_kpvs(alt_aal, slices, min_value)
 
 
 class SpeedbrakeDeployedWithFlapDuration(KeyPointValueNode):
@@ -16587,7 +16588,7 @@ class TailClearanceDuringTakeoffMin(KeyPointValueNode):
                alt_tail=P('Altitude Tail'),
                takeoffs=S('Takeoff')):
 
-        self.create_kpvs_within_slices(alt_tail.array, takeoffs, min_value)
+        self.create_extreme_kpvs(alt_tail, takeoffs, min_value)
 
 
 class TailClearanceDuringLandingMin(KeyPointValueNode):
@@ -16601,7 +16602,7 @@ class TailClearanceDuringLandingMin(KeyPointValueNode):
                alt_tail=P('Altitude Tail'),
                landings=S('Landing')):
 
-        self.create_kpvs_within_slices(alt_tail.array, landings, min_value)
+        self.create_extreme_kpvs(alt_tail, landings, min_value)
 
 
 class TailClearanceDuringGoAroundMin(KeyPointValueNode):
@@ -16614,7 +16615,7 @@ class TailClearanceDuringGoAroundMin(KeyPointValueNode):
                alt_tail=P('Altitude Tail'),
                go_arounds=S('Go Around And Climbout')):
 
-        self.create_kpvs_within_slices(alt_tail.array, go_arounds, min_value)
+        self.create_extreme_kpvs(alt_tail, go_arounds, min_value)
 
 
 class TailClearanceDuringApproachMin(KeyPointValueNode):
@@ -18451,7 +18452,7 @@ class ThrustAsymmetryDuringTakeoffMax(KeyPointValueNode):
     def derive(self, ta=P('Thrust Asymmetry'),
                takeoff_rolls=S('Takeoff Roll Or Rejected Takeoff')):
 
-        self.create_kpvs_within_slices(ta.array, takeoff_rolls, max_value)
+        self.create_extreme_kpvs(ta, takeoff_rolls, max_value)
 
 
 class ThrustAsymmetryDuringFlightMax(KeyPointValueNode):
@@ -18479,7 +18480,7 @@ class ThrustAsymmetryDuringGoAroundMax(KeyPointValueNode):
     def derive(self, ta=P('Thrust Asymmetry'),
                go_arounds=S('Go Around And Climbout')):
 
-        self.create_kpvs_within_slices(ta.array, go_arounds, max_value)
+        self.create_extreme_kpvs(ta, go_arounds, max_value)
 
 
 class ThrustAsymmetryDuringApproachMax(KeyPointValueNode):
@@ -18492,7 +18493,7 @@ class ThrustAsymmetryDuringApproachMax(KeyPointValueNode):
     def derive(self, ta=P('Thrust Asymmetry'),
                approaches=S('Approach')):
 
-        self.create_kpvs_within_slices(ta.array, approaches, max_value)
+        self.create_extreme_kpvs(ta, approaches, max_value)
 
 
 class ThrustAsymmetryWithThrustReversersDeployedMax(KeyPointValueNode):
@@ -18515,7 +18516,7 @@ class ThrustAsymmetryWithThrustReversersDeployedMax(KeyPointValueNode):
         # and as it is not possible for the thrust reversers to deploy and
         # retract within 2 seconds, small slices are removed here.
         slices = slices_remove_small_slices(slices, time_limit=2, hz=ta.hz)
-        self.create_kpvs_within_slices(ta.array, slices, max_value)
+        self.create_extreme_kpvs(ta, slices, max_value)
 
 
 class ThrustAsymmetryDuringApproachDuration(KeyPointValueNode):
@@ -18696,7 +18697,7 @@ class TurbulenceDuringApproachMax(KeyPointValueNode):
                turbulence=P('Turbulence'),
                approaches=S('Approach')):
 
-        self.create_kpvs_within_slices(turbulence.array, approaches, max_value)
+        self.create_extreme_kpvs(turbulence, approaches, max_value)
 
 
 class TurbulenceDuringCruiseMax(KeyPointValueNode):
@@ -18711,7 +18712,7 @@ class TurbulenceDuringCruiseMax(KeyPointValueNode):
                turbulence=P('Turbulence'),
                cruises=S('Cruise')):
 
-        self.create_kpvs_within_slices(turbulence.array, cruises, max_value)
+        self.create_extreme_kpvs(turbulence, cruises, max_value)
 
 
 class TurbulenceDuringFlightMax(KeyPointValueNode):
@@ -18753,9 +18754,10 @@ class WindSpeedAtAltitudeDuringDescent(KeyPointValueNode):
           wrong although is arithmetically "correct".
         '''
 
-        for descent in alt_aal.slices_from_to(2100, 0):
-            for altitude in self.NAME_VALUES['altitude']:
-                index = index_at_value(alt_aal.array, altitude, descent)
+        altitudes = self.NAME_VALUES['altitude']
+        descents = alt_aal.slices_from_to(2100, 0)
+        for indexes in indexes_at_values(alt_aal.array, altitudes, descents):
+            for altitude, index in zip(altitudes, indexes):
                 if not index:
                     continue
                 value = value_at_index(wind_spd.array, index)
@@ -18776,9 +18778,10 @@ class WindDirectionAtAltitudeDuringDescent(KeyPointValueNode):
                alt_aal=P('Altitude AAL For Flight Phases'),
                wind_dir=P('Wind Direction Continuous')):
 
-        for descent in alt_aal.slices_from_to(2100, 0):
-            for altitude in self.NAME_VALUES['altitude']:
-                index = index_at_value(alt_aal.array, altitude, descent)
+        altitudes = self.NAME_VALUES['altitude']
+        descents = alt_aal.slices_from_to(2100, 0)
+        for indexes in indexes_at_values(alt_aal.array, altitudes, descents):
+            for altitude, index in zip(altitudes, indexes):
                 if not index:
                     continue
                 # Check direction not masked before using % 360:
@@ -18822,9 +18825,10 @@ class TailwindAtAltitudeDuringDescent(KeyPointValueNode):
           wrong although is arithmetically "correct".
         '''
 
-        for descent in alt_aal.slices_from_to(2100, 0):
-            for altitude in self.NAME_VALUES['altitude']:
-                index = index_at_value(alt_aal.array, altitude, descent)
+        altitudes = self.NAME_VALUES['altitude']
+        descents = alt_aal.slices_from_to(2100, 0)
+        for indexes in indexes_at_values(alt_aal.array, altitudes, descents):
+            for altitude, index in zip(altitudes, indexes):
                 if not index:
                     continue
                 value = value_at_index(tailwind.array, index)
@@ -24,6 +24,7 @@ from analysis_engine.library import (
     first_valid_sample,
     hysteresis,
     index_at_value,
+    indexes_at_values,
     is_index_within_slice,
     last_valid_sample,
     max_value,
@@ -1803,18 +1804,20 @@ class AltitudeWhenClimbing(KeyTimeInstanceNode):
 
         climbs = list(takeoff) + list(initial_climb) + list(climb)
         climb_slices = slices_remove_small_gaps([c.slice for c in climbs])
-        for climb_slice in climb_slices:
-            for alt_threshold in self.NAME_VALUES['altitude']:
-                # Will trigger a single KTI per height (if threshold is crossed)
-                # per climbing phase.
-                if alt_threshold <= TRANSITION_ALTITUDE:
-                    # Use height above airfield.
-                    alt = alt_aal.array
-                else:
-                    # Use standard altitudes.
-                    alt = alt_std.array
-
-                index = index_at_value(alt, alt_threshold, climb_slice)
+        # Use height above airfield up to the transition altitude and
+        # standard altitudes above it.
+        thresholds = self.NAME_VALUES['altitude']
+        aal_thresholds = [t for t in thresholds if t <= TRANSITION_ALTITUDE]
+        std_thresholds = [t for t in thresholds if t > TRANSITION_ALTITUDE]
+        aal_indexes = indexes_at_values(alt_aal.array, aal_thresholds, climb_slices)
+        std_indexes = indexes_at_values(alt_std.array, std_thresholds, climb_slices)
+        for aal_index, std_index in zip(aal_indexes, std_indexes):
+            # Will trigger a single KTI per height (if threshold is crossed)
+            # per climbing phase.
+            indexes = dict(zip(aal_thresholds, aal_index))
+            indexes.update(zip(std_thresholds, std_index))
+            for alt_threshold in thresholds:
+                index = indexes[alt_threshold]
                 if index:
                     self.create_kti(index, altitude=alt_threshold)
 
@@ -1831,22 +1834,23 @@ class AltitudeWhenDescending(KeyTimeInstanceNode):
                alt_std=P('Altitude STD Smoothed')):
         alt_aal=repair_mask(alt_aal.array, frequency=alt_aal.frequency, copy=True)
         alt_std=repair_mask(alt_std.array, frequency=alt_std.frequency, copy=True)
-        for descend in descending:
-            for alt_threshold in self.NAME_VALUES['altitude']:
-                # Will trigger a single KTI per height (if threshold is
-                # crossed) per descending phase. The altitude array is
-                # scanned backwards to make sure we trap the last instance at
-                # each height.
-                if alt_threshold <= TRANSITION_ALTITUDE:
-                    # Use height above airfield.
-                    alt = alt_aal
-                else:
-                    # Use standard altitudes.
-                    alt = alt_std
-
-                index = index_at_value(alt, alt_threshold,
-                                       slice(descend.slice.stop,
-                                             descend.slice.start, -1))
+        # The altitude array is scanned backwards to make sure we trap the
+        # last instance at each height.
+        descent_slices = [slice(d.slice.stop, d.slice.start, -1) for d in descending]
+        # Use height above airfield up to the transition altitude and
+        # standard altitudes above it.
+        thresholds = self.NAME_VALUES['altitude']
+        aal_thresholds = [t for t in thresholds if t <= TRANSITION_ALTITUDE]
+        std_thresholds = [t for t in thresholds if t > TRANSITION_ALTITUDE]
+        aal_indexes = indexes_at_values(alt_aal, aal_thresholds, descent_slices)
+        std_indexes = indexes_at_values(alt_std, std_thresholds, descent_slices)
+        for aal_index, std_index in zip(aal_indexes, std_indexes):
+            # Will trigger a single KTI per height (if threshold is
+            # crossed) per descending phase.
+            indexes = dict(zip(aal_thresholds, aal_index))
+            indexes.update(zip(std_thresholds, std_index))
+            for alt_threshold in thresholds:
+                index = indexes[alt_threshold]
                 if index:
                     self.create_kti(index, altitude=alt_threshold)
 
@@ -1882,11 +1886,10 @@ class AltitudeBeforeLevelFlightWhenClimbing(KeyTimeInstanceNode):
             else:
                 continue  # Must be following a descent
 
-            for height in self.NAME_VALUES['altitude']:
-                index = index_at_value(aal.array, level_height-height,
-                                       _slice=slice(climb_slice.stop,
-                                                    climb_slice.start,
-                                                    -1))
+            heights = self.NAME_VALUES['altitude']
+            indexes = indexes_at_values(aal.array, [level_height - h for h in heights],
+                                        [slice(climb_slice.stop, climb_slice.start, -1)])[0]
+            for height, index in zip(heights, indexes):
                 if index:
                     self.create_kti(index, replace_values={'altitude': height})
 
@@ -1922,11 +1925,10 @@ class AltitudeBeforeLevelFlightWhenDescending(KeyTimeInstanceNode):
             else:
                 continue  # Must be following a climb
 
-            for height in self.NAME_VALUES['altitude']:
-                index = index_at_value(aal.array, level_height+height,
-                                       _slice=slice(descent_slice.stop,
-                                                    descent_slice.start,
-                                                    -1))
+            heights = self.NAME_VALUES['altitude']
+            indexes = indexes_at_values(aal.array, [level_height + h for h in heights],
+                                        [slice(descent_slice.stop, descent_slice.start, -1)])[0]
+            for height, index in zip(heights, indexes):
                 if index:
                     self.create_kti(index, replace_values={'altitude': height})
 
@@ -2006,14 +2008,16 @@ class DistanceToTouchdown(KeyTimeInstanceNode):
     def derive(self, dtl=P('Distance To Landing'),
                touchdowns=KTI('Touchdown')):
         last_tdwn_idx = 0
+        back_slices = []
         for touchdown in touchdowns:
-            for d in self.NAME_VALUES['distance']:
-                index = index_at_value(dtl.array, d,
-                                       slice(int(floor(touchdown.index)), last_tdwn_idx, -1))
+            back_slices.append(slice(int(floor(touchdown.index)), last_tdwn_idx, -1))
+            last_tdwn_idx = touchdown.index
+        distances = self.NAME_VALUES['distance']
+        for indexes in indexes_at_values(dtl.array, distances, back_slices):
+            for d, index in zip(distances, indexes):
                 if index:
                     # may not have travelled far enough to find distance threshold.
                     self.create_kti(index, distance=d)
-            last_tdwn_idx = touchdown.index
 
 
 class Autoland(KeyTimeInstanceNode):
@@ -11,16 +11,12 @@ import numpy as np
 import pytz
 
 from builtins import zip
-from collections import OrderedDict, namedtuple
+from collections import namedtuple
 from copy import copy, deepcopy
 from datetime import datetime, timedelta
 from decimal import Decimal
-from hashlib import sha256
 from math import ceil, copysign, cos, floor, log, radians, sin, sqrt
 from operator import attrgetter
-from scipy import interpolate as scipy_interpolate, optimize
-from scipy.ndimage import filters
-from scipy.signal import medfilt
 from six.moves import zip_longest
 
 from hdfaccess.parameter import MappedArray
@@ -32,6 +28,9 @@ from flightdatautilities.numpy_utils import (
     slices_int,
 )
 
+from analysis_engine import fingerprint
+from analysis_engine.precision import aligned_dtype
+from analysis_engine.rolling_window import maintained_values, running_differences
 from analysis_engine.settings import (
     ALTITUDE_RADIO_MAX_RANGE,
     BUMP_HALF_WIDTH,
@@ -380,7 +379,7 @@ def align_args(slave_array, slave_frequency, slave_offset, master_frequency, mas
         interpolate = False
         _dtype = slave_array.dtype
     elif isinstance(slave_array, np.ma.MaskedArray):
-        _dtype = float
+        _dtype = aligned_dtype(slave_array.dtype)
     else:
         raise ValueError('Cannot align slave array of unknown type.')
 
@@ -759,6 +758,10 @@ def calculate_surface_angle(mode, param, detents):
     :returns: array and frequency
     :rtype: np.ma.array, int or float
     '''
+    # import locally to speed up imports of library.py
+    from scipy.ndimage import maximum_filter1d, minimum_filter1d
+    from scipy.signal import medfilt
+
     freq_multiplier = 4 if param.frequency < 2 else 2
     freq = param.frequency * freq_multiplier
     # No need to re-align if high frequency.
@@ -787,8 +790,8 @@ def calculate_surface_angle(mode, param, detents):
 
     metrics = np.full(len(angle), np.Inf)
     for l in np.array([2, 3, 4, 5, 6, 8, 12, 16]):
-        maxy = filters.maximum_filter1d(angle, l)
-        miny = filters.minimum_filter1d(angle, l)
+        maxy = maximum_filter1d(angle, l)
+        miny = minimum_filter1d(angle, l)
         m = np.log(maxy - miny +  1) / np.log(l)
         metrics = np.minimum(metrics, m)
 
@@ -842,6 +845,22 @@ def calculate_surface_angle(mode, param, detents):
     return result, freq, offset
 
 
+def _timebase_values(values):
+    '''
+    :param values: Time element values.
+    :type values: iterable of numeric type
+    :returns: The values as floats with invalid values, e.g. None, as NaN.
+    :rtype: np.ndarray
+    '''
+    # The data of masked arrays is used regardless of the mask, as the time
+    # elements are validated by their range.
+    array = np.asarray(np.ma.getdata(values))
+    if array.dtype.kind not in 'biuf':
+        array = np.array([np.nan if v is None or v is np.ma.masked else v
+                          for v in array.tolist()], dtype=np.float64)
+    return array.astype(np.float64)
+
+
 def calculate_timebase(years, months, days, hours, mins, secs):
     """
     Calculates the timestamp most common in the array of timestamps. Returns
@@ -853,8 +872,8 @@ def calculate_timebase(years, months, days, hours, mins, secs):
     WARNING: If at all times, one or more of the parameters are masked, you
     willnot get a valid timestamp and an exception will be raised.
 
-    Note: if uneven arrays are passed in, they are assumed by zip that the
-    start is valid and the uneven ends are invalid and skipped over.
+    Timestamps which are out of range, e.g. 30th February, are skipped. If
+    offsets are equally common, the offset of the earliest timestamp is used.
 
     Supports years as a 2 digits - e.g. "11" is "2011"
 
@@ -864,56 +883,46 @@ def calculate_timebase(years, months, days, hours, mins, secs):
     :rtype: datetime
     :raises: InvalidDatetime if no valid timestamps provided
     """
-    base_dt = None
-    # Calculate current year here and pass into
-    # convert_two_digit_to_four_digit_year to save calculating year for every
-    # second of flight
-    current_year = str(datetime.utcnow().year)
-    # OrderedDict so if all values are the same, max will consistently take the
-    # first val on repeated runs
-    clock_variation = OrderedDict()
-
     if not len(years) == len(months) == len(days) == \
        len(hours) == len(mins) == len(secs):
         raise ValueError("Arrays must be of same length")
 
-    for step, (yr, mth, day, hr, mn, sc) in enumerate(np.transpose((years, months, days, hours, mins, secs))):
-
-        #TODO: Try using numpy datetime functions for speedup?
-        #try:
-            #date = np.datetime64('%d-%d-%d' % (yr, mth, day), 'D')
-        #except np.core._mx_datetime_parser.RangeError  :
-            #continue
-        # same for time?
-
-        if yr is not None and yr is not np.ma.masked and yr < 100:
-            yr = convert_two_digit_to_four_digit_year(yr, current_year)
-
-        try:
-            dt = datetime(int(yr), int(mth), int(day), int(hr), int(mn), int(sc), tzinfo=pytz.utc)
-        except (ValueError, TypeError, np.ma.core.MaskError):
-            # ValueError is raised if values are out of range, e.g. 0..59.
-            # Q: Should we validate these parameters and switch to fallback_dt
-            #    if it fails?
-            continue
-        if not base_dt:
-            base_dt = dt # store reference datetime
-        # calc diff from base
-        diff = dt - base_dt - timedelta(seconds=step)
-        ##print("%02d - %s %s" % (step, dt, diff))
-        try:
-            clock_variation[diff] += 1
-        except KeyError:
-            # new difference
-            clock_variation[diff] = 1
-    if base_dt:
-        # return most regular difference
-        clock_delta = max(clock_variation, key=clock_variation.get)
-        return base_dt + clock_delta
-    else:
+    yr, mth, day, hr, mn, sc = (
+        _timebase_values(a) for a in (years, months, days, hours, mins, secs))
+
+    with np.errstate(invalid='ignore'):
+        # Calculate current year once rather than for every second of flight.
+        current_year = str(datetime.utcnow().year)
+        two_digit = yr < 100
+        yr[two_digit] = convert_two_digit_to_four_digit_year(yr[two_digit], current_year)
+        # Truncate as int() would.
+        yr, mth, day, hr, mn, sc = (np.trunc(a) for a in (yr, mth, day, hr, mn, sc))
+        valid = ((yr >= 1) & (yr <= 9999) & (mth >= 1) & (mth <= 12) &
+                 (day >= 1) & (day <= 31) & (hr >= 0) & (hr <= 23) &
+                 (mn >= 0) & (mn <= 59) & (sc >= 0) & (sc <= 59))
+
+    steps = np.flatnonzero(valid)
+    months_since_epoch = ((yr[steps] - 1970) * 12 + mth[steps] - 1).astype(np.int64)
+    month_starts = months_since_epoch.astype('datetime64[M]').astype('datetime64[D]')
+    month_lengths = ((months_since_epoch + 1).astype('datetime64[M]').astype('datetime64[D]') -
+                     month_starts).astype(np.int64)
+    in_month = day[steps] <= month_lengths
+    steps = steps[in_month]
+    if not len(steps):
         # No valid datestamps found
         raise InvalidDatetime("No valid datestamps found")
 
+    seconds = (month_starts[in_month].astype(np.int64) * 86400 +
+               ((day[steps] - 1) * 86400 + hr[steps] * 3600 + mn[steps] * 60 +
+                sc[steps]).astype(np.int64))
+    # Vote on the start of the array implied by each timestamp. The most
+    # common is used, or the earliest of those equally common.
+    starts, first_steps, counts = np.unique(seconds - steps, return_index=True,
+                                            return_counts=True)
+    most_common = np.flatnonzero(counts == counts.max())
+    start = starts[most_common[np.argmin(first_steps[most_common])]]
+    return datetime(1970, 1, 1, tzinfo=pytz.utc) + timedelta(seconds=int(start))
+
 
 def convert_two_digit_to_four_digit_year(yr, current_year):
     """
@@ -926,10 +935,14 @@ def convert_two_digit_to_four_digit_year(yr, current_year):
     12 = 2012
     11 = 2011
     01 = 2001
+
+    Arrays of years are converted element-wise.
     """
     # convert to 4 digit year
     century = int(current_year[:2]) * 100
     yy = int(current_year[2:])
+    if np.ndim(yr):
+        return np.where(yr > yy, century - 100 + yr, century + yr)
     if yr > yy:
         return century - 100 + yr
     else:
@@ -2809,8 +2822,10 @@ def ground_track(lat_fix, lon_fix, gspd, hdg, frequency, mode):
     delta_east = gspd * np.ma.sin(hdg_rad)
 
     scale = ut.multiplier(ut.KT, ut.METER_S)
-    north = integrate(delta_north, frequency, scale=scale, direction=direction)
-    east = integrate(delta_east, frequency, scale=scale, direction=direction)
+    north = integrate(delta_north, frequency, scale=scale, direction=direction,
+                      segmented=True)
+    east = integrate(delta_east, frequency, scale=scale, direction=direction,
+                     segmented=True)
 
     bearing = np.ma.array(np.rad2deg(np.arctan2(east, north)))
     distance = np.ma.array(np.ma.sqrt(north**2 + east**2))
@@ -2934,14 +2949,10 @@ def av_gnd_trk(lat, lon, gspd, hdg, hz):
 def hash_array(array, sections, min_samples):
     '''
     Creates a sha256 hash from the array's tostring() method .
-    '''
-    checksum = sha256()
-    for section in sections:
-        if section.stop - section.start < min_samples:
-            continue
-        checksum.update(array[section].tostring())
 
-    return checksum.hexdigest()
+    Kept for compatibility, see fingerprint.hash_array.
+    '''
+    return fingerprint.hash_array(array, sections, min_samples, algorithm='sha256')
 
 
 def hysteresis(array, hysteresis):
@@ -3110,7 +3121,7 @@ def ils_localizer_align(runway):
 
 def integrate(array, frequency, initial_value=0.0, scale=1.0,
               direction="forwards", contiguous=False, extend=False,
-              repair=False):
+              repair=False, segmented=False, out=None):
     """
     Trapezoidal integration
 
@@ -3134,6 +3145,10 @@ def integrate(array, frequency, initial_value=0.0, scale=1.0,
     :type extend: Logical
     :param repair: Option to repair mask before integration.
     :type repair: Logical
+    :param segmented: Option to integrate each unmasked block independently, see integrate_blocks.
+    :type segmented: Logical
+    :param out: Optional buffer for the result when segmented.
+    :type out: Numpy float array
 
     Notes: Reverse integration does not include a change of sign, so positive
     values have a negative slope following integration using this function.
@@ -3149,6 +3164,12 @@ def integrate(array, frequency, initial_value=0.0, scale=1.0,
     :type integral: Numpy masked array.
     """
 
+    if segmented:
+        if contiguous or extend or repair:
+            raise ValueError('Segmented integration does not support contiguous, extend or repair options.')
+        return integrate_blocks(array, frequency, initial_value=initial_value,
+                                scale=scale, direction=direction, out=out)
+
     if np.ma.count(array)==0:
         return np_ma_masked_zeros_like(array)
 
@@ -3258,6 +3279,93 @@ def integ_value(array,
         value = None
     return Value(index, value)
 
+def integrate_blocks(array, frequency, initial_value=0.0, scale=1.0,
+                     direction='forwards', out=None):
+    """
+    Segmented trapezoidal integration.
+
+    Each unmasked block of the array is integrated independently, starting
+    from its own initial value, so that gaps in the data neither join blocks
+    together nor discard all but the longest block. All blocks are
+    integrated in a single cumulative sum without copying or rolling the
+    integrand.
+
+    Usage example:
+
+    distances = integrate_blocks(gspd.array, gspd.frequency, scale=1.0 / 3600.0)
+
+    :param array: Integrand.
+    :type array: Numpy masked array.
+    :param frequency: Sample rate of the integrand.
+    :type frequency: Float
+    :param initial_value: Initial value for the integral of every block, or one value per block.
+    :type initial_value: Float or sequence of floats
+    :param scale: Scaling factor, default = 1.0
+    :type scale: float
+    :param direction: Optional integration sense, default = 'forwards'
+    :type direction: String - ['forwards', 'backwards', 'reverse']
+    :param out: Optional buffer of the same length as the array to hold the result.
+    :type out: Numpy float array
+
+    Notes: As for integrate, reverse integration starts from the end of each
+    block and does not include a change of sign, while backwards integration
+    does.
+
+    :returns integral: Result of integration by time, masked where the integrand is masked.
+    :type integral: Numpy masked array.
+    :raises ValueError: If the direction is not recognised or the number of initial values does not match the number of
+        blocks.
+    """
+    direction = direction.lower()
+    if direction not in ('forwards', 'reverse', 'backwards'):
+        raise ValueError("Invalid direction '%s'" % direction)
+
+    data = np.ma.getdata(array)
+    mask = np.ma.getmaskarray(array)
+    length = len(data)
+    if out is None:
+        out = np.empty(length, dtype=float)
+    elif len(out) != length:
+        raise ValueError('Output buffer length %d does not match array length %d.' % (len(out), length))
+
+    # Block edges from changes in the mask.
+    changes = np.diff(np.concatenate(([True], mask, [True])).view(np.int8))
+    starts = np.flatnonzero(changes == -1)
+    stops = np.flatnonzero(changes == 1)
+    initial_values = np.broadcast_to(np.asarray(initial_value, dtype=float), starts.shape) \
+        if np.ndim(initial_value) == 0 else np.asarray(initial_value, dtype=float)
+    if len(initial_values) != len(starts):
+        raise ValueError('%d initial values provided for %d blocks.' % (len(initial_values), len(starts)))
+
+    if not len(starts):
+        out[:] = 0.0
+        return np.ma.array(out, mask=True)
+
+    # out[i] becomes the sum of the trapezoidal steps before sample i,
+    # ignoring steps which touch masked samples.
+    out[0] = 0.0
+    np.add(data[:-1], data[1:], out=out[1:])
+    out[1:] *= (scale * 0.5) / frequency
+    out[1:][mask[:-1] | mask[1:]] = 0.0
+    np.cumsum(out, out=out)
+
+    # Offset each block by its initial value less the sum at its origin.
+    if direction == 'forwards':
+        offsets = initial_values - out[starts]
+    elif direction == 'reverse':
+        offsets = initial_values + out[stops - 1]
+        np.negative(out, out=out)
+    else:
+        offsets = initial_values - out[stops - 1]
+    steps = np.zeros(length + 1)
+    steps[starts] = offsets
+    steps[stops] -= offsets
+    out += np.cumsum(steps[:-1])
+    out[mask] = 0.0
+
+    return np.ma.array(out, mask=mask.copy())
+
+
 def interpolate(array, extrapolate=True):
     """
     This will replace all masked values in an array with linearly
@@ -4306,6 +4414,136 @@ def min_value(array, _slice=slice(None), start_edge=None, stop_edge=None):
     return Value(index, value)
 
 
+class SliceExtremes(object):
+    '''
+    Applies max_value, min_value or max_abs_value to one array within many
+    slices.
+
+    The extreme and its index within each block of the array are found in a
+    single pass, so each slice only searches its partial blocks at either end
+    and the extremes of the blocks between them. Results, including the
+    index chosen from equal values and the start and stop edges, are the
+    same as calling the function.
+
+    Arrays which are not floating point or have unmasked values which are not
+    finite are searched by the function.
+
+    extremes = SliceExtremes(air_spd.array, max_value)
+    index, value = extremes(air_spd.array, _slice, start_edge=start_edge)
+    '''
+    block_size = 256
+
+    def __init__(self, array, function):
+        '''
+        :param array: Array to search.
+        :type array: np.ma.masked_array
+        :param function: max_value, min_value or max_abs_value.
+        :type function: function
+        '''
+        if function not in (max_value, min_value, max_abs_value):
+            raise ValueError("Unsupported function '%s'." % function.__name__)
+        self.array = array
+        self.function = function
+        if function is min_value:
+            self._operator = np.ma.argmin
+            self._argument = np.argmin
+            self._better = np.less
+            fill = np.inf
+        else:
+            self._operator = np.ma.argmax
+            self._argument = np.argmax
+            self._better = np.greater
+            fill = -np.inf
+        self._array = np.ma.abs(array) if function is max_abs_value else array
+
+        self._filled = None
+        data = np.ma.getdata(self._array)
+        mask = np.ma.getmaskarray(self._array)
+        if data.ndim != 1 or not np.issubdtype(data.dtype, np.floating) or \
+           not np.isfinite(data[~mask]).all():
+            return
+        # Masked values are filled so they are never the extreme of a block
+        # which has unmasked values, matching np.ma.argmax and np.ma.argmin.
+        self._filled = data.copy()
+        self._filled[mask] = fill
+        self._counts = np.concatenate(([0], np.cumsum(~mask)))
+        blocks = len(data) // self.block_size
+        block_array = self._filled[:blocks * self.block_size].reshape(blocks, self.block_size)
+        self._block_arguments = self._argument(block_array, axis=1)
+        self._block_values = block_array[np.arange(blocks), self._block_arguments]
+
+    def __call__(self, array, _slice=slice(None), start_edge=None, stop_edge=None):
+        '''
+        Same arguments as the function, where array must be the array
+        searched.
+
+        :returns: Value named tuple of index and value.
+        :rtype: Value
+        '''
+        index, value = _value(self._array, _slice, self._operator,
+                              start_edge=start_edge, stop_edge=stop_edge,
+                              extremes=self)
+        if value is not None and self.function is max_abs_value:
+            return Value(index, self.array[int(index)])  # Recover sign of the value.
+        return Value(index, value)
+
+    def _indices(self, _slice):
+        '''
+        :returns: Start and stop of a slice with a step of one, else None.
+        :rtype: (int, int) or None
+        '''
+        if self._filled is None:
+            return None
+        start, stop, step = _slice.indices(len(self._filled))
+        if step != 1:
+            return None
+        return start, max(start, stop)
+
+    def count(self, _slice):
+        '''
+        :returns: Number of unmasked values within the slice.
+        :rtype: int
+        '''
+        indices = self._indices(_slice)
+        if indices is None:
+            return np.ma.count(self._array[_slice])
+        start, stop = indices
+        return self._counts[stop] - self._counts[start]
+
+    def argument(self, _slice):
+        '''
+        :returns: Index of the first extreme within the slice relative to the
+            start of the slice.
+        :rtype: int
+        '''
+        indices = self._indices(_slice)
+        if indices is None:
+            return self._operator(self._array[_slice])
+        start, stop = indices
+        first_block = -(-start // self.block_size)
+        last_block = stop // self.block_size
+        if first_block >= last_block:
+            return self._argument(self._filled[start:stop])
+
+        # Partial block before, whole blocks and partial block after the
+        # slice in order, so the first of equal extremes is kept.
+        block_start = first_block * self.block_size
+        block_stop = last_block * self.block_size
+        index = None
+        if start < block_start:
+            index = start + self._argument(self._filled[start:block_start])
+            value = self._filled[index]
+        block = first_block + self._argument(self._block_values[first_block:last_block])
+        if index is None or self._better(self._block_values[block], value):
+            index = block * self.block_size + self._block_arguments[block]
+            value = self._block_values[block]
+        if block_stop < stop:
+            tail_index = block_stop + self._argument(self._filled[block_stop:stop])
+            if self._better(self._filled[tail_index], value):
+                index = tail_index
+        return index - start
+
+
 def average_value(array, _slice=slice(None), start_edge=None, stop_edge=None):
     '''
     Calculate the average value within an optional slice of the array and return
@@ -4865,6 +5103,8 @@ def blend_parameters_cubic(frequency, offset, params, result_slice, tolerance=No
     To be used with care as this both gives a smoother transition at sample
     boundaries, but suffers from overswing which can cause problems.
     '''
+    # import locally to speed up imports of library.py
+    from scipy.interpolate import splev, splrep
 
     new_t = np.linspace(result_slice.start / frequency,
                         result_slice.stop / frequency,
@@ -4891,12 +5131,12 @@ def blend_parameters_cubic(frequency, offset, params, result_slice, tolerance=No
             data=timebase, mask=np.ma.getmaskarray(param.array[my_slice]))
         if len(my_time.compressed()) < 4:
             continue
-        my_curve = scipy_interpolate.splrep(
+        my_curve = splrep(
             my_time.compressed(), param.array[my_slice].compressed(), s=0)
         # my_curve is the spline knot array, now compute the values for
         # the output timebase.
         curves.append(
-            scipy_interpolate.splev(new_t, my_curve, der=0, ext=0))
+            splev(new_t, my_curve, der=0, ext=0))
 
         # Compute the weights
         weights.append(blend_parameters_weighting(
@@ -7465,6 +7705,8 @@ def index_at_distance(distance, index_ref, latitude_ref, longitude_ref, latitude
     :rtype: float
     :raises: ValueError
     '''
+    # import locally to speed up imports of library.py
+    from scipy.optimize import fmin_l_bfgs_b
 
     def distance_error(index, *args):
         radius = args[0]
@@ -7498,7 +7740,7 @@ def index_at_distance(distance, index_ref, latitude_ref, longitude_ref, latitude
     # stray outside the available array.
     boundaries = [(0, end_data)]
 
-    kti = optimize.fmin_l_bfgs_b(
+    kti = fmin_l_bfgs_b(
         distance_error, estimate,
         fprime=None,
         args = (
@@ -7559,6 +7801,42 @@ def index_closest_value(array, threshold, _slice=slice(None)):
     return index_at_value(array, threshold, _slice, endpoint='closing')
 
 
+def _index_at_value_limits(max_index, _slice):
+    '''
+    Arrange the limits of an index_at_value scan, ensuring that we stay
+    inside the array.
+
+    :param max_index: Length of the array being scanned.
+    :type max_index: int
+    :param _slice: slice where we want to seek the threshold transit.
+    :type _slice: slice
+    :returns: begin and end indices with the left and right slices whose
+        samples straddle each step of the scan.
+    :rtype: (int, int, slice, slice)
+    :raises ValueError: If the slice step is neither 1 nor -1.
+    '''
+    step = _slice.step or 1
+
+    if step == 1:
+        begin = max(int(py2round(_slice.start or 0)), 0)
+        end = min(int(py2round(_slice.stop or max_index)), max_index)
+        left, right = slice(begin, end - 1, step), slice(begin + 1, end,step)
+
+    elif step == -1:
+        begin = min(int(py2round(_slice.start or max_index)), max_index-1)
+        # Indexing from the end of the array results in an array length
+        # mismatch. There is a failing test to cover this case which may work
+        # with array[:end:-1] construct, but using slices appears insoluble.
+        end = max(int(_slice.stop or 0),0)
+        left = slice(begin, end, step)
+        right = slice(begin - 1, end - 1 if end > 0 else None, step)
+
+    else:
+        raise ValueError('Step length not 1 in index_at_value')
+
+    return begin, end, left, right
+
+
 def index_at_value(array, threshold, _slice=slice(None), endpoint='exact'):
     '''
     This function seeks the moment when the parameter in question first crosses
@@ -7586,25 +7864,7 @@ def index_at_value(array, threshold, _slice=slice(None), endpoint='exact'):
     '''
     assert endpoint in ['exact', 'closing', 'nearest', 'first_closing']
     step = _slice.step or 1
-    max_index = len(array)
-
-    # Arrange the limits of our scan, ensuring that we stay inside the array.
-    if step == 1:
-        begin = max(int(py2round(_slice.start or 0)), 0)
-        end = min(int(py2round(_slice.stop or max_index)), max_index)
-        left, right = slice(begin, end - 1, step), slice(begin + 1, end,step)
-
-    elif step == -1:
-        begin = min(int(py2round(_slice.start or max_index)), max_index-1)
-        # Indexing from the end of the array results in an array length
-        # mismatch. There is a failing test to cover this case which may work
-        # with array[:end:-1] construct, but using slices appears insoluble.
-        end = max(int(_slice.stop or 0),0)
-        left = slice(begin, end, step)
-        right = slice(begin - 1, end - 1 if end > 0 else None, step)
-
-    else:
-        raise ValueError('Step length not 1 in index_at_value')
+    begin, end, left, right = _index_at_value_limits(len(array), _slice)
 
     if begin == end:
         logger.warning('No range for seek function to scan across')
@@ -7689,6 +7949,108 @@ def index_at_value(array, threshold, _slice=slice(None), endpoint='exact'):
     return (begin + step * (n + r))
 
 
+def indexes_at_values(array, thresholds, slices=(slice(None),), endpoint='exact',
+                      chunk_size=4096):
+    '''
+    Find the first crossing of several thresholds within each of several
+    slices, scanning each slice only once.
+
+    This is equivalent to, but much faster than:
+
+        [[index_at_value(array, t, s, endpoint=endpoint) for t in thresholds]
+         for s in slices]
+
+    The value passing products are evaluated for all thresholds still being
+    sought a chunk at a time, so the scan of a slice stops as soon as every
+    threshold has been found. The interpolated indices are identical to those
+    returned by index_at_value. Where a threshold is not crossed and endpoint
+    is not 'exact', the scalar function is used to apply the endpoint
+    condition.
+
+    For example, to find the heights on each descent:
+       indexes_at_values(alt_aal, [1000, 500, 50],
+                         [slice(d.stop, d.start, -1) for d in descents])
+
+    :param array: input data
+    :type array: masked array
+    :param thresholds: the values that we expect the array to cross.
+    :type thresholds: list of float
+    :param slices: slices where we want to seek the threshold transits.
+    :type slices: list of slice
+    :param endpoint: type of end condition being sought. See index_at_value.
+    :type endpoint: string
+    :param chunk_size: number of samples to test for all thresholds at once.
+    :type chunk_size: int
+
+    :returns: interpolated indices where the array first crossed each threshold, one list per slice with one entry per
+        threshold (None if not found).
+    :rtype: list of lists of float or None
+    '''
+    assert endpoint in ['exact', 'closing', 'nearest', 'first_closing']
+    thresholds = list(thresholds)
+    values = np.ma.getdata(array)
+    mask = np.ma.getmaskarray(array)
+    results = []
+    for _slice in slices:
+        indexes = [None] * len(thresholds)
+        results.append(indexes)
+        if not thresholds:
+            continue
+        step = _slice.step or 1
+        begin, end, left, right = _index_at_value_limits(len(array), _slice)
+        if begin == end:
+            logger.warning('No range for seek function to scan across')
+            continue
+        if (_slice.stop == _slice.start) and (_slice.start is not None):
+            # No range to scan across.
+            continue
+
+        left_values, right_values = values[left], values[right]
+        unmasked = ~(mask[left] | mask[right])
+        if not len(unmasked):
+            continue
+
+        thresholds_array = np.array(thresholds, dtype=float)[:, np.newaxis]
+        # The first sample where each threshold is passed (or NaN), and
+        # whether the threshold has been passed by valid (non-NaN) data.
+        first = np.full(len(thresholds), -1, dtype=int)
+        passed = np.zeros(len(thresholds), dtype=bool)
+        for start in range(0, len(unmasked), chunk_size):
+            seeking = np.flatnonzero(~passed)
+            if not len(seeking):
+                break
+            chunk = slice(start, start + chunk_size)
+            # As index_at_value, a negative product indicates where the
+            # value has been passed.
+            with np.errstate(invalid='ignore', over='ignore'):
+                value_passing_array = ((left_values[chunk] - thresholds_array[seeking]) *
+                                       (right_values[chunk] - thresholds_array[seeking]))
+                candidates = unmasked[chunk] & ~(value_passing_array > 0.0)
+            valid = candidates & ~np.isnan(value_passing_array)
+            has_candidate = candidates.any(axis=1)
+            new_first = has_candidate & (first[seeking] < 0)
+            first[seeking[new_first]] = start + candidates[new_first].argmax(axis=1)
+            passed[seeking] = valid.any(axis=1)
+
+        for t, threshold in enumerate(thresholds):
+            if not passed[t]:
+                if endpoint != 'exact':
+                    indexes[t] = index_at_value(array, threshold, _slice, endpoint=endpoint)
+                continue
+            n = first[t]
+            a = array[begin + (step * n)]
+            b = array[begin + (step * (n + 1))]
+            # Force threshold to float as often passed as an integer.
+            # Also check for b=a as otherwise we get a divide by zero condition.
+            if (a is np.ma.masked or b is np.ma.masked or np.isnan(a) or np.isnan(b) or a == b):
+                r = 0.5
+            else:
+                r = (float(threshold) - a) / (b - a)
+            indexes[t] = begin + step * (n + r)
+
+    return results
+
+
 def index_at_value_or_level_off(array, frequency, value, _slice, abs_threshold=None):
     '''
     Find the index closest to the value unless it doesn't get within 10% of
@@ -7722,9 +8084,12 @@ def index_at_value_or_level_off(array, frequency, value, _slice, abs_threshold=N
         # minimum go around altitude. Find the top of the climb.
         return find_level_off(array, frequency, _slice)
 
-def _value(array, _slice, operator, start_edge=None, stop_edge=None):
+def _value(array, _slice, operator, start_edge=None, stop_edge=None, extremes=None):
     """
     Applies logic of min_value and max_value across the array slice.
+
+    extremes is an optional SliceExtremes of the array which counts and
+    searches the slice in place of np.ma.count and operator.
     """
     start_result = np.nan
     stop_result = np.nan
@@ -7745,14 +8110,22 @@ def _value(array, _slice, operator, start_edge=None, stop_edge=None):
 
     if _slice.step and _slice.step < 0:
         raise ValueError("Negative step not supported")
-    if np.ma.count(array[search_slice]):
+    if extremes is not None:
+        count = extremes.count(search_slice)
+    else:
+        count = np.ma.count(array[search_slice])
+    if count:
         # get start_edge and stop_edge values if required
         if start_edge:
             start_result = value_at_index(array, start_edge)
             if start_result is not None and start_result is not np.ma.masked:
                 values.append((start_result, start_edge))
         # floor the start position as it will have been floored during the slice
-        value_index = int(operator(array[search_slice]) + int(floor(search_slice.start or 0)) * (search_slice.step or 1))
+        if extremes is not None:
+            slice_index = extremes.argument(search_slice)
+        else:
+            slice_index = operator(array[search_slice])
+        value_index = int(slice_index + int(floor(search_slice.start or 0)) * (search_slice.step or 1))
         value = array[value_index]
         values.append((value, value_index))
         if stop_edge:
@@ -7795,6 +8168,56 @@ def value_at_time(array, hz, offset, time_index):
     return value_at_index(array, location_in_array)
 
 
+def values_at_times(array, hz, offset, time_indexes):
+    '''
+    Finds the values of the data in array at each of the times given by
+    time_indexes. This is the vectorised equivalent of calling value_at_time
+    once per time and returns identical values.
+
+    :param array: input data
+    :type array: masked array
+    :param hz: sample rate for the input data (sec-1)
+    :type hz: float
+    :param offset: fdr offset for the array (sec)
+    :type offset: float
+    :param time_indexes: times into the array where we want to find the array values.
+    :type time_indexes: list or np.array of float
+    :returns: interpolated values from the array, masked where value_at_time would return None.
+    :rtype: np.ma.masked_array
+    '''
+    array = np.ma.asanyarray(array)
+    data = np.ma.getdata(array)
+    mask = np.ma.getmaskarray(array)
+    # Timedelta truncates to 6 digits, therefore round offset down.
+    time_into_array = np.asarray(time_indexes, dtype=float) - round(offset - 0.0000005, 6)
+    location_in_array = time_into_array * hz
+
+    # Trap overruns which arise from compensation for timing offsets.
+    last = len(array) - 1
+    location_in_array[location_in_array < 0] = 0
+    location_in_array[location_in_array > last] = last
+
+    low = location_in_array.astype(int)
+    high = np.minimum(low + 1, last)
+    r = location_in_array - low
+    low_value = data[low]
+    high_value = data[high]
+    low_masked = mask[low]
+    high_masked = mask[high]
+
+    # In the cases of neither sample masked, interpolate.
+    values = r * high_value + (1 - r) * low_value
+    # Crude handling of masked values as value_at_index.
+    values = np.where(low_masked, high_value, values)
+    values = np.where(high_masked & ~low_masked, low_value, values)
+    result_mask = low_masked & high_masked
+    # Arriving at exactly a sample returns it unless masked.
+    exact = low == location_in_array
+    values = np.where(exact, low_value, values)
+    result_mask = np.where(exact, low_masked, result_mask)
+    return np.ma.array(values, mask=result_mask)
+
+
 def value_at_datetime(start_datetime, array, hz, offset, value_datetime):
     '''
     Finds the value of the data in array at the time given by value_datetime.
@@ -7887,6 +8310,31 @@ def vstack_params(*params):
     return np.ma.vstack([getattr(p, 'array', p) for p in params if p is not None])
 
 
+def vstack_params_reduced(group, reductions, *params):
+    '''
+    Stack the params once and reduce the stacked dimension with each of the
+    reductions, e.g. to derive the Avg, Max and Min nodes of an output group
+    from a single stacked array.
+
+    vstack_params_reduced('Eng (*) N1', ('Max', 'Min'), eng1, eng2)
+    # returns {'Eng (*) N1 Max': ..., 'Eng (*) N1 Min': ...}
+
+    :param group: Name of the output group, prefixed to each reduction.
+    :type group: str
+    :param reductions: Names of the reductions, any of 'Avg', 'Max' and 'Min'.
+    :type reductions: [str]
+    :param params: Parameter arguments as required. Allows some None values.
+    :type params: np.ma.array or Parameter object or None
+    :returns: Reduced arrays keyed by '<group> <reduction>'.
+    :rtype: {str: np.ma.array}
+    :raises: ValueError if all params are None (concatenation of zero-length sequences is impossible)
+    '''
+    stacked = vstack_params(*params)
+    functions = {'Avg': np.ma.average, 'Max': np.ma.max, 'Min': np.ma.min}
+    return {'%s %s' % (group, reduction): functions[reduction](stacked, axis=0)
+            for reduction in reductions}
+
+
 def vstack_params_filtered(window, *params, **kw):
     '''
     Create a multi-dimensional masked array with a dimension per param.
@@ -7991,59 +8439,10 @@ def second_window(array, frequency, seconds, extend_window=False):
 
     samples = int(frequency * seconds)
 
-    window_array = np_ma_masked_zeros_like(array)
-
-    if array.size < samples:
-        # Array size is less than the window sample size.
-        return window_array
-
-    # Make a view of a sliding window using a different stride.
-    # For 3 samples, the array [1, 2, 3, 4, 5, 6, 7, 8, 9] will become
-    # [[1, 2, 3],
-    #  [2, 3, 4],
-    #  [3, 4, 5],
-    #  [4, 5, 6],
-    #  [5, 6, 7],
-    #  [6, 7, 8],
-    #  [7, 8, 9]]
-
-    sliding_window = np.lib.stride_tricks.as_strided(
-        array, shape=(len(array) - samples, samples + 1),
-        strides=array.strides * 2)
-
-    # Calculate min and max over the last axis (for each sliding window)
-    # Optimization: convert array to list for indexing (161 ms -> 124 ms)
-    min_ = np.min(sliding_window, axis=-1).tolist()
-    max_ = np.max(sliding_window, axis=-1).tolist()
-
-    unmasked_slices = np.ma.clump_unmasked(array)
-
-    # Optimization: local namespace (17 ms -> 6 ms)
-    window_array_data = window_array.data
-
-    for unmasked_slice in filter_slices_length(unmasked_slices, samples):
-        start = unmasked_slice.start
-        last_value = array[start]
-        window_stop = unmasked_slice.stop - samples
-        # We set already the mask to False where we are going to insert
-        # values. That is from start up to stop-sample_idx
-        # Much faster than setting the value in the masked array item by item
-        window_array.mask[start:window_stop] = False
-        for idx in range(start, window_stop):
-            # Clip the last value between sliding window min and max
-            last_value = min(max(last_value, min_[idx]), max_[idx])
-            # Set this value in the data object of the masked array.
-            # Much faster than using window_array[start+i] = last_value
-            window_array_data[idx] = last_value
-
-    '''
-    import matplotlib.pyplot as plt
-    plt.plot(array)
-    plt.plot(window_array)
-    plt.show()
-    '''
-
-    return window_array
+    # Each value is clipped between the minimum and maximum of the following
+    # window of samples + 1, calculated in linear time regardless of the
+    # window size.
+    return maintained_values(array, samples)
 
 #---------------------------------------------------------------------------
 # Air data calculations adapted from AeroCalc V0.11 to suit POLARIS Numpy
@@ -8738,14 +9137,14 @@ def max_maintained_value(arrays, seconds, frequency, phase):
         array = arrays[unmasked_slice]
         if samples <= len(array):
             max_value = array.max()
-            min_difference_index = 0
-            min_difference = sum = np.ma.sum(max_value - array[:samples])
-            for i in range(1, len(array) - samples + 1):
-                sum += array[i - 1]
-                sum -= array[samples + i - 1]
-                if sum < min_difference:
-                    min_difference = sum
-                    min_difference_index = i
+            # The difference from the maximum of each window of samples,
+            # calculated with the same floating point operations as a
+            # running total so that ties are resolved identically.
+            data = np.ma.getdata(array)
+            differences = running_differences(
+                np.ma.sum(max_value - array[:samples]),
+                data[:len(array) - samples], data[samples:])
+            min_difference_index = int(np.argmin(differences))
             index, value = min_value(array[min_difference_index:min_difference_index+samples])
             indices.append(min_difference_index + index + phase.start + unmasked_slice.start)
             values.append(value)
@@ -4,6 +4,7 @@ try:
 except ImportError:
     import _pickle as cPickle
 import gzip
+import importlib
 import inspect
 import logging
 import math
@@ -14,12 +15,13 @@ import six
 
 from abc import ABCMeta
 from collections import namedtuple, OrderedDict
-from collections.abc import Iterable
+from collections.abc import Iterable, Mapping
 from functools import total_ordering
 from itertools import product
 from operator import attrgetter
 
 from analysis_engine.library import (
+    SliceExtremes,
     align,
     align_slices,
     all_deps,
@@ -40,6 +42,7 @@ from analysis_engine.library import (
     value_at_index,
     value_at_time,
 )
+from analysis_engine.precision import cast_array, cast_param, compute_dtype
 from analysis_engine.recordtype import recordtype
 from analysis_engine.settings import NODE_CACHE_OFFSET_DP
 
@@ -446,6 +449,10 @@ def can_operate(cls, available, actype=A('Aircraft Type')):
             self.frequency = dependencies_to_align[0].frequency
             self.offset = dependencies_to_align[0].offset
 
+        dtype = self.compute_dtype()
+        if dtype:
+            args = [cast_param(arg, dtype) for arg in args]
+
         try:
             res = self.derive(*args)
         except Exception:
@@ -462,6 +469,14 @@ def can_operate(cls, available, actype=A('Aircraft Type')):
                 self.__class__.__name__, res))
         return self
 
+    def compute_dtype(self):
+        '''
+        :returns: Floating point data type which dependencies are cast to
+            before derive, or None to leave them unchanged.
+        :rtype: type or None
+        '''
+        return None
+
     def derive(self, **kwargs):
         """
         Accepts keyword arguments where the default determines the derive
@@ -628,6 +643,13 @@ class DerivedParameterNode(Node):
     node_type_abbr = 'Parameter'
     data_type = 'Derived'
     lfl = False
+    # Sibling nodes which share the same dependencies and alignment attributes
+    # and only differ in how the stacked dependencies are reduced (e.g. Avg,
+    # Max and Min) declare a common output_group and derive with
+    # derive_outputs. The first sibling to be derived calculates the arrays of
+    # every node in the group and the others reuse them from the cache
+    # without realigning their dependencies.
+    output_group = None
 
     def __init__(self, name='', array=np.ma.array([], dtype=float),
                  frequency=1.0, offset=0.0, data_type=None, lfl=False, *args, **kwargs):
@@ -671,6 +693,87 @@ class DerivedParameterNode(Node):
             secs = float(secs)
         return value_at_time(self.array, self.frequency, self.offset, secs)
 
+    def outputs_cache_key(self, args):
+        '''
+        Generate a cache key for the outputs of the Node's output group.
+
+        :param args: List of available Parameter objects
+        :type args: list
+        :returns: Cache key tuple containing ('outputs', output_group, dependency names).
+        :rtype: (str, str, tuple)
+        '''
+        return 'outputs', self.output_group, tuple(
+            None if arg is None else arg.name for arg in args)
+
+    def get_derived(self, *args, **kwargs):
+        '''
+        Reuses the outputs of a sibling Node in the same output group if they
+        have already been derived from the same dependencies, otherwise
+        aligns the dependencies and calls derive.
+
+        Arguments are forwarded to Node.get_derived, whose first argument is
+        the list of available Parameter objects.
+
+        :returns: self after having aligned dependencies and called derive.
+        :rtype: self
+        '''
+        if not self.output_group:
+            node = super(DerivedParameterNode, self).get_derived(*args, **kwargs)
+            self._cast_array()
+            return node
+
+        key = self.outputs_cache_key(args[0] if args else kwargs['args'])
+        cached = self.get_cache(key)
+        if cached and self.name in cached[0]:
+            outputs, self.frequency, self.offset = cached
+            self.array = outputs[self.name]
+            return self._cast_array()
+
+        node = super(DerivedParameterNode, self).get_derived(*args, **kwargs)
+        # The frequency and offset are only final once derive has returned.
+        outputs = self.__dict__.pop('_outputs', None)
+        if outputs is not None:
+            self.set_cache(key, (outputs, self.frequency, self.offset))
+        self._cast_array()
+        return node
+
+    def compute_dtype(self):
+        '''
+        :returns: Floating point data type of settings.COMPUTE_DTYPE for this
+            parameter, see precision.compute_dtype.
+        :rtype: type or None
+        '''
+        return compute_dtype(self.name)
+
+    def _cast_array(self):
+        '''
+        Cast the derived array to the compute data type so that it is stored
+        in the same precision as it was computed.
+
+        :returns: self
+        :rtype: DerivedParameterNode
+        '''
+        dtype = self.compute_dtype()
+        if dtype and getattr(self, 'array', None) is not None:
+            self.array = cast_array(self.array, dtype)
+        return self
+
+    def derive_outputs(self, function, *args, **kwargs):
+        '''
+        Calculate the arrays of every Node in the output group with a single
+        call to function and set self.array to this Node's output.
+
+        :param function: Returns a dict of output arrays keyed by Node name.
+        :type function: callable
+        :returns: Output arrays keyed by Node name.
+        :rtype: dict
+        '''
+        outputs = function(*args, **kwargs)
+        self.array = outputs[self.name]
+        if self.output_group:
+            self._outputs = outputs
+        return outputs
+
     def get_aligned(self, param):
         '''
         :param param: Node to align copy to.
@@ -1968,6 +2071,36 @@ class KeyPointValueNode(FormattedNameNode):
             if not min_duration or duration > min_duration:
                 self.create_kpv(index, value, **kwargs)
 
+    def create_extreme_kpvs(self, param, slices, function, min_duration=None, **kwargs):
+        '''
+        Shortcut for creating KPVs of the maximum, minimum or maximum
+        absolute value of a parameter within a number of slices, as
+        create_kpvs_within_slices.
+
+        The search of the parameter is shared through the cache by all nodes
+        creating KPVs of the same parameter, frequency, offset and function,
+        so the parameter's array must not have been modified.
+
+        :param param: Parameter to source values from.
+        :type param: Parameter
+        :param slices: Slices to create KPVs within.
+        :type slices: SectionNode or list of slices.
+        :param function: max_value, min_value or max_abs_value.
+        :type function: function
+        :param min_duration: Minimum duration for a slice to be meaningful.
+        :type min_duration: float
+        :returns: None
+        :rtype: None
+        '''
+        key = (function.__name__,) + self.cache_key(param.name, param.frequency, param.offset)
+        extremes = self.get_cache(key)
+        if extremes is None or len(extremes.array) != len(param.array):
+            extremes = SliceExtremes(param.array, function)
+            self.set_cache(key, extremes)
+        self.create_kpvs_within_slices(param.array, slices, extremes,
+                                       min_duration=min_duration,
+                                       freq=param.frequency, **kwargs)
+
     def create_kpv_from_slices(self, array, slices, function, **kwargs):
         '''
         Shortcut for creating a single KPV from multiple slices.
@@ -2433,6 +2566,124 @@ class ApproachNode(ListNode):
 App = ApproachNode
 
 
+def node_type_of(node_class):
+    '''
+    :param node_class: Node class.
+    :type node_class: class
+    :returns: The first of NODE_SUBCLASSES the class derives from, e.g.
+        KeyPointValueNode.
+    :rtype: class or None
+    '''
+    # Nodes which are not classes, e.g. mocks, provide __bases__.
+    for base_class in getattr(node_class, '__mro__', node_class.__bases__):
+        if base_class in NODE_SUBCLASSES:
+            return base_class
+    return None
+
+
+def has_default_can_operate(node_class):
+    '''
+    :param node_class: Node class.
+    :type node_class: class
+    :returns: Whether the node operates only if all of its dependencies are
+        available, i.e. does not override can_operate.
+    :rtype: bool
+    '''
+    return getattr(node_class.can_operate, '__func__', None) is Node.can_operate.__func__
+
+
+class NodeRegistry(Mapping):
+    '''
+    Node classes by name, imported from their modules when first accessed.
+
+    The index describes each node without importing its module: the module
+    and class names, dependency names, node type and whether the class
+    overrides can_operate, see analysis_engine.node_registry. Classes which
+    are already imported may be provided instead of or as well as the index.
+    '''
+
+    def __init__(self, index=None, classes=None):
+        '''
+        :param index: Entries describing each node by name.
+        :type index: dict or None
+        :param classes: Node classes by name.
+        :type classes: dict or None
+        '''
+        self.index = index or {}
+        self._classes = dict(classes or {})
+
+    def __repr__(self):
+        return '%s(%d nodes, %d imported)' % (
+            self.__class__.__name__, len(self), len(self._classes))
+
+    def __getitem__(self, name):
+        try:
+            return self._classes[name]
+        except KeyError:
+            pass
+        entry = self.index[name]
+        module = importlib.import_module(entry['module'])
+        node_class = self._classes[name] = getattr(module, entry['class'])
+        return node_class
+
+    def __contains__(self, name):
+        return name in self._classes or name in self.index
+
+    def __iter__(self):
+        for name in self._classes:
+            yield name
+        for name in self.index:
+            if name not in self._classes:
+                yield name
+
+    def __len__(self):
+        return len(self._classes) + sum(1 for name in self.index if name not in self._classes)
+
+    def imported(self, name):
+        '''
+        :returns: Whether the class of the node has been imported.
+        :rtype: bool
+        '''
+        return name in self._classes
+
+    def dependency_names(self, name):
+        '''
+        :returns: Dependency names of the node.
+        :rtype: [str]
+        '''
+        if name not in self._classes and name in self.index:
+            return self.index[name]['dependencies']
+        return self[name].get_dependency_names()
+
+    def node_type(self, name):
+        '''
+        :returns: The first of NODE_SUBCLASSES the node derives from.
+        :rtype: class or None
+        '''
+        if name not in self._classes and name in self.index:
+            return _NODE_TYPES.get(self.index[name]['node_type'])
+        return node_type_of(self[name])
+
+    def base_name(self, name):
+        '''
+        :returns: Name of the base class of the node.
+        :rtype: str
+        '''
+        if name not in self._classes and name in self.index:
+            return self.index[name]['base']
+        return self[name].__base__.__name__
+
+    def default_can_operate(self, name):
+        '''
+        :returns: Whether the node operates only if all of its dependencies
+            are available, i.e. does not override can_operate.
+        :rtype: bool
+        '''
+        if name not in self._classes and name in self.index:
+            return self.index[name]['default_can_operate']
+        return has_default_can_operate(self[name])
+
+
 class NodeManager(object):
     def __repr__(self):
         return 'NodeManager: x%d nodes in total' % (
@@ -2455,7 +2706,9 @@ class NodeManager(object):
         :type requested: [str]
         :param required: Nodes which are required, otherwise an exception will be raised.
         :type required: [str]
-        :type derived_nodes: dict
+        :param derived_nodes: Derived node classes by name. A dict is wrapped
+            in a NodeRegistry.
+        :type derived_nodes: NodeRegistry or dict
         :type aircraft_info: dict
         :type achieved_flight_record: dict
         """
@@ -2467,6 +2720,8 @@ class NodeManager(object):
         self.hdf_keys = hdf_keys
         self.requested = requested
         self.required = required
+        if not isinstance(derived_nodes, NodeRegistry):
+            derived_nodes = NodeRegistry(classes=derived_nodes)
         self.derived_nodes = derived_nodes
         # Attributes:
         self.aircraft_info = non_empty(aircraft_info)
@@ -2526,6 +2781,9 @@ class NodeManager(object):
                 or name in ('root', 'HDF Duration'):
             return True
         elif name in self.derived_nodes:
+            if self.derived_nodes.default_can_operate(name):
+                # Avoid importing the node until it is derived.
+                return all(d in available for d in self.derived_nodes.dependency_names(name))
             derived_node = self.derived_nodes[name]
             # NOTE: Raises "Unbound method" here due to can_operate being
             # overridden without wrapping with @classmethod decorator
@@ -2677,3 +2935,5 @@ NODE_SUBCLASSES = {
     KeyTimeInstanceNode,
     MultistateDerivedParameterNode,
 }
+
+_NODE_TYPES = {node_type.__name__: node_type for node_type in NODE_SUBCLASSES}
@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+# vim:et:ft=python:nowrap:sts=4:sw=4:ts=4
+##############################################################################
+
+'''
+Flight Data Analyzer: Node Registry
+
+A prebuilt index of the nodes within node modules so that processing can
+start without importing every module and naming every class, see
+node.NodeRegistry. Modules are imported when a node within them is first
+needed.
+
+The index is saved as JSON within settings.NODE_REGISTRY_DIR and rebuilt
+when the registry version, the version of the analyser or any of the
+module source files change. It can be prebuilt, e.g. when installing:
+
+python -m analysis_engine.node_registry
+'''
+
+##############################################################################
+# Imports
+
+
+from __future__ import print_function
+
+import argparse
+import hashlib
+import logging
+import os
+import simplejson as json
+
+from importlib.util import find_spec
+
+from analysis_engine import settings, __version__
+from analysis_engine.node import NodeRegistry, has_default_can_operate, node_type_of
+
+
+##############################################################################
+# Globals
+
+
+logger = logging.getLogger(name=__name__)
+
+# Version of the index format. Indexes of other versions are rebuilt.
+REGISTRY_VERSION = 1
+
+# Registries loaded within this process by tuple of module names.
+_REGISTRIES = {}
+
+
+##############################################################################
+# Functions
+
+
+def module_sources(modules):
+    '''
+    The modification time and size of the source file of each module, which
+    are compared to determine whether an index is stale. Modules are found
+    without being imported.
+
+    :param modules: Module names.
+    :type modules: [str]
+    :returns: Modification time and size of each module by name, or None if
+        the module has no source file.
+    :rtype: dict
+    '''
+    sources = {}
+    for module in modules:
+        spec = find_spec(module)
+        if spec is None:
+            raise ImportError("No module named '%s'" % module)
+        path = spec.origin
+        if path and os.path.isfile(path):
+            stat = os.stat(path)
+            sources[module] = [stat.st_mtime, stat.st_size]
+        else:
+            sources[module] = None
+    return sources
+
+
+def build_index(modules):
+    '''
+    Import the modules and describe each of their nodes.
+
+    :param modules: Module names.
+    :type modules: [str]
+    :returns: The index with the entries of each node by name.
+    :rtype: dict
+    '''
+    # utils imports the dependency graph and networkx, which are not needed
+    # to load an index.
+    from analysis_engine.utils import get_derived_nodes
+
+    nodes = {}
+    for name, node_class in get_derived_nodes(modules).items():
+        node_type = node_type_of(node_class)
+        nodes[name] = {
+            'module': node_class.__module__,
+            'class': node_class.__name__,
+            'dependencies': node_class.get_dependency_names(),
+            'node_type': node_type.__name__ if node_type else None,
+            'base': node_class.__base__.__name__,
+            'default_can_operate': has_default_can_operate(node_class),
+        }
+    return {
+        'version': REGISTRY_VERSION,
+        'analysis_engine': __version__,
+        'modules': list(modules),
+        'sources': module_sources(modules),
+        'nodes': nodes,
+    }
+
+
+def index_path(modules, directory=None):
+    '''
+    :param modules: Module names.
+    :type modules: [str]
+    :param directory: Directory of indexes, defaults to
+        settings.NODE_REGISTRY_DIR.
+    :type directory: str or None
+    :returns: Path of the index of the modules, or None if indexes are not
+        saved.
+    :rtype: str or None
+    '''
+    directory = directory or settings.NODE_REGISTRY_DIR
+    if not directory:
+        return None
+    key = hashlib.sha1('\n'.join(modules).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(directory, 'nodes_%s.json' % key)
+
+
+def is_current(index, modules):
+    '''
+    :param index: Index loaded from a file.
+    :type index: dict
+    :param modules: Module names.
+    :type modules: [str]
+    :returns: Whether the index describes the current source of the modules.
+    :rtype: bool
+    '''
+    return (index.get('version') == REGISTRY_VERSION and
+            index.get('analysis_engine') == __version__ and
+            index.get('modules') == list(modules) and
+            index.get('sources') == module_sources(modules))
+
+
+def load_index(modules, directory=None):
+    '''
+    Load the index of the modules, rebuilding and saving it if it does not
+    exist or is stale.
+
+    :param modules: Module names.
+    :type modules: [str]
+    :param directory: Directory of indexes, defaults to
+        settings.NODE_REGISTRY_DIR.
+    :type directory: str or None
+    :rtype: dict
+    '''
+    modules = list(modules)
+    path = index_path(modules, directory=directory)
+    if path and os.path.isfile(path):
+        try:
+            with open(path) as f:
+                index = json.load(f)
+        except (IOError, ValueError):
+            logger.warning("Unable to read node registry '%s'.", path)
+        else:
+            if is_current(index, modules):
+                return index
+            logger.info("Node registry '%s' is stale.", path)
+    index = build_index(modules)
+    if path:
+        save_index(index, path)
+    return index
+
+
+def save_index(index, path):
+    '''
+    Save an index, logging rather than raising if the directory is not
+    writable.
+
+    :type index: dict
+    :type path: str
+    '''
+    temp_path = '%s.%d.tmp' % (path, os.getpid())
+    try:
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(temp_path, 'w') as f:
+            json.dump(index, f)
+        # Replace atomically as workers may load the index concurrently.
+        os.rename(temp_path, path)
+    except (IOError, OSError):
+        logger.warning("Unable to save node registry '%s'.", path)
+    else:
+        logger.info("Saved node registry '%s'.", path)
+
+
+def get_node_registry(modules, directory=None):
+    '''
+    Node classes by name within the modules, imported when first accessed.
+
+    Registries are reused within the process, so each node class is imported
+    at most once.
+
+    :param modules: Module names.
+    :type modules: [str]
+    :param directory: Directory of indexes, defaults to
+        settings.NODE_REGISTRY_DIR.
+    :type directory: str or None
+    :rtype: NodeRegistry
+    '''
+    key = tuple(modules)
+    registry = _REGISTRIES.get(key)
+    if registry is None:
+        index = load_index(modules, directory=directory)
+        registry = _REGISTRIES[key] = NodeRegistry(index=index['nodes'])
+    return registry
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build the node registry of node modules.')
+    parser.add_argument('modules', nargs='*', help='Module names, defaults to settings.NODE_MODULES.')
+    parser.add_argument('-d', '--directory', help='Directory of indexes, defaults to settings.NODE_REGISTRY_DIR.')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    module_sets = [args.modules] if args.modules else [
+        settings.NODE_MODULES,
+        settings.NODE_MODULES + settings.NODE_HELICOPTER_MODULE_PATHS,
+    ]
+    for modules in module_sets:
+        path = index_path(modules, directory=args.directory)
+        if not path:
+            parser.error('No directory to save the node registry to.')
+        index = build_index(modules)
+        save_index(index, path)
+        print('%d nodes: %s' % (len(index['nodes']), path))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,648 @@
+# -*- coding: utf-8 -*-
+# vim:et:ft=python:nowrap:sts=4:sw=4:ts=4
+##############################################################################
+
+'''
+Flight Data Analyzer: Ingest Pipeline
+
+Splits raw HDF files into segments, processes each segment and exports the
+results in three stages:
+
+split -> process -> export
+
+Each stage has its own pool of workers and reads from a bounded queue which
+the previous stage writes to, so a stage waits when the next stage falls
+behind rather than holding every segment in memory. Segments of files which
+have been split are processed while later files are still being split.
+
+Progress is recorded within a journal, so running the pipeline again with the
+same journal skips the files and segments which have been completed:
+
+python -m analysis_engine.pipeline data/ -o segments/ -j ingest.journal \
+    -tail G-ABCD
+'''
+
+##############################################################################
+# Imports
+
+
+from __future__ import print_function
+
+import argparse
+import dateutil.parser
+import itertools
+import logging
+import multiprocessing
+import os
+import simplejson as json
+import six
+import threading
+import time
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+from six.moves import queue
+
+from analysis_engine import settings
+
+
+##############################################################################
+# Globals
+
+
+logger = logging.getLogger(name=__name__)
+
+# File extensions of the HDF files within input directories.
+HDF_EXTENSIONS = ('.hdf5', '.hdf', '.h5')
+
+# Exports written for each processed segment by default.
+EXPORTS = ('csv',)
+
+# Queued after the last item for each worker of a stage.
+_STOP = object()
+
+
+##############################################################################
+# Functions
+
+
+def find_inputs(inputs):
+    '''
+    :param inputs: Paths of HDF files and directories of HDF files.
+    :type inputs: str or [str]
+    :returns: Paths of the HDF files in order, with the files within each
+        directory sorted by name.
+    :rtype: [str]
+    '''
+    if isinstance(inputs, six.string_types):
+        inputs = [inputs]
+    paths = []
+    for path in inputs:
+        if os.path.isdir(path):
+            paths.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path))
+                if os.path.splitext(name)[1].lower() in HDF_EXTENSIONS and
+                os.path.isfile(os.path.join(path, name)))
+        else:
+            paths.append(path)
+    return paths
+
+
+def segment_to_info(segment, hdf_path):
+    '''
+    :param segment: Segment split from the HDF file.
+    :type segment: Segment
+    :param hdf_path: Path of the HDF file which was split.
+    :type hdf_path: str
+    :returns: Segment information for process_flight which can be written to
+        the journal, i.e. the start datetime is an ISO 8601 string.
+    :rtype: dict
+    '''
+    return {
+        'File': segment.path,
+        'Segment Type': segment.type,
+        'Start Datetime': segment.start_dt.isoformat() if segment.start_dt else None,
+        'Part': segment.part,
+        'Hash': segment.hash,
+        'Source': hdf_path,
+    }
+
+
+def split_file(hdf_path, aircraft_info, dest_dir=None, split_kwargs={}):
+    '''
+    Split stage: split an HDF file into segments.
+
+    :type hdf_path: str
+    :type aircraft_info: dict
+    :param dest_dir: Directory of the segments, defaults to the directory of
+        the HDF file.
+    :type dest_dir: str or None
+    :param split_kwargs: Keyword arguments of split_hdf_to_segments. Segments
+        are written by the split worker itself unless processes is provided,
+        as the stages already have a pool of workers each.
+    :type split_kwargs: dict
+    :returns: Information of each segment, see segment_to_info.
+    :rtype: [dict]
+    '''
+    from analysis_engine.split_hdf_to_segments import split_hdf_to_segments
+
+    split_kwargs = dict({'processes': 1}, **split_kwargs)
+    segments = split_hdf_to_segments(hdf_path, aircraft_info, dest_dir=dest_dir,
+                                     **split_kwargs)
+    return [segment_to_info(segment, hdf_path) for segment in segments]
+
+
+def process_segment(segment_info, aircraft_info, process_kwargs={}):
+    '''
+    Process stage: process a segment and write the results of process_flight
+    as JSON next to the segment.
+
+    :param segment_info: Segment information, see segment_to_info.
+    :type segment_info: dict
+    :type aircraft_info: dict
+    :param process_kwargs: Keyword arguments of process_flight.
+    :type process_kwargs: dict
+    :returns: The segment information with the path of the results.
+    :rtype: [dict]
+    '''
+    from analysis_engine.json_tools import process_flight_to_json
+    from analysis_engine.process_flight import process_flight
+
+    info = {k: v for k, v in six.iteritems(segment_info)
+            if k in ('File', 'Segment Type', 'Start Datetime')}
+    if info.get('Start Datetime'):
+        info['Start Datetime'] = dateutil.parser.parse(info['Start Datetime'])
+    else:
+        info.pop('Start Datetime', None)
+    res = process_flight(info, aircraft_info.get('Tail Number'),
+                         aircraft_info=aircraft_info, **process_kwargs)
+    results_path = os.path.splitext(segment_info['File'])[0] + '.json'
+    with open(results_path, 'w') as f:
+        f.write(process_flight_to_json(res))
+    return [dict(segment_info, Results=results_path)]
+
+
+def export_results(segment_info, exports=EXPORTS):
+    '''
+    Export stage: write the results of a processed segment.
+
+    :param segment_info: Segment information with the path of the results,
+        see process_segment.
+    :type segment_info: dict
+    :param exports: Exports to write, 'csv' for the KTIs, KPVs and phases and
+        'kml' for the flight track.
+    :type exports: iterable of str
+    :returns: Paths of the files written.
+    :rtype: [str]
+    :raises ValueError: If the results were written by another version.
+    '''
+    from analysis_engine.json_tools import json_to_process_flight
+    from analysis_engine.plot_flight import csv_flight_details, track_to_kml
+
+    with open(segment_info['Results']) as f:
+        res = json_to_process_flight(f.read())
+    if not res:
+        raise ValueError("Results '%s' were written by another version of the "
+                         "analysis engine." % segment_info['Results'])
+    res = {k: list(itertools.chain.from_iterable(six.itervalues(v)))
+           for k, v in six.iteritems(res)}
+    hdf_path = segment_info['File']
+    base_path = os.path.splitext(hdf_path)[0]
+    paths = []
+    if 'csv' in exports:
+        csv_flight_details(hdf_path, res['kti'], res['kpv'], res['phases'],
+                           dest_path=base_path + '.csv', append_to_file=False)
+        paths.append(base_path + '.csv')
+    if 'kml' in exports:
+        if track_to_kml(hdf_path, res['kti'], res['kpv'], res['approach'],
+                        dest_path=base_path + '.kml'):
+            paths.append(base_path + '.kml')
+    return paths
+
+
+##############################################################################
+# Classes
+
+
+class Journal(object):
+    '''
+    Progress of the pipeline, appended to a file as lines of JSON so that a
+    pipeline which is stopped can be resumed. Each line records an item
+    which a stage completed with its outputs, or failed:
+
+    {"stage": "split", "key": "data/flight.hdf5", "outputs": [...]}
+    {"stage": "process", "key": "segments/flight.001.hdf5", "error": "..."}
+
+    Items which failed are attempted again when resumed.
+    '''
+
+    def __init__(self, path=None):
+        '''
+        :param path: Path of the journal file. The journal is only held in
+            memory if None.
+        :type path: str or None
+        '''
+        self.path = path
+        self._completed = {}
+        self._lock = threading.Lock()
+        if path and os.path.isfile(path):
+            self.load()
+
+    def load(self):
+        '''
+        Read the completed items from the journal file.
+        '''
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Partially written when the pipeline was stopped.
+                    logger.warning("Ignoring incomplete journal entry: %r", line)
+                    continue
+                stage_completed = self._completed.setdefault(entry['stage'], {})
+                if 'error' in entry:
+                    stage_completed.pop(entry['key'], None)
+                else:
+                    stage_completed[entry['key']] = entry['outputs']
+
+    def completed(self, stage, key):
+        '''
+        :type stage: str
+        :type key: str
+        :returns: Outputs of the item if completed by the stage, otherwise
+            None.
+        :rtype: list or None
+        '''
+        with self._lock:
+            return self._completed.get(stage, {}).get(key)
+
+    def outputs(self, stage):
+        '''
+        :type stage: str
+        :returns: Outputs of every item completed by the stage.
+        :rtype: [object]
+        '''
+        with self._lock:
+            return list(itertools.chain.from_iterable(
+                six.itervalues(self._completed.get(stage, {}))))
+
+    def record(self, stage, key, outputs=None, error=None):
+        '''
+        Record an item completed or failed by a stage.
+
+        :type stage: str
+        :type key: str
+        :param outputs: Outputs of the item if completed.
+        :type outputs: list or None
+        :param error: Description of the error if failed.
+        :type error: str or None
+        '''
+        entry = {'stage': stage, 'key': key, 'time': time.time()}
+        if error is None:
+            entry['outputs'] = outputs
+        else:
+            entry['error'] = error
+        with self._lock:
+            stage_completed = self._completed.setdefault(stage, {})
+            if error is None:
+                stage_completed[key] = outputs
+            else:
+                stage_completed.pop(key, None)
+            if self.path:
+                with open(self.path, 'a') as f:
+                    f.write(json.dumps(entry) + '\n')
+                    f.flush()
+
+
+class StageMetrics(object):
+    '''
+    Throughput and latency of a stage. Wait is the time items are queued
+    before a worker starts them, latency is the time from being queued until
+    completed.
+    '''
+
+    def __init__(self, name):
+        self.name = name
+        self.completed = 0
+        self.failed = 0
+        self.skipped = 0
+        self.max_queued = 0
+        self.busy_time = 0.0
+        self.total_wait = 0.0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.first_start = None
+        self.last_finish = None
+        self._lock = threading.Lock()
+
+    def queued(self, size):
+        '''
+        :param size: Number of items queued for the stage.
+        :type size: int
+        '''
+        with self._lock:
+            self.max_queued = max(self.max_queued, size)
+
+    def skip(self):
+        '''
+        Count an item completed by an earlier run of the pipeline.
+        '''
+        with self._lock:
+            self.skipped += 1
+
+    def record(self, queued_at, started_at, finished_at, failed=False):
+        '''
+        :param queued_at: Time the item was queued for the stage.
+        :type queued_at: float
+        :param started_at: Time a worker started the item.
+        :type started_at: float
+        :param finished_at: Time the item was completed or failed.
+        :type finished_at: float
+        :param failed: Whether the item failed.
+        :type failed: bool
+        '''
+        latency = finished_at - queued_at
+        with self._lock:
+            if failed:
+                self.failed += 1
+            else:
+                self.completed += 1
+            self.busy_time += finished_at - started_at
+            self.total_wait += started_at - queued_at
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+            if self.first_start is None or started_at < self.first_start:
+                self.first_start = started_at
+            if self.last_finish is None or finished_at > self.last_finish:
+                self.last_finish = finished_at
+
+    def summary(self):
+        '''
+        :returns: Counts of items, throughput in items per second while the
+            stage was active and mean and maximum times in seconds.
+        :rtype: dict
+        '''
+        with self._lock:
+            count = self.completed + self.failed
+            active = (self.last_finish - self.first_start) if count else 0.0
+            return {
+                'stage': self.name,
+                'completed': self.completed,
+                'failed': self.failed,
+                'skipped': self.skipped,
+                'max_queued': self.max_queued,
+                'throughput': self.completed / active if active > 0 else 0.0,
+                'busy_time': self.busy_time,
+                'mean_wait': self.total_wait / count if count else 0.0,
+                'mean_latency': self.total_latency / count if count else 0.0,
+                'max_latency': self.max_latency,
+            }
+
+
+class Stage(object):
+    '''
+    A stage of the pipeline. Items are read from a bounded queue by a thread
+    for each worker, which runs the function of the stage within the
+    worker pool and queues the outputs for the next stage.
+    '''
+
+    def __init__(self, name, function, key, workers, queue_size=None):
+        '''
+        :param name: Name of the stage within the journal and metrics.
+        :type name: str
+        :param function: Picklable function of an item returning a list of
+            outputs.
+        :type function: callable
+        :param key: Function of an item returning the key of the item within
+            the journal.
+        :type key: callable
+        :param workers: Number of workers.
+        :type workers: int
+        :param queue_size: Maximum number of items queued for the stage,
+            defaults to twice the number of workers.
+        :type queue_size: int or None
+        '''
+        self.name = name
+        self.function = function
+        self.key = key
+        self.workers = workers
+        self.queue = queue.Queue(maxsize=queue_size or 2 * workers)
+        self.metrics = StageMetrics(name)
+        self.running = 0
+        self.lock = threading.Lock()
+
+
+class IngestPipeline(object):
+    '''
+    Splits HDF files, processes their segments and exports the results, see
+    the module docstring.
+
+    pipeline = IngestPipeline(aircraft_info, dest_dir='segments',
+                              journal_path='ingest.journal')
+    metrics = pipeline.run(['data/'])
+    '''
+
+    def __init__(self, aircraft_info, dest_dir=None, journal_path=None,
+                 exports=EXPORTS, split_kwargs={}, process_kwargs={},
+                 split_workers=None, process_workers=None, export_workers=None,
+                 queue_size=None, use_processes=True):
+        '''
+        :param aircraft_info: Aircraft information including the 'Tail Number'.
+        :type aircraft_info: dict
+        :param dest_dir: Directory of the segments and exports, defaults to
+            the directory of each HDF file.
+        :type dest_dir: str or None
+        :param journal_path: Path of the journal to resume from and record
+            progress within, progress is not recorded if None.
+        :type journal_path: str or None
+        :param exports: Exports of each segment, see export_results.
+        :type exports: iterable of str
+        :param split_kwargs: Keyword arguments of split_hdf_to_segments.
+        :type split_kwargs: dict
+        :param process_kwargs: Keyword arguments of process_flight.
+        :type process_kwargs: dict
+        :param split_workers: Number of workers splitting files, defaults to
+            settings.PIPELINE_SPLIT_WORKERS.
+        :type split_workers: int or None
+        :param process_workers: Number of workers processing segments,
+            defaults to settings.PIPELINE_PROCESS_WORKERS.
+        :type process_workers: int or None
+        :param export_workers: Number of workers exporting results, defaults
+            to settings.PIPELINE_EXPORT_WORKERS.
+        :type export_workers: int or None
+        :param queue_size: Maximum number of items queued for each stage,
+            defaults to settings.PIPELINE_QUEUE_SIZE.
+        :type queue_size: int or None
+        :param use_processes: Run workers in processes, otherwise threads.
+        :type use_processes: bool
+        '''
+        cpu_count = multiprocessing.cpu_count()
+        if split_workers is None:
+            split_workers = settings.PIPELINE_SPLIT_WORKERS or max(1, cpu_count // 4)
+        if process_workers is None:
+            process_workers = settings.PIPELINE_PROCESS_WORKERS or cpu_count
+        if export_workers is None:
+            export_workers = settings.PIPELINE_EXPORT_WORKERS or 1
+        if queue_size is None:
+            queue_size = settings.PIPELINE_QUEUE_SIZE
+        self.journal = Journal(journal_path)
+        self.use_processes = use_processes
+        self.stages = [
+            Stage('split', partial(split_file, aircraft_info=aircraft_info,
+                                   dest_dir=dest_dir, split_kwargs=split_kwargs),
+                  key=lambda path: path, workers=split_workers,
+                  queue_size=queue_size),
+            Stage('process', partial(process_segment, aircraft_info=aircraft_info,
+                                     process_kwargs=process_kwargs),
+                  key=lambda info: info['File'], workers=process_workers,
+                  queue_size=queue_size),
+            Stage('export', partial(export_results, exports=tuple(exports)),
+                  key=lambda info: info['File'], workers=export_workers,
+                  queue_size=queue_size),
+        ]
+
+    def _queue(self, index, item):
+        '''
+        Queue an item for a stage, or its outputs for the following stages if
+        the stage has already completed it. Blocks while the queue is full.
+
+        :param index: Index of the stage.
+        :type index: int
+        :param item: Input of the stage.
+        '''
+        if index == len(self.stages):
+            return
+        stage = self.stages[index]
+        outputs = self.journal.completed(stage.name, stage.key(item))
+        if outputs is not None:
+            stage.metrics.skip()
+            for output in outputs:
+                self._queue(index + 1, output)
+            return
+        stage.queue.put((item, time.time()))
+        stage.metrics.queued(stage.queue.qsize())
+
+    def _work(self, index, executor):
+        '''
+        Worker thread of a stage: run queued items within the executor until
+        stopped. The last worker of a stage to stop stops the next stage.
+
+        Items fail if the function of the stage raises or its outputs cannot
+        be queued for the next stage.
+
+        :param index: Index of the stage.
+        :type index: int
+        :param executor: Worker pool of the stage.
+        :type executor: concurrent.futures.Executor
+        '''
+        stage = self.stages[index]
+        try:
+            while True:
+                item = stage.queue.get()
+                if item is _STOP:
+                    break
+                item, queued_at = item
+                started_at = time.time()
+                key = None
+                try:
+                    key = stage.key(item)
+                    outputs = executor.submit(stage.function, item).result()
+                    finished_at = time.time()
+                    self.journal.record(stage.name, key, outputs=outputs)
+                    for output in outputs:
+                        self._queue(index + 1, output)
+                except Exception as err:
+                    stage.metrics.record(queued_at, started_at, time.time(), failed=True)
+                    logger.exception("Stage '%s' failed for '%s'.", stage.name,
+                                     item if key is None else key)
+                    if key is not None:
+                        # Replaces the outputs if they could not be queued.
+                        self.journal.record(stage.name, key,
+                                            error='%s: %s' % (type(err).__name__, err))
+                    continue
+                stage.metrics.record(queued_at, started_at, finished_at)
+        finally:
+            with stage.lock:
+                stage.running -= 1
+                last = not stage.running
+            if last and index + 1 < len(self.stages):
+                self._stop(index + 1)
+
+    def _stop(self, index):
+        '''
+        Stop the workers of a stage once the items queued have been run.
+
+        :param index: Index of the stage.
+        :type index: int
+        '''
+        for _ in range(self.stages[index].workers):
+            self.stages[index].queue.put(_STOP)
+
+    def run(self, inputs):
+        '''
+        Run the pipeline until every file has been split and every segment
+        processed and exported.
+
+        :param inputs: Paths of HDF files and directories of HDF files.
+        :type inputs: str or [str]
+        :returns: Metrics of each stage, see StageMetrics.summary.
+        :rtype: [dict]
+        '''
+        # Segments written to an input directory are not inputs.
+        segment_paths = set(os.path.abspath(info['File']) for info in
+                            self.journal.outputs(self.stages[0].name))
+        paths = [p for p in find_inputs(inputs)
+                 if os.path.abspath(p) not in segment_paths]
+        logger.info("Ingesting %d files.", len(paths))
+
+        executor_class = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+        executors = []
+        threads = []
+        try:
+            for index, stage in enumerate(self.stages):
+                executor = executor_class(max_workers=stage.workers)
+                executors.append(executor)
+                stage.running = stage.workers
+                for number in range(stage.workers):
+                    thread = threading.Thread(
+                        target=self._work, args=(index, executor),
+                        name='%s-%d' % (stage.name, number))
+                    thread.daemon = True
+                    thread.start()
+                    threads.append(thread)
+            for path in paths:
+                self._queue(0, path)
+            self._stop(0)
+            for thread in threads:
+                thread.join()
+        finally:
+            for executor in executors:
+                executor.shutdown(wait=not any(t.is_alive() for t in threads))
+
+        metrics = [stage.metrics.summary() for stage in self.stages]
+        for summary in metrics:
+            logger.info("Stage '%(stage)s': %(completed)d completed, %(failed)d "
+                        "failed, %(skipped)d skipped, %(throughput).2f per second, "
+                        "mean latency %(mean_latency).1fs, mean wait "
+                        "%(mean_wait).1fs.", summary)
+        return metrics
+
+
+def main():
+    logger = logging.getLogger()
+    logger.setLevel(logging.INFO)
+    logger.addHandler(logging.StreamHandler())
+    parser = argparse.ArgumentParser(description='Split, process and export HDF files.')
+    parser.add_argument('inputs', nargs='+',
+                        help='Paths of HDF files and directories of HDF files.')
+    parser.add_argument('-o', '--output', dest='dest_dir',
+                        help='Directory of the segments and exports.')
+    parser.add_argument('-j', '--journal', dest='journal_path',
+                        help='Path of the journal to resume from.')
+    parser.add_argument('-tail', '--tail', dest='tail_number', required=True,
+                        help='Aircraft tail number.')
+    parser.add_argument('-e', '--exports', nargs='*', default=list(EXPORTS),
+                        choices=('csv', 'kml'), help='Exports of each segment.')
+    parser.add_argument('--split-workers', type=int,
+                        help='Number of workers splitting files.')
+    parser.add_argument('--process-workers', type=int,
+                        help='Number of workers processing segments.')
+    parser.add_argument('--export-workers', type=int,
+                        help='Number of workers exporting results.')
+    parser.add_argument('--queue-size', type=int,
+                        help='Maximum number of items queued for each stage.')
+    args = parser.parse_args()
+
+    pipeline = IngestPipeline(
+        {'Tail Number': args.tail_number}, dest_dir=args.dest_dir,
+        journal_path=args.journal_path, exports=args.exports,
+        split_workers=args.split_workers, process_workers=args.process_workers,
+        export_workers=args.export_workers, queue_size=args.queue_size)
+    metrics = pipeline.run(args.inputs)
+    print(json.dumps(metrics, indent=2))
+
+
+if __name__ == '__main__':
+    main()
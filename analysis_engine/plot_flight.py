@@ -6,20 +6,18 @@ import itertools
 import logging
 import numpy as np
 import os
-import simplekml
 import six
 
-from copy import copy
+from xml.sax.saxutils import escape
 
 from hdfaccess.file import hdf_file
 from flightdatautilities import units as ut
-from flightdatautilities.print_table import indent
 
 from analysis_engine.library import (
     bearing_and_distance,
     latitudes_and_longitudes,
     repair_mask,
-    value_at_index,
+    values_at_times,
 )
 from analysis_engine.node import derived_param_from_hdf, Parameter
 
@@ -56,86 +54,163 @@ KEEP_KTIS = ['Takeoff Start','Liftoff', 'Touchdown',
              'IAN Glidepath Established Start', 'IAN Glidepath Established End',
              ]
 
-class TypedWriter(object):
-    """
-    A CSV writer which will write rows to CSV file "f",
-    which uses "fieldformats" to format fields.
-
-    ref: http://stackoverflow.com/questions/2982642/specifying-formatting-for-csv-writer-in-python
-    """
-
-    def __init__(self, f, fieldnames, fieldformats, skip_header=False, **kwds):
-        self.writer = csv.DictWriter(f, fieldnames, **kwds)
-        if not skip_header:
-            self.writer.writeheader()
-
-        self.formats = fieldformats
-
-    def _format(self, row):
-        return dict((k, self.formats.get(k, '%s') % v if v or v == 0.0 else v)
-                    for k, v in six.iteritems(row))
+# Parameters whose values are added to each row of the flight details CSV.
+CSV_PARAMETERS = ['Airspeed', 'Altitude AAL']
+CSV_ATTRIBUTES = ['value', 'datetime', 'latitude', 'longitude']
+CSV_FORMATS = {'index': '%.3f',
+               'value': '%.3f',
+               'duration': '%.2f',
+               'latitude': '%.4f',
+               'longitude': '%.4f',
+               'Airspeed': '%d kts',
+               'Altitude AAL': '%d ft',
+               }
 
-    def writerow(self, row):
-        self.writer.writerow(self._format(row))
+# KML altitude modes.
+ALTITUDE_MODE_ABSOLUTE = 'absolute'
+ALTITUDE_MODE_RELATIVE = 'relativeToGround'
+ALTITUDE_MODE_CLAMP = 'clampToGround'
+# Formats of longitude, latitude and altitude within KML coordinates.
+KML_COORDINATE_FORMATS = ('%.7f', '%.7f', '%.2f')
+# Maximum number of coordinates of each KML track.
+KML_TRACK_LENGTH = 4000
+# Colour of KPV markers (red).
+KPV_COLOUR = 'ff0000ff'
+
+class KMLWriter(object):
+    '''
+    Writes a KML document to a file as tracks and points are added rather
+    than building the document in memory.
 
-    def writerows(self, rows):
-        for row in rows:
-            self.writerow(row)
+    with open(path, 'w') as f:
+        kml = KMLWriter(f)
+        kml.linestring('Track', coords)
+        kml.close()
+    '''
 
-    def rowlist(self, rows):
-        "Return a list of formatted rows as ordered by fieldnames"
-        res = []
-        for row in rows:
-            res.append(self.writer._dict_to_list(self._format(row)))
-        return res
+    def __init__(self, f):
+        '''
+        :param f: File opened for writing text.
+        :type f: file
+        '''
+        self.f = f
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<kml xmlns="http://www.opengis.net/kml/2.2">\n'
+                '<Document>\n')
+
+    def _element(self, tag, text):
+        self.f.write('<%s>%s</%s>\n' % (tag, escape(six.text_type(text)), tag))
+
+    def _coordinates(self, coords):
+        '''
+        :param coords: Coordinates with a row of longitude, latitude and
+            optionally altitude per point.
+        :type coords: np.ndarray
+        '''
+        coords = np.asarray(coords, dtype=float)
+        formats = KML_COORDINATE_FORMATS[:coords.shape[1]]
+        points = np.char.mod(formats[0], coords[:, 0])
+        for column, fmt in enumerate(formats[1:], start=1):
+            points = np.char.add(np.char.add(points, ','), np.char.mod(fmt, coords[:, column]))
+        self.f.write('<coordinates>%s</coordinates>\n' % ' '.join(points.tolist()))
+
+    def _geometry(self, tag, coords, altitude_mode=None, extrude=False):
+        self.f.write('<%s>\n' % tag)
+        if extrude:
+            self._element('extrude', 1)
+        if altitude_mode:
+            self._element('altitudeMode', altitude_mode)
+        self._coordinates(coords)
+        self.f.write('</%s>\n' % tag)
+
+    def start_folder(self, name):
+        self.f.write('<Folder>\n')
+        self._element('name', name)
+
+    def end_folder(self):
+        self.f.write('</Folder>\n')
+
+    def linestring(self, name, coords, colour=None, altitude_mode=None,
+                   extrude=False, visible=True):
+        '''
+        :param coords: Coordinates with a row per point.
+        :type coords: np.ndarray
+        :param colour: Line colour as aabbggrr. The area fill of extruded
+            lines has an opacity of 40%.
+        :type colour: str
+        :param altitude_mode: Such as ALTITUDE_MODE_ABSOLUTE.
+        :type altitude_mode: str
+        '''
+        self.f.write('<Placemark>\n')
+        self._element('name', name)
+        self._element('visibility', 1 if visible else 0)
+        if colour:
+            self.f.write('<Style><LineStyle><color>%s</color></LineStyle>'
+                         '<PolyStyle><color>66%s</color></PolyStyle></Style>\n'
+                         % (colour, colour[2:]))
+        self._geometry('LineString', coords, altitude_mode=altitude_mode, extrude=extrude)
+        self.f.write('</Placemark>\n')
+
+    def point(self, name, coords, colour=None, altitude_mode=None):
+        '''
+        :param coords: Longitude, latitude and optionally altitude.
+        :type coords: tuple
+        :param colour: Icon colour as aabbggrr.
+        :type colour: str
+        '''
+        self.f.write('<Placemark>\n')
+        self._element('name', name)
+        if colour:
+            self.f.write('<Style><IconStyle><color>%s</color></IconStyle></Style>\n' % colour)
+        self._geometry('Point', [coords], altitude_mode=altitude_mode)
+        self.f.write('</Placemark>\n')
+
+    def close(self):
+        '''
+        End the document. The file remains open.
+        '''
+        self.f.write('</Document>\n</kml>\n')
+
+
+def _gather(array, size):
+    '''
+    Values of array at each index up to size, repeating the last value
+    beyond the end of the array as value_at_index.
+    '''
+    return array[np.minimum(np.arange(size), len(array) - 1)]
 
 
 def add_track(kml, track_name, lat, lon, colour, alt_param=None, alt_mode=None,
               visible=True):
     '''
-    alt_mode such as simplekml.constants.AltitudeMode.clamptoground
-    '''
-    track_config = {'visibility': 1 if visible else 0}
-    if alt_param:
-        track_config['altitudemode'] = alt_mode
-        track_config['extrude'] = 1
-
-    tracks = []
-    track_coords = []
-    count = 0
-    ##scope_lon = np.ma.flatnotmasked_edges(lon.array)
-    ##scope_lat = np.ma.flatnotmasked_edges(lat.array)
-    ##begin = max(scope_lon[0], scope_lat[0])+1
-    ##end = min(scope_lon[1], scope_lat[1])-1
-    for i in range(0, len(lon.array)):
-        _lon = value_at_index(lon.array, i)
-        _lat = value_at_index(lat.array, i)
-        if alt_param:
-            _alt = value_at_index(alt_param.array, i)
-            coords = (_lon, _lat, _alt)
-        else:
-            coords = (_lon, _lat)
+    Add a track of each sample of lon where the latitude, longitude and
+    altitude are valid and non-zero.
 
-        if not all(coords) or any(np.isnan(coords)):
-            continue
-        track_coords.append(coords)
-        count += 1
-        # Split up tracks because Google Earth cannot extrude long LineStrings.
-        if count >= 4000:
-            tracks.append(track_coords)
-            track_coords = []
-            count = 0
-    if track_coords:
-        tracks.append(track_coords)
-
-    for index, track_coords in enumerate(tracks, start=1):
-        track_config = track_config.copy()
-        track_config['name'] = '%s (%d)' % (track_name, index)
-        track_config['coords'] = track_coords
-        line = kml.newlinestring(**track_config)
-        line.style.linestyle.color = colour
-        line.style.polystyle.color = '66%s' % colour[2:] # set opacity of area fill to 40%
-    return
+    :type kml: KMLWriter
+    :param alt_mode: KML altitude mode such as ALTITUDE_MODE_ABSOLUTE.
+    :type alt_mode: str
+    '''
+    size = len(lon.array)
+    if not size or not len(lat.array):
+        return
+    columns = [lon.array, _gather(lat.array, size)]
+    if alt_param is not None:
+        if not len(alt_param.array):
+            return
+        columns.append(_gather(alt_param.array, size))
+    coords = np.ma.column_stack(columns)
+    data = np.ma.getdata(coords)
+    with np.errstate(invalid='ignore'):
+        valid = ~np.ma.getmaskarray(coords).any(axis=1) & np.all(data != 0, axis=1) & \
+            ~np.any(np.isnan(data), axis=1)
+    coords = data[valid]
+
+    # Split up tracks because Google Earth cannot extrude long LineStrings.
+    for index, start in enumerate(range(0, len(coords), KML_TRACK_LENGTH), start=1):
+        kml.linestring('%s (%d)' % (track_name, index),
+                       coords[start:start + KML_TRACK_LENGTH], colour=colour,
+                       altitude_mode=alt_mode if alt_param is not None else None,
+                       extrude=alt_param is not None, visible=visible)
 
 
 def draw_centreline(kml, rwy):
@@ -152,27 +227,32 @@ def draw_centreline(kml, rwy):
     except:
         angle = np.deg2rad(3.0)
     end_height = ut.convert(30000 * np.tan(angle), ut.METER, ut.FT)
-    track_config = {'name': 'ILS'}
-    track_coords = []
-    track_coords.append((end_lon,end_lat))
-    track_coords.append((lon_30k.data[0],lat_30k.data[0], end_height))
-    track_config['coords'] = track_coords
-    kml.newlinestring(**track_config)
+    track_coords = [(end_lon, end_lat, 0),
+                    (lon_30k.data[0], lat_30k.data[0], end_height)]
+    kml.linestring('ILS', track_coords)
     return
 
 
-def track_to_kml(hdf_path, kti_list, kpv_list, approach_list,
-                 plot_altitude=None, dest_path=None):
+def _filter_names(items, keep, skip):
     '''
-    Plot results of process_flight onto a KML track.
+    Items to display as markers by name, see KEEP_KTIS and SKIP_KTIS.
+    '''
+    if keep:
+        return [item for item in items if item.name in keep]
+    return [item for item in items if item.name not in skip]
 
-    :param flight_attrs: List of Flight Attributes
-    :type flight_attrs: list
-    :param plot_altitude: Name of Altitude parameter to use in KML
-    :type plot_altitude: String
+
+def _add_segment_to_kml(kml, hdf_path, kti_list, kpv_list, approach_list,
+                        plot_altitude=None, folder=None):
+    '''
+    Add the tracks, KTIs, KPVs and approaches of a segment.
+
+    :param folder: Name of a folder to add the segment within.
+    :type folder: str or None
+    :returns: Whether the segment had coordinate parameters to add.
+    :rtype: bool
     '''
     one_hz = Parameter()
-    kml = simplekml.Kml()
     with hdf_file(hdf_path) as hdf:
         # Latitude param, Longitude param, track name, colour
         coord_params = (
@@ -220,11 +300,14 @@ def track_to_kml(hdf_path, kti_list, kpv_list, approach_list,
             alt = None
 
         if plot_altitude in altitude_absolute_params:
-            altitude_mode = simplekml.constants.AltitudeMode.absolute
+            altitude_mode = ALTITUDE_MODE_ABSOLUTE
         elif plot_altitude in altitude_relative_params:
-            altitude_mode = simplekml.constants.AltitudeMode.relativetoground
+            altitude_mode = ALTITUDE_MODE_RELATIVE
         else:
-            altitude_mode = simplekml.constants.AltitudeMode.clamptoground
+            altitude_mode = ALTITUDE_MODE_CLAMP
+
+        if folder:
+            kml.start_folder(folder)
 
         ## Get best latitude and longitude parameters.
         best_lat = None
@@ -248,52 +331,45 @@ def track_to_kml(hdf_path, kti_list, kpv_list, approach_list,
                 best_lat = derived_param_from_hdf(lat).get_aligned(one_hz)
                 best_lon = derived_param_from_hdf(lon).get_aligned(one_hz)
 
-    # Add KTIs.
-    for kti in kti_list:
-        kti_point_values = {'name': kti.name}
-
-        if not KEEP_KTIS and kti.name in SKIP_KTIS:
-            continue
-        elif len(KEEP_KTIS)>0 and (kti.name not in KEEP_KTIS):
-            continue
+    def altitudes(items):
+        # Altitude of each item, masked where unavailable or zero.
+        if alt is None:
+            return np.ma.masked_all(len(items))
+        altitude = values_at_times(alt.array, alt.frequency, alt.offset,
+                                   [item.index for item in items])
+        return np.ma.masked_equal(altitude, 0)
 
-        altitude = alt.at(kti.index) if alt else None
-        kti_point_values['altitudemode'] = altitude_mode
-        if altitude:
-            kti_point_values['coords'] = ((kti.longitude, kti.latitude, altitude),)
+    # Add KTIs.
+    ktis = [kti for kti in _filter_names(kti_list, KEEP_KTIS, SKIP_KTIS)
+            if kti.latitude is not None and kti.longitude is not None]
+    for kti, altitude in zip(ktis, altitudes(ktis)):
+        if altitude is np.ma.masked:
+            coords = (kti.longitude, kti.latitude)
         else:
-            kti_point_values['coords'] = ((kti.longitude, kti.latitude),)
-        kml.newpoint(**kti_point_values)
+            coords = (kti.longitude, kti.latitude, altitude)
+        kml.point(kti.name, coords, altitude_mode=altitude_mode)
 
     # Add KPVs.
-    for kpv in kpv_list:
-
+    kpvs = _filter_names(kpv_list, KEEP_KPVS, SKIP_KPVS)
+    if kpvs:
+        indices = [kpv.index for kpv in kpvs]
+        kpv_lats = values_at_times(best_lat.array, best_lat.frequency, best_lat.offset, indices)
+        kpv_lons = values_at_times(best_lon.array, best_lon.frequency, best_lon.offset, indices)
         # Trap kpvs with invalid latitude or longitude data (normally happens
         # at the start of the data where accelerometer offsets are declared,
         # and this avoids casting kpvs into the Atlantic.
-        kpv_lat = best_lat.at(kpv.index)
-        kpv_lon = best_lon.at(kpv.index)
-        if kpv_lat is None or kpv_lon is None or \
-           (kpv_lat == 0.0 and kpv_lon == 0.0):
-            continue
-
-        if not KEEP_KPVS and kpv.name in SKIP_KPVS:
-            continue
-        elif len(KEEP_KPVS)>0 and (kpv.name not in KEEP_KPVS):
-            continue
-
-        style = simplekml.Style()
-        style.iconstyle.color = simplekml.Color.red
-        kpv_point_values = {'name': '%s (%.3f)' % (kpv.name, kpv.value)}
-        altitude = alt.at(kpv.index) if alt else None
-        kpv_point_values['altitudemode'] = altitude_mode
-        if altitude:
-            kpv_point_values['coords'] = ((kpv_lon, kpv_lat, altitude),)
-        else:
-            kpv_point_values['coords'] = ((kpv_lon, kpv_lat),)
-
-        pnt = kml.newpoint(**kpv_point_values)
-        pnt.style = style
+        valid = ~(np.ma.getmaskarray(kpv_lats) | np.ma.getmaskarray(kpv_lons)) & \
+            ~((np.ma.getdata(kpv_lats) == 0) & (np.ma.getdata(kpv_lons) == 0))
+        for kpv, kpv_lat, kpv_lon, altitude, kpv_valid in zip(
+                kpvs, kpv_lats.tolist(), kpv_lons.tolist(), altitudes(kpvs), valid):
+            if not kpv_valid:
+                continue
+            if altitude is np.ma.masked:
+                coords = (kpv_lon, kpv_lat)
+            else:
+                coords = (kpv_lon, kpv_lat, altitude)
+            kml.point('%s (%.3f)' % (kpv.name, kpv.value), coords,
+                      colour=KPV_COLOUR, altitude_mode=altitude_mode)
 
     # Add approach centre lines.
     for app in approach_list:
@@ -302,9 +378,56 @@ def track_to_kml(hdf_path, kti_list, kpv_list, approach_list,
         except:
             pass
 
+    if folder:
+        kml.end_folder()
+    return True
+
+
+def track_to_kml(hdf_path, kti_list, kpv_list, approach_list,
+                 plot_altitude=None, dest_path=None):
+    '''
+    Plot results of process_flight onto a KML track.
+
+    :param plot_altitude: Name of Altitude parameter to use in KML
+    :type plot_altitude: String
+    :param dest_path: Path of the KML file, defaults to hdf_path + '.kml'.
+    :type dest_path: str
+    :returns: dest_path or False if the HDF file has no coordinates.
+    '''
     if not dest_path:
         dest_path = hdf_path + ".kml"
-    kml.save(dest_path)
+    return segments_to_kml([(hdf_path, kti_list, kpv_list, approach_list)],
+                           dest_path, plot_altitude=plot_altitude, folders=False)
+
+
+def segments_to_kml(segments, dest_path, plot_altitude=None, folders=True):
+    '''
+    Plot results of process_flight for a batch of segments into a single KML
+    file, which is written as each segment is added.
+
+    :param segments: HDF path, KTIs, KPVs and approaches of each segment.
+    :type segments: iterable of (str, list, list, list)
+    :param dest_path: Path of the KML file.
+    :type dest_path: str
+    :param plot_altitude: Name of Altitude parameter to use in KML
+    :type plot_altitude: String
+    :param folders: Whether to add each segment within a folder named after
+        its HDF file.
+    :type folders: bool
+    :returns: dest_path or False if no segment has coordinates.
+    '''
+    added = False
+    with open(dest_path, 'w') as dest:
+        kml = KMLWriter(dest)
+        for hdf_path, kti_list, kpv_list, approach_list in segments:
+            folder = os.path.basename(hdf_path) if folders else None
+            added |= _add_segment_to_kml(kml, hdf_path, kti_list, kpv_list,
+                                         approach_list, plot_altitude=plot_altitude,
+                                         folder=folder)
+        kml.close()
+    if not added:
+        os.remove(dest_path)
+        return False
     return dest_path
 
 
@@ -477,41 +600,108 @@ def _index_or_slice(x):
         return x.slice.start
 
 
-def csv_flight_details(hdf_path, kti_list, kpv_list, phase_list,
-                       dest_path=None, append_to_file=True):
-    """
-    Currently writes to csv and prints to a table.
+def _masked_column(values):
+    '''
+    Masked float array of values, masking None.
+    '''
+    return np.ma.array([0.0 if v is None else v for v in values],
+                       mask=[v is None for v in values], dtype=float)
 
-    Phase types have a 'duration' column
 
-    :param dest_path: Outputs CSV to dest_path (removing if exists). If None,
-      collates results by appending to a single file: 'combined_test_output.csv'
-    """
+def _format_column(values, fmt='%s'):
+    '''
+    Format each value of a column at once. Masked and None values are left
+    empty while NaN and infinite values are written as 'nan' and 'inf'.
+
+    :type values: np.ma.MaskedArray or list
+    :param fmt: Format string of each value.
+    :type fmt: str
+    :rtype: np.ndarray of objects
+    '''
+    if isinstance(values, np.ma.MaskedArray):
+        data = values.filled(0)
+        invalid = ~np.isfinite(data)
+        formatted = np.char.mod(fmt, np.where(invalid, 0, data)).astype(object)
+        formatted[invalid] = data[invalid].astype(str)
+        formatted[np.ma.getmaskarray(values)] = ''
+        return formatted
+    return np.array(['' if v is None else fmt % (v,) for v in values],
+                    dtype=object)
+
+
+def flight_details_columns(hdf, hdf_path, kti_list, kpv_list, phase_list,
+                           params=CSV_PARAMETERS):
+    '''
+    Columns of the flight details CSV of a segment, sorted by index.
+
+    KTIs, KPVs and the start and end of each phase are a row each. The values
+    of params at the index of every row are interpolated at once.
+
+    :param hdf: Open HDF file of the segment.
+    :type hdf: hdf_file
+    :param params: Names of parameters to add the values of.
+    :type params: [str]
+    :returns: Column values by name.
+    :rtype: dict
+    '''
+    # each phase has a row at its start and another at its end
+    phase_rows = [(p, edge) for p in phase_list for edge in ('START', 'END')]
+    columns = {
+        'path': [hdf_path] * (len(kti_list) + len(kpv_list) + len(phase_rows)),
+        'type': ['Key Time Instance'] * len(kti_list) +
+                ['Key Point Value'] * len(kpv_list) +
+                ['Phase'] * len(phase_rows),
+        'name': [v.name for v in itertools.chain(kti_list, kpv_list)] +
+                ['%s [%s]' % (p.name, edge) for p, edge in phase_rows],
+        'index': [v.index for v in itertools.chain(kti_list, kpv_list)] +
+                 [p.start_edge if edge == 'START' else p.stop_edge for p, edge in phase_rows],
+        'duration': [None] * (len(kti_list) + len(kpv_list)) +
+                    [p.stop_edge - p.start_edge for p, edge in phase_rows],  # (secs)
+        'value': [None] * len(kti_list) + [v.value for v in kpv_list] +
+                 [None] * len(phase_rows),
+    }
+    for attr in ('datetime', 'latitude', 'longitude'):
+        columns[attr] = [getattr(v, attr) for v in itertools.chain(kti_list, kpv_list)] + \
+            [None] * len(phase_rows)
+    for name in ('index', 'duration', 'value', 'latitude', 'longitude'):
+        columns[name] = _masked_column(columns[name])
+
+    # Append values of useful parameters at these times
+    for param in params:
+        if param not in hdf:
+            continue
+        p = hdf[param]
+        columns[param] = values_at_times(p.array, p.frequency, p.offset, columns['index'].data)
+
+    # sort rows, keeping the order of rows with the same index
+    order = np.argsort(columns['index'].data, kind='mergesort')
+    for name, values in columns.items():
+        if not isinstance(values, np.ma.MaskedArray):
+            values = np.array(values, dtype=object)
+        columns[name] = values[order]
+    return columns
+
+
+def _flight_details_rows(hdf_path, kti_list, kpv_list, phase_list, columns):
+    '''
+    Rows of the flight details of a segment as dicts, sorted by index.
+
+    :param columns: Columns of the segment from flight_details_columns.
+    :type columns: dict
+    :rtype: [dict]
+    '''
     rows = []
-    params = ['Airspeed', 'Altitude AAL']
-    attrs = ['value', 'datetime', 'latitude', 'longitude']
-    header = ['path', 'type', 'index', 'duration', 'name'] + attrs + params
-    if not dest_path:
-        header.append('Path')
-    formats = {'index': '%.3f',
-               'value': '%.3f',
-               'duration': '%.2f',
-               'latitude': '%.4f',
-               'longitude': '%.4f',
-               'Airspeed': '%d kts',
-               'Altitude AAL': '%d ft',
-               }
     for value in kti_list:
         vals = value._asdict()  # recordtype
         vals['path'] = hdf_path
         vals['type'] = 'Key Time Instance'
-        rows.append( vals )
+        rows.append(vals)
 
     for value in kpv_list:
         vals = value._asdict()  # recordtype
         vals['path'] = hdf_path
         vals['type'] = 'Key Point Value'
-        rows.append( vals )
+        rows.append(vals)
 
     for value in phase_list:
         vals = value._asdict()  # namedtuple
@@ -522,25 +712,31 @@ def csv_flight_details(hdf_path, kti_list, kpv_list, phase_list,
         vals['duration'] = value.stop_edge - value.start_edge  # (secs)
         rows.append(vals)
         # create another at the stop of the phase
-        end = copy(vals)
+        end = dict(vals)
         end['name'] = value.name + ' [END]'
         end['index'] = value.stop_edge
         rows.append(end)
 
-    # Append values of useful parameters at this time
-    with hdf_file(hdf_path) as hdf:
-        for param in params:
-            # Create DerivedParameterNode to utilise the .at() method
-            if param not in hdf:
-                continue
-            p = hdf[param]
-            dp = Parameter(name=p.name, array=p.array,
-                           frequency=p.frequency, offset=p.offset)
-            for row in rows:
-                row[param] = dp.at(row['index'])
-
-    # sort rows
+    # sort rows in the same order as the columns
     rows = sorted(rows, key=lambda x: x['index'])
+    for param in CSV_PARAMETERS:
+        if param in columns:
+            for row, value in zip(rows, columns[param].tolist()):
+                row[param] = value
+    return rows
+
+
+def _write_csv_details(segments, dest_path=None, append_to_file=True):
+    '''
+    Write the rows of each segment to csv once it has been read, yielding the
+    columns of each segment after they are written.
+
+    :type segments: iterable of (str, list, list, list)
+    :rtype: generator of dict
+    '''
+    header = ['path', 'type', 'index', 'duration', 'name'] + CSV_ATTRIBUTES + CSV_PARAMETERS
+    if not dest_path:
+        header.append('Path')
 
     skip_header = False
 
@@ -557,14 +753,56 @@ def csv_flight_details(hdf_path, kti_list, kpv_list, phase_list,
             skip_header = True
 
     with open(dest_path, 'a') as dest:
-        writer = TypedWriter(dest, fieldnames=header, fieldformats=formats,
-                             skip_header=skip_header, extrasaction='ignore')
-        writer.writerows(rows)
-        # print to Debug I/O
-        logger.debug(indent([header] + writer.rowlist(rows), hasHeader=True, wrapfunc=lambda x:str(x)))
+        writer = csv.writer(dest)
+        if not skip_header:
+            writer.writerow(header)
+        for hdf_path, kti_list, kpv_list, phase_list in segments:
+            with hdf_file(hdf_path) as hdf:
+                columns = flight_details_columns(hdf, hdf_path, kti_list,
+                                                 kpv_list, phase_list)
+            size = len(columns['index'])
+            formatted = [_format_column(columns[name], CSV_FORMATS.get(name, '%s'))
+                         if name in columns else [''] * size for name in header]
+            writer.writerows(zip(*formatted))
+            logger.debug("Wrote %d rows of '%s' to csv.", size, hdf_path)
+            yield columns
+
+
+def csv_flight_details(hdf_path, kti_list, kpv_list, phase_list,
+                       dest_path=None, append_to_file=True):
+    """
+    Writes KTIs, KPVs and phases to csv.
+
+    Phase types have a 'duration' column
+
+    :param dest_path: Outputs CSV to dest_path (removing if exists). If None,
+      collates results by appending to a single file: 'combined_test_output.csv'
+    :returns: Rows written, sorted by index.
+    :rtype: [dict]
+    """
+    rows = []
+    for columns in _write_csv_details([(hdf_path, kti_list, kpv_list, phase_list)],
+                                      dest_path=dest_path, append_to_file=append_to_file):
+        rows = _flight_details_rows(hdf_path, kti_list, kpv_list, phase_list, columns)
     return rows
 
 
+def csv_segments_details(segments, dest_path=None, append_to_file=True):
+    """
+    Writes KTIs, KPVs and phases of a batch of segments to a single csv. The
+    rows of each segment are written once it has been read, rather than
+    holding every row in memory.
+
+    :param segments: HDF path, KTIs, KPVs and phases of each segment.
+    :type segments: iterable of (str, list, list, list)
+    :param dest_path: Outputs CSV to dest_path (removing if exists). If None,
+      collates results by appending to a single file: 'combined_test_output.csv'
+    :returns: Number of rows written.
+    :rtype: int
+    """
+    return sum(len(columns['index']) for columns in
+               _write_csv_details(segments, dest_path=dest_path,
+                                  append_to_file=append_to_file))
 
 
 if __name__ == '__main__':
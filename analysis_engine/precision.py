@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+# vim:et:ft=python:nowrap:sts=4:sw=4:ts=4
+##############################################################################
+
+'''
+Flight Data Analyzer: Compute Precision
+
+Derived parameters are computed in float32 when settings.COMPUTE_DTYPE is
+'float32', apart from the precision sensitive settings.FLOAT64_PARAMETERS
+which are computed from float64 dependencies. Multistates and other
+non-floating point arrays are unchanged.
+
+The KPVs of a flight computed in float32 can be compared with those computed
+in float64:
+
+python -m analysis_engine.precision flight.hdf5 G-ABCD
+'''
+
+##############################################################################
+# Imports
+
+
+from __future__ import print_function
+
+import argparse
+import copy
+import fnmatch
+import logging
+import numpy as np
+import os
+import shutil
+import tempfile
+
+from hdfaccess.parameter import MappedArray
+
+from analysis_engine import settings
+
+
+##############################################################################
+# Globals
+
+
+logger = logging.getLogger(name=__name__)
+
+
+##############################################################################
+# Functions
+
+
+def is_float64_parameter(name):
+    '''
+    :param name: Name of the derived parameter.
+    :type name: str
+    :returns: Whether the parameter matches settings.FLOAT64_PARAMETERS, so
+        is neither computed nor stored in float32.
+    :rtype: bool
+    '''
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in settings.FLOAT64_PARAMETERS)
+
+
+def compute_dtype(name):
+    '''
+    :param name: Name of the derived parameter.
+    :type name: str
+    :returns: Floating point data type to compute the parameter in, or None
+        to leave data types unchanged.
+    :rtype: type or None
+    '''
+    if settings.COMPUTE_DTYPE != 'float32':
+        return None
+    if is_float64_parameter(name):
+        return np.float64
+    return np.float32
+
+
+def aligned_dtype(dtype):
+    '''
+    :param dtype: Data type of an array which is aligned.
+    :type dtype: np.dtype
+    :returns: Data type of the aligned array. float32 arrays remain float32
+        when computing in float32, otherwise aligned arrays are float64.
+    :rtype: type
+    '''
+    if settings.COMPUTE_DTYPE == 'float32' and dtype == np.float32:
+        return np.float32
+    return np.float64
+
+
+def cast_array(array, dtype):
+    '''
+    :param array: Array of a parameter.
+    :type array: np.ma.MaskedArray
+    :param dtype: Floating point data type.
+    :type dtype: type
+    :returns: The array if it is not a floating point array or is of the
+        data type, otherwise a copy cast to the data type.
+    :rtype: np.ma.MaskedArray
+    '''
+    if isinstance(array, MappedArray) or not isinstance(array, np.ma.MaskedArray) \
+       or array.dtype.kind != 'f' or array.dtype == dtype:
+        return array
+    return array.astype(dtype)
+
+
+def cast_param(param, dtype):
+    '''
+    :param param: Dependency of a derived parameter.
+    :type param: Node or None
+    :param dtype: Floating point data type.
+    :type dtype: type
+    :returns: The parameter, or a copy with its array cast to the data type
+        so that parameters shared between nodes are not modified.
+    :rtype: Node or None
+    '''
+    array = getattr(param, 'array', None)
+    if array is None:
+        return param
+    cast = cast_array(array, dtype)
+    if cast is array:
+        return param
+    param = copy.copy(param)
+    param.array = cast
+    return param
+
+
+def compare_kpvs(reference, candidate):
+    '''
+    The differences between KPVs computed in float64 and float32.
+
+    :param reference: KPVs computed in float64 by name, as returned by
+        process_flight.
+    :type reference: {str: [KeyPointValue]}
+    :param candidate: KPVs computed in float32 by name.
+    :type candidate: {str: [KeyPointValue]}
+    :returns: Name, reference KPV, candidate KPV and absolute difference of
+        value, largest difference first. KPVs only created by one of the
+        computations are paired with None and have an infinite difference.
+    :rtype: [(str, KeyPointValue or None, KeyPointValue or None, float)]
+    '''
+    deltas = []
+    for name in sorted(set(reference) | set(candidate)):
+        reference_kpvs = reference.get(name, [])
+        candidate_kpvs = candidate.get(name, [])
+        for index in range(max(len(reference_kpvs), len(candidate_kpvs))):
+            reference_kpv = reference_kpvs[index] if index < len(reference_kpvs) else None
+            candidate_kpv = candidate_kpvs[index] if index < len(candidate_kpvs) else None
+            if reference_kpv is None or candidate_kpv is None:
+                delta = float('inf')
+            else:
+                delta = abs(float(candidate_kpv.value) - float(reference_kpv.value))
+            deltas.append((name, reference_kpv, candidate_kpv, delta))
+    deltas.sort(key=lambda d: -d[3])
+    return deltas
+
+
+def validate_precision(hdf_path, tail_number, **kwargs):
+    '''
+    Process copies of a flight in float64 and float32 and compare their KPVs.
+
+    Downcast policies are disabled while processing, so that derived
+    parameters read back from the HDF file are not downcast and the float64
+    computation is the reference.
+
+    :param hdf_path: Path of the HDF file of the segment.
+    :type hdf_path: str
+    :param tail_number: Tail number of the aircraft.
+    :type tail_number: str
+    :param kwargs: Keyword arguments of process_flight.
+    :returns: See compare_kpvs.
+    :rtype: [(str, KeyPointValue or None, KeyPointValue or None, float)]
+    '''
+    from analysis_engine.process_flight import process_flight
+
+    kwargs.setdefault('reprocess', True)
+    compute_dtype_setting = settings.COMPUTE_DTYPE
+    downcast_policies_setting = settings.DOWNCAST_POLICIES
+    settings.DOWNCAST_POLICIES = []
+    temp_dir = tempfile.mkdtemp()
+    kpvs = {}
+    try:
+        for dtype in ('float64', 'float32'):
+            path = os.path.join(temp_dir, '%s.hdf5' % dtype)
+            shutil.copy(hdf_path, path)
+            settings.COMPUTE_DTYPE = dtype
+            res = process_flight({'File': path}, tail_number, **kwargs)
+            kpvs[dtype] = res['kpv']
+    finally:
+        settings.COMPUTE_DTYPE = compute_dtype_setting
+        settings.DOWNCAST_POLICIES = downcast_policies_setting
+        shutil.rmtree(temp_dir)
+    return compare_kpvs(kpvs['float64'], kpvs['float32'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare the KPVs of a flight computed in float32 with float64.')
+    parser.add_argument('file', help='Path of the HDF file of the segment.')
+    parser.add_argument('tail_number', help='Tail number of the aircraft.')
+    parser.add_argument('-t', '--tolerance', type=float, default=0.0,
+                        help='Only report differences greater than the tolerance.')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    deltas = validate_precision(args.file, args.tail_number)
+    for name, reference_kpv, candidate_kpv, delta in deltas:
+        if delta <= args.tolerance:
+            continue
+        print('%s: float64 %s float32 %s difference %s' % (
+            name,
+            None if reference_kpv is None else reference_kpv.value,
+            None if candidate_kpv is None else candidate_kpv.value,
+            delta))
+    print('%d of %d KPVs differ by more than %s.' % (
+        len([d for d in deltas if d[3] > args.tolerance]), len(deltas), args.tolerance))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,24 +1,27 @@
 from __future__ import print_function
 
 import argparse
+import copy
 import itertools
 import logging
+import numpy as np
 import os
 import simplejson as json
 import six
 import sys
 
-from datetime import datetime, timedelta
-from networkx.readwrite import json_graph
+from datetime import datetime
 
 from flightdatautilities.filesystem_tools import copy_file
 
 from hdfaccess.file import hdf_file
 
 from analysis_engine import hooks, settings, __version__
-from analysis_engine.dependency_graph import dependency_order
+from analysis_engine.dependency_graph import dependency_order, transient_parameters
+from analysis_engine.dependency_tree_store import store_dependency_tree
+from analysis_engine.hdf_writer import WriteBehindHDF
 from analysis_engine.json_tools import json_to_process_flight, process_flight_to_nodes
-from analysis_engine.library import np_ma_masked_zeros, repair_mask
+from analysis_engine.library import np_ma_masked_zeros, repair_mask, values_at_times
 from analysis_engine.node import (ApproachNode, Attribute,
                                   derived_param_from_hdf,
                                   DerivedParameterNode,
@@ -27,23 +30,33 @@ from analysis_engine.node import (ApproachNode, Attribute,
                                   KeyTimeInstanceNode,
                                   NodeManager, P, Section, SectionNode,
                                   NODE_SUBCLASSES)
+from analysis_engine.node_registry import get_node_registry
 from analysis_engine.settings import NODE_CACHE
-from analysis_engine.utils import get_aircraft_info, get_derived_nodes
+from analysis_engine.downcast import downcast_param
+from analysis_engine.utils import get_aircraft_info
 
 
 logger = logging.getLogger(__name__)
 
 
 
-def geo_locate(hdf, items):
+def get_geo_positions(hdf):
     '''
-    Translate KeyTimeInstance into GeoKeyTimeInstance namedtuples
+    Prepare the repaired 'Latitude Smoothed' and 'Longitude Smoothed'
+    parameters used to geo-locate KTIs and KPVs.
+
+    The result can be passed to geo_locate for each collection of items so
+    that the arrays are only read and repaired once.
+
+    :returns: Latitude and longitude parameters or (None, None) if they are
+        not available.
+    :rtype: (DerivedParameterNode, DerivedParameterNode)
     '''
     if 'Latitude Smoothed' not in hdf.valid_param_names() \
        or 'Longitude Smoothed' not in hdf.valid_param_names():
         logger.warning("Could not geo-locate as either 'Latitude Smoothed' or "
                        "'Longitude Smoothed' were not found within the hdf.")
-        return items
+        return None, None
 
     lat_hdf = hdf['Latitude Smoothed']
     lon_hdf = hdf['Longitude Smoothed']
@@ -51,7 +64,7 @@ def geo_locate(hdf, items):
     if (not lat_hdf.array.count()) or (not lon_hdf.array.count()):
         logger.warning("Could not geo-locate as either 'Latitude Smoothed' or "
                        "'Longitude Smoothed' have no unmasked values.")
-        return items
+        return None, None
 
     lat_pos = derived_param_from_hdf(lat_hdf)
     lon_pos = derived_param_from_hdf(lon_hdf)
@@ -62,10 +75,33 @@ def geo_locate(hdf, items):
     # extrapolate=True we achieve this goal.
     lat_pos.array = repair_mask(lat_pos.array, repair_duration=None, extrapolate=True)
     lon_pos.array = repair_mask(lon_pos.array, repair_duration=None, extrapolate=True)
+    return lat_pos, lon_pos
+
+
+def geo_locate(hdf, items, positions=None):
+    '''
+    Translate KeyTimeInstance into GeoKeyTimeInstance namedtuples
+
+    The positions of all items are interpolated at once.
+
+    :param positions: Latitude and longitude parameters from
+        get_geo_positions. Prepared from the hdf if not provided.
+    :type positions: (DerivedParameterNode, DerivedParameterNode)
+    '''
+    lat_pos, lon_pos = positions or get_geo_positions(hdf)
+    if lat_pos is None or lon_pos is None:
+        return items
 
-    for item in itertools.chain.from_iterable(six.itervalues(items)):
-        item.latitude = lat_pos.at(item.index) or None
-        item.longitude = lon_pos.at(item.index) or None
+    item_list = list(itertools.chain.from_iterable(six.itervalues(items)))
+    if not item_list:
+        return items
+
+    secs = [item.index for item in item_list]
+    latitudes = values_at_times(lat_pos.array, lat_pos.frequency, lat_pos.offset, secs)
+    longitudes = values_at_times(lon_pos.array, lon_pos.frequency, lon_pos.offset, secs)
+    for item, latitude, longitude in zip(item_list, latitudes, longitudes):
+        item.latitude = None if latitude is np.ma.masked else latitude or None
+        item.longitude = None if longitude is np.ma.masked else longitude or None
     return items
 
 
@@ -73,13 +109,23 @@ def _timestamp(start_datetime, items):
     '''
     Adds item.datetime (from timedelta of item.index + start_datetime)
 
+    The offsets of all items are calculated at once, rounded to microseconds
+    as timedelta would be.
+
     :param start_datetime: Origin timestamp used as a base to the index
     :type start_datetime: datetime
     :param item_list: list of objects with a .index attribute
     :type item_list: list
     '''
-    for item in itertools.chain.from_iterable(six.itervalues(items)):
-        item.datetime = start_datetime + timedelta(seconds=float(item.index))
+    item_list = list(itertools.chain.from_iterable(six.itervalues(items)))
+    if not item_list:
+        return items
+
+    fractions, seconds = np.modf(np.array([item.index for item in item_list], dtype=float))
+    microseconds = seconds.astype(np.int64) * 1000000 + np.round(fractions * 1e6).astype(np.int64)
+    offsets = microseconds.astype('timedelta64[us]').astype(object)
+    for item, offset in zip(item_list, offsets):
+        item.datetime = start_datetime + offset
     return items
 
 
@@ -100,11 +146,23 @@ def serialise_datetime(value):
     raise TypeError("Cannot serialise type: %s" % type(value))
 
 
-def derive_parameters(hdf, node_mgr, process_order, params=None, force=False):
+def derive_parameters(hdf, node_mgr, process_order, params=None, force=False,
+                      transient=None):
     '''
     Derives parameters in process_order. Dependencies are sourced via the
     node_mgr.
 
+    Transient parameters are not written to the HDF file. They are kept in
+    memory until each of the nodes consuming them has been derived.
+
+    If settings.HDF_WRITE_BEHIND is enabled, derived parameters are written
+    to the HDF file in the background while the following nodes are derived.
+    Every parameter has been written when this function returns and errors
+    raised while writing are raised here.
+
+    Derived parameters are downcast to the data type of their downcast
+    policy, see analysis_engine.downcast.
+
     :param hdf: Data file accessor used to get and save parameter data and
         attributes
     :type hdf: hdf_file
@@ -113,9 +171,32 @@ def derive_parameters(hdf, node_mgr, process_order, params=None, force=False):
     :param process_order: Parameter / Node class names in the required order to
         be processed
     :type process_order: list of strings
+    :param transient: Names of the nodes consuming each transient parameter
+        by name, see dependency_graph.transient_parameters.
+    :type transient: dict or None
+    '''
+    if not settings.HDF_WRITE_BEHIND:
+        return _derive_parameters(hdf, node_mgr, process_order, params=params,
+                                  force=force, transient=transient)
+    with WriteBehindHDF(hdf) as writer:
+        return _derive_parameters(writer, node_mgr, process_order, params=params,
+                                  force=force, transient=transient)
+
+
+def _derive_parameters(hdf, node_mgr, process_order, params=None, force=False,
+                       transient=None):
+    '''
+    Derives parameters in process_order, see derive_parameters.
     '''
     if not params:
         params = {}
+    # transient parameters kept in memory and the number of nodes still to
+    # consume them
+    transient = transient or {}
+    transients = {}
+    consumers = {name: len(names) for name, names in transient.items()}
+    transient_derived = []
+    transient_bytes = 0
     # OPT: local lookup is faster than module-level (small).
     node_subclasses = NODE_SUBCLASSES
 
@@ -166,6 +247,11 @@ def derive_parameters(hdf, node_mgr, process_order, params=None, force=False):
                 deps.append(params[dep_name])
             elif node_mgr.get_attribute(dep_name) is not None:
                 deps.append(node_mgr.get_attribute(dep_name))
+            elif dep_name in transients:
+                # copy as nodes may modify the arrays of their dependencies
+                dp = copy.copy(transients[dep_name])
+                dp.array = dp.array.copy()
+                deps.append(derived_param_from_hdf(dp, cache=cache))
             elif dep_name in node_mgr.hdf_keys:
                 # LFL/Derived parameter
                 # all parameters (LFL or other) need get_aligned which is
@@ -179,6 +265,12 @@ def derive_parameters(hdf, node_mgr, process_order, params=None, force=False):
                 deps.append(dp)
             else:  # dependency not available
                 deps.append(None)
+        # release transient parameters once each of their consumers has them
+        for dep_name in set(node_deps):
+            if dep_name in transients and param_name in transient[dep_name]:
+                consumers[dep_name] -= 1
+                if not consumers[dep_name]:
+                    del transients[dep_name]
         if all([d is None for d in deps]):
             raise RuntimeError(
                 "No dependencies available - Nodes cannot "
@@ -302,9 +394,17 @@ def derive_parameters(hdf, node_mgr, process_order, params=None, force=False):
                                                        expected_length,
                                                        array_length))
 
-            hdf.set_param(node)
-            # Keep hdf_keys up to date.
-            node_mgr.hdf_keys.append(param_name)
+            if param_name in transient:
+                transients[param_name] = node
+                transient_derived.append(param_name)
+                # data and mask
+                transient_bytes += node.array.nbytes + node.array.size
+            else:
+                # Downcast before queueing so that parameters read before and
+                # after being written are the same.
+                hdf.set_param(downcast_param(node))
+                # Keep hdf_keys up to date.
+                node_mgr.hdf_keys.append(param_name)
         elif issubclass(node.node_type, ApproachNode):
             aligned_approach = node.get_aligned(P(frequency=1, offset=0))
             for approach in aligned_approach:
@@ -328,6 +428,10 @@ def derive_parameters(hdf, node_mgr, process_order, params=None, force=False):
         else:
             raise NotImplementedError("Unknown Type %s" % node.__class__)
         continue
+    if transient_derived:
+        logger.info("Did not write %d transient parameters to the HDF file, "
+                    "saving %d bytes before compression: %s", len(transient_derived),
+                    transient_bytes, sorted(transient_derived))
     return ktis, kpvs, sections, approaches, flight_attrs
 
 
@@ -357,7 +461,7 @@ def parse_analyser_profiles(analyser_profiles, filter_modules=None):
                 continue
             additional_modules.append(import_path)
             if is_required:
-                required_nodes.extend(get_derived_nodes([import_path]))
+                required_nodes.extend(get_node_registry([import_path]))
     return additional_modules, required_nodes
 
 
@@ -574,29 +678,8 @@ def process_flight(segment_info, tail_number, aircraft_info={}, achieved_flight_
             settings.NODE_HELICOPTER_MODULE_PATHS + additional_modules
     else:
         node_modules = settings.NODE_MODULES + additional_modules
-    # go through modules to get derived nodes
-    derived_nodes = get_derived_nodes(node_modules)
-
-    if segment_info['Segment Type'] == 'GROUND_ONLY':
-        # Owing to the huge increase in circular dependancies when building
-        # the process_order for GROUND_ONLY segments. Logging on clery workers
-        # run out of disk space and then stops. Processing time also increases.
-        # Instead of trying to resolve the processing order for all the nodes,
-        # GROUND_ONLY will be restricted to processing only what is required
-        # for certain events. This reduce the circlar dependencies from
-        # 17,860 to 908 (worst case frame) and reduces frames with circular
-        # dependency issues from 100 to 33
-        # TODO: Fix circular dependancies for GROUND_ONLY
-        requested = [
-            'Groundspeed During Rejected Takeoff Max',
-            #'Eng Torque During Taxi Max',
-            #'Takeoff Configuration Warning Duration',
-            #'Eng Gas Temp During Eng Start Max',
-            #'Eng Torque During Taxi Max',
-            #'Eng Eng Start To N1 At 60 Percent Duration',
-            #'Eng N1 During Taxi Max',
-            #'Eng N1 During Taxi Out Max',
-        ]
+    # go through modules to get derived nodes, which are imported when needed
+    derived_nodes = get_node_registry(node_modules)
 
     if requested:
         requested_subset = \
@@ -610,7 +693,7 @@ def process_flight(segment_info, tail_number, aircraft_info={}, achieved_flight_
     # include all flight attributes as requested
     if include_flight_attributes:
         requested_subset = list(set(
-            requested_subset + list(get_derived_nodes(
+            requested_subset + list(get_node_registry(
                 ['analysis_engine.flight_attribute']).keys())))
 
     initial = process_flight_to_nodes(initial)
@@ -643,6 +726,7 @@ def process_flight(segment_info, tail_number, aircraft_info={}, achieved_flight_
             segment_info, hdf.duration, param_names,
             requested_subset, required, derived_nodes, aircraft_info,
             achieved_flight_record)
+        transient = None
         if requested_only:
             # TODO: derive dependencies which are unavailable
             # XXX: maintain ordering of requested iterable
@@ -650,6 +734,10 @@ def process_flight(segment_info, tail_number, aircraft_info={}, achieved_flight_
         else:
             # calculate dependency tree
             process_order, gr_st = dependency_order(node_mgr, draw=False, dependency_tree_log=dependency_tree_log)
+            # intermediate parameters which need not be written
+            transient = transient_parameters(
+                gr_st, node_mgr, settings.TRANSIENT_PARAMETERS,
+                persisted=set(settings.PERSISTED_PARAMETERS).union(requested, required))
             if settings.CACHE_PARAMETER_MIN_USAGE:
                 # find params used more than CACHE_PARAMETER_MIN_USAGE
                 for node in gr_st.nodes():
@@ -663,14 +751,16 @@ def process_flight(segment_info, tail_number, aircraft_info={}, achieved_flight_
 
         # derive parameters
         ktis, kpvs, sections, approaches, flight_attrs = \
-            derive_parameters(hdf, node_mgr, process_order, params=initial, force=force)
+            derive_parameters(hdf, node_mgr, process_order, params=initial, force=force,
+                              transient=transient)
 
         # geo locate KTIs
-        ktis = geo_locate(hdf, ktis)
+        positions = get_geo_positions(hdf)
+        ktis = geo_locate(hdf, ktis, positions=positions)
         ktis = _timestamp(segment_info['Start Datetime'], ktis)
 
         # geo locate KPVs
-        kpvs = geo_locate(hdf, kpvs)
+        kpvs = geo_locate(hdf, kpvs, positions=positions)
         kpvs = _timestamp(segment_info['Start Datetime'], kpvs)
 
         if not requested_only:
@@ -678,7 +768,7 @@ def process_flight(segment_info, tail_number, aircraft_info={}, achieved_flight_
             hdf.analysis_version = __version__
 
             # Store dependency tree
-            hdf.dependency_tree = json.dumps(json_graph.node_link_data(gr_st))
+            store_dependency_tree(hdf, gr_st)
 
             # Store aircraft info
             hdf.set_attr('aircraft_info', json.dumps(aircraft_info))
@@ -703,7 +793,7 @@ def pre_process_parameters(hdf, segment_info, param_names, required,
     removing circular dependacies.
     '''
 
-    pre_processing_nodes = get_derived_nodes(settings.PRE_PROCESSING_MODULE_PATHS)
+    pre_processing_nodes = get_node_registry(settings.PRE_PROCESSING_MODULE_PATHS)
     requested = list(pre_processing_nodes.keys())
 
     node_mgr = NodeManager(
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+# vim:et:ft=python:nowrap:sts=4:sw=4:ts=4
+##############################################################################
+
+'''
+Flight Data Analyzer: Rolling Window
+
+Sliding window reductions whose cost does not depend on the window size.
+
+Window results are returned for "valid" windows only, i.e. an array of n
+samples reduced over a window of w samples returns n - w + 1 values where
+value i covers array[i:i + w].
+'''
+
+##############################################################################
+# Imports
+
+
+import numpy as np
+
+
+##############################################################################
+# Functions
+
+
+def _sliding_accumulate(array, window, ufunc):
+    '''
+    Sliding window reduction using the van Herk/Gil-Werman algorithm.
+
+    The array is split into blocks of the window size. Each window spans the
+    end of one block and the start of the next, so its reduction is the
+    combination of a suffix accumulation of the first block and a prefix
+    accumulation of the second. Only three operations per sample are
+    required regardless of the window size.
+
+    :param array: Data to reduce. Masks are ignored.
+    :type array: np.array or np.ma.array
+    :param window: Number of samples in each window.
+    :type window: int
+    :param ufunc: Associative and idempotent binary ufunc, e.g. np.maximum.
+    :type ufunc: np.ufunc
+    :rtype: np.array
+    '''
+    data = np.ma.getdata(array)
+    window = int(window)
+    if window < 1:
+        raise ValueError('Window must be at least one sample, got %s.' % window)
+    size = len(data)
+    if size < window:
+        return data[:0].copy()
+    if window == 1:
+        return data.copy()
+
+    blocks = -(-size // window)
+    # Padding is never part of a valid window as no block extends beyond the
+    # last valid window's stop.
+    padded = np.empty(blocks * window, dtype=data.dtype)
+    padded[:size] = data
+    padded[size:] = data[-1]
+    padded = padded.reshape(blocks, window)
+
+    prefix = ufunc.accumulate(padded, axis=1).ravel()
+    suffix = ufunc.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+    return ufunc(suffix[:size - window + 1], prefix[window - 1:size])
+
+
+def sliding_max(array, window):
+    '''
+    Maximum of each window of samples. NaN values propagate to the windows
+    which contain them, as with np.max.
+
+    e.g. sliding_max([1, 3, 2, 0, 1], 3) -> [3, 3, 2]
+
+    :param array: Data to reduce. Masks are ignored.
+    :type array: np.array or np.ma.array
+    :param window: Number of samples in each window.
+    :type window: int
+    :rtype: np.array
+    '''
+    return _sliding_accumulate(array, window, np.maximum)
+
+
+def sliding_min(array, window):
+    '''
+    Minimum of each window of samples. NaN values propagate to the windows
+    which contain them, as with np.min.
+
+    e.g. sliding_min([1, 3, 2, 0, 1], 3) -> [1, 0, 0]
+
+    :param array: Data to reduce. Masks are ignored.
+    :type array: np.array or np.ma.array
+    :param window: Number of samples in each window.
+    :type window: int
+    :rtype: np.array
+    '''
+    return _sliding_accumulate(array, window, np.minimum)
+
+
+def sliding_sum(array, window):
+    '''
+    Sum of the unmasked samples within each window.
+
+    :param array: Data to sum.
+    :type array: np.array or np.ma.array
+    :param window: Number of samples in each window.
+    :type window: int
+    :rtype: np.array
+    '''
+    window = int(window)
+    if window < 1:
+        raise ValueError('Window must be at least one sample, got %s.' % window)
+    data = np.ma.filled(array, 0)
+    if len(data) < window:
+        return data[:0].copy()
+    cumulative = np.concatenate(([0], np.cumsum(data)))
+    return cumulative[window:] - cumulative[:-window]
+
+
+def sliding_mean(array, window):
+    '''
+    Mean of the unmasked samples within each window. Windows without any
+    unmasked samples are masked.
+
+    e.g. sliding_mean(np.ma.array([1, 2, 3, 4], mask=[0, 0, 1, 0]), 2) -> [1.5, 2, 4]
+
+    :param array: Data to average.
+    :type array: np.array or np.ma.array
+    :param window: Number of samples in each window.
+    :type window: int
+    :rtype: np.ma.array
+    '''
+    totals = sliding_sum(np.ma.asarray(array, dtype=float), window)
+    counts = sliding_sum(~np.ma.getmaskarray(array), window)
+    return np.ma.array(totals / np.maximum(counts, 1), mask=counts == 0)
+
+
+def running_differences(initial, added, subtracted):
+    '''
+    Running total which starts from initial and then for each step adds one
+    value and subtracts another, e.g. the sum of a window moving along an
+    array.
+
+    The arithmetic is performed in the same order as the equivalent loop so
+    that floating point results, and therefore comparisons between totals,
+    are identical:
+
+    total = initial
+    for a, s in zip(added, subtracted):
+        total += a
+        total -= s
+
+    :param initial: Starting total.
+    :type initial: int or float
+    :param added: Values added at each step.
+    :type added: np.array
+    :param subtracted: Values subtracted at each step, same length as added.
+    :type subtracted: np.array
+    :returns: Totals before the first step and after each step.
+    :rtype: np.array
+    '''
+    added = np.asarray(added)
+    subtracted = np.asarray(subtracted)
+    dtype = np.result_type(initial, added, subtracted)
+    steps = np.empty(2 * len(added) + 1, dtype=dtype)
+    steps[0] = initial
+    steps[1::2] = added
+    steps[2::2] = subtracted
+    steps[2::2] *= -1
+    return np.cumsum(steps, dtype=dtype)[::2]
+
+
+def clamp_scan(lower, upper, length=None):
+    '''
+    Running composition of clamps, where value i of the result is
+
+    value = min(max(value, lower[i]), upper[i])
+
+    applied to the value from the previous position. A clamp with equal
+    lower and upper limits sets the value regardless of the previous value,
+    so the first position must be such a constant for the result to be
+    defined.
+
+    Clamps compose into clamps, so the running composition is calculated
+    with a parallel prefix scan which doubles the span of each composition
+    per pass, rather than a loop over every sample. Only minimum and maximum
+    operations are used so results are exact.
+
+    :param lower: Lower limit of each clamp. Modified in place.
+    :type lower: np.array
+    :param upper: Upper limit of each clamp. Modified in place.
+    :type upper: np.array
+    :param length: Longest run of clamps before a constant, if known. The
+        scan stops once compositions span this many positions.
+    :type length: int or None
+    :returns: Clamped value at each position.
+    :rtype: np.array
+    '''
+    length = len(lower) if length is None else length
+    span = 1
+    while span < length:
+        # Compose the clamp ending span positions earlier with each clamp.
+        current_lower = lower[span:]
+        current_upper = upper[span:]
+        composed_lower = np.minimum(np.maximum(lower[:-span], current_lower), current_upper)
+        composed_upper = np.minimum(np.maximum(upper[:-span], current_lower), current_upper)
+        lower[span:] = composed_lower
+        upper[span:] = composed_upper
+        span *= 2
+    return lower
+
+
+def maintained_values(array, samples):
+    '''
+    Values maintained for a number of samples, shorter excursions are
+    excluded. Each value is the previous value clipped between the minimum
+    and maximum of the window of samples + 1 starting at the value.
+
+    Windows may not include masked values. Results are masked where there is
+    no complete window within an unmasked section of the array.
+
+    e.g. maintained_values([0, 1, 2, 3, 2, 1, 2, 3, 2, 2], 2) -> [0, 1, 2, 2, 2, 2, 2, 2, --, --]
+
+    :param array: Data to filter.
+    :type array: np.ma.array
+    :param samples: Number of samples a value must be maintained for.
+    :type samples: int
+    :returns: Float array of maintained values.
+    :rtype: np.ma.array
+    '''
+    size = len(array)
+    result = np.ma.array(data=np.zeros(size, dtype=float),
+                         mask=np.ones(size, dtype=bool))
+    if size < samples:
+        return result
+
+    data = np.ma.getdata(array)
+    lower = sliding_min(data, samples + 1)
+    upper = sliding_max(data, samples + 1)
+    if lower.dtype.kind == 'f':
+        # A window containing NaN does not limit the value.
+        lower[np.isnan(lower)] = -np.inf
+        upper[np.isnan(upper)] = np.inf
+
+    valid = np.zeros(len(lower), dtype=bool)
+    sections = []
+    longest = 0
+    for unmasked in np.ma.clump_unmasked(np.ma.asarray(array)):
+        start = unmasked.start
+        stop = unmasked.stop - samples
+        if stop > start:
+            valid[start:stop] = True
+            sections.append(slice(start, stop))
+            longest = max(longest, stop - start)
+    if not sections:
+        return result
+    starts = [section.start for section in sections]
+
+    # Each section starts from its first value clipped to the first window,
+    # and positions outside of the sections are constants which are ignored.
+    lower[~valid] = 0
+    upper[~valid] = 0
+    lower[starts] = upper[starts] = np.minimum(
+        np.maximum(data[starts], lower[starts]), upper[starts])
+    nan_sections = []
+    if lower.dtype.kind == 'f':
+        # A section starting with NaN is NaN throughout. Its start is scanned
+        # as a finite constant so that NaN does not carry into the following
+        # sections.
+        nan_sections = [s for s in sections if np.isnan(lower[s.start])]
+        for section in nan_sections:
+            lower[section.start] = upper[section.start] = 0
+    values = clamp_scan(lower, upper, length=longest)
+    for section in nan_sections:
+        values[section] = np.nan
+
+    indexes = np.flatnonzero(valid)
+    result.data[indexes] = values[indexes]
+    result.mask[indexes] = False
+    return result
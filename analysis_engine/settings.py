@@ -47,8 +47,30 @@ PRE_PROCESSING_MODULE_PATHS = [ # Cant end with _MODULES as will be added to NOD
     'analysis_engine.pre_processing.merge_parameters',
 ]
 
+# Directory of the prebuilt indexes of nodes within node modules, which are
+# rebuilt when the modules change. Node modules are only imported when a node
+# within them is needed. None builds the index within each process.
+NODE_REGISTRY_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'analysis_engine')
+
+# Directory shared by workers where the dependency tree of each flight is
+# stored once by hash, with the HDF file of the flight holding a reference to
+# it, see analysis_engine.dependency_tree_store. None stores the tree within
+# each HDF file.
+DEPENDENCY_TREE_STORE_DIR = None
+
 API_HTTP_HANDLER = 'analysis_engine.api_handler.HTTPHandler'
 API_HTTP_BASE_URL = None
+API_HTTP_TIMEOUT = 60
+
+# Caching HTTP API Handler, selected with
+# API_HANDLER = 'analysis_engine.api_handler.CachingHTTPHandler': responses are
+# held in memory and optionally in a directory shared between workers for
+# API_CACHE_TTL seconds. Nearest airport coordinates are rounded to
+# API_CACHE_COORDINATE_PRECISION decimal places.
+API_CACHE_SIZE = 10000
+API_CACHE_TTL = 3600
+API_CACHE_DIR = None
+API_CACHE_COORDINATE_PRECISION = 3
 
 API_FILE_HANDLER = 'analysis_engine.api_handler.FileHandler'
 API_FILE_PATHS = {
@@ -60,6 +82,13 @@ API_FILE_PATHS = {
 
 API_HANDLER = API_FILE_HANDLER
 
+# Radius in metres of the airports returned by the File API Handler's nearest
+# airport lookup. All airports are returned if None, as the takeoff airport
+# and approach lookups choose from every airport. Setting a radius is opt-in:
+# only then are the airports found with the spatial index rather than by
+# calculating the distance to every airport.
+AIRPORT_SEARCH_RADIUS = None
+
 # User's home directory, override in analyser_custom_settings.py
 WORKING_DIR = os.path.expanduser('~')
 
@@ -83,6 +112,23 @@ MINIMUM_FAST_DURATION = 60
 # value, a flight split can be made.
 MINIMUM_SPLIT_PARAM_VALUE = 0.175
 
+# Number of processes which write the segments of a file and calculate their
+# information. Segments are processed by the splitting process if 1 and by a
+# process for each CPU if None.
+SPLIT_SEGMENT_PROCESSES = None
+
+# Digest of segment fingerprints, i.e. the speed hash and the hash of segment
+# files which do not go fast, see analysis_engine.fingerprint. 'sha256' is
+# compatible with fingerprints of earlier versions, 'blake2b' and 'xxh64' are
+# faster. 'xxh64' is not cryptographic and requires the xxhash package.
+FINGERPRINT_ALGORITHM = 'sha256'
+
+# Size in bytes of the chunks of arrays and files which are hashed.
+FINGERPRINT_CHUNK_SIZE = 1024 * 1024
+
+# Number of file fingerprints cached by path, size and modification time.
+FINGERPRINT_CACHE_SIZE = 1000
+
 # Threshold for splitting based upon rate of turn. This threshold dictates
 # when the aircraft is not considered to be turning.
 HEADING_RATE_SPLITTING_THRESHOLD = 0.1
@@ -93,6 +139,41 @@ SPLIT_PARAMETERS = ('Eng (1) N1', 'Eng (2) N1', 'Eng (3) N1', 'Eng (4) N1',
                     'Eng (1) NP', 'Eng (2) NP', 'Eng (3) NP', 'Eng (4) NP')
 
 
+##############################################################################
+# Compute Precision
+
+
+# Floating point data type derived parameters are computed in, see
+# analysis_engine.precision. 'float32' halves the memory and bandwidth of
+# array operations: dependencies are cast to float32, float32 arrays remain
+# float32 when aligned and derived arrays are cast to float32, apart from the
+# FLOAT64_PARAMETERS. 'float64' leaves data types unchanged.
+COMPUTE_DTYPE = 'float64'
+
+# fnmatch patterns of derived parameters which lose accuracy in float32, i.e.
+# integrated, positional and smoothed parameters. They are computed from
+# float64 dependencies when COMPUTE_DTYPE is 'float32'.
+FLOAT64_PARAMETERS = [
+    # Positions
+    'Latitude*',
+    'Longitude*',
+    'Approach Range',
+    # Integrated
+    'Altitude STD',
+    'Climb For Flight Phases',
+    'Descend For Flight Phases',
+    'Distance*',
+    'Eng (*) Fuel Burn',
+    'Groundspeed Along Track',
+    'Vertical Speed Inertial',
+    # Smoothed
+    '*Smoothed',
+    'Altitude ADH',
+    'Altitude AGL',
+    'Heading Continuous',
+]
+
+
 ##############################################################################
 # Node Cache
 
@@ -106,6 +187,71 @@ NODE_CACHE = True
 NODE_CACHE_OFFSET_DP = None
 
 
+##############################################################################
+# HDF Writing
+
+
+# Derived parameters are written to the HDF file by a background thread while
+# the following nodes are derived.
+HDF_WRITE_BEHIND = True
+
+# Maximum number of derived parameters held in memory waiting to be written.
+HDF_WRITE_BEHIND_QUEUE_SIZE = 16
+
+# Derived parameters matching these fnmatch patterns which are only read by
+# other nodes are transient. They are kept in memory until every node which
+# depends upon them has been derived and are not written to the HDF file, so
+# they are unavailable when reprocessing requested nodes only. An empty list,
+# the default, writes every derived parameter, e.g.
+#
+# TRANSIENT_PARAMETERS = ['* For Flight Phases', '* Offset Removed']
+TRANSIENT_PARAMETERS = []
+
+# Derived parameters which are always written to the HDF file as they are
+# read after deriving nodes or by the exporters of plot_flight.
+PERSISTED_PARAMETERS = [
+    'Altitude AAL For Flight Phases',
+    'Latitude Smoothed',
+    'Longitude Smoothed',
+    'Vertical Speed For Flight Phases',
+]
+
+# Maximum absolute error of valid values introduced by downcasting a derived
+# parameter to a smaller floating point type, otherwise the data type is kept.
+DOWNCAST_TOLERANCE = 0.01
+
+# Downcast policies of derived parameters in order of precedence, see
+# analysis_engine.downcast.DowncastPolicy for the criteria and data type of
+# each. Parameters matching none of the policies are written unchanged, as
+# are floating point parameters matching FLOAT64_PARAMETERS.
+# Derived parameters are read back from the HDF file by the nodes which
+# depend upon them, so downcasting is opt-in, e.g.
+#
+# DOWNCAST_POLICIES = [
+#     # Multistates hold few states, so are stored as small integers.
+#     {'name': 'multistate', 'multistate': True, 'dtype': 'integer'},
+#     {'name': 'float32', 'dtype': 'float32'},
+# ]
+DOWNCAST_POLICIES = []
+
+
+##############################################################################
+# Ingest Pipeline
+
+
+# Number of worker processes of each stage of analysis_engine.pipeline. None
+# splits files in a process for every four CPUs, processes segments in a
+# process for each CPU and exports results in a single process.
+PIPELINE_SPLIT_WORKERS = None
+PIPELINE_PROCESS_WORKERS = None
+PIPELINE_EXPORT_WORKERS = None
+
+# Maximum number of items waiting for each stage, after which the previous
+# stage waits, e.g. files stop being split while segments wait to be
+# processed. None allows twice the number of workers of the stage.
+PIPELINE_QUEUE_SIZE = None
+
+
 ##############################################################################
 # Parameter Analysis
 
@@ -602,15 +748,23 @@ except ImportError as err:
 # KPV/KTI Name Values (#2)
 
 # Note: These must be created after the custom settings have been imported.
+# They are created when first accessed as the aircraft tables are slow to
+# import and only needed by the node modules.
+
+_NAME_VALUES_DETENTS = {
+    'NAME_VALUES_FLAP': ('flap', 'get_flap_detents'),
+    'NAME_VALUES_SLAT': ('slat', 'get_slat_detents'),
+    'NAME_VALUES_AILERON': ('aileron', 'get_aileron_detents'),
+    'NAME_VALUES_CONF': ('conf', 'get_conf_detents'),
+    'NAME_VALUES_LEVER': ('flap', 'get_lever_detents'),  # XXX: Key must be 'flap'
+}
 
-from flightdatautilities import aircrafttables as at
-
-NAME_VALUES_FLAP = {'flap': at.get_flap_detents()}
-
-NAME_VALUES_SLAT = {'slat': at.get_slat_detents()}
-
-NAME_VALUES_AILERON = {'aileron': at.get_aileron_detents()}
-
-NAME_VALUES_CONF = {'conf': at.get_conf_detents()}
 
-NAME_VALUES_LEVER = {'flap': at.get_lever_detents()}  # XXX: Key must be 'flap'
+def __getattr__(name):
+    try:
+        key, function_name = _NAME_VALUES_DETENTS[name]
+    except KeyError:
+        raise AttributeError("module '%s' has no attribute '%s'" % (__name__, name))
+    from flightdatautilities import aircrafttables as at
+    value = globals()[name] = {key: getattr(at, function_name)()}
+    return value
@@ -5,6 +5,7 @@ from __future__ import print_function
 
 import os
 import logging
+import multiprocessing
 import pytz
 import numpy as np
 
@@ -14,11 +15,11 @@ from math import floor
 
 from analysis_engine import hooks, settings
 from analysis_engine.datastructures import Segment
+from analysis_engine.fingerprint import hash_array, hash_file
 from analysis_engine.node import P
 from analysis_engine.library import (align,
                                      blend_parameters,
                                      calculate_timebase,
-                                     hash_array,
                                      min_value,
                                      mask_outside_slices,
                                      normalise,
@@ -36,7 +37,6 @@ from analysis_engine.library import (align,
 from hdfaccess.file import hdf_file
 from hdfaccess.utils import segment_boundaries, write_segment
 
-from flightdatautilities.filesystem_tools import sha_hash_file
 from flightdatautilities.numpy_utils import (
     slices_int,
     py2round,
@@ -61,6 +61,157 @@ class TimebaseError(ValueError):
     pass
 
 
+# Engine parameters whose average indicates whether the engines are running.
+ENG_SPLIT_PARAMETERS = (
+    'Eng (1) N1', 'Eng (2) N1', 'Eng (3) N1', 'Eng (4) N1',
+    'Eng (1) N2', 'Eng (2) N2', 'Eng (3) N2', 'Eng (4) N2',
+    'Eng (1) Np', 'Eng (2) Np', 'Eng (3) Np', 'Eng (4) Np',
+    'Eng (1) Fuel Flow', 'Eng (2) Fuel Flow', 'Eng (3) Fuel Flow', 'Eng (4) Fuel Flow',
+)
+
+# Parameters normalised alongside the engine parameters to find splits.
+NORMALISED_SPLIT_PARAMETERS = ENG_SPLIT_PARAMETERS + (
+    'Groundspeed', 'Groundspeed (1)', 'Groundspeed (2)',
+)
+
+
+class SplitParameters(object):
+    '''
+    Reads the parameters used for splitting from an HDF file at most once.
+
+    Segment splitting and segment information read the same parameters
+    repeatedly, e.g. the engine parameters are stacked both for their average
+    and for the minimum of the normalised split parameters, and Airspeed is
+    read for the speed parameter and for the valid datetime slices.
+    Parameters are cached by name and the split parameters are aligned and
+    stacked once for each parameter they are aligned to.
+
+    Can be used in place of the HDF file. Other attributes, e.g. duration and
+    get_param, are those of the HDF file and are not cached. Cached
+    parameters are shared between their readers.
+    '''
+
+    def __init__(self, hdf, aircraft_info=None):
+        '''
+        :param hdf: hdf_file object.
+        :type hdf: hdfaccess.file.hdf_file
+        :param aircraft_info: Aircraft information used to select the speed
+            parameter.
+        :type aircraft_info: dict or None
+        '''
+        self.hdf = hdf
+        self.aircraft_info = aircraft_info or {}
+        self._params = {}
+        self._stacks = {}
+        self._speed = None
+
+    def __getattr__(self, name):
+        return getattr(self.hdf, name)
+
+    def __contains__(self, name):
+        return name in self.hdf
+
+    def __getitem__(self, name):
+        try:
+            param = self._params[name]
+        except KeyError:
+            try:
+                param = self.hdf[name]
+            except KeyError:
+                param = None
+            self._params[name] = param
+        if param is None:
+            raise KeyError(name)
+        return param
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def speed(self):
+        '''
+        :returns: The speed parameter, Vertical Speed and splitting
+            thresholds, see _get_speed_parameter.
+        :rtype: (Parameter, Parameter or None, dict)
+        '''
+        if self._speed is None:
+            self._speed = _get_speed_parameter(self, self.aircraft_info)
+        return self._speed
+
+    def _split_stack(self, align_param=None):
+        '''
+        Align the available split parameters to align_param, or to the first
+        available if None, and stack them.
+
+        :returns: Stacked split parameters, the number of engine parameters
+            (which are stacked first) and the frequency of the stack.
+        :rtype: (np.ma.masked_array or None, int, float or None)
+        '''
+        key = (align_param.frequency, align_param.offset) if align_param else None
+        if key not in self._stacks:
+            arrays = []
+            eng_count = 0
+            for param_name in NORMALISED_SPLIT_PARAMETERS:
+                param = self.get(param_name)
+                if param is None:
+                    continue
+                if align_param:
+                    # Align all other parameters to provided param or first
+                    # available.  #Q: Why not force to 1Hz?
+                    arrays.append(align(param, align_param))
+                else:
+                    align_param = param
+                    arrays.append(param.array)
+                if param_name in ENG_SPLIT_PARAMETERS:
+                    eng_count += 1
+            if arrays:
+                self._stacks[key] = (vstack_params(*arrays), eng_count,
+                                     align_param.frequency)
+            else:
+                self._stacks[key] = (None, 0, None)
+        return self._stacks[key]
+
+    def eng_params(self, align_param=None):
+        '''
+        :returns: Average of the engine parameters along with its frequency.
+            Will return None, None if no engine parameters are available.
+        :rtype: (None, None) or (np.ma.masked_array, float)
+        '''
+        stacked_params, eng_count, frequency = self._split_stack(align_param)
+        if not eng_count:
+            return None, None
+        return np.ma.average(stacked_params[:eng_count], axis=0), frequency
+
+    def normalised_split_params(self, align_param=None):
+        '''
+        :returns: Average of the normalised split parameters along with its
+            frequency. Will return None, None if no split parameters are
+            available.
+        :rtype: (None, None) or (np.ma.masked_array, float)
+        '''
+        stacked_params, _, frequency = self._split_stack(align_param)
+        if stacked_params is None:
+            return None, None
+        # We normalise each in turn to the range 0-1 so they have equal weight
+        normalised_params = [normalise(i) for i in stacked_params]
+        # Using a true minimum leads to bias to a zero value. We take the average
+        # to allow each parameter equal weight, then (later) seek the minimum.
+        return np.ma.average(normalised_params, axis=0), frequency
+
+
+def _split_parameters(hdf, aircraft_info=None):
+    '''
+    :returns: hdf if it is SplitParameters, otherwise SplitParameters reading
+        from hdf.
+    :rtype: SplitParameters
+    '''
+    if isinstance(hdf, SplitParameters):
+        return hdf
+    return SplitParameters(hdf, aircraft_info)
+
+
 def validate_aircraft(aircraft_info, hdf):
     """
     """
@@ -266,44 +417,12 @@ def _get_normalised_split_params(hdf, align_param=None):
     normalise them on a scale from 0-1.0 and return the minimum.
 
     :param hdf: hdf_file object.
-    :type hdf: hdfaccess.file.hdf_file
+    :type hdf: hdfaccess.file.hdf_file or SplitParameters
     :returns: Minimum of normalised split parameters along with its frequency.
         Will return None, None if no split parameters are available.
     :rtype: (None, None) or (np.ma.masked_array, float)
     '''
-    params = []
-
-    split_params = (
-        'Eng (1) N1', 'Eng (2) N1', 'Eng (3) N1', 'Eng (4) N1',
-        'Eng (1) N2', 'Eng (2) N2', 'Eng (3) N2', 'Eng (4) N2',
-        'Eng (1) Np', 'Eng (2) Np', 'Eng (3) Np', 'Eng (4) Np',
-        'Eng (1) Fuel Flow', 'Eng (2) Fuel Flow', 'Eng (3) Fuel Flow', 'Eng (4) Fuel Flow',
-        'Groundspeed', 'Groundspeed (1)', 'Groundspeed (2)'
-    )
-    for param_name in split_params:
-        try:
-            param = hdf[param_name]
-        except KeyError:
-            continue
-        if align_param:
-            # Align all other parameters to first available.  #Q: Why not force
-            # to 1Hz?
-            param.array = align(param, align_param)
-        else:
-            align_param = param
-        params.append(param)
-
-    if not len(params):
-        return None, None
-    # If there is at least one split parameter available.
-    # normalise the parameters we'll use for splitting the data
-    stacked_params = vstack_params(*params)
-    # We normalise each in turn to the range 0-1 so they have equal weight
-    normalised_params = [normalise(i) for i in stacked_params]
-    # Using a true minimum leads to bias to a zero value. We take the average
-    # to allow each parameter equal weight, then (later) seek the minimum.
-    split_params_min = np.ma.average(normalised_params, axis=0)
-    return split_params_min, align_param.frequency
+    return _split_parameters(hdf).normalised_split_params(align_param)
 
 
 def _get_eng_params(hdf, align_param=None):
@@ -311,38 +430,12 @@ def _get_eng_params(hdf, align_param=None):
     Get eng parameters from hdf, and return the minimum.
 
     :param hdf: hdf_file object.
-    :type hdf: hdfaccess.file.hdf_file
+    :type hdf: hdfaccess.file.hdf_file or SplitParameters
     :returns: Minimum of normalised split parameters along with its frequency.
         Will return None, None if no split parameters are available.
     :rtype: (None, None) or (np.ma.masked_array, float)
     '''
-    params = []
-
-    eng_params = (
-        'Eng (1) N1', 'Eng (2) N1', 'Eng (3) N1', 'Eng (4) N1',
-        'Eng (1) N2', 'Eng (2) N2', 'Eng (3) N2', 'Eng (4) N2',
-        'Eng (1) Np', 'Eng (2) Np', 'Eng (3) Np', 'Eng (4) Np',
-        'Eng (1) Fuel Flow', 'Eng (2) Fuel Flow', 'Eng (3) Fuel Flow', 'Eng (4) Fuel Flow'
-    )
-
-    for param_name in eng_params:
-        try:
-            param = hdf[param_name]
-        except KeyError:
-            continue
-        if align_param:
-            # Align all other parameters to provided param or first available.
-            param.array = align(param, align_param)
-        else:
-            align_param = param
-        params.append(param)
-
-    if not len(params):
-        return None, None
-    # If there is at least one split parameter available.
-    stacked_params = vstack_params(*params)
-    split_params_avg = np.ma.average(stacked_params, axis=0)
-    return split_params_avg, align_param.frequency
+    return _split_parameters(hdf).eng_params(align_param)
 
 
 def _rate_of_turn(heading):
@@ -491,7 +584,8 @@ def split_segments(hdf, aircraft_info):
     '''
 
     segments = []
-    speed, vspeed, thresholds = _get_speed_parameter(hdf, aircraft_info)
+    split_params = _split_parameters(hdf, aircraft_info)
+    speed, vspeed, thresholds = split_params.speed()
     min_split_duration = thresholds['min_split_duration']
 
     # Look for heading first
@@ -502,7 +596,7 @@ def split_segments(hdf, aircraft_info):
         # try Heading True, otherwise fail loudly with a KeyError
         heading = hdf.get_param('Heading True', valid_only=True)
 
-    eng_arrays, _ = _get_eng_params(hdf, align_param=heading)
+    eng_arrays, _ = split_params.eng_params(align_param=heading)
 
     # Look for speed
     try:
@@ -516,7 +610,7 @@ def split_segments(hdf, aircraft_info):
         return [_segment_type_and_slice(
             speed.array, speed.frequency, heading.array,
             heading.frequency, 0, hdf.duration, eng_arrays,
-            aircraft_info, thresholds, hdf, vspeed)]
+            aircraft_info, thresholds, split_params, vspeed)]
 
     speed_secs = len(speed_array) / speed.frequency
 
@@ -532,20 +626,20 @@ def split_segments(hdf, aircraft_info):
                 segments.append(_segment_type_and_slice(
                     speed_array, speed.frequency, heading.array,
                     heading.frequency, start, split_idx, eng_arrays,
-                    aircraft_info, thresholds, hdf, vspeed))
+                    aircraft_info, thresholds, split_params, vspeed))
                 start = split_idx
                 logger.info("Split Flag found at at index '%d'.", split_idx)
             # Add remaining data to a segment.
             segments.append(_segment_type_and_slice(
                 speed_array, speed.frequency, heading.array, heading.frequency,
-                start, speed_secs, eng_arrays, aircraft_info, thresholds, hdf,
+                start, speed_secs, eng_arrays, aircraft_info, thresholds, split_params,
                 vspeed))
         else:
             # if no split flags use whole file.
             logger.info("'Segment Split' found but no Splits found, using whole file.")
             segments.append(_segment_type_and_slice(
                 speed_array, speed.frequency, heading.array, heading.frequency,
-                start, speed_secs, eng_arrays, aircraft_info, thresholds, hdf,
+                start, speed_secs, eng_arrays, aircraft_info, thresholds, split_params,
                 vspeed))
         return segments
 
@@ -563,7 +657,7 @@ def split_segments(hdf, aircraft_info):
         return [_segment_type_and_slice(
             speed_array, speed.frequency, heading.array,
             heading.frequency, 0, speed_secs, eng_arrays,
-            aircraft_info, thresholds, hdf, vspeed)]
+            aircraft_info, thresholds, split_params, vspeed)]
 
     # suppress transient changes in speed around 80 kts
     slow_slices = slices_remove_small_slices(np.ma.clump_masked(slow_array), 10, speed.frequency)
@@ -579,7 +673,7 @@ def split_segments(hdf, aircraft_info):
     rate_of_turn = _rate_of_turn(heading)
 
     split_params_min, split_params_frequency \
-        = _get_normalised_split_params(hdf, heading)
+        = split_params.normalised_split_params(heading)
     if split_params_min is not None and not split_params_min.mask.all():
         split_params_min = repair_mask(split_params_min,
                                        frequency=split_params_frequency,
@@ -655,7 +749,7 @@ def split_segments(hdf, aircraft_info):
                 segments.append(_segment_type_and_slice(
                     speed_array, speed.frequency, heading.array,
                     heading.frequency, start, dfc_split_index, eng_arrays,
-                    aircraft_info, thresholds, hdf, vspeed))
+                    aircraft_info, thresholds, split_params, vspeed))
                 start = dfc_split_index
                 logger.info("'Frame Counter' jumped within slow_slice '%s' "
                             "at index '%d'.", slow_slice, dfc_split_index)
@@ -677,7 +771,7 @@ def split_segments(hdf, aircraft_info):
             segments.append(_segment_type_and_slice(
                 speed_array, speed.frequency, heading.array, heading.frequency,
                 start, eng_split_index, eng_arrays, aircraft_info, thresholds,
-                hdf, vspeed))
+                split_params, vspeed))
             start = eng_split_index
             continue
         else:
@@ -700,7 +794,7 @@ def split_segments(hdf, aircraft_info):
             segments.append(_segment_type_and_slice(
                 speed_array, speed.frequency, heading.array, heading.frequency,
                 start, rot_split_index, eng_arrays, aircraft_info, thresholds,
-                hdf, vspeed))
+                split_params, vspeed))
             start = rot_split_index
             logger.info("Splitting at index '%s' where rate of turn was below "
                         "'%s'.", rot_split_index,
@@ -719,8 +813,8 @@ def split_segments(hdf, aircraft_info):
     if start < speed_secs:
         segments.append(_segment_type_and_slice(
             speed_array, speed.frequency, heading.array, heading.frequency,
-            start, speed_secs, eng_arrays, aircraft_info, thresholds, hdf,
-            vspeed))
+            start, speed_secs, eng_arrays, aircraft_info, thresholds,
+            split_params, vspeed))
 
     '''
     import matplotlib.pyplot as plt
@@ -786,13 +880,37 @@ def _mask_invalid_years(array, latest_year):
     return array
 
 
+def _fallback_dt_arrays(fallback_dt, duration):
+    '''
+    The time elements of each second from fallback_dt.
+
+    :type fallback_dt: datetime
+    :param duration: Duration in seconds.
+    :type duration: int or float
+    :returns: Arrays of each time element, e.g. 'Year', by name.
+    :rtype: dict
+    '''
+    # The time elements are of the local time of fallback_dt.
+    seconds = np.datetime64(fallback_dt.replace(tzinfo=None), 's') + np.arange(int(duration))
+    days = seconds.astype('datetime64[D]')
+    months = seconds.astype('datetime64[M]')
+    years = seconds.astype('datetime64[Y]')
+    times = (seconds - days).astype(np.int64)
+    return {
+        'Year': years.astype(np.int64) + 1970,
+        'Month': (months - years).astype(np.int64) + 1,
+        'Day': (days - months).astype(np.int64) + 1,
+        'Hour': times // 3600,
+        'Minute': times // 60 % 60,
+        'Second': times % 60,
+    }
+
+
 def get_dt_arrays(hdf, fallback_dt, validation_dt, valid_slices=[]):
     now = datetime.utcnow().replace(tzinfo=pytz.utc)
 
     if fallback_dt:
-        fallback_dts = []
-        for secs in range(0, int(hdf.duration)):
-            fallback_dts.append(fallback_dt + timedelta(seconds=secs))
+        fallback_dt_arrays = _fallback_dt_arrays(fallback_dt, hdf.duration)
 
     onehz = P(frequency=1)
     dt_arrays = []
@@ -820,7 +938,7 @@ def get_dt_arrays(hdf, fallback_dt, validation_dt, valid_slices=[]):
 
         if fallback_dt:
             precise = False
-            array = [getattr(dt, name.lower()) for dt in fallback_dts]
+            array = fallback_dt_arrays[name]
             logger.warning("%s not available, using range from %d to %d from fallback_dt %s",
                            name, array[0], array[-1], fallback_dt)
             dt_arrays.append(array)
@@ -1031,11 +1149,13 @@ def append_segment_info(hdf_segment_path, segment_type, segment_slice, part,
     """
     # build information about a slice
     with hdf_file(hdf_segment_path) as hdf:
-        speed, _, thresholds = _get_speed_parameter(hdf, aircraft_info)
+        # Airspeed is read for both the speed and the valid datetime slices.
+        split_params = SplitParameters(hdf, aircraft_info)
+        speed, _, thresholds = split_params.speed()
         duration = hdf.duration
         try:
             start_datetime, precise_timestamp, timestamp_configuration = _calculate_start_datetime(
-                hdf, fallback_dt, validation_dt)
+                split_params, fallback_dt, validation_dt)
         except TimebaseError:
             # Warn the user and store the fake datetime. The code on the other
             # side should check the datetime and avoid processing this file
@@ -1066,7 +1186,7 @@ def append_segment_info(hdf_segment_path, segment_type, segment_slice, part,
         go_fast_index = None
         go_fast_datetime = None
         # if not go_fast, create hash from entire file
-        speed_hash = sha_hash_file(hdf_segment_path)
+        speed_hash = hash_file(hdf_segment_path)
     segment = Segment(
         segment_slice,
         segment_type,
@@ -1082,10 +1202,73 @@ def append_segment_info(hdf_segment_path, segment_type, segment_slice, part,
     return segment
 
 
+def _segment_fallback_dts(fallback_dt, segment_tuples):
+    '''
+    The fallback_dt of each segment. fallback_dt moves on by the duration of
+    each segment slice and is adjusted for any padding added at the start of
+    the segment.
+
+    :param fallback_dt: fallback_dt relative to the start of the data.
+    :type fallback_dt: datetime or None
+    :param segment_tuples: Segment type, slice and start padding of each
+        segment, see split_segments.
+    :type segment_tuples: [(str, slice, int)]
+    :rtype: [datetime or None]
+    '''
+    fallback_dts = []
+    for segment_type, segment_slice, start_padding in segment_tuples:
+        if fallback_dt:
+            fallback_dts.append(fallback_dt - timedelta(seconds=start_padding))
+            fallback_dt += timedelta(seconds=(segment_slice.stop - segment_slice.start))
+        else:
+            fallback_dts.append(None)
+    return fallback_dts
+
+
+def _segment_processes(processes, segment_count):
+    '''
+    :param processes: Number of processes, defaults to
+        settings.SPLIT_SEGMENT_PROCESSES or the number of CPUs.
+    :type processes: int or None
+    :type segment_count: int
+    :returns: Number of processes to write segments in, at most one for each
+        segment. Daemonic processes, e.g. pool workers, cannot start processes.
+    :rtype: int
+    '''
+    if processes is None:
+        processes = settings.SPLIT_SEGMENT_PROCESSES
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if multiprocessing.current_process().daemon:
+        return 1
+    return max(1, min(processes, segment_count))
+
+
+def _write_segment(args):
+    '''
+    Write a segment into a new file and get its information. Segments are
+    independent, so may be written in parallel.
+
+    :param args: Source HDF path, segment path, boundary, segment type,
+        segment slice, part, fallback_dt, validation_dt and aircraft_info.
+    :type args: tuple
+    :rtype: Segment
+    '''
+    (hdf_path, dest_path, boundary, segment_type, segment_slice, part,
+     fallback_dt, validation_dt, aircraft_info) = args
+    logger.debug("Writing segment %d: %s", part, dest_path)
+    write_segment(hdf_path, segment_slice, dest_path, boundary,
+                  submasks=('arinc', 'invalid_states', 'padding', 'saturation'))
+    return append_segment_info(
+        dest_path, segment_type, segment_slice, part,
+        fallback_dt=fallback_dt, validation_dt=validation_dt,
+        aircraft_info=aircraft_info)
+
+
 def split_hdf_to_segments(hdf_path, aircraft_info, fallback_dt=None,
                           validation_dt=None, fallback_relative_to_start=True,
                           draw=False, dest_dir=None, pre_file_kwargs={},
-                          dt_origin_kwargs={}):
+                          dt_origin_kwargs={}, processes=None):
     """
     Main method - analyses an HDF file for flight segments and splits each
     flight into a new segment appropriately.
@@ -1106,6 +1289,9 @@ def split_hdf_to_segments(hdf_path, aircraft_info, fallback_dt=None,
     :type dest_dir: str
     :param pre_file_kwargs: Pre-file analysis keyword arguments.
     :type pre_file_kwargs: dict
+    :param processes: Number of processes to write segments in, defaults to
+        settings.SPLIT_SEGMENT_PROCESSES.
+    :type processes: int or None
     :returns: List of Segments
     :rtype: List of Segment recordtypes ('slice type part duration path hash')
     """
@@ -1155,26 +1341,33 @@ def split_hdf_to_segments(hdf_path, aircraft_info, fallback_dt=None,
                                             frame_doubled, dt_origin_kwargs)
 
     # process each segment (into a new file) having closed original hdf_path
-    segments = []
-    previous_stop_dt = None
-    for part, (segment_type, segment_slice, start_padding) in enumerate(segment_tuples,
-                                                         start=1):
+    # The fallback_dt of each segment is known beforehand so that segments
+    # can be written independently.
+    fallback_dts = _segment_fallback_dts(fallback_dt, segment_tuples)
+    basename = os.path.splitext(os.path.basename(hdf_path))[0]
+    segment_args = []
+    for part, (segment_type, segment_slice, _) in enumerate(segment_tuples, start=1):
         # write segment to new split file (.001)
-        basename = os.path.basename(hdf_path)
-        dest_basename = os.path.splitext(basename)[0] + '.%03d.hdf5' % part
-        dest_path = os.path.join(dest_dir, dest_basename)
-        logger.debug("Writing segment %d: %s", part, dest_path)
-
-        write_segment(hdf_path, segment_slice, dest_path, boundary,
-                      submasks=('arinc', 'invalid_states', 'padding', 'saturation'))
-
-        # adjust fallback time to account for any padding added at start of segment
-        segment_start_dt = fallback_dt - timedelta(seconds=start_padding)
+        dest_path = os.path.join(dest_dir, basename + '.%03d.hdf5' % part)
+        segment_args.append((hdf_path, dest_path, boundary, segment_type,
+                             segment_slice, part, fallback_dts[part - 1],
+                             validation_dt, aircraft_info))
+
+    processes = _segment_processes(processes, len(segment_args))
+    if processes > 1:
+        logger.debug("Writing %d segments in %d processes", len(segment_args), processes)
+        pool = multiprocessing.Pool(processes)
+        try:
+            # map returns segments in order of part.
+            segments = pool.map(_write_segment, segment_args, chunksize=1)
+        finally:
+            pool.terminate()
+            pool.join()
+    else:
+        segments = [_write_segment(args) for args in segment_args]
 
-        segment = append_segment_info(
-            dest_path, segment_type, segment_slice, part,
-            fallback_dt=segment_start_dt, validation_dt=validation_dt,
-            aircraft_info=aircraft_info)
+    previous_stop_dt = None
+    for segment in segments:
         if previous_stop_dt and segment.start_dt < previous_stop_dt - timedelta(0, 4):
             # In theory, this should not happen - but be warned of superframe
             # padding?
@@ -1182,13 +1375,8 @@ def split_hdf_to_segments(hdf_path, aircraft_info, fallback_dt=None,
                 "Segment start_dt '%s' comes before the previous segment "
                 "ended '%s'", segment.start_dt, previous_stop_dt)
         previous_stop_dt = segment.stop_dt
-
-        if fallback_dt:
-            # move the fallback_dt on to be relative to start of next segment slice
-            fallback_dt += timedelta(seconds=(segment_slice.stop - segment_slice.start))
-        segments.append(segment)
         if draw:
-            plot_essential(dest_path)
+            plot_essential(segment.path)
 
     if draw:
         # show all figures together
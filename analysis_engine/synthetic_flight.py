@@ -0,0 +1,699 @@
+# -*- coding: utf-8 -*-
+# vim:et:ft=python:nowrap:sts=4:sw=4:ts=4
+##############################################################################
+
+'''
+Flight Data Analyzer: Synthetic Flight
+
+Generation of physically plausible flight data for testing how the analyser
+scales to long flights, high sample rates and large parameter sets.
+
+A flight is modelled as a piecewise linear profile sampled at 1Hz: engine
+start, taxi out, takeoff roll, climb, cruise with heading changes and step
+climbs, descent, approach, landing roll, taxi in and engine shutdown. Several
+flights may be generated within the same file, separated by turnarounds with
+the engines shut down, for testing split_hdf_to_segments. Each recorded
+parameter is interpolated from the profile at its own sample rate and offset
+with noise and masked dropouts.
+
+e.g. writing a 16 hour flight with a 16Hz ARINC 767 parameter set and 2000
+parameters, then splitting it into segments:
+
+flight = SyntheticFlight(duration=16 * 3600, frequency=16, arinc='767',
+                         parameter_count=2000, mask_density=0.001)
+flight.write(hdf_path)
+segments = split_hdf_to_segments(hdf_path, {}, dest_dir=dest_dir)
+'''
+
+##############################################################################
+# Imports
+
+
+import numpy as np
+import pytz
+
+from datetime import datetime, timedelta
+
+from flightdatautilities import units as ut
+from hdfaccess.file import hdf_file
+
+from analysis_engine.node import M, P
+from analysis_engine.settings import GRAVITY_METRIC
+
+
+##############################################################################
+# Globals
+
+
+# Sample rates of the profile parameters in Hz, similar to an ARINC 717 frame
+# recorded at 64 words per second.
+FREQUENCIES = {
+    'Acceleration Lateral': 4.0,
+    'Acceleration Longitudinal': 4.0,
+    'Acceleration Normal': 8.0,
+    'Airspeed': 1.0,
+    'Altitude Radio': 2.0,
+    'Altitude STD': 1.0,
+    'AP (1) Engaged': 1.0,
+    'Day': 0.25,
+    'Eng (*) Fuel Flow': 1.0,
+    'Eng (*) Gas Temp': 1.0,
+    'Eng (*) N1': 1.0,
+    'Eng (*) N2': 1.0,
+    'Flap Angle': 1.0,
+    'Frame Counter': 0.25,
+    'Gear Down': 1.0,
+    'Gear On Ground': 2.0,
+    'Groundspeed': 1.0,
+    'Heading': 1.0,
+    'Heading True': 1.0,
+    'Hour': 0.25,
+    'Latitude': 0.5,
+    'Longitude': 0.5,
+    'Minute': 0.25,
+    'Month': 0.25,
+    'Pitch': 4.0,
+    'Roll': 4.0,
+    'Second': 0.25,
+    'Vertical Speed': 2.0,
+    'Year': 0.25,
+}
+
+# Sample rates cycled through by the additional parameters.
+ADDITIONAL_FREQUENCIES = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0)
+
+# Durations in seconds of the phases on the ground.
+ENGINE_START_TIME = 60
+TAXI_OUT_START_TIME = 180
+TAXI_OUT_DURATION = 480
+TAKEOFF_ROLL_DURATION = 40
+LANDING_ROLL_DURATION = 50
+TAXI_IN_DURATION = 300
+ENGINE_SHUTDOWN_DURATION = 60
+
+# Rates of climb and descent in feet per second.
+CLIMB_RATE = 2000 / 60.0
+DESCENT_RATE = 1500 / 60.0
+APPROACH_RATE = 800 / 60.0
+APPROACH_ALTITUDE = 3000
+
+# Speeds in knots.
+TAXI_SPEED = 15
+ROTATE_SPEED = 155
+CLIMB_SPEED = 250
+CRUISE_SPEED = 290
+APPROACH_SPEED = 180
+TOUCHDOWN_SPEED = 135
+
+# Shortest flight which contains every phase.
+MINIMUM_FLIGHT_DURATION = 30 * 60
+
+# The Frame Counter wraps at 12 bits.
+FRAME_COUNTER_MAX = 4095
+
+# Altitude Radio is only recorded within range.
+ALTITUDE_RADIO_RANGE = 5000
+
+# Aerodrome elevations in feet.
+ORIGIN_ELEVATION = 681
+DESTINATION_ELEVATION = 200
+
+# Start of the first flight at Oslo Gardermoen.
+ORIGIN = (60.19, 11.10)
+
+# Magnetic variation in degrees, added to Heading for Heading True.
+MAGNETIC_VARIATION = 2.0
+
+
+##############################################################################
+# Functions
+
+
+def interpolate_profile(anchors, times):
+    '''
+    Interpolate a piecewise linear profile.
+
+    :param anchors: Pairs of time in seconds and value, in time order.
+    :type anchors: [(float, float)]
+    :param times: Times to interpolate at in seconds.
+    :type times: np.array
+    :rtype: np.array
+    '''
+    anchor_times, values = zip(*anchors)
+    return np.interp(times, anchor_times, values)
+
+
+def dropout_mask(size, density, random, max_length=4):
+    '''
+    Mask of dropouts, bursts of up to max_length consecutive samples which
+    cover approximately density of the samples.
+
+    :param size: Number of samples.
+    :type size: int
+    :param density: Proportion of samples to mask.
+    :type density: float
+    :param random: Random number generator.
+    :type random: np.random.RandomState
+    :param max_length: Longest dropout in samples.
+    :type max_length: int
+    :rtype: np.array(dtype=bool)
+    '''
+    mask = np.zeros(size, dtype=bool)
+    count = int(round(size * density * 2 / (max_length + 1)))
+    if not count or not size:
+        return mask
+    starts = random.randint(0, size, count)
+    stops = np.minimum(starts + random.randint(1, max_length + 1, count), size)
+    edges = np.zeros(size + 1, dtype=int)
+    np.add.at(edges, starts, 1)
+    np.add.at(edges, stops, -1)
+    return np.cumsum(edges[:-1]) > 0
+
+
+def flight_anchors(duration, cruise_altitude, runway_headings, seed=0):
+    '''
+    Profiles of a single flight from engine start to engine shutdown.
+
+    The cruise altitude is reduced when the flight is too short to reach it.
+    Cruise includes a heading change every 40 minutes and, on long flights, a
+    step climb of 2000 ft every 4 hours.
+
+    :param duration: Duration of the flight in seconds.
+    :type duration: int
+    :param cruise_altitude: Initial cruise altitude in feet.
+    :type cruise_altitude: int
+    :param runway_headings: Headings of the takeoff and landing runways.
+    :type runway_headings: (float, float)
+    :param seed: Random seed of the heading changes.
+    :type seed: int
+    :raises ValueError: If the flight is shorter than MINIMUM_FLIGHT_DURATION.
+    :returns: Anchors of each profile by name, changes of each discrete state
+        by name and the times of the key events by name.
+    :rtype: dict, dict, dict
+    '''
+    if duration < MINIMUM_FLIGHT_DURATION:
+        raise ValueError('Flight duration must be at least %d seconds, got %s.'
+                         % (MINIMUM_FLIGHT_DURATION, duration))
+    random = np.random.RandomState(seed)
+    t = {}
+    t['engine_start'] = ENGINE_START_TIME
+    t['taxi_out'] = TAXI_OUT_START_TIME
+    t['takeoff_roll'] = t['taxi_out'] + TAXI_OUT_DURATION
+    t['liftoff'] = t['takeoff_roll'] + TAKEOFF_ROLL_DURATION
+    t['engine_stop'] = duration - ENGINE_SHUTDOWN_DURATION
+    t['taxi_in_stop'] = t['engine_stop'] - ENGINE_SHUTDOWN_DURATION
+    t['runway_exit'] = t['taxi_in_stop'] - TAXI_IN_DURATION
+    t['touchdown'] = t['runway_exit'] - LANDING_ROLL_DURATION
+    airborne = t['touchdown'] - t['liftoff']
+
+    # Climb and descent take at most 80% of the airborne time.
+    approach = APPROACH_ALTITUDE / APPROACH_RATE
+    altitude = min(cruise_altitude,
+                   (airborne * 0.8 - approach + APPROACH_ALTITUDE / DESCENT_RATE)
+                   / (1 / CLIMB_RATE + 1 / DESCENT_RATE))
+    altitude = max(altitude, APPROACH_ALTITUDE + 1000)
+    t['top_of_climb'] = t['liftoff'] + altitude / CLIMB_RATE
+    t['approach'] = t['touchdown'] - approach
+
+    # Step climbs during cruise.
+    altitudes = [(0, 0), (t['liftoff'], 0), (t['top_of_climb'], altitude)]
+    step = t['top_of_climb'] + 4 * 3600
+    while step + 4 * 3600 < t['approach']:
+        altitudes += [(step, altitude), (step + 2000 / CLIMB_RATE * 2, altitude + 2000)]
+        altitude += 2000
+        step += 4 * 3600
+    t['top_of_descent'] = t['approach'] - (altitude - APPROACH_ALTITUDE) / DESCENT_RATE
+    altitudes += [(t['top_of_descent'], altitude), (t['approach'], APPROACH_ALTITUDE),
+                  (t['touchdown'], 0), (duration, 0)]
+
+    climb_10000 = t['liftoff'] + min(altitude, 10000) / CLIMB_RATE
+    descent_10000 = t['approach'] - max(min(altitude, 10000) - APPROACH_ALTITUDE, 0) / DESCENT_RATE
+    airspeeds = [
+        (0, 0), (t['takeoff_roll'], 0), (t['liftoff'], ROTATE_SPEED),
+        (t['liftoff'] + 60, CLIMB_SPEED), (climb_10000, CLIMB_SPEED),
+        (min(climb_10000 + 120, t['top_of_climb']), CRUISE_SPEED),
+        (t['top_of_descent'], CRUISE_SPEED),
+        (max(descent_10000 - 120, t['top_of_descent']), CLIMB_SPEED),
+        (descent_10000, CLIMB_SPEED), (t['approach'], APPROACH_SPEED),
+        (t['touchdown'] - 30, TOUCHDOWN_SPEED + 5), (t['touchdown'], TOUCHDOWN_SPEED),
+        (t['runway_exit'], 20), (t['runway_exit'] + 30, 0), (duration, 0),
+    ]
+    groundspeeds = [
+        (0, 0), (t['taxi_out'], 0), (t['taxi_out'] + 30, TAXI_SPEED),
+        (t['takeoff_roll'] - 60, TAXI_SPEED), (t['takeoff_roll'] - 30, 0),
+        (t['takeoff_roll'], 0), (t['touchdown'], 0),
+        (t['runway_exit'], TAXI_SPEED), (t['taxi_in_stop'] - 30, TAXI_SPEED),
+        (t['taxi_in_stop'], 0), (duration, 0),
+    ]
+
+    # Headings are unwrapped, turning from the stand onto the runway, along
+    # the route and onto the landing runway.
+    takeoff_heading, landing_heading = runway_headings
+    headings = [(0, takeoff_heading + 90), (t['takeoff_roll'] - 90, takeoff_heading + 90),
+                (t['takeoff_roll'] - 60, takeoff_heading),
+                (t['liftoff'] + 120, takeoff_heading)]
+    heading = takeoff_heading
+    turn = t['liftoff'] + 120
+    while turn + 2400 < t['approach'] - 240:
+        change = random.uniform(-45, 45)
+        headings += [(turn, heading), (turn + abs(change) / 2, heading + change)]
+        heading += change
+        turn += 2400
+    # Turn onto the landing runway the shortest way round.
+    landing_heading = heading + (landing_heading - heading + 180) % 360 - 180
+    headings += [(t['approach'] - 240, heading),
+                 (t['approach'] - 240 + abs(landing_heading - heading) / 2, landing_heading),
+                 (t['runway_exit'], landing_heading),
+                 (t['runway_exit'] + 30, landing_heading - 90), (duration, landing_heading - 90)]
+
+    pitches = [
+        (0, 0), (t['liftoff'] - 5, 0), (t['liftoff'] + 3, 15), (t['liftoff'] + 60, 10),
+        (t['top_of_climb'], 5), (t['top_of_climb'] + 60, 2.5),
+        (t['top_of_descent'], 2.5), (t['top_of_descent'] + 60, -1),
+        (t['approach'], 1), (t['approach'] + 60, 2.5), (t['touchdown'] - 5, 5),
+        (t['touchdown'], 4), (t['touchdown'] + 5, 0), (duration, 0),
+    ]
+    n1s = [
+        (0, 0), (t['engine_start'], 0), (t['engine_start'] + 40, 22),
+        (t['takeoff_roll'], 22), (t['takeoff_roll'] + 10, 92),
+        (t['liftoff'] + 120, 90), (t['top_of_climb'], 85), (t['top_of_climb'] + 60, 80),
+        (t['top_of_descent'], 80), (t['top_of_descent'] + 30, 30),
+        (t['approach'], 35), (t['approach'] + 60, 55), (t['touchdown'], 35),
+        (t['touchdown'] + 5, 70), (t['touchdown'] + 25, 25),
+        (t['engine_stop'] - 5, 22), (t['engine_stop'], 0), (duration, 0),
+    ]
+    # Flaps are retracted passing 3000 ft in the climb.
+    retraction = max(t['liftoff'] + APPROACH_ALTITUDE / CLIMB_RATE, t['liftoff'] + 60)
+    flaps = [
+        (0, 0), (t['taxi_out'] + 60, 0), (t['taxi_out'] + 70, 5),
+        (retraction, 5), (retraction + 10, 0), (t['approach'] - 180, 0),
+        (t['approach'] - 170, 5), (t['approach'] - 120, 15),
+        (t['approach'] - 60, 30), (t['runway_exit'], 30),
+        (t['runway_exit'] + 10, 0), (duration, 0),
+    ]
+    # Discrete states change at a single time.
+    states = {
+        'Gear Down': [(0, 1), (t['liftoff'] + 8, 0), (t['approach'] - 60, 1)],
+        'Gear On Ground': [(0, 1), (t['liftoff'], 0), (t['touchdown'], 1)],
+        'AP (1) Engaged': [(0, 0), (t['liftoff'] + 1000 / CLIMB_RATE, 1),
+                           (t['touchdown'] - 800 / APPROACH_RATE, 0)],
+    }
+    anchors = {
+        'Altitude': altitudes,
+        'Airspeed': airspeeds,
+        'Groundspeed': groundspeeds,
+        'Heading': headings,
+        'Pitch': pitches,
+        'N1': n1s,
+        'Flap Angle': flaps,
+    }
+    return anchors, states, t
+
+
+##############################################################################
+# Classes
+
+
+class SyntheticFlight(object):
+    '''
+    Synthetic flight data of one or more flights within a single file.
+
+    Profiles are calculated at 1Hz when created. Recorded parameters are
+    generated one at a time from the profiles, so memory use is bounded by
+    the largest parameter rather than the file.
+    '''
+
+    def __init__(self, duration=2 * 3600, flights=1, turnaround=45 * 60,
+                 cruise_altitude=35000, engine_count=2, frequency=None,
+                 frequencies=None, arinc='717', parameter_count=None,
+                 multistate_count=0, mask_density=0.0, noise=True,
+                 start_datetime=datetime(2020, 1, 1, 8, tzinfo=pytz.utc),
+                 seed=0):
+        '''
+        :param duration: Duration of each flight in seconds.
+        :type duration: int
+        :param flights: Number of flights.
+        :type flights: int
+        :param turnaround: Duration in seconds between flights with the
+            engines shut down.
+        :type turnaround: int
+        :param cruise_altitude: Initial cruise altitude in feet.
+        :type cruise_altitude: int
+        :param engine_count: Number of engines.
+        :type engine_count: int
+        :param frequency: Sample rate in Hz of every parameter, e.g. 16 for an
+            ARINC 767 parameter set. Defaults to the rates of FREQUENCIES.
+        :type frequency: float or None
+        :param frequencies: Sample rates in Hz by parameter name overriding
+            the defaults. Engine parameters use the 'Eng (*) ...' name.
+        :type frequencies: dict or None
+        :param arinc: ARINC standard of the data, '717' or '767'.
+        :type arinc: str
+        :param parameter_count: Total number of parameters. Additional
+            parameters are generated after the profile parameters.
+        :type parameter_count: int or None
+        :param multistate_count: Number of the additional parameters which are
+            multistates.
+        :type multistate_count: int
+        :param mask_density: Proportion of the samples of each parameter
+            masked in short dropouts.
+        :type mask_density: float
+        :param noise: Whether to add noise to the profiles.
+        :type noise: bool
+        :param start_datetime: Datetime at the start of the data.
+        :type start_datetime: datetime
+        :param seed: Random seed so that data is reproducible.
+        :type seed: int
+        '''
+        self.flights = flights
+        self.flight_duration = int(duration)
+        self.turnaround = int(turnaround)
+        self.duration = flights * self.flight_duration + (flights - 1) * self.turnaround
+        self.engine_count = engine_count
+        self.frequency = frequency
+        self.frequencies = frequencies or {}
+        self.arinc = arinc
+        self.multistate_count = multistate_count
+        self.mask_density = mask_density
+        self.noise = noise
+        self.start_datetime = start_datetime
+        self.seed = seed
+        self.parameter_count = parameter_count
+        self.events = []
+        self._profile(cruise_altitude)
+
+    def _profile(self, cruise_altitude):
+        '''
+        Calculate the 1Hz profiles of every flight.
+        '''
+        random = np.random.RandomState(self.seed)
+        times = np.arange(self.duration, dtype=float)
+        profiles = {}
+        states = {}
+        heading = random.uniform(0, 360)
+        unwrapped = heading + 90
+        offset = 0
+        for flight in range(self.flights):
+            runway_headings = (heading, random.uniform(0, 360))
+            anchors, flight_states, events = flight_anchors(
+                self.flight_duration, cruise_altitude, runway_headings,
+                seed=self.seed + flight)
+            # Aircraft park facing the direction they arrived from.
+            heading = anchors['Heading'][-1][1] % 360
+            self.events.append({k: v + offset for k, v in events.items()})
+            stop = offset + self.flight_duration
+            if flight < self.flights - 1:
+                stop += self.turnaround
+            flight_times = times[offset:stop] - offset
+            for name, flight_anchor in anchors.items():
+                values = interpolate_profile(flight_anchor, flight_times)
+                if name == 'Heading':
+                    # Keep unwrapped headings continuous between flights.
+                    values += unwrapped - values[0]
+                    unwrapped = values[-1]
+                profiles.setdefault(name, []).append(values)
+            for name, changes in flight_states.items():
+                change_times, values = zip(*changes)
+                indexes = np.searchsorted(change_times, flight_times, side='right') - 1
+                states.setdefault(name, []).append(np.array(values)[indexes])
+            offset += self.flight_duration + self.turnaround
+
+        self.profiles = {name: np.concatenate(values) for name, values in profiles.items()}
+        self.states = {name: np.concatenate(values) for name, values in states.items()}
+
+        # Aerodrome elevations change across each flight, with flights
+        # returning to the origin and back.
+        elevations = (float(ORIGIN_ELEVATION), float(DESTINATION_ELEVATION))
+        elevation = np.full(self.duration, elevations[0])
+        for flight, events in enumerate(self.events):
+            origin, destination = elevations[flight % 2], elevations[(flight + 1) % 2]
+            _slice = slice(int(events['liftoff']), int(events['touchdown']))
+            elevation[_slice] = np.linspace(origin, destination, _slice.stop - _slice.start)
+            elevation[_slice.stop:] = destination
+        self.profiles['Altitude STD'] = self.profiles['Altitude'] + elevation
+
+        airspeed = self.profiles['Airspeed']
+        altitude = self.profiles['Altitude STD']
+        airborne = self.states['Gear On Ground'] == 0
+        # True airspeed increases by approximately 2% per thousand feet.
+        true_airspeed = airspeed * (1 + 0.02 * altitude / 1000)
+        self.profiles['Groundspeed'] = np.where(airborne, true_airspeed,
+                                                np.maximum(self.profiles['Groundspeed'], airspeed))
+        self.profiles['Heading True'] = self.profiles['Heading'] + MAGNETIC_VARIATION
+        self.profiles['Vertical Speed'] = np.gradient(altitude) * 60
+
+        # Bank angle of a coordinated turn at the heading rate.
+        heading_rate = np.radians(np.gradient(self.profiles['Heading']))
+        velocity = ut.convert(true_airspeed, ut.KT, ut.METER_S)
+        roll = np.degrees(np.arctan(velocity * heading_rate / GRAVITY_METRIC))
+        self.profiles['Roll'] = np.where(airborne, np.clip(roll, -30, 30), 0)
+
+        # Position from integrating the groundspeed along the true heading.
+        distance = self.profiles['Groundspeed'] / 3600.0 / 60.0
+        track = np.radians(self.profiles['Heading True'])
+        latitude = ORIGIN[0] + np.cumsum(distance * np.cos(track))
+        longitude = ORIGIN[1] + np.cumsum(distance * np.sin(track) / np.cos(np.radians(latitude)))
+        self.profiles['Latitude'] = latitude
+        self.profiles['Longitude'] = (longitude + 180) % 360 - 180
+
+        acceleration = ut.convert(np.gradient(airspeed), ut.KT, ut.METER_S) / GRAVITY_METRIC
+        pitch = self.profiles['Pitch']
+        self.profiles['Acceleration Longitudinal'] = acceleration + np.sin(np.radians(pitch))
+        self.profiles['Acceleration Normal'] = np.cos(np.radians(pitch)) / np.cos(np.radians(self.profiles['Roll']))
+        self.profiles['Acceleration Lateral'] = np.zeros(self.duration)
+
+    def _frequency(self, name):
+        '''
+        :param name: Parameter name, with engine parameters as 'Eng (*) ...'.
+        :type name: str
+        :returns: Sample rate of the parameter in Hz.
+        :rtype: float
+        '''
+        if name in self.frequencies:
+            return float(self.frequencies[name])
+        if self.frequency:
+            return float(self.frequency)
+        return FREQUENCIES.get(name, 1.0)
+
+    def _sample(self, values, frequency, random, wrap=None, sigma=0, lower=None, dtype=float):
+        '''
+        Sample a 1Hz profile at a frequency and a random offset.
+
+        :param values: 1Hz profile.
+        :type values: np.array
+        :param wrap: Values are modulo wrap, e.g. 360 for headings.
+        :type wrap: float or None
+        :param sigma: Standard deviation of the noise.
+        :type sigma: float
+        :param lower: Lower limit of the values with noise, e.g. 0 for speeds.
+        :type lower: float or None
+        :param dtype: float to interpolate values or int to sample states.
+        :type dtype: type
+        :returns: Array and offset.
+        :rtype: np.ma.array, float
+        '''
+        offset = random.uniform(0, 1.0 / frequency)
+        times = np.arange(int(self.duration * frequency)) / frequency + offset
+        if dtype == float:
+            array = np.interp(times, np.arange(self.duration), values)
+            if sigma and self.noise:
+                array += random.normal(0, sigma, len(array))
+            if lower is not None:
+                np.maximum(array, lower, out=array)
+            if wrap:
+                array %= wrap
+        else:
+            array = values[np.minimum(times.astype(int), self.duration - 1)].astype(dtype)
+        mask = dropout_mask(len(array), self.mask_density, random)
+        return np.ma.array(array, mask=mask), offset
+
+    def _parameter(self, name, values, random, units=None, frequency_name=None, **kwargs):
+        '''
+        Recorded parameter sampled from a 1Hz profile.
+
+        :rtype: DerivedParameterNode
+        '''
+        frequency = self._frequency(frequency_name or name)
+        array, offset = self._sample(values, frequency, random, **kwargs)
+        param = P(name, array, frequency=frequency, offset=offset, lfl=True)
+        param.units = units
+        return param
+
+    def _multistate(self, name, values, values_mapping, random):
+        '''
+        Recorded multistate parameter sampled from 1Hz states.
+
+        :rtype: MultistateDerivedParameterNode
+        '''
+        frequency = self._frequency(name)
+        array, offset = self._sample(values, frequency, random, dtype=int)
+        return M(name, array, frequency=frequency, offset=offset,
+                 values_mapping=values_mapping, lfl=True)
+
+    def parameters(self):
+        '''
+        Generate the recorded parameters one at a time.
+
+        :rtype: generator of DerivedParameterNode and MultistateDerivedParameterNode
+        '''
+        random = np.random.RandomState(self.seed)
+        profiles = self.profiles
+        count = 0
+
+        for name, units, wrap, sigma, lower in (
+                ('Airspeed', ut.KT, None, 0.3, 0),
+                ('Altitude STD', ut.FT, None, 3, None),
+                ('Heading', ut.DEGREE, 360, 0.05, None),
+                ('Heading True', ut.DEGREE, 360, 0.05, None),
+                ('Pitch', ut.DEGREE, None, 0.05, None),
+                ('Roll', ut.DEGREE, None, 0.05, None),
+                ('Vertical Speed', ut.FPM, None, 20, None),
+                ('Groundspeed', ut.KT, None, 0.3, 0),
+                ('Acceleration Normal', ut.G, None, 0.01, None),
+                ('Acceleration Longitudinal', ut.G, None, 0.005, None),
+                ('Acceleration Lateral', ut.G, None, 0.005, None),
+                ('Latitude', ut.DEGREE, None, 0, None),
+                ('Longitude', ut.DEGREE, None, 0, None),
+                ('Flap Angle', ut.DEGREE, None, 0, None)):
+            yield self._parameter(name, profiles[name], random, units=units,
+                                  wrap=wrap, sigma=sigma, lower=lower)
+            count += 1
+
+        param = self._parameter('Altitude Radio', profiles['Altitude'], random,
+                                units=ut.FT, sigma=0.5)
+        param.array[param.array > ALTITUDE_RADIO_RANGE] = np.ma.masked
+        yield param
+        count += 1
+
+        for number in range(1, self.engine_count + 1):
+            # Engines differ slightly from each other.
+            n1 = profiles['N1'] * random.uniform(0.99, 1.01)
+            running = n1 > 0
+            for name, values, units, sigma in (
+                    ('N1', n1, ut.PERCENT, 0.1),
+                    ('N2', np.where(running, 55 + n1 * 0.45, 0), ut.PERCENT, 0.1),
+                    ('Fuel Flow', np.where(running, 300 + n1 ** 2 * 0.5, 0), ut.KG_H, 5),
+                    ('Gas Temp', np.where(running, 350 + n1 * 5, 15), ut.CELSIUS, 1)):
+                yield self._parameter('Eng (%d) %s' % (number, name), values, random,
+                                      units=units, sigma=sigma, lower=0,
+                                      frequency_name='Eng (*) %s' % name)
+                count += 1
+
+        for name, values_mapping in (
+                ('Gear Down', {0: 'Up', 1: 'Down'}),
+                ('Gear On Ground', {0: 'Air', 1: 'Ground'}),
+                ('AP (1) Engaged', {0: '-', 1: 'Engaged'})):
+            yield self._multistate(name, self.states[name], values_mapping, random)
+            count += 1
+
+        for param in self._time_parameters(random):
+            yield param
+            count += 1
+
+        for param in self._additional_parameters(count, random):
+            yield param
+
+    def _time_parameters(self, random):
+        '''
+        Frame Counter and the date and time parameters, which are never
+        masked so that the timebase can be calculated.
+        '''
+        frequency = self._frequency('Frame Counter')
+        size = int(self.duration * frequency)
+        param = P('Frame Counter', np.ma.arange(size) % (FRAME_COUNTER_MAX + 1),
+                  frequency=frequency, offset=0, lfl=True)
+        yield param
+
+        start = np.datetime64(self.start_datetime.replace(tzinfo=None), 's')
+        for name, unit, modulo in (('Year', 'Y', None), ('Month', 'M', 12),
+                                   ('Day', 'D', None), ('Hour', 'h', 24),
+                                   ('Minute', 'm', 60), ('Second', 's', 60)):
+            frequency = self._frequency(name)
+            offset = random.uniform(0, 1.0 / frequency)
+            times = start + (np.arange(int(self.duration * frequency)) / frequency + offset).astype('timedelta64[s]')
+            if name == 'Year':
+                array = times.astype('datetime64[Y]').astype(int) + 1970
+            elif name == 'Day':
+                array = (times.astype('datetime64[D]') - times.astype('datetime64[M]')).astype(int) + 1
+            else:
+                array = times.astype('datetime64[%s]' % unit).astype(int) % modulo
+                if name == 'Month':
+                    array += 1
+            yield P(name, np.ma.array(array), frequency=frequency, offset=offset, lfl=True)
+
+    def _additional_parameters(self, count, random):
+        '''
+        Numeric random walks and multistate parameters making up the
+        parameter count.
+        '''
+        additional = max((self.parameter_count or 0) - count, 0)
+        multistates = min(self.multistate_count, additional)
+        for index in range(additional):
+            frequency = float(self.frequencies.get('Synthetic', self.frequency) or
+                              ADDITIONAL_FREQUENCIES[index % len(ADDITIONAL_FREQUENCIES)])
+            size = int(self.duration * frequency)
+            offset = random.uniform(0, 1.0 / frequency)
+            mask = dropout_mask(size, self.mask_density, random)
+            if index < multistates:
+                # States held for between one and ten minutes.
+                changes = np.cumsum(random.randint(60, 600, self.duration // 60 + 1))
+                states = np.searchsorted(changes, np.arange(size) / frequency, side='right') % 2
+                yield M('Synthetic Discrete (%d)' % (index + 1), np.ma.array(states, mask=mask),
+                        frequency=frequency, offset=offset,
+                        values_mapping={0: '-', 1: 'Active'}, lfl=True)
+            else:
+                array = np.cumsum(random.normal(0, 1, size))
+                yield P('Synthetic Parameter (%d)' % (index + 1 - multistates),
+                        np.ma.array(array, mask=mask), frequency=frequency,
+                        offset=offset, lfl=True)
+
+    def write(self, path):
+        '''
+        Write the flight data to a new HDF file.
+
+        :param path: Path of the HDF file, overwritten if it exists.
+        :type path: str
+        :returns: Path of the HDF file.
+        :rtype: str
+        '''
+        with hdf_file(path, create=True) as hdf:
+            for param in self.parameters():
+                hdf.set_param(param)
+            hdf.set_attr('arinc', self.arinc)
+            hdf.set_attr('superframe_present', False)
+            hdf.set_attr('reliable_frame_counter', True)
+            hdf.set_attr('duration', self.duration)
+        return path
+
+    def segment_info(self, path, flight=0):
+        '''
+        Segment information for passing the file to process_flight, for files
+        written with a single flight.
+
+        :param path: Path of the HDF file.
+        :type path: str
+        :param flight: Index of the flight.
+        :type flight: int
+        :rtype: dict
+        '''
+        start = self.flight_duration * flight + self.turnaround * flight
+        return {
+            'File': path,
+            'Segment Type': 'START_AND_STOP',
+            'Start Datetime': self.start_datetime + timedelta(seconds=start),
+        }
+
+
+def write_synthetic_flight(path, **kwargs):
+    '''
+    Write a synthetic flight to a new HDF file.
+
+    :param path: Path of the HDF file.
+    :type path: str
+    :param kwargs: Keyword arguments of SyntheticFlight.
+    :returns: The synthetic flight written.
+    :rtype: SyntheticFlight
+    '''
+    flight = SyntheticFlight(**kwargs)
+    flight.write(path)
+    return flight
@@ -1,6 +1,14 @@
 '''
-Three little routines to make building Sections for testing easier.
+Three little routines to make building Sections for testing easier, and a
+stub API server for testing the HTTP API handlers offline.
 '''
+import simplejson as json
+import threading
+
+from six.moves.BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from six.moves.socketserver import ThreadingMixIn
+from six.moves.urllib.parse import urlsplit
+
 from analysis_engine.node import (
     Section,
     SectionNode,
@@ -59,3 +67,65 @@ def buildsections(name, *args):
 
 def build_kti(name, *args):
     return KTI(items=[KeyTimeInstance(a, name) for a in args if a])
+
+
+class StubAPIServer(ThreadingMixIn, HTTPServer):
+    '''
+    Local HTTP server which serves canned JSON responses in place of the API.
+
+    Responses are looked up by request path with query string, falling back
+    to the path alone, e.g. '/api/airport/nearest/'. Unknown paths return 404.
+    Requests and connections are counted so tests can check caching and
+    connection reuse.
+
+    Example:
+    with StubAPIServer({'/api/airport/krs/': {'id': 2456}}) as server:
+        settings.API_HTTP_BASE_URL = server.url
+    '''
+    daemon_threads = True
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.requests = []
+        self.connections = 0
+        HTTPServer.__init__(self, ('127.0.0.1', 0), _StubAPIRequestHandler)
+        self.url = 'http://127.0.0.1:%d' % self.server_address[1]
+        self._thread = threading.Thread(target=self.serve_forever)
+        self._thread.daemon = True
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+
+class _StubAPIRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        self.server.connections += 1
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        try:
+            body, status = json.dumps(self.server.responses[self.path]), 200
+        except KeyError:
+            parts = urlsplit(self.path)
+            try:
+                body, status = json.dumps(self.server.responses[parts.path]), 200
+            except KeyError:
+                body, status = json.dumps({'detail': 'Not found.'}), 404
+        body = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
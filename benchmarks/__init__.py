@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+# vim:et:ft=python:nowrap:sts=4:sw=4:ts=4
+##############################################################################
+
+'''
+Flight Data Analyzer: Benchmarks
+
+Timing and peak memory benchmarks of library functions, node derivation and
+end-to-end flight processing. Run with:
+
+    python -m benchmarks --output results.json --compare baseline.json
+'''
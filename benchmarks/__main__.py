@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+# vim:et:ft=python:nowrap:sts=4:sw=4:ts=4
+##############################################################################
+
+'''
+Flight Data Analyzer: Benchmarks: Command Line
+
+Run benchmarks, save the results as JSON and compare them with the results
+of a baseline, e.g. from the previous commit. Exits with status 1 if any
+benchmark has regressed beyond the threshold.
+'''
+
+##############################################################################
+# Imports
+
+
+from __future__ import print_function
+
+import argparse
+import logging
+import sys
+
+from benchmarks import core
+
+
+##############################################################################
+# Functions
+
+
+def print_results(results):
+    for name, result in results['benchmarks'].items():
+        memory = result.get(core.MEMORY_METRIC)
+        size = result.get(core.SIZE_METRIC)
+        print('%-60s %12.6fs %12.6fs %12s %12s' % (
+            name, result['min'], result['median'],
+            '%.1fMiB' % (memory / 1024.0 ** 2) if memory is not None else '-',
+            '%.1fMiB' % (size / 1024.0 ** 2) if size is not None else '-'))
+
+
+def print_comparisons(comparisons):
+    for comparison in comparisons:
+        print('%-60s %-12s %8.3fx%s' % (
+            comparison['name'], comparison['metric'], comparison['ratio'],
+            '  REGRESSION' if comparison['regression'] else ''))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run FlightDataAnalyzer benchmarks.')
+    parser.add_argument('-k', '--name', dest='patterns', action='append', default=[],
+                        help='Only run benchmarks with names matching the pattern, e.g. "library.slices_*".')
+    parser.add_argument('-g', '--group', dest='groups', action='append', default=[],
+                        help='Only run benchmarks in the group, e.g. library, node or flight.')
+    parser.add_argument('-o', '--output', help='Path to save the results as JSON.')
+    parser.add_argument('-c', '--compare', help='Path of baseline results to compare with.')
+    parser.add_argument('-t', '--threshold', type=float, default=core.REGRESSION_THRESHOLD,
+                        help='Proportion by which a benchmark must slow down to regress (default: %(default)s).')
+    parser.add_argument('-r', '--repeat', type=int, help='Override the number of repeats.')
+    parser.add_argument('--no-memory', dest='memory', action='store_false',
+                        help='Do not measure peak memory.')
+    parser.add_argument('-l', '--list', action='store_true', help='List the benchmarks and exit.')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Verbose logging.')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    core.load_benchmarks()
+    benchmarks = core.select_benchmarks(args.patterns, args.groups)
+
+    if args.list:
+        for bench in benchmarks:
+            print(bench.name)
+        return 0
+
+    results = core.run_benchmarks(benchmarks, repeat=args.repeat, memory=args.memory)
+    print_results(results)
+    if args.output:
+        core.save_results(results, args.output)
+
+    if args.compare:
+        comparisons = core.compare_results(core.load_results(args.compare), results,
+                                           threshold=args.threshold)
+        print()
+        print_comparisons(comparisons)
+        if any(c['regression'] for c in comparisons):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
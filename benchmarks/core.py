@@ -0,0 +1,354 @@
+# -*- coding: utf-8 -*-
+# vim:et:ft=python:nowrap:sts=4:sw=4:ts=4
+##############################################################################
+
+'''
+Flight Data Analyzer: Benchmarks: Core
+
+Registration, measurement and comparison of benchmarks.
+
+Benchmarks are registered with the benchmark decorator. The decorated
+function is the setup for the benchmark and returns the callable to be
+timed, so that loading test data and copying files is excluded from the
+measurements:
+
+@benchmark('library', repeat=10)
+def repair_mask():
+    array = np.ma.array(...)
+    return lambda: library.repair_mask(array)
+'''
+
+##############################################################################
+# Imports
+
+
+import datetime
+import fnmatch
+import gc
+import importlib
+import logging
+import os
+import platform
+import simplejson as json
+import subprocess
+import sys
+import timeit
+import tracemalloc
+
+from collections import OrderedDict
+
+import numpy as np
+
+
+##############################################################################
+# Globals
+
+
+logger = logging.getLogger(name=__name__)
+
+# Modules which register benchmarks when imported.
+BENCHMARK_MODULES = [
+    'benchmarks.library_benchmarks',
+    'benchmarks.node_benchmarks',
+    'benchmarks.flight_benchmarks',
+    'benchmarks.downcast_benchmarks',
+    'benchmarks.import_benchmarks',
+]
+
+# A benchmark has regressed if it is slower (or uses more memory or writes a
+# larger file) than the baseline by more than this proportion.
+REGRESSION_THRESHOLD = 0.1
+
+# Metrics compared between results.
+TIME_METRIC = 'min'
+MEMORY_METRIC = 'peak_memory'
+SIZE_METRIC = 'size'
+
+# Registered benchmarks by name.
+BENCHMARKS = OrderedDict()
+
+
+##############################################################################
+# Classes
+
+
+class Benchmark(object):
+    '''
+    A registered benchmark scenario.
+    '''
+
+    def __init__(self, name, group, setup, number=1, repeat=5, memory=True,
+                 size=None):
+        '''
+        :param name: Unique name of the benchmark.
+        :type name: str
+        :param group: Group of the benchmark, e.g. 'library' or 'node'.
+        :type group: str
+        :param setup: Called before each repeat, returns the callable to time.
+        :type setup: callable
+        :param number: Number of calls timed within each repeat.
+        :type number: int
+        :param repeat: Number of repeats.
+        :type repeat: int
+        :param memory: Whether to measure the peak memory of a call.
+        :type memory: bool
+        :param size: Called after the repeats, returns the size in bytes of
+            the output of the benchmark, e.g. a file it has written.
+        :type size: callable or None
+        '''
+        self.name = name
+        self.group = group
+        self.setup = setup
+        self.number = number
+        self.repeat = repeat
+        self.memory = memory
+        self.size = size
+
+    def __repr__(self):
+        return '%s(%r, %r)' % (self.__class__.__name__, self.name, self.group)
+
+    def measure(self, repeat=None, memory=True):
+        '''
+        Time the benchmark and measure its peak memory.
+
+        Each repeat calls setup, then times number calls of the returned
+        callable. Peak memory is measured separately with tracemalloc, as
+        tracing allocations slows down the calls.
+
+        :param repeat: Number of repeats, defaults to the benchmark's.
+        :type repeat: int or None
+        :param memory: Whether to measure peak memory.
+        :type memory: bool
+        :returns: Measurements of the benchmark.
+        :rtype: dict
+        '''
+        repeat = repeat or self.repeat
+        times = []
+        for _ in range(repeat):
+            function = self.setup()
+            gc.collect()
+            gc_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                start = timeit.default_timer()
+                for _ in range(self.number):
+                    function()
+                times.append((timeit.default_timer() - start) / self.number)
+            finally:
+                if gc_enabled:
+                    gc.enable()
+
+        result = OrderedDict([
+            ('group', self.group),
+            ('number', self.number),
+            ('repeat', repeat),
+            ('times', times),
+            ('min', min(times)),
+            ('median', float(np.median(times))),
+            ('mean', float(np.mean(times))),
+        ])
+        if self.size is not None:
+            result[SIZE_METRIC] = self.size()
+        if memory and self.memory:
+            result[MEMORY_METRIC] = peak_memory(self.setup())
+        return result
+
+
+##############################################################################
+# Functions
+
+
+def benchmark(group, name=None, number=1, repeat=5, memory=True, size=None):
+    '''
+    Decorator which registers a benchmark setup function.
+
+    :param group: Group of the benchmark, e.g. 'library' or 'node'.
+    :type group: str
+    :param name: Name of the benchmark, defaults to '<group>.<function name>'.
+    :type name: str or None
+    :param number: Number of calls timed within each repeat.
+    :type number: int
+    :param repeat: Number of repeats.
+    :type repeat: int
+    :param memory: Whether to measure the peak memory of a call.
+    :type memory: bool
+    :param size: Returns the size in bytes of the output of the benchmark.
+    :type size: callable or None
+    '''
+    def decorator(setup):
+        register(Benchmark(name or '%s.%s' % (group, setup.__name__), group,
+                           setup, number=number, repeat=repeat, memory=memory,
+                           size=size))
+        return setup
+    return decorator
+
+
+def register(bench):
+    '''
+    Register a benchmark.
+
+    :type bench: Benchmark
+    :raises ValueError: If a benchmark with the same name is registered.
+    '''
+    if bench.name in BENCHMARKS:
+        raise ValueError("Benchmark '%s' is already registered." % bench.name)
+    BENCHMARKS[bench.name] = bench
+
+
+def load_benchmarks(modules=BENCHMARK_MODULES):
+    '''
+    Import the modules which register benchmarks.
+
+    :param modules: Module paths.
+    :type modules: [str]
+    :returns: Registered benchmarks by name.
+    :rtype: OrderedDict
+    '''
+    for module in modules:
+        importlib.import_module(module)
+    return BENCHMARKS
+
+
+def select_benchmarks(patterns=None, groups=None, benchmarks=None):
+    '''
+    Select benchmarks by name pattern and group.
+
+    :param patterns: fnmatch patterns of benchmark names, all if empty.
+    :type patterns: [str] or None
+    :param groups: Benchmark groups, all if empty.
+    :type groups: [str] or None
+    :param benchmarks: Benchmarks by name, defaults to the registered benchmarks.
+    :type benchmarks: dict or None
+    :rtype: [Benchmark]
+    '''
+    benchmarks = BENCHMARKS if benchmarks is None else benchmarks
+    return [b for b in benchmarks.values()
+            if (not groups or b.group in groups)
+            and (not patterns or any(fnmatch.fnmatch(b.name, p) for p in patterns))]
+
+
+def peak_memory(function):
+    '''
+    Peak memory allocated by Python and numpy while calling function.
+
+    :type function: callable
+    :returns: Peak traced memory in bytes.
+    :rtype: int
+    '''
+    gc.collect()
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    try:
+        tracemalloc.clear_traces()
+        baseline = tracemalloc.get_traced_memory()[0]
+        function()
+        return tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+
+
+def git_commit(path=None):
+    '''
+    :returns: Commit hash of the working tree or None if not available.
+    :rtype: str or None
+    '''
+    path = path or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        output = subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=path,
+                                         stderr=subprocess.STDOUT)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.decode('ascii').strip()
+
+
+def run_benchmarks(benchmarks, repeat=None, memory=True):
+    '''
+    Measure benchmarks.
+
+    :param benchmarks: Benchmarks to measure.
+    :type benchmarks: [Benchmark]
+    :param repeat: Number of repeats, overriding each benchmark's.
+    :type repeat: int or None
+    :param memory: Whether to measure peak memory.
+    :type memory: bool
+    :returns: Results with metadata about the environment.
+    :rtype: dict
+    '''
+    results = OrderedDict()
+    for bench in benchmarks:
+        logger.info("Running benchmark '%s'.", bench.name)
+        try:
+            results[bench.name] = bench.measure(repeat=repeat, memory=memory)
+        except Exception:
+            logger.exception("Benchmark '%s' failed.", bench.name)
+    return OrderedDict([
+        ('metadata', OrderedDict([
+            ('created', datetime.datetime.utcnow().isoformat()),
+            ('commit', git_commit()),
+            ('python', sys.version.split()[0]),
+            ('numpy', np.__version__),
+            ('platform', platform.platform()),
+            ('machine', platform.node()),
+        ])),
+        ('benchmarks', results),
+    ])
+
+
+def save_results(results, path):
+    '''
+    Save results as JSON.
+
+    :type results: dict
+    :type path: str
+    '''
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+
+
+def load_results(path):
+    '''
+    Load results saved as JSON.
+
+    :type path: str
+    :rtype: dict
+    '''
+    with open(path) as f:
+        return json.load(f, object_pairs_hook=OrderedDict)
+
+
+def compare_results(baseline, current, threshold=REGRESSION_THRESHOLD):
+    '''
+    Compare the results of benchmarks measured in both baseline and current.
+
+    :param baseline: Results to compare against, e.g. from the previous commit.
+    :type baseline: dict
+    :param current: Results to compare.
+    :type current: dict
+    :param threshold: Proportion by which a metric must increase to regress.
+    :type threshold: float
+    :returns: Comparisons with the benchmark name, metric, baseline and
+        current values, their ratio and whether it is a regression.
+    :rtype: [dict]
+    '''
+    comparisons = []
+    baseline = baseline['benchmarks']
+    for name, result in current['benchmarks'].items():
+        if name not in baseline:
+            continue
+        for metric in (TIME_METRIC, MEMORY_METRIC, SIZE_METRIC):
+            before = baseline[name].get(metric)
+            after = result.get(metric)
+            if before is None or after is None:
+                continue
+            ratio = after / float(before) if before else (1.0 if not after else float('inf'))
+            comparisons.append(OrderedDict([
+                ('name', name),
+                ('metric', metric),
+                ('baseline', before),
+                ('current', after),
+                ('ratio', ratio),
+                ('regression', ratio > 1 + threshold),
+            ]))
+    return comparisons
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+# vim:et:ft=python:nowrap:sts=4:sw=4:ts=4
+##############################################################################
+
+'''
+Flight Data Analyzer: Benchmarks: Downcast
+
+Benchmarks of writing and reading derived parameters with and without
+downcasting by downcast policies. The size of the HDF file written is recorded
+alongside the time.
+'''
+
+##############################################################################
+# Imports
+
+
+import os
+
+from hdfaccess.file import hdf_file
+
+from analysis_engine.downcast import downcast_param, get_downcast_policy
+from analysis_engine.synthetic_flight import SyntheticFlight
+
+from benchmarks.core import Benchmark, register
+from benchmarks.flight_benchmarks import temp_path
+
+
+##############################################################################
+# Globals
+
+
+# Downcast policies by benchmark name. None uses settings.DOWNCAST_POLICIES
+# when the benchmark is run.
+BENCHMARK_POLICIES = {
+    'hdf_defaults': [],
+    'policies': None,
+    'downcast': [
+        {'name': 'multistate', 'multistate': True, 'dtype': 'integer'},
+        {'name': 'float32', 'dtype': 'float32'},
+    ],
+}
+
+# Keyword arguments of the synthetic flight whose parameters are written,
+# which include multistates and parameters from 0.25Hz to 16Hz.
+SYNTHETIC_FLIGHT = dict(duration=4 * 60 * 60, parameter_count=300, multistate_count=50,
+                        mask_density=0.001)
+
+_PARAMETERS = None
+
+
+##############################################################################
+# Functions
+
+
+def synthetic_parameters():
+    '''
+    :returns: Parameters of the synthetic flight, generated once.
+    :rtype: [Parameter]
+    '''
+    global _PARAMETERS
+    if _PARAMETERS is None:
+        _PARAMETERS = list(SyntheticFlight(**SYNTHETIC_FLIGHT).parameters())
+    return _PARAMETERS
+
+
+def write_parameters(path, parameters, policies):
+    '''
+    Write parameters to a new HDF file as derived parameters are written.
+
+    :type path: str
+    :type parameters: [Parameter]
+    :param policies: Keyword arguments of each DowncastPolicy, or None for
+        settings.DOWNCAST_POLICIES.
+    :type policies: [dict] or None
+    '''
+    if os.path.exists(path):
+        os.remove(path)
+    with hdf_file(path, create=True) as hdf:
+        for param in parameters:
+            policy = get_downcast_policy(param, policies=policies)
+            hdf.set_param(downcast_param(param, policy=policy))
+
+
+def read_parameters(path):
+    '''
+    Read every parameter from an HDF file.
+
+    :type path: str
+    '''
+    with hdf_file(path) as hdf:
+        for name in hdf.keys():
+            hdf.get_param(name)
+
+
+def downcast_setups(name, policies):
+    '''
+    Create the setup functions of the write and read benchmarks.
+
+    :param name: Name of the downcast policies.
+    :type name: str
+    :param policies: Keyword arguments of each DowncastPolicy, or None for
+        settings.DOWNCAST_POLICIES.
+    :type policies: [dict] or None
+    :returns: Setup of the write benchmark, setup of the read benchmark and
+        a function returning the size of the file written.
+    :rtype: (callable, callable, callable)
+    '''
+    path = temp_path('downcast_%s.hdf5' % name)
+
+    def write_setup():
+        parameters = synthetic_parameters()
+        return lambda: write_parameters(path, parameters, policies)
+
+    def read_setup():
+        if not os.path.exists(path):
+            write_parameters(path, synthetic_parameters(), policies)
+        return lambda: read_parameters(path)
+
+    def size():
+        return os.path.getsize(path)
+
+    return write_setup, read_setup, size
+
+
+##############################################################################
+# Benchmarks
+
+
+for _name, _policies in sorted(BENCHMARK_POLICIES.items()):
+    _write_setup, _read_setup, _size = downcast_setups(_name, _policies)
+    register(Benchmark('downcast.write_%s' % _name, 'downcast', _write_setup,
+                       repeat=3, size=_size))
+    register(Benchmark('downcast.read_%s' % _name, 'downcast', _read_setup,
+                       repeat=3, size=_size))
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+# vim:et:ft=python:nowrap:sts=4:sw=4:ts=4
+##############################################################################
+
+'''
+Flight Data Analyzer: Benchmarks: Flights
+
+End-to-end benchmarks of splitting data files into segments and processing
+flights from the HDF files in the test data.
+
+Each repeat processes a fresh copy of the HDF file within a temporary
+directory, as processing writes derived parameters and segments alongside
+the original.
+
+Scaling benchmarks process synthetic flights which are longer, recorded at
+higher sample rates or with more parameters than the test data.
+'''
+
+##############################################################################
+# Imports
+
+
+import atexit
+import logging
+import os
+import pytz
+import shutil
+import tempfile
+
+from datetime import datetime
+
+from analysis_engine import hooks, settings
+from analysis_engine.synthetic_flight import SyntheticFlight
+
+from benchmarks.core import Benchmark, benchmark, register
+from benchmarks.library_benchmarks import TEST_DATA_PATH
+
+
+##############################################################################
+# Globals
+
+
+# Aircraft info of the specimen flight.
+SPECIMEN_AIRCRAFT_INFO = {
+    'Tail Number': 'G-ABCD',
+    'Model': 'B737-301',
+    'Series': 'B737-300',
+    'Family': 'B737 Classic',
+    'Manufacturer': 'Boeing',
+    'Precise Positioning': False,
+    'Frame': '737-5',
+    'Frame Qualifier': 'Altitude_Radio_EFIS',
+}
+
+# Aircraft info of synthetic flights, which are recorded by a twin engine
+# aeroplane.
+SYNTHETIC_AIRCRAFT_INFO = dict(SPECIMEN_AIRCRAFT_INFO, **{
+    'Tail Number': 'G-SYNT',
+    'Aircraft Type': 'aeroplane',
+})
+
+# Synthetic flight keyword arguments by benchmark name.
+SYNTHETIC_FLIGHTS = {
+    'long_haul': dict(duration=16 * 60 * 60, mask_density=0.001),
+    'arinc_767': dict(duration=4 * 60 * 60, frequency=16, arinc='767', mask_density=0.001),
+    'large_lfl': dict(duration=2 * 60 * 60, parameter_count=2000, multistate_count=200,
+                      mask_density=0.001),
+}
+
+_TEMP_DIR = None
+
+
+##############################################################################
+# Functions
+
+
+def prepare():
+    '''
+    Use the file API handler and disable hooks and logging below warnings so
+    that flights are processed offline.
+    '''
+    settings.API_HANDLER = 'analysis_engine.api_handler.FileHandler'
+    hooks.PRE_FILE_ANALYSIS = None
+    hooks.PRE_FLIGHT_ANALYSIS = None
+    logging.disable(logging.INFO)
+
+
+def temp_path(name):
+    '''
+    :param name: File name within the temporary directory, which is removed
+        on exit.
+    :type name: str
+    :rtype: str
+    '''
+    global _TEMP_DIR
+    if _TEMP_DIR is None:
+        _TEMP_DIR = tempfile.mkdtemp(prefix='benchmarks_')
+        atexit.register(shutil.rmtree, _TEMP_DIR, True)
+    return os.path.join(_TEMP_DIR, name)
+
+
+def copy_test_data(name):
+    '''
+    Copy an HDF file from the test data into the temporary directory, which is
+    removed on exit.
+
+    :param name: File name within the test data.
+    :type name: str
+    :returns: Path of the copy.
+    :rtype: str
+    '''
+    path = temp_path(name)
+    shutil.copy(os.path.join(TEST_DATA_PATH, name), path)
+    return path
+
+
+##############################################################################
+# Benchmarks
+
+
+@benchmark('flight', repeat=3)
+def process_specimen_flight():
+    from analysis_engine.process_flight import process_flight
+    prepare()
+    segment_info = {
+        'File': copy_test_data('Specimen_Flight.hdf5'),
+        'Segment Type': 'START_AND_STOP',
+        'Start Datetime': datetime(2012, 12, 30, 19, 9, 6, tzinfo=pytz.utc),
+    }
+    return lambda: process_flight(segment_info, SPECIMEN_AIRCRAFT_INFO['Tail Number'],
+                                  aircraft_info=SPECIMEN_AIRCRAFT_INFO)
+
+
+@benchmark('flight', repeat=3)
+def split_hdf_to_segments():
+    from analysis_engine.split_hdf_to_segments import split_hdf_to_segments
+    prepare()
+    hdf_path = copy_test_data('split_segments_1.hdf5')
+    return lambda: split_hdf_to_segments(hdf_path, {}, fallback_dt=datetime(2012, 12, 30, tzinfo=pytz.utc),
+                                         dest_dir=os.path.dirname(hdf_path))
+
+
+@benchmark('flight', repeat=1)
+def split_synthetic_flights():
+    from analysis_engine.split_hdf_to_segments import split_hdf_to_segments
+    prepare()
+    flight = SyntheticFlight(duration=4 * 60 * 60, flights=3, mask_density=0.001)
+    hdf_path = flight.write(temp_path('synthetic_flights.hdf5'))
+    return lambda: split_hdf_to_segments(hdf_path, {}, fallback_dt=flight.start_datetime,
+                                         dest_dir=os.path.dirname(hdf_path))
+
+
+def process_synthetic_flight_setup(name, kwargs):
+    '''
+    Create a setup function which writes a synthetic flight and returns a
+    function processing it.
+
+    :param name: Name of the synthetic flight.
+    :type name: str
+    :param kwargs: Keyword arguments of SyntheticFlight.
+    :type kwargs: dict
+    :rtype: callable
+    '''
+    def setup():
+        from analysis_engine.process_flight import process_flight
+        prepare()
+        flight = SyntheticFlight(**kwargs)
+        segment_info = flight.segment_info(flight.write(temp_path('synthetic_%s.hdf5' % name)))
+        return lambda: process_flight(segment_info, SYNTHETIC_AIRCRAFT_INFO['Tail Number'],
+                                      aircraft_info=dict(SYNTHETIC_AIRCRAFT_INFO))
+    return setup
+
+
+for _name, _kwargs in sorted(SYNTHETIC_FLIGHTS.items()):
+    register(Benchmark('flight.process_synthetic_%s' % _name, 'flight',
+                       process_synthetic_flight_setup(_name, _kwargs), repeat=1))
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+# vim:et:ft=python:nowrap:sts=4:sw=4:ts=4
+##############################################################################
+
+'''
+Flight Data Analyzer: Benchmarks: Imports
+
+Benchmarks of the time to import the core modules in a new interpreter, and
+a report of the import time of every module they import, parsed from
+python -X importtime:
+
+python -m benchmarks.import_benchmarks analysis_engine.split_hdf_to_segments
+
+The core modules must not import the heavy modules in DEFERRED_MODULES,
+which are imported within the functions which use them. The report exits
+with status 1 if any core module does.
+'''
+
+##############################################################################
+# Imports
+
+
+from __future__ import print_function
+
+import argparse
+import os
+import subprocess
+import sys
+
+from collections import OrderedDict
+
+from benchmarks.core import Benchmark, register
+
+
+##############################################################################
+# Globals
+
+
+# Modules used by tools which do not derive nodes, e.g. segment splitting and
+# loading process flight results.
+CORE_MODULES = [
+    'analysis_engine.json_tools',
+    'analysis_engine.library',
+    'analysis_engine.node',
+    'analysis_engine.split_hdf_to_segments',
+]
+
+# Modules which the core modules must not import.
+DEFERRED_MODULES = [
+    'networkx',
+    'pkg_resources',
+    'scipy.interpolate',
+    'scipy.ndimage',
+    'scipy.optimize',
+    'scipy.signal',
+]
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+##############################################################################
+# Functions
+
+
+def parse_import_times(output):
+    '''
+    Parse the output of python -X importtime.
+
+    :param output: Standard error of the interpreter.
+    :type output: str
+    :returns: Self and cumulative import times in microseconds and the depth
+        within the import tree of each module by name, in import order.
+    :rtype: OrderedDict
+    '''
+    times = OrderedDict()
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_time, cumulative, name = line[len('import time:'):].split('|')
+        if not self_time.strip().isdigit():
+            # header
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        times[name.strip()] = (int(self_time), int(cumulative), depth)
+    return times
+
+
+def import_times(module):
+    '''
+    Import a module within a new interpreter.
+
+    :param module: Module name.
+    :type module: str
+    :returns: Import times of every module imported, see parse_import_times.
+    :rtype: OrderedDict
+    :raises subprocess.CalledProcessError: If the module cannot be imported.
+    '''
+    process = subprocess.Popen(
+        [sys.executable, '-X', 'importtime', '-c', 'import %s' % module],
+        cwd=_ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True)
+    _, output = process.communicate()
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, module, output=output)
+    return parse_import_times(output)
+
+
+def deferred_imports(times, deferred=DEFERRED_MODULES):
+    '''
+    :param times: Import times, see import_times.
+    :type times: dict
+    :param deferred: Names of modules which should not be imported.
+    :type deferred: [str]
+    :returns: Names of the deferred modules which were imported.
+    :rtype: [str]
+    '''
+    return [name for name in deferred if name in times]
+
+
+def import_setup(module):
+    '''
+    :param module: Module name.
+    :type module: str
+    :returns: Setup of a benchmark which imports the module within a new
+        interpreter.
+    :rtype: callable
+    '''
+    command = [sys.executable, '-c', 'import %s' % module]
+    return lambda: lambda: subprocess.check_call(command, cwd=_ROOT)
+
+
+def print_report(module, times, limit=20):
+    '''
+    Print the modules with the largest cumulative import times.
+
+    :type module: str
+    :param times: Import times, see import_times.
+    :type times: dict
+    :param limit: Number of modules to print.
+    :type limit: int
+    '''
+    total = times[module][1] if module in times else 0
+    print('%s: %.3fs' % (module, total / 1e6))
+    print('%12s %12s  %s' % ('self', 'cumulative', 'module'))
+    ranked = sorted(times.items(), key=lambda item: item[1][1], reverse=True)
+    for name, (self_time, cumulative, depth) in ranked[:limit]:
+        print('%11.3fs %11.3fs  %s%s' % (self_time / 1e6, cumulative / 1e6,
+                                         '  ' * depth, name))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Report the import time of modules.')
+    parser.add_argument('modules', nargs='*', help='Module names, defaults to the core modules.')
+    parser.add_argument('-n', '--limit', type=int, default=20,
+                        help='Number of modules to report (default: %(default)s).')
+    args = parser.parse_args(argv)
+    status = 0
+    for module in args.modules or CORE_MODULES:
+        times = import_times(module)
+        print_report(module, times, limit=args.limit)
+        deferred = deferred_imports(times)
+        if deferred and module in CORE_MODULES:
+            print('Imports deferred modules: %s' % ', '.join(deferred))
+            status = 1
+        print()
+    return status
+
+
+##############################################################################
+# Benchmarks
+
+
+for _module in CORE_MODULES:
+    register(Benchmark('import.%s' % _module.split('.')[-1], 'import',
+                       import_setup(_module), repeat=5, memory=False))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
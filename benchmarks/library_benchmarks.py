@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+# vim:et:ft=python:nowrap:sts=4:sw=4:ts=4
+##############################################################################
+
+'''
+Flight Data Analyzer: Benchmarks: Library
+
+Micro-benchmarks of the library functions most frequently called while
+processing a flight.
+'''
+
+##############################################################################
+# Imports
+
+
+import numpy as np
+import os
+
+from analysis_engine import library
+from analysis_engine.node import load
+
+from benchmarks.core import benchmark
+
+
+##############################################################################
+# Globals
+
+
+TEST_DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              'tests', 'test_data')
+
+# Four hour flight sampled at 8Hz.
+FREQUENCY = 8.0
+DURATION = 4 * 60 * 60
+
+
+##############################################################################
+# Data
+
+
+def altitude(frequency=FREQUENCY, duration=DURATION, masked=0.01, seed=0):
+    '''
+    Synthetic altitude profile of a climb, cruise and descent with noise and
+    short masked sections.
+
+    :param frequency: Sample rate in Hz.
+    :type frequency: float
+    :param duration: Duration in seconds.
+    :type duration: int
+    :param masked: Proportion of samples within masked sections.
+    :type masked: float
+    :param seed: Random seed so that every run uses the same data.
+    :type seed: int
+    :rtype: np.ma.array
+    '''
+    random = np.random.RandomState(seed)
+    size = int(frequency * duration)
+    profile = np.interp(np.arange(size), [0, size * 0.2, size * 0.8, size], [0, 35000, 35000, 0])
+    array = np.ma.array(profile + random.normal(0, 20, size))
+    # Mask sections of up to two seconds.
+    for start in random.randint(0, size, int(size * masked / frequency)):
+        array[start:start + random.randint(1, int(frequency * 2))] = np.ma.masked
+    return array
+
+
+def fixture(name):
+    '''
+    Load a node from the test data.
+
+    :type name: str
+    :rtype: Node
+    '''
+    return load(os.path.join(TEST_DATA_PATH, name))
+
+
+##############################################################################
+# Benchmarks
+
+
+@benchmark('library')
+def align_args():
+    array = altitude(frequency=1)
+    return lambda: library.align_args(array, 1, 0.25, FREQUENCY, 0)
+
+
+@benchmark('library')
+def align_args_downsample():
+    array = altitude()
+    return lambda: library.align_args(array, FREQUENCY, 0.1, 1, 0.5)
+
+
+@benchmark('library')
+def repair_mask():
+    array = altitude()
+    return lambda: library.repair_mask(array, frequency=FREQUENCY, copy=True,
+                                       raise_duration_exceedance=False)
+
+
+@benchmark('library', number=10)
+def index_at_value():
+    array = altitude()
+    _slice = slice(len(array) // 2, None)
+    return lambda: library.index_at_value(array, 1000, _slice=_slice)
+
+
+@benchmark('library')
+def indexes_at_values():
+    array = altitude()
+    slices = [slice(0, len(array) // 2), slice(len(array), len(array) // 2, -1)]
+    thresholds = np.arange(500, 10500, 500)
+    return lambda: library.indexes_at_values(array, thresholds, slices=slices)
+
+
+@benchmark('library')
+def hysteresis():
+    array = altitude()
+    return lambda: library.hysteresis(array, 100)
+
+
+@benchmark('library', number=10)
+def slices_above():
+    array = altitude()
+    return lambda: library.slices_above(array, 10000)
+
+
+@benchmark('library', number=10)
+def slices_between():
+    array = altitude()
+    return lambda: library.slices_between(array, 1000, 10000)
+
+
+@benchmark('library', number=10)
+def slices_from_to():
+    array = altitude()
+    return lambda: library.slices_from_to(array, 10000, 1000)
+
+
+@benchmark('library', number=100)
+def slices_and_or():
+    random = np.random.RandomState(0)
+    starts = np.sort(random.randint(0, 100000, 1000))
+    first = [slice(s, s + 50) for s in starts[::2]]
+    second = [slice(s, s + 80) for s in starts[1::2]]
+
+    def function():
+        library.slices_and(first, second)
+        library.slices_or(first, second)
+    return function
+
+
+@benchmark('library', number=100)
+def slices_remove_small_gaps():
+    starts = np.cumsum(np.random.RandomState(0).randint(20, 200, 1000))
+    slices = [slice(s, s + 15) for s in starts]
+    return lambda: library.slices_remove_small_gaps(slices, time_limit=10, hz=FREQUENCY)
+
+
+@benchmark('library')
+def second_window():
+    array = altitude(frequency=2)
+    return lambda: library.second_window(array, 2, 10)
+
+
+@benchmark('library')
+def integrate():
+    array = altitude()
+    return lambda: library.integrate(array, FREQUENCY)
+
+
+@benchmark('library')
+def repair_mask_fixture():
+    node = fixture('AltitudeAAL_AltitudeSTDSmoothed.nod')
+    return lambda: library.repair_mask(node.array, frequency=node.frequency, copy=True,
+                                       raise_duration_exceedance=False)
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# vim:et:ft=python:nowrap:sts=4:sw=4:ts=4
+##############################################################################
+
+'''
+Flight Data Analyzer: Benchmarks: Nodes
+
+Benchmarks of deriving individual nodes from the recorded flight data saved
+in the test data.
+'''
+
+##############################################################################
+# Imports
+
+
+import importlib
+
+from analysis_engine.node import Attribute
+
+from benchmarks.core import Benchmark, register
+from benchmarks.library_benchmarks import fixture
+
+
+##############################################################################
+# Globals
+
+
+AEROPLANE = Attribute('Aircraft Type', 'aeroplane')
+
+# Node class paths and their dependencies by name. Dependencies are either
+# the file name of a node saved in the test data or an Attribute. Missing
+# dependencies are passed as None.
+NODE_BENCHMARKS = [
+    ('analysis_engine.derived_parameters.AltitudeAAL', {
+        'Altitude Radio Offset Removed': 'AltitudeAAL_AltitudeRadio.nod',
+        'Altitude STD Smoothed': 'AltitudeAAL_AltitudeSTDSmoothed.nod',
+        'Fast': 'AltitudeAAL_Fast.nod',
+        'Aircraft Type': AEROPLANE,
+    }),
+    ('analysis_engine.derived_parameters.AltitudeSTDSmoothed', {
+        'Altitude STD': 'AltitudeSTDSmoothed_alt.nod',
+        'Frame': Attribute('Frame', 'ATR42_V2_Quad'),
+    }),
+    ('analysis_engine.flight_phase.Fast', {
+        'Airspeed': 'Fast_airspeed.nod',
+        'Aircraft Type': AEROPLANE,
+    }),
+    ('analysis_engine.flight_phase.ApproachAndLanding', {
+        'Aircraft Type': AEROPLANE,
+        'Altitude AAL For Flight Phases': 'ApproachAndLanding_alt_aal_1.nod',
+        'Level Flight': 'ApproachAndLanding_level_flights_1.nod',
+        'Landing': 'ApproachAndLanding_landings_1.nod',
+    }),
+    ('analysis_engine.key_point_values.AltitudeOvershootAtSuspectedLevelBust', {
+        'Altitude STD Smoothed': 'alt_std_smoothed_go_around.nod',
+        'Altitude AAL': 'alt_std_smoothed_go_around.nod',
+    }),
+]
+
+
+##############################################################################
+# Functions
+
+
+def import_node(path):
+    '''
+    :param path: Module path and class name of the node.
+    :type path: str
+    :rtype: class
+    '''
+    module_path, class_name = path.rsplit('.', 1)
+    return getattr(importlib.import_module(module_path), class_name)
+
+
+def derive_setup(path, dependencies):
+    '''
+    Create a setup function which loads the dependencies and returns a
+    function deriving the node with get_derived, including alignment.
+
+    :param path: Module path and class name of the node.
+    :type path: str
+    :param dependencies: Dependency test data file names or Attributes by name.
+    :type dependencies: dict
+    :rtype: callable
+    '''
+    def setup():
+        node_class = import_node(path)
+        loaded = {}
+        for name, dependency in dependencies.items():
+            loaded[name] = fixture(dependency) if isinstance(dependency, str) else dependency
+        args = [loaded.get(name) for name in node_class.get_dependency_names()]
+        return lambda: node_class().get_derived(args)
+    return setup
+
+
+def register_node_benchmarks(node_benchmarks=NODE_BENCHMARKS):
+    '''
+    Register a benchmark for each of the node benchmarks.
+
+    :param node_benchmarks: Node class paths and their dependencies.
+    :type node_benchmarks: [(str, dict)]
+    '''
+    for path, dependencies in node_benchmarks:
+        register(Benchmark('node.%s' % path.rsplit('.', 1)[1], 'node',
+                           derive_setup(path, dependencies), repeat=3))
+
+
+register_node_benchmarks()
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+# vim:et:ft=python:nowrap:sts=4:sw=4:ts=4
+##############################################################################
+
+'''
+Flight Data Analyzer: Airport Store: Tests
+'''
+
+##############################################################################
+# Imports
+
+import os
+import shutil
+import tempfile
+import unittest
+import yaml
+
+from analysis_engine import settings
+from analysis_engine.airport_store import AirportStore, chord_length, get_airport_store, unit_vectors
+
+
+##############################################################################
+# Test Cases
+
+
+class AirportStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        with open(settings.API_FILE_PATHS['airports'], 'rb') as f:
+            self.airports = yaml.load(f)
+        self.store = AirportStore(self.airports)
+
+    def test_unit_vectors(self):
+        vectors = unit_vectors([0, 90, 0], [0, 0, 90])
+        self.assertAlmostEqual(vectors[0][0], 1.0)
+        self.assertAlmostEqual(vectors[1][2], 1.0)
+        self.assertAlmostEqual(vectors[2][1], 1.0)
+
+    def test_chord_length(self):
+        self.assertEqual(chord_length(0), 0)
+        self.assertAlmostEqual(chord_length(6371000 * 3.141592653589793), 2.0)
+        self.assertAlmostEqual(chord_length(1e12), 2.0)
+
+    def test_get(self):
+        self.assertEqual(self.store.get(2456), self.airports[0])
+        self.assertEqual(self.store.get('KRS'), self.airports[0])
+        self.assertEqual(self.store.get('ENGM'), self.airports[1])
+        self.assertRaises(KeyError, self.store.get, 'XXXX')
+
+    def test_get_with_runways(self):
+        runways = [{'id': 1, 'airport': 2461, 'identifier': '01L'}]
+        store = AirportStore(self.airports, runways=runways)
+        self.assertEqual(store.get('OSL')['runways'], runways)
+        self.assertNotIn('runways', store.get('KRS'))
+        self.assertNotIn('runways', self.airports[1])
+
+    def test_within(self):
+        airports = self.store.within(58, 8)
+        self.assertEqual([a['id'] for a in airports], [2456, 2461])
+        self.assertEqual(airports[0]['distance'], 23253.447237062534)
+        self.assertEqual(airports[1]['distance'], 301363.618453967)
+        self.assertNotIn('distance', self.airports[0])
+        airports = self.store.within(58, 8, radius=100000)
+        self.assertEqual([a['id'] for a in airports], [2456])
+        self.assertEqual(self.store.within(58, 8, radius=1000), [])
+
+    def test_nearest(self):
+        airports = self.store.nearest(60, 11)
+        self.assertEqual(len(airports), 1)
+        self.assertEqual(airports[0]['id'], 2461)
+        self.assertEqual(airports[0]['distance'], 22267.45203750386)
+        airports = self.store.nearest(60, 11, k=5)
+        self.assertEqual([a['id'] for a in airports], [2461, 2456])
+
+    def test_empty(self):
+        store = AirportStore([])
+        self.assertEqual(store.within(58, 8), [])
+        self.assertEqual(store.nearest(58, 8), [])
+
+
+class GetAirportStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tempdir, 'airports.yaml')
+        shutil.copy(settings.API_FILE_PATHS['airports'], self.path)
+        self.loads = []
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def load(self, path):
+        self.loads.append(path)
+        with open(path, 'rb') as f:
+            return yaml.load(f)
+
+    def test_get_airport_store(self):
+        store = get_airport_store(self.load, self.path)
+        self.assertEqual(len(store), 2)
+        self.assertIs(get_airport_store(self.load, self.path), store)
+        self.assertEqual(self.loads, [self.path])
+        with open(self.path, 'w') as f:
+            f.write('---\n  - {id: 1, latitude: 0, longitude: 0, code: {icao: XXXX}}\n')
+        store = get_airport_store(self.load, self.path)
+        self.assertEqual(len(store), 1)
+        self.assertEqual(self.loads, [self.path, self.path])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,12 +10,17 @@ Flight Data Analyzer: API Handler: Tests
 # Imports
 
 import copy
+import mock
+import shutil
+import tempfile
 import unittest
 import yaml
 
 from flightdatautilities import api
 
 from analysis_engine import settings
+from analysis_engine.api_handler import CachingHandler, CachingHTTPHandler, DiskCache, PooledHTTPHandler, TTLCache
+from analysis_engine.test_utils import StubAPIServer
 
 
 ##############################################################################
@@ -89,6 +94,113 @@ class HTTPHandlerTest(unittest.TestCase):
         pass
 
 
+class TTLCacheTest(unittest.TestCase):
+
+    def test_lru(self):
+        cache = TTLCache(2, 60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.set('c', 3)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertRaises(KeyError, cache.get, 'b')
+
+    def test_ttl(self):
+        now = [1000.0]
+        cache = TTLCache(10, 60, timer=lambda: now[0])
+        cache.set('a', 1)
+        now[0] += 59
+        self.assertEqual(cache.get('a'), 1)
+        now[0] += 2
+        self.assertRaises(KeyError, cache.get, 'a')
+        self.assertEqual(len(cache), 0)
+
+
+class DiskCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_shared(self):
+        now = [1000.0]
+        cache = DiskCache(self.tempdir, 60, timer=lambda: now[0])
+        self.assertRaises(KeyError, cache.get, ('get_airport', 'KRS'))
+        cache.set(('get_airport', 'KRS'), {'id': 2456})
+        other = DiskCache(self.tempdir, 60, timer=lambda: now[0])
+        self.assertEqual(other.get(('get_airport', 'KRS')), {'id': 2456})
+        now[0] += 61
+        self.assertRaises(KeyError, other.get, ('get_airport', 'KRS'))
+
+
+class CachingHandlerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.handler = mock.Mock()
+        self.handler.get_airport.return_value = {'id': 2456}
+        self.handler.get_nearest_airport.return_value = [{'id': 2456, 'distance': 23253.4}]
+        self.cache = CachingHandler(self.handler, memory=TTLCache(100, 60))
+
+    def test_get_airport(self):
+        airport = self.cache.get_airport('KRS')
+        self.assertEqual(airport, {'id': 2456})
+        airport['distance'] = 1.0
+        self.assertEqual(self.cache.get_airport('KRS'), {'id': 2456})
+        self.handler.get_airport.assert_called_once_with('KRS')
+
+    def test_get_nearest_airport_quantised(self):
+        self.cache.get_nearest_airport(58.00001, 8.00004)
+        self.cache.get_nearest_airport(57.99996, 7.99999)
+        self.handler.get_nearest_airport.assert_called_once_with(58.0, 8.0)
+        self.cache.get_nearest_airport(58.001, 8.0)
+        self.assertEqual(self.handler.get_nearest_airport.call_count, 2)
+
+    def test_errors_not_cached(self):
+        self.handler.get_aircraft.side_effect = api.NotFoundError('Not found.')
+        self.assertRaises(api.NotFoundError, self.cache.get_aircraft, 'G-ABCD')
+        self.assertRaises(api.NotFoundError, self.cache.get_aircraft, 'G-ABCD')
+        self.assertEqual(self.handler.get_aircraft.call_count, 2)
+
+
+class CachingHTTPHandlerTest(unittest.TestCase):
+
+    def setUp(self):
+        responses = {
+            '/api/aircraft/g-abcd/': {'tail_number': 'G-ABCD'},
+            '/api/airport/krs/': {'id': 2456},
+            '/api/airport/nearest/': [{'id': 2456, 'distance': 23253.4}],
+        }
+        self.server = StubAPIServer(responses).__enter__()
+        patcher = mock.patch.object(settings, 'API_HTTP_BASE_URL', self.server.url)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.server.__exit__)
+        CachingHTTPHandler._memory = None
+
+    def test_pooled_request(self):
+        handler = PooledHTTPHandler()
+        self.assertEqual(handler.get_airport('KRS'), {'id': 2456})
+        self.assertEqual(handler.get_aircraft('G-ABCD'), {'tail_number': 'G-ABCD'})
+        self.assertRaises(api.NotFoundError, handler.get_airport, 'XXX')
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_cached_requests(self):
+        handler = CachingHTTPHandler()
+        for _ in range(3):
+            self.assertEqual(handler.get_airport('KRS'), {'id': 2456})
+            self.assertEqual(CachingHTTPHandler().get_nearest_airport(58.0001, 8.0001),
+                             [{'id': 2456, 'distance': 23253.4}])
+        self.assertEqual(self.server.requests, [
+            '/api/airport/krs/',
+            '/api/airport/nearest/?all=1&ll=58.000%2C8.000',
+        ])
+
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -0,0 +1,140 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from collections import OrderedDict
+
+from benchmarks import core
+from benchmarks.import_benchmarks import (
+    deferred_imports,
+    import_times,
+    parse_import_times,
+)
+
+
+class TestBenchmark(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.setups = []
+
+        def setup():
+            self.setups.append(1)
+            return lambda: self.calls.append(1)
+        self.benchmark = core.Benchmark('test.example', 'test', setup, number=3, repeat=2)
+
+    def test_measure(self):
+        result = self.benchmark.measure()
+        self.assertEqual(len(self.setups), 3)
+        self.assertEqual(len(self.calls), 7)
+        self.assertEqual(result['group'], 'test')
+        self.assertEqual(len(result['times']), 2)
+        self.assertEqual(result['min'], min(result['times']))
+        self.assertIn('peak_memory', result)
+
+    def test_measure_without_memory(self):
+        result = self.benchmark.measure(repeat=1, memory=False)
+        self.assertEqual(len(self.setups), 1)
+        self.assertEqual(len(self.calls), 3)
+        self.assertNotIn('peak_memory', result)
+
+    def test_measure_size(self):
+        self.benchmark.size = lambda: len(self.calls)
+        result = self.benchmark.measure(repeat=1, memory=False)
+        self.assertEqual(result['size'], 3)
+
+    def test_peak_memory(self):
+        self.assertGreaterEqual(core.peak_memory(lambda: bytearray(10 ** 6)), 10 ** 6)
+
+
+class TestRegistry(unittest.TestCase):
+    def setUp(self):
+        self.benchmarks = OrderedDict()
+        for name, group in (('library.slices_and', 'library'),
+                            ('library.repair_mask', 'library'),
+                            ('node.Fast', 'node')):
+            self.benchmarks[name] = core.Benchmark(name, group, None)
+
+    def test_register(self):
+        bench = core.Benchmark('test.register', 'test', None)
+        core.register(bench)
+        try:
+            self.assertIs(core.BENCHMARKS['test.register'], bench)
+            self.assertRaises(ValueError, core.register, bench)
+        finally:
+            del core.BENCHMARKS['test.register']
+
+    def test_select_benchmarks(self):
+        select = lambda *args: [b.name for b in core.select_benchmarks(*args, benchmarks=self.benchmarks)]
+        self.assertEqual(select(), list(self.benchmarks))
+        self.assertEqual(select(['library.slices_*']), ['library.slices_and'])
+        self.assertEqual(select(None, ['node']), ['node.Fast'])
+        self.assertEqual(select(['*.slices_and'], ['node']), [])
+
+
+class TestResults(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_save_and_load_results(self):
+        results = core.run_benchmarks([core.Benchmark('test.noop', 'test', lambda: lambda: None, repeat=1)])
+        self.assertEqual(list(results['benchmarks']), ['test.noop'])
+        path = os.path.join(self.tempdir, 'results.json')
+        core.save_results(results, path)
+        self.assertEqual(core.load_results(path), results)
+
+    def test_run_benchmarks_failure(self):
+        def setup():
+            raise ValueError()
+        results = core.run_benchmarks([core.Benchmark('test.failure', 'test', setup)])
+        self.assertEqual(results['benchmarks'], {})
+
+    def test_compare_results(self):
+        baseline = {'benchmarks': {
+            'a': {'min': 1.0, 'peak_memory': 100},
+            'b': {'min': 2.0},
+            'c': {'min': 1.0},
+        }}
+        current = {'benchmarks': {
+            'a': {'min': 1.05, 'peak_memory': 200},
+            'b': {'min': 2.5, 'peak_memory': 100},
+            'd': {'min': 1.0},
+        }}
+        comparisons = core.compare_results(baseline, current, threshold=0.1)
+        self.assertEqual([(c['name'], c['metric'], c['ratio'], c['regression']) for c in comparisons],
+                         [('a', 'min', 1.05, False), ('a', 'peak_memory', 2.0, True), ('b', 'min', 1.25, True)])
+        comparisons = core.compare_results(baseline, current, threshold=0.01)
+        self.assertTrue(comparisons[0]['regression'])
+
+
+class TestImportTimes(unittest.TestCase):
+    def test_parse_import_times(self):
+        times = parse_import_times(
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       120 |        120 |     posixpath\n'
+            'import time:       300 |        420 |   os\n'
+            'other output\n'
+            'import time:        50 |        470 | example\n')
+        self.assertEqual(list(times.items()), [
+            ('posixpath', (120, 120, 2)),
+            ('os', (300, 420, 1)),
+            ('example', (50, 470, 0)),
+        ])
+        self.assertEqual(deferred_imports(times, ['os', 'scipy.signal']), ['os'])
+
+    def test_import_times(self):
+        times = import_times('json')
+        self.assertIn('json', times)
+        self.assertGreaterEqual(times['json'][1], times['json'][0])
+
+    def test_core_modules(self):
+        # Heavy modules are imported within the functions which use them.
+        for module in ('analysis_engine.json_tools', 'analysis_engine.split_hdf_to_segments'):
+            self.assertEqual(deferred_imports(import_times(module)), [], msg=module)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,7 @@ from __future__ import print_function
 import importlib.machinery
 import os
 import networkx as nx
+import numpy as np
 import six
 import unittest
 import yaml
@@ -11,15 +12,22 @@ from collections.abc import Iterable
 
 from datetime import datetime
 
-from analysis_engine.node import (DerivedParameterNode, Node, NodeManager, P)
+from analysis_engine.node import (DerivedParameterNode, FlightPhaseNode, Node, NodeManager, NodeRegistry, P)
 from analysis_engine.dependency_graph import (
+    CALCULATE_NODE_LAST,
     CircularDependency,
+    FlightGraph,
     any_predecessors_in_requested,
+    dependencies3,
+    dependencies4,
     dependency_order,
+    get_static_graph,
     graph_nodes,
     graph_adjacencies,
     indent_tree,
+    ordered_successors,
     process_order,
+    transient_parameters,
 )
 from analysis_engine.utils import get_derived_nodes
 from analysis_engine import settings
@@ -374,6 +382,61 @@ Node: Start Datetime 	Pre: [] 	Succ: [] 	Neighbors: [] 	Edges: []
 
         # try a bigger cyclic dependency on top of the above one
 
+    def test_dependencies4_matches_dependencies3(self):
+        lfl_params = ['Airspeed', 'Gear (L) Down', 'Gear (L) Red Warning']
+        derived = get_derived_nodes([import_module('sample_circular_dependency_nodes')])
+        segment_info = {
+            'Start Datetime': datetime.now(),
+            'Segment Type': 'GROUND_ONLY',
+        }
+        for requested in (['Airspeed At Gear Down Selected'],
+                          sorted(derived),
+                          ['Gear Down Selected', 'Gear Down']):
+            mgr = NodeManager(segment_info, 10, lfl_params, requested, [],
+                              derived, {}, {})
+            gr = graph_nodes(mgr)
+            self.assertEqual(dependencies4(gr, 'root', mgr)[0],
+                             dependencies3(gr, 'root', mgr)[0])
+        mgr = NodeManager(segment_info, 10, [], ['Gear Down'], [], derived, {}, {})
+        order, tree_path = dependencies4(graph_nodes(mgr), 'root', mgr)
+        self.assertEqual(order, ['root'])
+        self.assertIn(['root', 'Gear Down', 'Gear Down Selected', 'Gear Down', 'CIRCULAR'], tree_path)
+        self.assertRaises(CircularDependency, dependencies4, graph_nodes(mgr),
+                          'root', mgr, raise_cir_dep=True)
+
+    def test_dependencies4_deep_tree(self):
+        # deeper than the recursion limit
+        derived_nodes = {'P%d' % n: MockParam(dependencies=['P%d' % (n + 1)])
+                         for n in range(5000)}
+        mgr = NodeManager({'Start Datetime': datetime.now()}, 10, ['P5000'],
+                          ['P0'], [], derived_nodes, {}, {})
+        order = dependencies4(graph_nodes(mgr), 'root', mgr)[0]
+        self.assertEqual(order, ['P%d' % n for n in range(5000, -1, -1)] + ['root'])
+
+    def test_calculate_node_last(self):
+        requested = CALCULATE_NODE_LAST + ['P8', 'P4']
+        derived_nodes = dict(self.derived_nodes)
+        derived_nodes.update({name: MockParam(dependencies=['Raw1']) for name in CALCULATE_NODE_LAST})
+        mgr = NodeManager({'Start Datetime': datetime.now()}, 10, self.lfl_params,
+                          requested, [], derived_nodes, {}, {})
+        order = dependencies4(graph_nodes(mgr), 'root', mgr)[0]
+        self.assertEqual(order[-len(CALCULATE_NODE_LAST) - 1:-1], CALCULATE_NODE_LAST)
+
+    def test_calculate_node_last_not_first(self):
+        # Nodes are only moved to the end when they would be traversed first.
+        requested = ['P8'] + CALCULATE_NODE_LAST + ['P4']
+        derived_nodes = dict(self.derived_nodes)
+        derived_nodes.update({name: MockParam(dependencies=['Raw1']) for name in CALCULATE_NODE_LAST})
+        mgr = NodeManager({'Start Datetime': datetime.now()}, 10, self.lfl_params,
+                          requested, [], derived_nodes, {}, {})
+        gr = graph_nodes(mgr)
+        self.assertEqual(ordered_successors(gr, 'root'), requested)
+        graph = FlightGraph(get_static_graph(derived_nodes), mgr)
+        self.assertEqual(graph.ordered_successors('root'), requested)
+        mgr.requested = CALCULATE_NODE_LAST + ['P8', 'P4']
+        graph = FlightGraph(get_static_graph(derived_nodes), mgr)
+        self.assertEqual(graph.ordered_successors('root'), ['P8', 'P4'] + CALCULATE_NODE_LAST)
+
     def _get_dependency_order(self, requested, aircraft_info, lfl_params,
                               draw=False, raise_cir_dep=True, segment_info={}):
         #derived_nodes = get_derived_nodes(settings.NODE_MODULES)
@@ -625,6 +688,57 @@ Node: Start Datetime 	Pre: [] 	Succ: [] 	Neighbors: [] 	Edges: []
 
 
 
+class TestStaticGraph(unittest.TestCase):
+    def setUp(self):
+        self.registry = NodeRegistry(classes={
+            'P4': MockParam(dependencies=['Raw1', 'Raw2']),
+            'P5': MockParam(dependencies=['Raw3', 'P4']),
+            'P6': MockParam(dependencies=['P5', 'P4']),
+        })
+
+    def test_static_graph(self):
+        graph = get_static_graph(self.registry)
+        self.assertIs(get_static_graph(self.registry), graph)
+        self.assertEqual(graph.names, ['P4', 'P5', 'P6', 'Raw1', 'Raw2', 'Raw3'])
+        self.assertEqual(graph.derived_count, 3)
+        self.assertEqual(graph.dependencies(2), [1, 0])
+        recorded = np.zeros(6, dtype=bool)
+        self.assertEqual(graph.first_dependent(0, recorded), 1)
+        recorded[1] = True
+        self.assertEqual(graph.first_dependent(0, recorded), 2)
+        self.assertEqual(graph.first_dependent(2, recorded), None)
+        self.assertEqual(graph.node_types, ['DerivedParameterNode'] * 3)
+
+    def test_flight_graph(self):
+        mgr = NodeManager({'Start Datetime': datetime.now()}, 10,
+                          ['Raw1', 'Raw2', 'Raw3'], ['P4', 'P5'], [],
+                          self.registry, {}, {})
+        graph = FlightGraph(get_static_graph(self.registry), mgr)
+        self.assertEqual(graph.ordered_successors('root'), ['P5'])
+        self.assertEqual(graph.ordered_successors('P5'), ['Raw3', 'P4'])
+        self.assertEqual(graph.strongly_connected_components()[-1], {'root'})
+        # P4 is linked to root as the recorded P5 does not depend on it.
+        mgr.hdf_keys.append('P5')
+        graph = FlightGraph(get_static_graph(self.registry), mgr)
+        self.assertEqual(graph.ordered_successors('root'), ['P4', 'P5'])
+        self.assertEqual(graph.ordered_successors('P5'), [])
+        self.assertEqual(graph.ordered_successors('root'),
+                         list(graph_nodes(mgr).successors('root')))
+
+    def test_dependency_order(self):
+        # The flight graph orders nodes as the graph of all nodes.
+        derived = get_derived_nodes([import_module('sample_circular_dependency_nodes')])
+        lfl_params = ['Airspeed', 'Gear (L) Down', 'Gear (L) Red Warning']
+        for requested in (['Airspeed At Gear Down Selected'], sorted(derived)):
+            mgr = NodeManager({'Start Datetime': datetime.now()}, 10, lfl_params,
+                              requested, [], derived, {}, {})
+            order, gr_st = dependency_order(mgr, draw=False)
+            _, expected_gr_st, expected_order = process_order(graph_nodes(mgr), mgr)
+            self.assertEqual(order, expected_order)
+            self.assertEqual(dict(gr_st.nodes(data=True)), dict(expected_gr_st.nodes(data=True)))
+            self.assertEqual(sorted(gr_st.edges()), sorted(expected_gr_st.edges()))
+
+
 class TestGraphAdjacencies(unittest.TestCase):
     def test_graph_adjacencies(self):
         g = nx.DiGraph()
@@ -701,6 +815,44 @@ class TestGraphAdjacencies(unittest.TestCase):
         self.assertEqual(list(flatten(exp)), list(flatten(res)))
 
 
+class TestTransientParameters(unittest.TestCase):
+    def setUp(self):
+        class Intermediate(DerivedParameterNode):
+            pass
+
+        class Phase(FlightPhaseNode):
+            pass
+
+        self.graph = nx.DiGraph()
+        self.graph.add_edges_from([
+            ('root', 'Top'), ('root', 'Phase For Flight Phases'),
+            ('Top', 'Altitude For Flight Phases'), ('Top', 'Heading'),
+            ('Other', 'Altitude For Flight Phases'),
+            ('Altitude For Flight Phases', 'Altitude'),
+            ('Phase For Flight Phases', 'Altitude'),
+        ])
+        self.node_mgr = types.SimpleNamespace(
+            hdf_keys=['Altitude'],
+            derived_nodes={
+                'Top': Intermediate,
+                'Other': Intermediate,
+                'Heading': Intermediate,
+                'Altitude For Flight Phases': Intermediate,
+                'Phase For Flight Phases': Phase,
+            })
+
+    def test_transient_parameters(self):
+        transient = transient_parameters(self.graph, self.node_mgr, ['* For Flight Phases'])
+        self.assertEqual(transient, {'Altitude For Flight Phases': {'Top', 'Other'}})
+        transient = transient_parameters(self.graph, self.node_mgr, ['*'])
+        self.assertEqual(sorted(transient), ['Altitude For Flight Phases', 'Heading'])
+
+    def test_persisted(self):
+        transient = transient_parameters(self.graph, self.node_mgr, ['*'],
+                                         persisted=['Heading'])
+        self.assertEqual(sorted(transient), ['Altitude For Flight Phases'])
+        self.assertEqual(transient_parameters(self.graph, self.node_mgr, []), {})
+
+
 if __name__ == '__main__':
     unittest.main()
-
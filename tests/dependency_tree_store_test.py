@@ -0,0 +1,67 @@
+import mock
+import networkx as nx
+import os
+import shutil
+import simplejson as json
+import tempfile
+import unittest
+
+from analysis_engine.dependency_tree_store import (
+    HASH_KEY,
+    dependency_tree_json,
+    load_dependency_tree,
+    store_dependency_tree,
+    tree_path,
+)
+
+
+class MockHDF(object):
+    dependency_tree = None
+
+
+class TestDependencyTreeStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.gr_st = nx.DiGraph()
+        self.gr_st.add_node('root', color='#ffffff')
+        self.gr_st.add_edge('root', 'Airspeed Max')
+        self.gr_st.add_edge('Airspeed Max', 'Airspeed')
+        self.gr_st.add_edge('Airspeed Max', 'Airborne')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def assertTreeEqual(self, tree):
+        self.assertEqual(list(tree.nodes(data=True)), list(self.gr_st.nodes(data=True)))
+        self.assertEqual(list(tree.edges()), list(self.gr_st.edges()))
+
+    def test_store_within_hdf(self):
+        hdf = MockHDF()
+        store_dependency_tree(hdf, self.gr_st, directory=None)
+        self.assertEqual(hdf.dependency_tree, dependency_tree_json(self.gr_st))
+        self.assertTreeEqual(load_dependency_tree(hdf))
+        self.assertIsNone(load_dependency_tree(MockHDF()))
+
+    def test_store_within_directory(self):
+        hdfs = [MockHDF(), MockHDF()]
+        for hdf in hdfs:
+            store_dependency_tree(hdf, self.gr_st.copy(), directory=self.temp_dir)
+        # Both flights reference the same tree.
+        self.assertEqual(hdfs[0].dependency_tree, hdfs[1].dependency_tree)
+        tree_hash = json.loads(hdfs[0].dependency_tree)[HASH_KEY]
+        self.assertTrue(os.path.isfile(tree_path(tree_hash, self.temp_dir)))
+        self.assertTreeEqual(load_dependency_tree(hdfs[0], directory=self.temp_dir))
+        self.assertRaises(IOError, load_dependency_tree, hdfs[0], directory=None)
+
+        self.gr_st.add_edge('root', 'Airspeed Min')
+        hdf = MockHDF()
+        store_dependency_tree(hdf, self.gr_st, directory=self.temp_dir)
+        self.assertNotEqual(hdf.dependency_tree, hdfs[0].dependency_tree)
+        self.assertTreeEqual(load_dependency_tree(hdf, directory=self.temp_dir))
+
+    @mock.patch('analysis_engine.dependency_tree_store.save_tree')
+    def test_store_unwritable_directory(self, save_tree):
+        save_tree.side_effect = OSError
+        hdf = MockHDF()
+        store_dependency_tree(hdf, self.gr_st, directory=self.temp_dir)
+        self.assertEqual(hdf.dependency_tree, dependency_tree_json(self.gr_st))
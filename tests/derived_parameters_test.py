@@ -2640,7 +2640,7 @@ class TestDistanceTravelled(unittest.TestCase):
         repair_mask.assert_called_once_with(gndspeed.array, gndspeed.frequency,
                                             repair_duration=None)
         integrate.assert_called_once_with(repair_mask.return_value, gndspeed.frequency,
-                                          scale=1.0 / 3600)
+                                          scale=1.0 / 3600, segmented=True)
 
 
 class TestDrift(unittest.TestCase):
@@ -0,0 +1,86 @@
+import numpy as np
+import unittest
+
+from mock import patch
+
+from analysis_engine.node import M, P
+from analysis_engine.downcast import (
+    DowncastPolicy,
+    downcast_param,
+    get_downcast_policy,
+)
+
+
+POLICIES = [
+    {'name': 'multistate', 'multistate': True, 'dtype': 'integer'},
+    {'name': 'position', 'parameters': ['Latitude*']},
+    {'name': 'fast', 'min_frequency': 8, 'dtype': 'float32'},
+    {'name': 'slow', 'max_frequency': 0.25, 'dtype': 'float16'},
+]
+
+
+@patch('analysis_engine.downcast.settings.DOWNCAST_POLICIES', POLICIES)
+class TestGetDowncastPolicy(unittest.TestCase):
+    def test_get_downcast_policy(self):
+        multistate = M('Gear Down', np.ma.array([0, 1]), values_mapping={0: 'Up', 1: 'Down'}, frequency=8)
+        self.assertEqual(get_downcast_policy(multistate).name, 'multistate')
+        self.assertEqual(get_downcast_policy(P('Latitude Smoothed', frequency=8)).name, 'position')
+        self.assertEqual(get_downcast_policy(P('Acceleration Normal', frequency=8)).name, 'fast')
+        self.assertEqual(get_downcast_policy(P('Fuel Qty', frequency=0.25)).name, 'slow')
+        self.assertEqual(get_downcast_policy(P('Airspeed', frequency=1)).name, 'default')
+        self.assertEqual(get_downcast_policy(multistate, policies=[]).name, 'default')
+
+
+class TestDowncastPolicy(unittest.TestCase):
+    def test_downcast_dtype_integer(self):
+        policy = DowncastPolicy('multistate', dtype='integer')
+        self.assertEqual(policy.downcast_dtype(np.ma.array([0, 1, 2])), np.uint8)
+        self.assertEqual(policy.downcast_dtype(np.ma.array([-1, 300])), np.int16)
+        self.assertEqual(policy.downcast_dtype(np.ma.array([0., 1.])), np.uint8)
+        # Masked values are not considered.
+        self.assertEqual(policy.downcast_dtype(np.ma.array([0, 1, 10 ** 6], mask=[0, 0, 1])), np.uint8)
+        self.assertIsNone(policy.downcast_dtype(np.ma.array([0, 1.5])))
+        self.assertIsNone(policy.downcast_dtype(np.ma.array([0, 1], dtype=np.int8)))
+
+    def test_downcast_dtype_float(self):
+        policy = DowncastPolicy('fast', dtype='float32', tolerance=0.01)
+        self.assertEqual(policy.downcast_dtype(np.ma.array([0.1, 35000.123])), np.float32)
+        self.assertEqual(policy.downcast_dtype(np.ma.array([0.1, np.nan])), np.float32)
+        # Precision is lost above 2 ** 18.
+        self.assertIsNone(policy.downcast_dtype(np.ma.array([0.1, 10 ** 7 + 0.25])))
+        self.assertEqual(policy.downcast_dtype(np.ma.array([0.1, 10 ** 7 + 0.25], mask=[0, 1])),
+                         np.float32)
+        self.assertIsNone(policy.downcast_dtype(np.ma.array([1e39])))
+        self.assertIsNone(policy.downcast_dtype(np.ma.array([1.0], dtype=np.float32)))
+        self.assertIsNone(DowncastPolicy('default').downcast_dtype(np.ma.array([0.1])))
+
+
+@patch('analysis_engine.downcast.settings.DOWNCAST_POLICIES', POLICIES)
+class TestDowncastParam(unittest.TestCase):
+    def test_downcast_param(self):
+        param = P('Acceleration Normal', np.ma.array([1.0, 1.1, 0.9], mask=[0, 1, 0]), frequency=8)
+        result = downcast_param(param)
+        self.assertIsNot(result, param)
+        self.assertEqual(result.array.dtype, np.float32)
+        self.assertEqual(result.array.mask.tolist(), [False, True, False])
+        self.assertEqual(result.frequency, 8)
+        self.assertEqual(param.array.dtype, np.float64)
+        # Parameters which keep their data type are not copied.
+        param = P('Airspeed', np.ma.array([100.0, 110.0]))
+        self.assertIs(downcast_param(param), param)
+
+    @patch('analysis_engine.precision.settings.FLOAT64_PARAMETERS', ['Latitude*'])
+    def test_downcast_float64_parameter(self):
+        policy = DowncastPolicy('fast', dtype='float32')
+        param = P('Latitude Smoothed', np.ma.array([51.5, 51.6]), frequency=8)
+        self.assertIs(downcast_param(param, policy=policy), param)
+        param = P('Longitude', np.ma.array([0.0, 1.0]), frequency=8)
+        self.assertEqual(downcast_param(param, policy=policy).array.dtype, np.float32)
+
+    def test_downcast_multistate(self):
+        param = M('Gear Down', np.ma.array([0, 1, 1], mask=[0, 0, 1]),
+                  values_mapping={0: 'Up', 1: 'Down'})
+        result = downcast_param(param)
+        self.assertEqual(result.array.dtype, np.uint8)
+        self.assertEqual(result.array.values_mapping, {0: 'Up', 1: 'Down'})
+        self.assertEqual(result.array.raw.tolist(), [0, 1, None])
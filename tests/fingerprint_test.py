@@ -0,0 +1,76 @@
+import hashlib
+import mock
+import numpy as np
+import os
+import shutil
+import tempfile
+import unittest
+
+from analysis_engine.fingerprint import clear_cache, hash_array, hash_file, new_hash
+
+
+class TestHashArray(unittest.TestCase):
+    def test_hash_array(self):
+        array = np.arange(10, dtype=np.float64)
+        self.assertEqual(hash_array(array, [slice(0, 10)], 5, algorithm='sha256'),
+                         'c29605eb4e50fbb653a19f1a28c4f0955721419f989f1ffd8cb2ed6f4914bbea')
+        # Short sections are not hashed.
+        self.assertEqual(hash_array(array, [slice(0, 10), slice(2, 4)], 5, algorithm='sha256'),
+                         hash_array(array, [slice(0, 10)], 5, algorithm='sha256'))
+        self.assertNotEqual(hash_array(array, [slice(0, 10)], 5, algorithm='blake2b'),
+                            hash_array(array, [slice(0, 10)], 5, algorithm='sha256'))
+
+    def test_hash_array_sections(self):
+        array = np.random.rand(1000)
+        sections = [slice(0, 100), slice(150, 700), slice(900, 1000)]
+        expected = hashlib.sha256()
+        for section in sections:
+            expected.update(array[section].tobytes())
+        with mock.patch('analysis_engine.fingerprint.settings') as settings:
+            # Chunks which do not divide the sections.
+            settings.FINGERPRINT_CHUNK_SIZE = 100
+            self.assertEqual(hash_array(array, sections, 64, algorithm='sha256'),
+                             expected.hexdigest())
+        self.assertEqual(hash_array(array[::2], [slice(0, 500)], 64, algorithm='sha256'),
+                         hashlib.sha256(array[::2].tobytes()).hexdigest())
+
+    def test_hash_array_masked(self):
+        array = np.ma.arange(100, 200)
+        masked = np.ma.arange(100, 200)
+        masked[50] = np.ma.masked
+        self.assertNotEqual(hash_array(array, [slice(0, 100)], 5),
+                            hash_array(masked, [slice(0, 100)], 5))
+
+    def test_unknown_algorithm(self):
+        self.assertRaises(ValueError, new_hash, 'md4')
+
+
+class TestHashFile(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'segment.hdf5')
+        self.data = os.urandom(3 * 1024 * 1024 + 17)
+        with open(self.path, 'wb') as f:
+            f.write(self.data)
+        clear_cache()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+        clear_cache()
+
+    def test_hash_file(self):
+        self.assertEqual(hash_file(self.path, algorithm='sha256'),
+                         hashlib.sha256(self.data).hexdigest())
+        self.assertEqual(hash_file(self.path, algorithm='blake2b'),
+                         hashlib.blake2b(self.data, digest_size=32).hexdigest())
+
+    def test_hash_file_cached(self):
+        fingerprint = hash_file(self.path, algorithm='sha256')
+        with mock.patch('analysis_engine.fingerprint.open', create=True) as open_patch:
+            self.assertEqual(hash_file(self.path, algorithm='sha256'), fingerprint)
+            self.assertFalse(open_patch.called)
+        # Modified files are hashed again.
+        with open(self.path, 'ab') as f:
+            f.write(b'\0')
+        self.assertEqual(hash_file(self.path, algorithm='sha256'),
+                         hashlib.sha256(self.data + b'\0').hexdigest())
@@ -0,0 +1,98 @@
+import numpy as np
+import threading
+import unittest
+
+from analysis_engine.hdf_writer import WriteBehindHDF
+from analysis_engine.node import P
+
+
+class MockHDF(dict):
+    '''
+    Parameters by name with the methods of hdf_file used by WriteBehindHDF.
+    Writes wait until the event is set.
+    '''
+    duration = 10
+
+    def __init__(self):
+        super(MockHDF, self).__init__()
+        self.event = threading.Event()
+        self.event.set()
+        self.written = []
+
+    def set_param(self, param):
+        self.event.wait()
+        if param.name == 'Error':
+            raise ValueError('Failed to write.')
+        self[param.name] = param
+        self.written.append(param.name)
+
+    def get_param(self, name, valid_only=False):
+        return self[name]
+
+
+class TestWriteBehindHDF(unittest.TestCase):
+    def setUp(self):
+        self.hdf = MockHDF()
+        self.writer = WriteBehindHDF(self.hdf, queue_size=4)
+
+    def tearDown(self):
+        self.hdf.event.set()
+        self.writer.close(raise_errors=False)
+
+    def test_set_param(self):
+        for name in ('A', 'B', 'C'):
+            self.writer.set_param(P(name, np.ma.arange(10)))
+        self.writer.flush()
+        self.assertEqual(self.hdf.written, ['A', 'B', 'C'])
+
+    def test_get_pending(self):
+        self.hdf.event.clear()
+        param = P('A', np.ma.arange(10), frequency=2, offset=0.25)
+        self.writer.set_param(param)
+        self.assertIn('A', self.writer)
+        self.assertNotIn('A', self.hdf)
+        pending = self.writer.get_param('A', valid_only=True)
+        self.assertEqual(pending.frequency, 2)
+        self.assertEqual(pending.offset, 0.25)
+        self.assertEqual(pending.array.tolist(), list(range(10)))
+        # The queued parameter is not modified through the copy.
+        pending.array[0] = 5
+        self.assertEqual(param.array[0], 0)
+        self.assertEqual(self.writer['A'].array[0], 0)
+        self.hdf.event.set()
+        self.writer.flush()
+        self.assertIs(self.writer.get_param('A'), param)
+        self.assertIsNone(self.writer.get('B'))
+
+    def test_attributes_flush(self):
+        self.writer.set_param(P('A', np.ma.arange(10)))
+        self.assertEqual(self.writer.duration, 10)
+        self.assertEqual(self.hdf.written, ['A'])
+
+    def test_error(self):
+        self.writer.set_param(P('Error', np.ma.arange(10)))
+        self.assertRaises(ValueError, self.writer.flush)
+        # Errors are raised once.
+        self.writer.flush()
+        # Hold the writes until both parameters are queued, otherwise the
+        # error may be raised by the second set_param.
+        self.hdf.event.clear()
+        self.writer.set_param(P('Error', np.ma.arange(10)))
+        self.writer.set_param(P('A', np.ma.arange(10)))
+        self.hdf.event.set()
+        self.assertRaises(ValueError, self.writer.close)
+        # Parameters queued after an error are not written.
+        self.assertEqual(self.hdf.written, [])
+
+    def test_context_manager(self):
+        with WriteBehindHDF(self.hdf) as writer:
+            writer.set_param(P('A', np.ma.arange(10)))
+        self.assertEqual(self.hdf.written, ['A'])
+        with self.assertRaises(ValueError):
+            with WriteBehindHDF(self.hdf) as writer:
+                writer.set_param(P('Error', np.ma.arange(10)))
+        # An exception within the block is not replaced by write errors.
+        with self.assertRaises(KeyError):
+            with WriteBehindHDF(self.hdf) as writer:
+                writer.set_param(P('Error', np.ma.arange(10)))
+                raise KeyError('B')
@@ -1052,15 +1052,22 @@ class CreateKPVsWithinSlicesTest(NodeTest):
             mock3.return_value = Mock()
         node = self.node_class()
         node.create_kpvs_within_slices = Mock()
+        node.create_extreme_kpvs = Mock()
         node.derive(mock1, mock2)
+        # Nodes creating extreme KPVs pass the parameter rather than its array.
+        if node.create_extreme_kpvs.called:
+            self.assertFalse(node.create_kpvs_within_slices.called)
+            create_kpvs, param = node.create_extreme_kpvs, mock1
+        else:
+            create_kpvs, param = node.create_kpvs_within_slices, mock1.array
         if hasattr(self, 'second_param_method_calls'):
             mock3.assert_called_once_with(*self.second_param_method_calls[0][1])
-            node.create_kpvs_within_slices.assert_called_once_with(
-                mock1.array, mock3.return_value, self.function)
+            create_kpvs.assert_called_once_with(
+                param, mock3.return_value, self.function)
         else:
             self.assertEqual(mock2.method_calls, [])
-            node.create_kpvs_within_slices.assert_called_once_with(
-                mock1.array, mock2, self.function)
+            create_kpvs.assert_called_once_with(
+                param, mock2, self.function)
 
 
 class CreateKPVsWithinSlicesSecondWindowTest(CreateKPVsWithinSlicesTest):
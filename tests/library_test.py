@@ -104,11 +104,13 @@ from analysis_engine.library import (
     including_transition,
     index_at_distance,
     index_at_value,
+    indexes_at_values,
     index_closest_value,
     index_of_datetime,
     index_of_first_start,
     index_of_last_stop,
     integrate,
+    integrate_blocks,
     integ_value,
     interleave,
     interpolate,
@@ -181,6 +183,7 @@ from analysis_engine.library import (
     second_window,
     shift_slice,
     shift_slices,
+    SliceExtremes,
     slice_duration,
     slice_round,
     slice_multiply,
@@ -227,6 +230,7 @@ from analysis_engine.library import (
     value_at_datetime,
     value_at_index,
     value_at_time,
+    values_at_times,
     vstack_params,
     vstack_params_where_state,
     wrap_array,
@@ -2176,6 +2180,34 @@ class TestCalculateTimebase(unittest.TestCase):
         start_dt = calculate_timebase(years, months, days, hours, mins, secs)
         self.assertEqual(start_dt, datetime(2012, 12, 30, 8, 20, 36, tzinfo=pytz.utc))
 
+    def test_invalid_dates_skipped(self):
+        # 30th February and 60 seconds are skipped.
+        years = np.ma.array([2016] * 10)
+        months = np.ma.array([2] * 5 + [3] * 5)
+        days = np.ma.array([30] * 5 + [1] * 5)
+        hours = np.ma.array([12] * 10)
+        mins = np.ma.array([0] * 10)
+        secs = np.ma.array([0, 1, 2, 3, 4, 60, 6, 7, 8, 9])
+        start_dt = calculate_timebase(years, months, days, hours, mins, secs)
+        self.assertEqual(start_dt, datetime(2016, 3, 1, 12, 0, 0, tzinfo=pytz.utc))
+        days[:5] = 29  # leap year
+        start_dt = calculate_timebase(years, months, days, hours, mins, secs)
+        self.assertEqual(start_dt, datetime(2016, 2, 29, 12, 0, 0, tzinfo=pytz.utc))
+
+    def test_equally_common_offsets(self):
+        # The offset of the earliest timestamp is used.
+        years = np.array([2016.0] * 6)
+        months = np.array([6.0] * 6)
+        days = np.array([1.0] * 6)
+        hours = np.array([12.0] * 6)
+        mins = np.array([0.0] * 6)
+        secs = np.array([10.5, 11, 12, 3, 4, 5])
+        start_dt = calculate_timebase(years, months, days, hours, mins, secs)
+        self.assertEqual(start_dt, datetime(2016, 6, 1, 12, 0, 10, tzinfo=pytz.utc))
+        secs[:3] = np.nan
+        start_dt = calculate_timebase(years, months, days, hours, mins, secs)
+        self.assertEqual(start_dt, datetime(2016, 6, 1, 12, 0, 0, tzinfo=pytz.utc))
+
     @unittest.skip("Implement if this is a requirement, currently "
                    "all parameters are aligned before this is being used.")
     def test_using_offset_for_seconds(self):
@@ -2191,6 +2223,8 @@ class TestConvertTwoDigitToFourDigitYear(unittest.TestCase):
         self.assertEquals(convert_two_digit_to_four_digit_year(12, '2012'), 2012) # will break next year
         self.assertEquals(convert_two_digit_to_four_digit_year(11, '2012'), 2011)
         self.assertEquals(convert_two_digit_to_four_digit_year(1, '2012'), 2001)
+        self.assertEqual(convert_two_digit_to_four_digit_year(np.array([99, 12, 1]), '2012').tolist(),
+                         [1999, 2012, 2001])
 
 
 class TestCoReg(unittest.TestCase):
@@ -3209,6 +3243,15 @@ class TestGroundTrack(unittest.TestCase):
         np.testing.assert_almost_equal(expected_lon.data, lon.data)
         np.testing.assert_equal(expected_lat.mask, lat.mask)
         np.testing.assert_equal(expected_lon.mask, lon.mask)
+    def test_ground_track_masked_start(self):
+        # The track starts at the fix from the first valid sample.
+        gspd = np.ma.array(data=[60,60,60,60,60,60,60],
+                           mask=[1,1,0,0,0,0,0])
+        hdg = np.ma.array([0.0,0.0,0.0,0.0,0.0,0.0,0.0])
+        lat, lon = ground_track(0.0, 0.0, gspd, hdg, 1.0, 'landing')
+        np.testing.assert_almost_equal(lat.data[2:], [0.0,0.00027759,0.00055518,0.00083277,0.00111036])
+        np.testing.assert_almost_equal(lon.data[2:], [0.0,0.0,0.0,0.0,0.0])
+        np.testing.assert_equal(lat.mask, [1,1,0,0,0,0,0])
     def test_ground_track_takeoff(self):
         gspd = np.ma.array([60,60,60,60,60,60,60])
         hdg = np.ma.array([0,0.0,0.0,90,90,90,270])
@@ -3567,6 +3610,55 @@ class TestIndexAtValue(unittest.TestCase):
         self.assertEqual(index_at_value(array, 10, _slice=slice(3, 0, -1), endpoint='closing'), 0)
 
 
+class TestIndexesAtValues(unittest.TestCase):
+
+    # Reminder: indexes_at_values (array, thresholds, slices=(slice(None),), endpoint='exact')
+
+    def test_indexes_at_values_basic(self):
+        array = np.ma.arange(8)
+        self.assertEqual(indexes_at_values(array, [1.5, 3.2, 7.5], [slice(0, 7)]),
+                         [[1.5, 3.2, None]])
+
+    def test_indexes_at_values_no_slices(self):
+        array = np.ma.arange(4)
+        self.assertEqual(indexes_at_values(array, [1.5]), [[1.5]])
+        self.assertEqual(indexes_at_values(array, [1.5], []), [])
+        self.assertEqual(indexes_at_values(array, [], [slice(None)]), [[]])
+
+    def test_indexes_at_values_multiple_slices(self):
+        array = np.ma.array([0, 1, 2, 3, 4, 3, 2, 1, 0], dtype=float)
+        slices = [slice(0, 5), slice(8, 4, -1), slice(2, 2)]
+        self.assertEqual(indexes_at_values(array, [0.5, 2.5], slices),
+                         [[0.5, 2.5], [7.5, 5.5], [None, None]])
+
+    def test_indexes_at_values_masked(self):
+        array = np.ma.arange(30, dtype=float)
+        array[25:] -= 1
+        array[23] = np.ma.masked
+        array[26] = np.ma.masked
+        self.assertEqual(indexes_at_values(array, [24, 26.5], [slice(20, 30)]),
+                         [[24.5, 27.5]])
+
+    def test_indexes_at_values_endpoints(self):
+        array = np.ma.array([0, 1, 2, 1, 2, 3, 2, 1])
+        self.assertEqual(indexes_at_values(array, [3.1, 1.5], [slice(1, 8)], endpoint='nearest'),
+                         [[5.0, 1.5]])
+        self.assertEqual(indexes_at_values(array, [3.1, 1.5], [slice(1, 8)], endpoint='closing'),
+                         [[2.0, 1.5]])
+
+    def test_indexes_at_values_matches_index_at_value(self):
+        array = np.ma.array(np.cumsum(np.sin(np.arange(500) / 7.0)) * 10.0)
+        array[100:110] = np.ma.masked
+        array[300] = np.ma.masked
+        thresholds = [-20, 0, 15.5, 30, 60, 1000]
+        slices = [slice(None), slice(50, 400), slice(450, 10, -1), slice(30, 0, -1)]
+        for endpoint in ('exact', 'nearest'):
+            expected = [[index_at_value(array, t, s, endpoint=endpoint) for t in thresholds]
+                        for s in slices]
+            self.assertEqual(indexes_at_values(array, thresholds, slices, endpoint=endpoint,
+                                               chunk_size=16), expected)
+
+
 class TestIndexClosestValue(unittest.TestCase):
     def test_index_closest_value(self):
         array = np.ma.array([1, 2, 3, 4, 5, 4, 3])
@@ -4034,6 +4126,57 @@ class TestIntegrate (unittest.TestCase):
 
     #TODO: test for mask repair
 
+    def test_integration_segmented(self):
+        data = np.ma.array(data=[1,2,3,4,5,6,7,8,9,10,11.0],
+                           mask=[1,0,0,1,1,0,0,0,1,1,0])
+        result = integrate(data, 1.0, initial_value=5, segmented=True)
+        ma_test.assert_masked_array_equal(result, integrate_blocks(data, 1.0, initial_value=5))
+        self.assertRaises(ValueError, integrate, data, 1.0, segmented=True, contiguous=True)
+
+
+class TestIntegrateBlocks(unittest.TestCase):
+    # Reminder: integrate_blocks(array, frequency, initial_value=0.0, scale=1.0,
+    #                            direction='forwards', out=None)
+
+    def setUp(self):
+        self.data = np.ma.array(data=[1,2,3,4,5,6,7,8,9,10,11.0],
+                                mask=[1,0,0,1,1,0,0,0,1,1,0])
+
+    def test_integrate_blocks_unmasked(self):
+        data = np.ma.arange(10, dtype=float)
+        for direction in ('forwards', 'reverse', 'backwards'):
+            assert_array_almost_equal(
+                integrate_blocks(data, 2.0, initial_value=3, scale=1.5, direction=direction),
+                integrate(data, 2.0, initial_value=3, scale=1.5, direction=direction))
+
+    def test_integrate_blocks_forwards(self):
+        result = integrate_blocks(self.data, 1.0, initial_value=5)
+        assert_array_equal(result.data[~result.mask], [5, 7.5, 5, 11.5, 19, 5])
+        assert_array_equal(result.mask, self.data.mask)
+
+    def test_integrate_blocks_reverse(self):
+        result = integrate_blocks(self.data, 1.0, initial_value=[5, 6, 7], direction='reverse')
+        assert_array_equal(result.data[~result.mask], [7.5, 5, 20, 13.5, 6, 7])
+
+    def test_integrate_blocks_backwards(self):
+        result = integrate_blocks(self.data, 1.0, direction='backwards')
+        assert_array_equal(result.data[~result.mask], [-2.5, 0, -14, -7.5, 0, 0])
+
+    def test_integrate_blocks_out(self):
+        out = np.empty(11)
+        result = integrate_blocks(self.data, 2.0, out=out)
+        self.assertTrue(np.shares_memory(result.data, out))
+        assert_array_equal(out[~result.mask], [0, 1.25, 0, 3.25, 7, 0])
+        self.assertRaises(ValueError, integrate_blocks, self.data, 1.0, out=np.empty(3))
+
+    def test_integrate_blocks_invalid(self):
+        self.assertRaises(ValueError, integrate_blocks, self.data, 1.0, direction='sideways')
+        self.assertRaises(ValueError, integrate_blocks, self.data, 1.0, initial_value=[1, 2])
+
+    def test_integrate_blocks_all_masked(self):
+        result = integrate_blocks(np.ma.array([1.0, 2.0], mask=True), 1.0)
+        self.assertEqual(np.ma.count(result), 0)
+
 
 class TestIsSliceWithinSlice(unittest.TestCase):
     def test_is_slice_within_slice(self):
@@ -6038,6 +6181,46 @@ class TestSliceDuration(unittest.TestCase):
         self.assertRaises(ValueError, slice_duration, slice(20, None), 1)
 
 
+class TestSliceExtremes(unittest.TestCase):
+    def test_slice_extremes(self):
+        # Repeated values check the first of equal extremes is found.
+        np.random.seed(0)
+        array = np.ma.array(np.random.randint(-20, 20, 2000).astype(float))
+        array[np.random.rand(2000) < 0.3] = np.ma.masked
+        array[300:900] = np.ma.masked
+        slices = [slice(0, 2000), slice(10, 20), slice(100, 1500), slice(255, 1025),
+                  slice(400, 600), slice(600, 1999), slice(3.4, 1200.6),
+                  slice(2100, 2200), slice(None, 700)]
+        for function in (max_value, min_value, max_abs_value):
+            extremes = SliceExtremes(array, function)
+            for _slice in slices:
+                self.assertEqual(extremes(array, _slice),
+                                 function(array, _slice))
+                self.assertEqual(extremes(array, _slice, start_edge=_slice.start, stop_edge=99.5),
+                                 function(array, _slice, start_edge=_slice.start, stop_edge=99.5))
+
+    def test_slice_extremes_max_abs_value_sign(self):
+        array = np.ma.array([1.0, -5.0, 3.0] * 200)
+        extremes = SliceExtremes(array, max_abs_value)
+        self.assertEqual(extremes(array, slice(2, 590)), (4, -5))
+
+    def test_slice_extremes_non_finite(self):
+        array = np.ma.array([1.0, -np.inf, 3.0] * 200, mask=[True, False, False] * 200)
+        extremes = SliceExtremes(array, max_value)
+        self.assertEqual(extremes(array, slice(0, 600)), max_value(array, slice(0, 600)))
+        extremes = SliceExtremes(array, min_value)
+        self.assertEqual(extremes(array, slice(0, 600)), min_value(array, slice(0, 600)))
+
+    def test_slice_extremes_step(self):
+        array = np.ma.arange(1000.0)
+        extremes = SliceExtremes(array, max_value)
+        self.assertEqual(extremes(array, slice(0, 1000, 3)),
+                         max_value(array, slice(0, 1000, 3)))
+
+    def test_slice_extremes_unsupported_function(self):
+        self.assertRaises(ValueError, SliceExtremes, np.ma.arange(10), average_value)
+
+
 class TestSlicesAnd(unittest.TestCase):
     def test_slices_and(self):
         self.assertEqual(slices_and([slice(2,5)],[slice(3,7)]),
@@ -7710,6 +7893,36 @@ class TestValueAtTime(unittest.TestCase):
         self.assertEquals (value_at_time(array, 2.0, 0.2, 1.0), None)
 
 
+class TestValuesAtTimes(unittest.TestCase):
+    # Reminder: values_at_times (array, hz, offset, time_indexes)
+
+    def test_values_at_times_basic(self):
+        array = np.ma.arange(4) + 22.3
+        result = values_at_times(array, 1, 0.0, [2.5, 0.0, 3.0, -2.0, 7.0])
+        assert_array_almost_equal(result, [24.8, 22.3, 25.3, 22.3, 25.3])
+
+    def test_values_at_times_masked(self):
+        array = np.ma.arange(4) + 7.4
+        array[1] = np.ma.masked
+        array[2] = np.ma.masked
+        result = values_at_times(array, 2.0, 0.2, [1.0, 0.5, 1.7])
+        self.assertTrue(result[0] is np.ma.masked)
+        self.assertEqual(result[1], 7.4)
+        self.assertEqual(result[2], 10.4)
+
+    def test_values_at_times_matches_value_at_time(self):
+        array = np.ma.array(np.sin(np.arange(40) / 3.0) * 100.0)
+        array[[3, 10, 11, 25]] = np.ma.masked
+        times = np.arange(-2, 25, 0.3)
+        result = values_at_times(array, 2.0, 0.3, times)
+        for time_index, value in zip(times, result):
+            expected = value_at_time(array, 2.0, 0.3, time_index)
+            if expected is None:
+                self.assertTrue(value is np.ma.masked)
+            else:
+                self.assertEqual(value, expected)
+
+
 class TestValueAtDatetime(unittest.TestCase):
     @mock.patch('analysis_engine.library.value_at_time')
     def test_value_at_datetime(self, value_at_time):
@@ -8248,6 +8461,15 @@ class TestSecondWindow(unittest.TestCase):
                          3.5, 3.5, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0] + [0] * 10,
                         mask=np.concatenate((np.zeros(30), np.ones(10)))))
 
+    def test_second_window_nan_start_of_section(self):
+        # NaN at the start of a section does not carry into the next section.
+        array = np.ma.array([np.nan, 1, 1, 0] + [5.0] * 16,
+                            mask=[0, 0, 0, 1] + [0] * 16)
+        result = second_window(array, 1, 2)
+        self.assertTrue(np.isnan(result[0]))
+        self.assertEqual(result.mask.tolist(), [0, 1, 1, 1] + [0] * 14 + [1, 1])
+        self.assertEqual(result[4:18].tolist(), [5.0] * 14)
+
     @unittest.skip('Not Implemented')
     def test_three_second_window(self):
         self.assertTrue(False)
@@ -0,0 +1,91 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import simplejson as json
+
+from analysis_engine.node import DerivedParameterNode, NodeManager, NodeRegistry
+from analysis_engine.node_registry import (
+    build_index,
+    get_node_registry,
+    index_path,
+    load_index,
+    _REGISTRIES,
+)
+
+
+MODULE = 'tests.sample_circular_dependency_nodes'
+
+
+class TestNodeRegistry(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.module = sys.modules.pop(MODULE, None)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+        _REGISTRIES.pop((MODULE,), None)
+        if self.module is not None:
+            sys.modules[MODULE] = self.module
+
+    def test_build_index(self):
+        nodes = build_index([MODULE])['nodes']
+        self.assertEqual(nodes['Airspeed At Gear Down Selected'], {
+            'module': MODULE,
+            'class': 'AirspeedAtGearDownSelected',
+            'dependencies': ['Gear Down Selected', 'Airspeed'],
+            'node_type': 'DerivedParameterNode',
+            'base': 'DerivedParameterNode',
+            'default_can_operate': True,
+        })
+        self.assertFalse(nodes['Gear Down']['default_can_operate'])
+
+    def test_load_index(self):
+        path = index_path([MODULE], directory=self.temp_dir)
+        index = load_index([MODULE], directory=self.temp_dir)
+        self.assertTrue(os.path.isfile(path))
+        sys.modules.pop(MODULE, None)
+        # The saved index is loaded without importing the module.
+        self.assertEqual(load_index([MODULE], directory=self.temp_dir), index)
+        self.assertNotIn(MODULE, sys.modules)
+
+    def test_stale_index(self):
+        path = index_path([MODULE], directory=self.temp_dir)
+        index = load_index([MODULE], directory=self.temp_dir)
+        index['sources'][MODULE][1] += 1
+        index['nodes'] = {}
+        with open(path, 'w') as f:
+            json.dump(index, f)
+        self.assertTrue(load_index([MODULE], directory=self.temp_dir)['nodes'])
+        with open(path, 'w') as f:
+            f.write('{')
+        self.assertTrue(load_index([MODULE], directory=self.temp_dir)['nodes'])
+
+    def test_lazy_import(self):
+        load_index([MODULE], directory=self.temp_dir)
+        sys.modules.pop(MODULE, None)
+        registry = get_node_registry([MODULE], directory=self.temp_dir)
+        self.assertIsInstance(registry, NodeRegistry)
+        self.assertIn('Gear Down', registry)
+        self.assertEqual(registry.dependency_names('Airspeed At Gear Down Selected'),
+                         ['Gear Down Selected', 'Airspeed'])
+        self.assertIs(registry.node_type('Gear Down'), DerivedParameterNode)
+        node_mgr = NodeManager({'Start Datetime': None}, 10, ['Airspeed'], [], [],
+                               registry, {}, {})
+        self.assertFalse(node_mgr.operational('Airspeed At Gear Down Selected', ['Airspeed']))
+        self.assertNotIn(MODULE, sys.modules)
+        self.assertFalse(registry.imported('Gear Down'))
+        node_class = registry['Gear Down']
+        self.assertEqual(node_class.__name__, 'GearDown')
+        self.assertTrue(registry.imported('Gear Down'))
+        self.assertIn(MODULE, sys.modules)
+        self.assertIs(get_node_registry([MODULE], directory=self.temp_dir), registry)
+
+    def test_classes(self):
+        registry = NodeRegistry(classes={'Node': DerivedParameterNode})
+        self.assertEqual(list(registry), ['Node'])
+        self.assertEqual(len(registry), 1)
+        self.assertTrue(registry.default_can_operate('Node'))
+        self.assertRaises(KeyError, registry.__getitem__, 'Missing')
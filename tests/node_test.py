@@ -9,7 +9,7 @@ from datetime import datetime
 from inspect import ArgSpec
 from random import shuffle
 
-from analysis_engine.library import min_value, max_value, average_value
+from analysis_engine.library import min_value, max_value, average_value, vstack_params_reduced
 from analysis_engine.node import (
     ApproachItem,
     ApproachNode,
@@ -1334,6 +1334,29 @@ class TestKeyPointValueNode(unittest.TestCase):
         self.assertEqual(list(knode),
                          [KeyPointValue(index=6, value=26, name='Kpv')])
 
+    def test_create_extreme_kpvs(self):
+        class KPV(KeyPointValueNode):
+            def derive(self, a=P('a')):
+                pass
+        param = P('a', np.ma.arange(2, 50, 4), 2, 0.4)
+        sections = SectionNode('Section', items=[
+            Section('section', slice=slice(4, 10), start_edge=3.25, stop_edge=10.75),
+            Section('section', slice=slice(1, 3), start_edge=1, stop_edge=3)])
+        cache = {}
+        for function in (min_value, max_value):
+            knode = KPV(cache=cache)
+            knode.create_extreme_kpvs(param, sections, function)
+            expected = KPV()
+            expected.create_kpvs_within_slices(param.array, sections, function)
+            self.assertEqual(list(knode), list(expected))
+        self.assertEqual(len(cache), 2)
+        # The search is shared by nodes using the same parameter and function.
+        extremes = cache[('min_value', 'a', 2, 0.4)]
+        knode = KPV(cache=cache)
+        knode.create_extreme_kpvs(param, [slice(6, 16)], min_value, min_duration=2.0)
+        self.assertEqual(list(knode), [KeyPointValue(index=6, value=26, name='Kpv')])
+        self.assertIs(cache[('min_value', 'a', 2, 0.4)], extremes)
+
 
     def test_create_kpv_from_slices(self):
         knode = self.knode
@@ -1912,6 +1935,49 @@ class TestDerivedParameterNode(unittest.TestCase):
         self.assertEqual(result.frequency, unaligned_param.frequency)
         self.assertEqual(result.offset, unaligned_param.offset)
 
+    def test_get_derived_output_group(self):
+        '''
+        Sibling nodes in an output group are derived once from aligned
+        dependencies and share the outputs through the cache.
+        '''
+        calls = []
+
+        def reduce_params(group, reductions, *params):
+            calls.append(group)
+            return vstack_params_reduced(group, reductions, *params)
+
+        class ExampleMax(DerivedParameterNode):
+            name = 'Example Max'
+            output_group = 'Example'
+            align_frequency = 2
+            align_offset = 0
+
+            def derive(self, eng1=P('Eng (1) Example'), eng2=P('Eng (2) Example')):
+                self.derive_outputs(reduce_params, self.output_group, ('Max', 'Min'), eng1, eng2)
+
+        class ExampleMin(ExampleMax):
+            name = 'Example Min'
+
+        eng1 = Parameter('Eng (1) Example', np.ma.array([1, 5, 3, 4]), frequency=1, offset=0)
+        eng2 = Parameter('Eng (2) Example', np.ma.array([2, 2, 6, 1]), frequency=1, offset=0)
+        cache = {}
+        max_node = ExampleMax(cache=cache).get_derived([eng1, eng2])
+        min_node = ExampleMin(cache=cache).get_derived([eng1, eng2])
+        self.assertEqual(calls, ['Example'])
+        self.assertEqual(min_node.frequency, 2)
+        self.assertEqual(min_node.offset, 0)
+        self.assertFalse(hasattr(max_node, '_outputs'))
+        # Identical to deriving without the cache.
+        expected_max = ExampleMax().get_derived([eng1, eng2])
+        expected_min = ExampleMin().get_derived([eng1, eng2])
+        self.assertEqual(calls, ['Example', 'Example', 'Example'])
+        self.assertEqual(max_node.array.tolist(), expected_max.array.tolist())
+        self.assertEqual(min_node.array.tolist(), expected_min.array.tolist())
+        self.assertEqual(min_node.array.tolist()[:4], [1, 2, 2, 4])
+        # Different dependencies are not shared.
+        ExampleMin(cache=cache).get_derived([eng1, None])
+        self.assertEqual(len(calls), 4)
+
     def test_get_derived_discrete_align(self):
         '''
         Ensure that interpolations do not occur.
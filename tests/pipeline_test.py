@@ -0,0 +1,271 @@
+import json
+import mock
+import os
+import pytz
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from datetime import datetime
+
+from analysis_engine.datastructures import Segment
+from analysis_engine.json_tools import process_flight_to_json
+from analysis_engine.node import KeyPointValue, KeyTimeInstance, Section
+from analysis_engine.pipeline import (
+    IngestPipeline,
+    Journal,
+    export_results,
+    find_inputs,
+    process_segment,
+    segment_to_info,
+    split_file,
+)
+
+
+def split(path, **kwargs):
+    base = os.path.splitext(path)[0]
+    return [{'File': '%s.%03d.hdf5' % (base, part), 'Source': path}
+            for part in (1, 2)]
+
+
+def process(info, **kwargs):
+    return [dict(info, Results=os.path.splitext(info['File'])[0] + '.json')]
+
+
+def export(info, **kwargs):
+    return [os.path.splitext(info['File'])[0] + '.csv']
+
+
+class TestFindInputs(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        for name in ('b.hdf5', 'a.hdf5', 'c.h5', 'notes.txt'):
+            open(os.path.join(self.temp_dir, name), 'w').close()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_find_inputs(self):
+        paths = [os.path.join(self.temp_dir, name) for name in ('a.hdf5', 'b.hdf5', 'c.h5')]
+        self.assertEqual(find_inputs(self.temp_dir), paths)
+        self.assertEqual(find_inputs(['x.hdf5', self.temp_dir]), ['x.hdf5'] + paths)
+
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'ingest.journal')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_journal(self):
+        journal = Journal(self.path)
+        journal.record('split', 'a.hdf5', outputs=[{'File': 'a.001.hdf5'}])
+        journal.record('process', 'a.001.hdf5', outputs=['a.001.json'])
+        journal.record('process', 'a.001.hdf5', error='ValueError: Failed')
+        with open(self.path, 'a') as f:
+            f.write('{"stage": "split", "key": "b.hd')
+
+        journal = Journal(self.path)
+        self.assertEqual(journal.completed('split', 'a.hdf5'), [{'File': 'a.001.hdf5'}])
+        self.assertIsNone(journal.completed('split', 'b.hdf5'))
+        self.assertIsNone(journal.completed('process', 'a.001.hdf5'))
+        self.assertEqual(journal.outputs('split'), [{'File': 'a.001.hdf5'}])
+
+
+class TestSegmentToInfo(unittest.TestCase):
+    def test_segment_to_info(self):
+        start_dt = datetime(2020, 1, 2, 3, 4, 5, tzinfo=pytz.utc)
+        segment = Segment(slice(0, 100), 'START_AND_STOP', 1, 'a.001.hdf5',
+                          'abc', start_dt)
+        self.assertEqual(segment_to_info(segment, 'a.hdf5'), {
+            'File': 'a.001.hdf5',
+            'Segment Type': 'START_AND_STOP',
+            'Start Datetime': '2020-01-02T03:04:05+00:00',
+            'Part': 1,
+            'Hash': 'abc',
+            'Source': 'a.hdf5',
+        })
+        segment.start_dt = None
+        self.assertIsNone(segment_to_info(segment, 'a.hdf5')['Start Datetime'])
+
+
+class TestSplitFile(unittest.TestCase):
+    @mock.patch('analysis_engine.split_hdf_to_segments.split_hdf_to_segments')
+    def test_split_file(self, split_hdf_to_segments):
+        split_hdf_to_segments.return_value = [
+            Segment(slice(0, 100), 'START_AND_STOP', 1, 'a.001.hdf5', 'abc', None)]
+        infos = split_file('a.hdf5', {'Tail Number': 'G-ABCD'}, dest_dir='segments')
+        self.assertEqual([i['File'] for i in infos], ['a.001.hdf5'])
+        # Segments are written by the split worker unless processes are provided.
+        split_hdf_to_segments.assert_called_once_with(
+            'a.hdf5', {'Tail Number': 'G-ABCD'}, dest_dir='segments', processes=1)
+        split_hdf_to_segments.reset_mock()
+        split_file('a.hdf5', {}, split_kwargs={'processes': 4, 'draw': True})
+        split_hdf_to_segments.assert_called_once_with(
+            'a.hdf5', {}, dest_dir=None, processes=4, draw=True)
+
+
+class TestProcessAndExport(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.info = {
+            'File': os.path.join(self.temp_dir, 'a.001.hdf5'),
+            'Segment Type': 'START_AND_STOP',
+            'Start Datetime': '2020-01-02T03:04:05+00:00',
+            'Part': 1,
+            'Hash': 'abc',
+            'Source': os.path.join(self.temp_dir, 'a.hdf5'),
+        }
+        self.res = {
+            'flight': {},
+            'kti': {'Touchdown': [KeyTimeInstance(50, 'Touchdown')]},
+            'kpv': {'Airspeed Max': [KeyPointValue(20, 250.0, 'Airspeed Max')]},
+            'approach': {},
+            'phases': {'Airborne': [Section('Airborne', slice(10, 50), 10, 50)]},
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    @mock.patch('analysis_engine.plot_flight.csv_flight_details')
+    @mock.patch('analysis_engine.process_flight.process_flight')
+    def test_process_and_export(self, process_flight, csv_flight_details):
+        process_flight.return_value = self.res
+        aircraft_info = {'Tail Number': 'G-ABCD'}
+        outputs = process_segment(self.info, aircraft_info, process_kwargs={'reprocess': True})
+        results_path = os.path.join(self.temp_dir, 'a.001.json')
+        self.assertEqual(outputs, [dict(self.info, Results=results_path)])
+        process_flight.assert_called_once_with(
+            {'File': self.info['File'], 'Segment Type': 'START_AND_STOP',
+             'Start Datetime': datetime(2020, 1, 2, 3, 4, 5, tzinfo=pytz.utc)},
+            'G-ABCD', aircraft_info=aircraft_info, reprocess=True)
+
+        paths = export_results(outputs[0])
+        csv_path = os.path.join(self.temp_dir, 'a.001.csv')
+        self.assertEqual(paths, [csv_path])
+        csv_flight_details.assert_called_once_with(
+            self.info['File'], self.res['kti']['Touchdown'],
+            self.res['kpv']['Airspeed Max'], self.res['phases']['Airborne'],
+            dest_path=csv_path, append_to_file=False)
+
+    @mock.patch('analysis_engine.process_flight.process_flight')
+    def test_process_without_start_datetime(self, process_flight):
+        process_flight.return_value = self.res
+        self.info['Start Datetime'] = None
+        process_segment(self.info, {})
+        self.assertNotIn('Start Datetime', process_flight.call_args[0][0])
+
+    @mock.patch('analysis_engine.plot_flight.csv_flight_details')
+    def test_export_other_version(self, csv_flight_details):
+        results_path = os.path.join(self.temp_dir, 'a.001.json')
+        results = json.loads(process_flight_to_json(self.res))
+        results['version'] = 'other'
+        with open(results_path, 'w') as f:
+            json.dump(results, f)
+        self.assertRaises(ValueError, export_results, dict(self.info, Results=results_path))
+        self.assertFalse(csv_flight_details.called)
+
+
+@mock.patch('analysis_engine.pipeline.export_results', side_effect=export)
+@mock.patch('analysis_engine.pipeline.process_segment', side_effect=process)
+@mock.patch('analysis_engine.pipeline.split_file', side_effect=split)
+class TestIngestPipeline(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.journal_path = os.path.join(self.temp_dir, 'ingest.journal')
+        self.paths = []
+        for name in ('a.hdf5', 'b.hdf5', 'c.hdf5'):
+            path = os.path.join(self.temp_dir, name)
+            open(path, 'w').close()
+            self.paths.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def pipeline(self, **kwargs):
+        return IngestPipeline({'Tail Number': 'G-ABCD'}, journal_path=self.journal_path,
+                              split_workers=1, process_workers=2, export_workers=1,
+                              use_processes=False, **kwargs)
+
+    def test_run(self, split_file, process_segment, export_results):
+        metrics = self.pipeline().run(self.temp_dir)
+        self.assertEqual(sorted(c[0][0] for c in split_file.call_args_list), self.paths)
+        self.assertEqual(process_segment.call_count, 6)
+        self.assertEqual(export_results.call_count, 6)
+        self.assertEqual([(m['stage'], m['completed'], m['failed']) for m in metrics],
+                         [('split', 3, 0), ('process', 6, 0), ('export', 6, 0)])
+
+    def test_resume(self, split_file, process_segment, export_results):
+        failed = os.path.join(self.temp_dir, 'b.002.hdf5')
+
+        def process_failing(info, **kwargs):
+            if info['File'] == failed:
+                raise ValueError('Failed to process.')
+            return process(info)
+
+        process_segment.side_effect = process_failing
+        metrics = self.pipeline().run(self.temp_dir)
+        self.assertEqual(metrics[1]['failed'], 1)
+        self.assertEqual(export_results.call_count, 5)
+
+        for patch in (split_file, process_segment, export_results):
+            patch.reset_mock()
+        process_segment.side_effect = process
+        # Segments written to the input directory are not split.
+        metrics = self.pipeline().run(self.temp_dir)
+        self.assertFalse(split_file.called)
+        self.assertEqual([c[0][0]['File'] for c in process_segment.call_args_list], [failed])
+        self.assertEqual([c[0][0]['File'] for c in export_results.call_args_list], [failed])
+        self.assertEqual([(m['completed'], m['skipped']) for m in metrics],
+                         [(0, 3), (1, 5), (1, 5)])
+
+    def test_queue_failure(self, split_file, process_segment, export_results):
+        failed = os.path.join(self.temp_dir, 'b.002.hdf5')
+
+        def process_without_file(info, **kwargs):
+            if info['File'] == failed:
+                # The export stage cannot key the output.
+                return [{'Results': 'b.002.json'}]
+            return process(info)
+
+        process_segment.side_effect = process_without_file
+        pipeline = self.pipeline()
+        thread = threading.Thread(target=pipeline.run, args=(self.temp_dir,))
+        thread.daemon = True
+        thread.start()
+        thread.join(10)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual([(s.metrics.completed, s.metrics.failed) for s in pipeline.stages],
+                         [(3, 0), (5, 1), (5, 0)])
+        # The segment is processed again when resumed.
+        self.assertIsNone(Journal(self.journal_path).completed('process', failed))
+
+    def test_backpressure(self, split_file, process_segment, export_results):
+        event = threading.Event()
+
+        def process_waiting(info, **kwargs):
+            event.wait(10)
+            return process(info)
+
+        process_segment.side_effect = process_waiting
+        pipeline = self.pipeline(queue_size=1)
+        thread = threading.Thread(target=pipeline.run, args=(self.paths,))
+        thread.start()
+        try:
+            # Two segments are being processed and one is queued, so the
+            # second file cannot be queued and the third is not split.
+            while split_file.call_count < 2:
+                time.sleep(0.01)
+            time.sleep(0.2)
+            self.assertEqual(split_file.call_count, 2)
+            self.assertEqual(process_segment.call_count, 2)
+        finally:
+            event.set()
+            thread.join()
+        self.assertEqual(split_file.call_count, 3)
+        self.assertEqual(export_results.call_count, 6)
+        self.assertEqual(pipeline.stages[1].metrics.max_queued, 1)
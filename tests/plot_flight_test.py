@@ -0,0 +1,217 @@
+import csv
+import numpy as np
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import patch
+from xml.etree import ElementTree
+
+from hdfaccess.file import hdf_file
+
+from analysis_engine.node import (
+    KeyPointValue,
+    KeyTimeInstance,
+    M,
+    P,
+    Section,
+)
+from analysis_engine.plot_flight import (
+    ALTITUDE_MODE_ABSOLUTE,
+    KMLWriter,
+    add_track,
+    csv_flight_details,
+    csv_segments_details,
+    segments_to_kml,
+    track_to_kml,
+)
+
+
+KML = '{http://www.opengis.net/kml/2.2}'
+
+
+def write_hdf(path, params):
+    with hdf_file(path, create=True) as hdf:
+        for param in params:
+            hdf.set_param(param)
+    return path
+
+
+def read_kml(path):
+    return ElementTree.parse(path).getroot()
+
+
+class TestKMLWriter(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'test.kml')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_kml_writer(self):
+        with open(self.path, 'w') as f:
+            kml = KMLWriter(f)
+            kml.start_folder('Flight <1>')
+            kml.linestring('Track', np.array([[1.5, 51.25, 100], [1.75, 51.5, 200]]),
+                           colour='ff0000ff', altitude_mode=ALTITUDE_MODE_ABSOLUTE,
+                           extrude=True, visible=False)
+            kml.point('Liftoff', (1.5, 51.25))
+            kml.end_folder()
+            kml.close()
+        folder = read_kml(self.path).find(KML + 'Document').find(KML + 'Folder')
+        self.assertEqual(folder.find(KML + 'name').text, 'Flight <1>')
+        track, point = folder.findall(KML + 'Placemark')
+        self.assertEqual(track.find(KML + 'visibility').text, '0')
+        self.assertEqual(track.find('.//%sPolyStyle/%scolor' % (KML, KML)).text, '660000ff')
+        line = track.find(KML + 'LineString')
+        self.assertEqual(line.find(KML + 'altitudeMode').text, 'absolute')
+        self.assertEqual(line.find(KML + 'coordinates').text,
+                         '1.5000000,51.2500000,100.00 1.7500000,51.5000000,200.00')
+        self.assertEqual(point.find('.//%scoordinates' % KML).text, '1.5000000,51.2500000')
+
+
+class TestAddTrack(unittest.TestCase):
+    def test_add_track(self):
+        lat = P('Latitude', np.ma.array([51.0, 51.1, 51.2, 0, 51.4, 51.5], mask=[0, 1, 0, 0, 0, 0]))
+        lon = P('Longitude', np.ma.array([1.0, 1.1, 1.2, 1.3, np.nan, 1.5]))
+        alt = P('Altitude', np.ma.array([10, 20, 30, 40], mask=[0, 0, 0, 1]))
+        tracks = []
+        kml = type('MockKML', (object,), {'linestring': lambda self, name, coords, **kwargs: tracks.append(
+            (name, coords.tolist(), kwargs))})()
+        add_track(kml, 'Track', lat, lon, 'ff0000ff')
+        self.assertEqual(tracks.pop(), ('Track (1)', [[1.0, 51.0], [1.2, 51.2], [1.5, 51.5]],
+                                        {'colour': 'ff0000ff', 'altitude_mode': None,
+                                         'extrude': False, 'visible': True}))
+        # Samples beyond the end of the altitude array repeat the last value,
+        # which is masked.
+        add_track(kml, 'Track', lat, lon, 'ff0000ff', alt_param=alt,
+                  alt_mode=ALTITUDE_MODE_ABSOLUTE, visible=False)
+        self.assertEqual(tracks.pop(), ('Track (1)', [[1.0, 51.0, 10], [1.2, 51.2, 30]],
+                                        {'colour': 'ff0000ff', 'altitude_mode': 'absolute',
+                                         'extrude': True, 'visible': False}))
+
+    @patch('analysis_engine.plot_flight.KML_TRACK_LENGTH', 4)
+    def test_split_tracks(self):
+        tracks = []
+        kml = type('MockKML', (object,), {'linestring': lambda self, name, coords, **kwargs: tracks.append(
+            (name, len(coords)))})()
+        add_track(kml, 'Track', P('Latitude', np.ma.arange(1, 11)), P('Longitude', np.ma.arange(1, 11)),
+                  'ff0000ff')
+        self.assertEqual(tracks, [('Track (1)', 4), ('Track (2)', 4), ('Track (3)', 2)])
+
+
+class TestCsvFlightDetails(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.hdf_path = write_hdf(os.path.join(self.temp_dir, 'flight.hdf5'), [
+            P('Airspeed', np.ma.array([100, 110, 120, 130, 140, 150, 160, 170],
+                                      mask=[0, 0, 0, 0, 0, 1, 1, 0]), frequency=2),
+            P('Altitude AAL', np.ma.arange(0, 4000, 1000)),
+            M('Gear Down', np.ma.array([1, 1, 0, 0]), values_mapping={0: 'Up', 1: 'Down'}),
+        ])
+        self.ktis = [KeyTimeInstance(1.5, 'Liftoff', latitude=51.123456, longitude=1.5)]
+        self.kpvs = [KeyPointValue(0.5, 105.5, 'Airspeed Max'),
+                     KeyPointValue(2.75, 150, 'Airspeed At Top')]
+        self.phases = [Section('Airborne', slice(1.5, 3), 1.5, 3)]
+        self.dest = os.path.join(self.temp_dir, 'flight.csv')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def read_csv(self):
+        with open(self.dest) as f:
+            return list(csv.reader(f))
+
+    def test_csv_flight_details(self):
+        details = csv_flight_details(self.hdf_path, self.ktis, self.kpvs, self.phases,
+                                     dest_path=self.dest)
+        self.assertEqual([(d['name'], d['index'], d['type']) for d in details], [
+            ('Airspeed Max', 0.5, 'Key Point Value'),
+            ('Liftoff', 1.5, 'Key Time Instance'),
+            ('Airborne [START]', 1.5, 'Phase'),
+            ('Airspeed At Top', 2.75, 'Key Point Value'),
+            ('Airborne [END]', 3, 'Phase'),
+        ])
+        self.assertEqual(details[1]['latitude'], 51.123456)
+        self.assertEqual(details[2]['duration'], 1.5)
+        self.assertEqual(details[2]['slice'], slice(1.5, 3))
+        self.assertEqual((details[1]['Airspeed'], details[1]['Altitude AAL']), (130, 1500))
+        self.assertIsNone(details[4]['Airspeed'])
+        rows = self.read_csv()
+        self.assertEqual(rows[0], ['path', 'type', 'index', 'duration', 'name', 'value', 'datetime',
+                                   'latitude', 'longitude', 'Airspeed', 'Altitude AAL'])
+        self.assertEqual([row[2:5] for row in rows[1:]], [
+            ['0.500', '', 'Airspeed Max'],
+            ['1.500', '', 'Liftoff'],
+            ['1.500', '1.50', 'Airborne [START]'],
+            ['2.750', '', 'Airspeed At Top'],
+            ['3.000', '1.50', 'Airborne [END]'],
+        ])
+        self.assertEqual(rows[1][:2], [self.hdf_path, 'Key Point Value'])
+        self.assertEqual(rows[1][5], '105.500')
+        self.assertEqual(rows[2][7:], ['51.1235', '1.5000', '130 kts', '1500 ft'])
+        # Airspeed is masked at 2.75 seconds.
+        self.assertEqual(rows[4][9:], ['', '2750 ft'])
+
+    def test_nan(self):
+        kpvs = [KeyPointValue(0.5, np.nan, 'Airspeed Max')]
+        details = csv_flight_details(self.hdf_path, [], kpvs, [], dest_path=self.dest)
+        self.assertTrue(np.isnan(details[0]['value']))
+        self.assertEqual(self.read_csv()[1][5], 'nan')
+
+    def test_append(self):
+        csv_flight_details(self.hdf_path, self.ktis, [], [], dest_path=self.dest)
+        csv_flight_details(self.hdf_path, self.ktis, [], [], dest_path=self.dest)
+        self.assertEqual(len(self.read_csv()), 3)
+        csv_flight_details(self.hdf_path, self.ktis, [], [], dest_path=self.dest,
+                           append_to_file=False)
+        self.assertEqual(len(self.read_csv()), 2)
+
+    def test_csv_segments_details(self):
+        segments = [(self.hdf_path, self.ktis, self.kpvs, []), (self.hdf_path, self.ktis, [], [])]
+        self.assertEqual(csv_segments_details(segments, dest_path=self.dest), 4)
+        rows = self.read_csv()
+        self.assertEqual([row[4] for row in rows],
+                         ['name', 'Airspeed Max', 'Liftoff', 'Airspeed At Top', 'Liftoff'])
+
+
+class TestTrackToKml(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.hdf_path = write_hdf(os.path.join(self.temp_dir, 'flight.hdf5'), [
+            P('Latitude Smoothed', np.ma.array(np.linspace(51, 52, 10))),
+            P('Longitude Smoothed', np.ma.array(np.linspace(1, 2, 10))),
+            P('Altitude STD', np.ma.arange(0, 10000, 1000)),
+        ])
+        self.ktis = [KeyTimeInstance(1, 'Liftoff', latitude=51.1, longitude=1.1),
+                     KeyTimeInstance(2, 'Transmit', latitude=51.2, longitude=1.2)]
+        self.kpvs = [KeyPointValue(2, 250, 'ILS Frequency During Approach')]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_track_to_kml(self):
+        dest = track_to_kml(self.hdf_path, self.ktis, self.kpvs, [])
+        self.assertEqual(dest, self.hdf_path + '.kml')
+        document = read_kml(dest).find(KML + 'Document')
+        names = [p.find(KML + 'name').text for p in document.findall(KML + 'Placemark')]
+        self.assertEqual(names, ['Smoothed (1)', 'Smoothed On Ground (1)', 'Liftoff',
+                                 'ILS Frequency During Approach (250.000)'])
+        liftoff = document.findall(KML + 'Placemark')[2]
+        self.assertEqual(liftoff.find('.//%scoordinates' % KML).text,
+                         '1.1000000,51.1000000,304.80')
+
+    def test_segments_to_kml(self):
+        dest = os.path.join(self.temp_dir, 'flights.kml')
+        segments = [(self.hdf_path, self.ktis, [], []), (self.hdf_path, [], self.kpvs, [])]
+        self.assertEqual(segments_to_kml(segments, dest), dest)
+        folders = read_kml(dest).find(KML + 'Document').findall(KML + 'Folder')
+        self.assertEqual([len(f.findall(KML + 'Placemark')) for f in folders], [3, 3])
+
+    def test_no_coordinates(self):
+        hdf_path = write_hdf(os.path.join(self.temp_dir, 'empty.hdf5'),
+                             [P('Altitude STD', np.ma.arange(10))])
+        self.assertFalse(track_to_kml(hdf_path, [], [], []))
+        self.assertFalse(os.path.exists(hdf_path + '.kml'))
@@ -0,0 +1,143 @@
+import mock
+import numpy as np
+import unittest
+
+from analysis_engine.library import align
+from analysis_engine.node import (
+    DerivedParameterNode,
+    KeyPointValue,
+    P,
+)
+from analysis_engine.precision import (
+    cast_array,
+    cast_param,
+    compare_kpvs,
+    compute_dtype,
+    validate_precision,
+)
+
+from hdfaccess.parameter import MappedArray
+
+
+FLOAT64_PARAMETERS = ('Latitude*', 'Altitude STD')
+
+
+class Float32Mode(object):
+    '''
+    Patch the settings to compute in float32.
+    '''
+    def __enter__(self):
+        self.patch = mock.patch('analysis_engine.precision.settings')
+        settings = self.patch.start()
+        settings.COMPUTE_DTYPE = 'float32'
+        settings.FLOAT64_PARAMETERS = FLOAT64_PARAMETERS
+
+    def __exit__(self, *args):
+        self.patch.stop()
+
+
+class TestComputeDtype(unittest.TestCase):
+    def test_compute_dtype(self):
+        self.assertIsNone(compute_dtype('Airspeed'))
+        with Float32Mode():
+            self.assertEqual(compute_dtype('Airspeed'), np.float32)
+            self.assertEqual(compute_dtype('Latitude Smoothed'), np.float64)
+            self.assertEqual(compute_dtype('Altitude STD'), np.float64)
+            self.assertEqual(compute_dtype('Altitude STD Smoothed'), np.float32)
+
+
+class TestCast(unittest.TestCase):
+    def test_cast_array(self):
+        array = np.ma.array([1.5, 2.5, 3.5], mask=[False, True, False])
+        cast = cast_array(array, np.float32)
+        self.assertEqual(cast.dtype, np.float32)
+        self.assertEqual(cast.mask.tolist(), [False, True, False])
+        self.assertIs(cast_array(cast, np.float32), cast)
+        integers = np.ma.arange(3)
+        self.assertIs(cast_array(integers, np.float32), integers)
+        mapped = MappedArray([0, 1, 0], values_mapping={0: '-', 1: 'Down'})
+        self.assertIs(cast_array(mapped, np.float32), mapped)
+
+    def test_cast_param(self):
+        param = P('Airspeed', np.ma.arange(10, dtype=float))
+        cast = cast_param(param, np.float32)
+        self.assertEqual(cast.array.dtype, np.float32)
+        # The dependency is not modified.
+        self.assertEqual(param.array.dtype, np.float64)
+        self.assertIs(cast_param(param, np.float64), param)
+        self.assertIsNone(cast_param(None, np.float32))
+
+
+class TestAlign(unittest.TestCase):
+    def test_align_float32(self):
+        slave = P('Slave', np.ma.arange(10, dtype=np.float32), frequency=1)
+        master = P('Master', np.ma.arange(20, dtype=float), frequency=2)
+        self.assertEqual(align(slave, master).dtype, np.float64)
+        with mock.patch('analysis_engine.precision.settings') as settings:
+            settings.COMPUTE_DTYPE = 'float32'
+            aligned = align(slave, master)
+        self.assertEqual(aligned.dtype, np.float32)
+        self.assertEqual(len(aligned), 20)
+
+
+class TestDerivedParameterNode(unittest.TestCase):
+    class Sum(DerivedParameterNode):
+        def derive(self, a=P('A'), b=P('B')):
+            self.array = a.array + b.array
+
+    def test_get_derived(self):
+        a = P('A', np.ma.arange(10, dtype=float))
+        b = P('B', np.ma.arange(10, dtype=float))
+        node = self.Sum()
+        node.get_derived([a, b])
+        self.assertEqual(node.array.dtype, np.float64)
+        with Float32Mode():
+            node = self.Sum()
+            node.get_derived([a, b])
+            self.assertEqual(node.array.dtype, np.float32)
+            node = self.Sum('Latitude')
+            node.get_derived([a, b])
+            self.assertEqual(node.array.dtype, np.float64)
+        self.assertEqual(a.array.dtype, np.float64)
+
+
+class TestCompareKPVs(unittest.TestCase):
+    def test_compare_kpvs(self):
+        reference = {
+            'Airspeed Max': [KeyPointValue(10, 250.0, 'Airspeed Max')],
+            'Pitch Max': [KeyPointValue(20, 10.0, 'Pitch Max')],
+        }
+        candidate = {
+            'Airspeed Max': [KeyPointValue(10, 250.5, 'Airspeed Max')],
+            'Roll Max': [KeyPointValue(30, 5.0, 'Roll Max')],
+        }
+        deltas = compare_kpvs(reference, candidate)
+        self.assertEqual([(d[0], d[3]) for d in deltas], [
+            ('Pitch Max', float('inf')),
+            ('Roll Max', float('inf')),
+            ('Airspeed Max', 0.5),
+        ])
+        self.assertIsNone(deltas[0][2])
+        self.assertIsNone(deltas[1][1])
+
+
+class TestValidatePrecision(unittest.TestCase):
+    @mock.patch('analysis_engine.process_flight.process_flight')
+    def test_validate_precision(self, process_flight):
+        from analysis_engine import settings
+        settings_seen = []
+
+        def process(segment_info, tail_number, **kwargs):
+            settings_seen.append((settings.COMPUTE_DTYPE, settings.DOWNCAST_POLICIES))
+            value = 250.0 if settings.COMPUTE_DTYPE == 'float64' else 250.25
+            return {'kpv': {'Airspeed Max': [KeyPointValue(10, value, 'Airspeed Max')]}}
+
+        process_flight.side_effect = process
+        policies = [{'name': 'float32', 'dtype': 'float32'}]
+        with mock.patch.object(settings, 'DOWNCAST_POLICIES', policies):
+            deltas = validate_precision(__file__, 'G-ABCD')
+            # Settings are restored.
+            self.assertIs(settings.DOWNCAST_POLICIES, policies)
+        self.assertEqual(settings_seen, [('float64', []), ('float32', [])])
+        self.assertEqual(settings.COMPUTE_DTYPE, 'float64')
+        self.assertEqual([(d[0], d[3]) for d in deltas], [('Airspeed Max', 0.25)])
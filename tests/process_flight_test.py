@@ -1,5 +1,9 @@
+import numpy as np
 import unittest
 
+from analysis_engine.node import DerivedParameterNode, NodeManager, P
+from analysis_engine.process_flight import derive_parameters
+
 
 class TestProcessFlight(unittest.TestCase):
 
@@ -15,3 +19,51 @@ class TestProcessFlight(unittest.TestCase):
         '''
         self.assertTrue(False, msg='Test not implemented.')
 
+
+class MockHDF(dict):
+    duration = 4
+
+    def get_param(self, name, valid_only=False):
+        return self[name]
+
+    def set_param(self, param):
+        self[param.name] = param
+
+
+class Doubled(DerivedParameterNode):
+    def derive(self, raw=P('Raw')):
+        self.array = raw.array * 2
+
+
+class Tripled(DerivedParameterNode):
+    def derive(self, doubled=P('Doubled')):
+        self.array = doubled.array * 3
+        # Modifying a dependency must not affect other nodes.
+        doubled.array[:] = 0
+
+
+class Summed(DerivedParameterNode):
+    def derive(self, doubled=P('Doubled'), tripled=P('Tripled')):
+        self.array = doubled.array + tripled.array
+
+
+class TestDeriveParameters(unittest.TestCase):
+    def setUp(self):
+        self.hdf = MockHDF(Raw=P('Raw', np.ma.arange(4)))
+        derived_nodes = {'Doubled': Doubled, 'Tripled': Tripled, 'Summed': Summed}
+        self.node_mgr = NodeManager({}, 4, ['Raw'], list(derived_nodes), [],
+                                    derived_nodes, {}, {})
+        self.process_order = ['Doubled', 'Tripled', 'Summed']
+
+    def test_derive_parameters(self):
+        derive_parameters(self.hdf, self.node_mgr, self.process_order)
+        self.assertEqual(sorted(self.hdf), ['Doubled', 'Raw', 'Summed', 'Tripled'])
+        self.assertEqual(self.hdf['Summed'].array.tolist(), [0, 8, 16, 24])
+
+    def test_transient(self):
+        derive_parameters(self.hdf, self.node_mgr, self.process_order,
+                          transient={'Doubled': {'Tripled', 'Summed'}})
+        self.assertEqual(sorted(self.hdf), ['Raw', 'Summed', 'Tripled'])
+        self.assertEqual(self.hdf['Tripled'].array.tolist(), [0, 6, 12, 18])
+        self.assertEqual(self.hdf['Summed'].array.tolist(), [0, 8, 16, 24])
+        self.assertNotIn('Doubled', self.node_mgr.hdf_keys)
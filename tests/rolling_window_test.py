@@ -0,0 +1,105 @@
+import numpy as np
+import unittest
+
+from numpy.ma.testutils import assert_array_equal
+
+from analysis_engine.rolling_window import (
+    clamp_scan,
+    maintained_values,
+    running_differences,
+    sliding_max,
+    sliding_mean,
+    sliding_min,
+    sliding_sum,
+)
+
+
+class TestSlidingMaxMin(unittest.TestCase):
+    def test_sliding_max(self):
+        assert_array_equal(sliding_max([1, 3, 2, 0, 1], 3), [3, 3, 2])
+        assert_array_equal(sliding_max([1, 3, 2, 0, 1], 1), [1, 3, 2, 0, 1])
+        assert_array_equal(sliding_max([1, 3, 2, 0, 1], 5), [3])
+        self.assertEqual(len(sliding_max([1, 3], 3)), 0)
+        self.assertRaises(ValueError, sliding_max, [1, 3], 0)
+
+    def test_sliding_min(self):
+        assert_array_equal(sliding_min([1, 3, 2, 0, 1], 3), [1, 0, 0])
+        assert_array_equal(sliding_min(np.arange(10), 4), np.arange(7))
+
+    def test_matches_stacked_windows(self):
+        array = np.random.RandomState(0).rand(1000)
+        for window in (2, 3, 7, 64, 999, 1000):
+            windows = np.array([array[i:i + window] for i in range(len(array) - window + 1)])
+            assert_array_equal(sliding_max(array, window), windows.max(axis=1))
+            assert_array_equal(sliding_min(array, window), windows.min(axis=1))
+
+    def test_nan(self):
+        result = sliding_max([1, np.nan, 2, 3, 4], 2)
+        self.assertTrue(np.isnan(result[:2]).all())
+        assert_array_equal(result[2:], [3, 4])
+
+    def test_ignores_mask(self):
+        array = np.ma.array([1, 9, 2], mask=[False, True, False])
+        assert_array_equal(sliding_max(array, 2), [9, 9])
+
+
+class TestSlidingSumMean(unittest.TestCase):
+    def test_sliding_sum(self):
+        assert_array_equal(sliding_sum([1, 2, 3, 4], 2), [3, 5, 7])
+        array = np.ma.array([1, 2, 3, 4], mask=[False, False, True, False])
+        assert_array_equal(sliding_sum(array, 2), [3, 2, 4])
+
+    def test_sliding_mean(self):
+        array = np.ma.array([1, 2, 3, 4, 5], mask=[False, False, True, True, False])
+        result = sliding_mean(array, 2)
+        self.assertEqual(result.tolist(), [1.5, 2, None, 5])
+
+
+class TestRunningDifferences(unittest.TestCase):
+    def test_running_differences(self):
+        assert_array_equal(running_differences(10, [1, 2], [3, 5]), [10, 8, 5])
+
+    def test_matches_loop(self):
+        random = np.random.RandomState(1)
+        added = np.round(random.rand(500), 1)
+        subtracted = np.round(random.rand(500), 1)
+        total = expected = 0.3
+        totals = [total]
+        for a, s in zip(added, subtracted):
+            total += a
+            total -= s
+            totals.append(total)
+        self.assertEqual(running_differences(expected, added, subtracted).tolist(), totals)
+
+
+class TestClampScan(unittest.TestCase):
+    def test_clamp_scan(self):
+        lower = np.array([5.0, 0, 6, 1, 0])
+        upper = np.array([5.0, 4, 9, 3, 9])
+        expected = []
+        value = 5.0
+        for low, high in zip(lower, upper):
+            value = min(max(value, low), high)
+            expected.append(value)
+        assert_array_equal(clamp_scan(lower, upper), expected)
+
+
+class TestMaintainedValues(unittest.TestCase):
+    def test_maintained_values(self):
+        result = maintained_values(np.ma.array([0, 1, 2, 3, 2, 1, 2, 3, 2, 2]), 2)
+        self.assertEqual(result.tolist(), [0, 1, 2, 2, 2, 2, 2, 2, None, None])
+
+    def test_masked_sections(self):
+        array = np.ma.arange(12.0)
+        array[5] = np.ma.masked
+        result = maintained_values(array, 2)
+        self.assertEqual(result.tolist(),
+                         [0, 1, 2, None, None, None, 6, 7, 8, 9, None, None])
+
+    def test_too_short(self):
+        result = maintained_values(np.ma.arange(3), 5)
+        self.assertTrue(result.mask.all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,26 +1,34 @@
 from __future__ import print_function
 
 import mock
+import multiprocessing
 import numpy as np
 import os.path
 import pytz
+import shutil
+import tempfile
 import unittest
 
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from analysis_engine.split_hdf_to_segments import (
     _calculate_start_datetime,
     _get_normalised_split_params,
     _mask_invalid_years,
+    _segment_fallback_dts,
+    _segment_processes,
     _segment_type_and_slice,
     append_segment_info,
     calculate_fallback_dt,
     get_dt_arrays,
     get_valid_dt_slices,
     has_constant_time,
+    split_hdf_to_segments,
     split_segments,
-    PRECISE
+    PRECISE,
+    SplitParameters,
 )
+from analysis_engine.datastructures import Segment
 from analysis_engine.node import M, P, Parameter
 
 from hdfaccess.file import hdf_file
@@ -43,6 +51,21 @@ class MockHDF(dict):
         self.duration = duration
 
 
+def mock_write_segment(hdf_path, segment_slice, dest_path, boundary, submasks=()):
+    with open(dest_path, 'w') as f:
+        f.write('%s %s %s' % (hdf_path, segment_slice, boundary))
+
+
+def mock_append_segment_info(dest_path, segment_type, segment_slice, part,
+                             fallback_dt=None, validation_dt=None, aircraft_info={}):
+    with open(dest_path) as f:
+        contents = f.read()
+    # The process which wrote the segment is recorded within the hash.
+    return Segment(segment_slice, segment_type, part, dest_path,
+                   '%s %d' % (contents, os.getpid()), fallback_dt,
+                   fallback_dt, fallback_dt)
+
+
 class TestInvalidYears(unittest.TestCase):
     def test_mask_invalid_years(self):
         array = np.ma.array([0, 2, 9, 10, 13, 14, 15, 88, 99,
@@ -510,6 +533,7 @@ class TestSplitSegments(unittest.TestCase):
         '''Splits on both DFC Jump and Engine parameters.'''
         hdf_path = os.path.join(test_data_path, "split_segments_1.hdf5")
         temp_path = copy_file(hdf_path)
+        self.addCleanup(os.remove, temp_path)
         hdf = hdf_file(temp_path)
         segment_tuples = split_segments(hdf, {})
         self.assertEqual(segment_tuples,
@@ -523,6 +547,7 @@ class TestSplitSegments(unittest.TestCase):
         '''Splits on both DFC Jump and Engine parameters.'''
         hdf_path = os.path.join(test_data_path, "split_segments_2.hdf5")
         temp_path = copy_file(hdf_path)
+        self.addCleanup(os.remove, temp_path)
         hdf = hdf_file(temp_path)
 
         segment_tuples = split_segments(hdf, {})
@@ -539,6 +564,7 @@ class TestSplitSegments(unittest.TestCase):
         '''Splits on both Engine and Heading parameters.'''
         hdf_path = os.path.join(test_data_path, "split_segments_3.hdf5")
         temp_path = copy_file(hdf_path)
+        self.addCleanup(os.remove, temp_path)
         hdf = hdf_file(temp_path)
 
         segment_tuples = split_segments(hdf, {})
@@ -593,6 +619,7 @@ class TestSplitSegments(unittest.TestCase):
 
         hdf_path = os.path.join(test_data_path, "split_segments_multiple_types.hdf5")
         temp_path = copy_file(hdf_path)
+        self.addCleanup(os.remove, temp_path)
         hdf = hdf_file(temp_path)
         self.maxDiff = None
         segment_tuples = split_segments(hdf, {})
@@ -666,6 +693,53 @@ class TestSplitSegments(unittest.TestCase):
         self.assertEqual(np.ma.argmin(norm_array), 715)
 
 
+class TestSplitParameters(unittest.TestCase):
+    def setUp(self):
+        self.reads = []
+        params = {
+            'Airspeed': P('Airspeed', np.ma.arange(0, 200, 10)),
+            'Eng (1) N1': P('Eng (1) N1', np.ma.array([0, 50, 100, 50] * 5)),
+            'Eng (2) N1': P('Eng (2) N1', np.ma.array([0, 0, 100, 100] * 5)),
+            'Groundspeed': P('Groundspeed', np.ma.arange(0, 20, 0.5), frequency=2),
+        }
+
+        class CountingHDF(MockHDF):
+            def __getitem__(hdf, name):
+                self.reads.append(name)
+                return MockHDF.__getitem__(hdf, name)
+
+        self.hdf = CountingHDF(params, duration=20)
+        self.heading = P('Heading', np.ma.zeros(20))
+
+    def test_split_parameters(self):
+        split_params = SplitParameters(self.hdf)
+        eng_avg, eng_frequency = split_params.eng_params(self.heading)
+        self.assertEqual(eng_avg.tolist()[:4], [0, 25, 100, 75])
+        self.assertEqual(eng_frequency, 1)
+        split_min, split_frequency = split_params.normalised_split_params(self.heading)
+        self.assertEqual(len(split_min), 20)
+        self.assertEqual(split_frequency, 1)
+        self.assertIs(split_params.speed()[0], dict.__getitem__(self.hdf, 'Airspeed'))
+        self.assertEqual(get_valid_dt_slices(split_params, min_threshold_count=5),
+                         [slice(0, 20)])
+        # Each parameter, including those not available, is read once.
+        self.assertEqual(self.reads.count('Airspeed'), 1)
+        self.assertEqual(len(self.reads), len(set(self.reads)))
+        self.assertEqual(split_params.duration, 20)
+        self.assertIsNone(split_params.get('Eng (3) N1'))
+        self.assertRaises(KeyError, split_params.__getitem__, 'Eng (3) N1')
+        self.assertEqual(len(self.reads), len(set(self.reads)))
+
+    def test_no_eng_params(self):
+        del self.hdf['Eng (1) N1']
+        del self.hdf['Eng (2) N1']
+        split_params = SplitParameters(self.hdf)
+        self.assertEqual(split_params.eng_params(), (None, None))
+        split_min, split_frequency = split_params.normalised_split_params()
+        self.assertEqual(split_frequency, 2)
+        self.assertEqual(len(split_min), 40)
+
+
 class mocked_hdf(object):
     def __init__(self, path=None):
         pass
@@ -721,12 +795,108 @@ class mocked_hdf(object):
         return P(key, array=data)
 
 
+class TestSplitHdfToSegments(unittest.TestCase):
+    def test_segment_fallback_dts(self):
+        fallback_dt = datetime(2012, 12, 12, 0, 0, 0, tzinfo=pytz.utc)
+        segment_tuples = [('START_AND_STOP', slice(0, 1000), 0),
+                          ('GROUND_ONLY', slice(1000, 1500), 8),
+                          ('START_AND_STOP', slice(1500, 3000), 4)]
+        self.assertEqual(_segment_fallback_dts(fallback_dt, segment_tuples),
+                         [fallback_dt,
+                          fallback_dt + timedelta(seconds=992),
+                          fallback_dt + timedelta(seconds=1496)])
+        self.assertEqual(_segment_fallback_dts(None, segment_tuples),
+                         [None, None, None])
+
+    @mock.patch('analysis_engine.split_hdf_to_segments.settings')
+    def test_segment_processes(self, settings):
+        settings.SPLIT_SEGMENT_PROCESSES = 4
+        self.assertEqual(_segment_processes(None, 10), 4)
+        self.assertEqual(_segment_processes(None, 2), 2)
+        self.assertEqual(_segment_processes(1, 10), 1)
+        self.assertEqual(_segment_processes(8, 0), 1)
+        settings.SPLIT_SEGMENT_PROCESSES = None
+        self.assertGreaterEqual(_segment_processes(None, 10), 1)
+
+    @mock.patch('analysis_engine.split_hdf_to_segments._write_segment')
+    @mock.patch('analysis_engine.split_hdf_to_segments.calculate_fallback_dt')
+    @mock.patch('analysis_engine.split_hdf_to_segments.split_segments')
+    @mock.patch('analysis_engine.split_hdf_to_segments.validate_aircraft')
+    @mock.patch('analysis_engine.split_hdf_to_segments.hdf_file')
+    def test_split_hdf_to_segments(self, hdf_file, validate_aircraft,
+                                   split_segments, calculate_fallback_dt,
+                                   write_segment):
+        fallback_dt = datetime(2012, 12, 12, 0, 0, 0, tzinfo=pytz.utc)
+        calculate_fallback_dt.return_value = fallback_dt
+        split_segments.return_value = [('START_AND_STOP', slice(0, 1000), 0),
+                                       ('GROUND_ONLY', slice(1000, 1500), 8)]
+        write_segment.side_effect = lambda args: mock.Mock(
+            path=args[1], start_dt=args[6], stop_dt=args[6])
+        segments = split_hdf_to_segments(os.path.join('data', 'flight.hdf5'),
+                                         {}, dest_dir='segments', processes=1)
+        self.assertEqual([s.path for s in segments],
+                         [os.path.join('segments', 'flight.001.hdf5'),
+                          os.path.join('segments', 'flight.002.hdf5')])
+        self.assertEqual(
+            write_segment.call_args_list,
+            [mock.call((os.path.join('data', 'flight.hdf5'),
+                        os.path.join('segments', 'flight.001.hdf5'), 4,
+                        'START_AND_STOP', slice(0, 1000), 1, fallback_dt,
+                        None, {})),
+             mock.call((os.path.join('data', 'flight.hdf5'),
+                        os.path.join('segments', 'flight.002.hdf5'), 4,
+                        'GROUND_ONLY', slice(1000, 1500), 2,
+                        fallback_dt + timedelta(seconds=992), None, {}))])
+
+    @unittest.skipIf(multiprocessing.get_start_method() != 'fork',
+                     'Patched functions are only inherited by forked processes')
+    @mock.patch('analysis_engine.split_hdf_to_segments.append_segment_info',
+                mock_append_segment_info)
+    @mock.patch('analysis_engine.split_hdf_to_segments.write_segment',
+                mock_write_segment)
+    @mock.patch('analysis_engine.split_hdf_to_segments.calculate_fallback_dt')
+    @mock.patch('analysis_engine.split_hdf_to_segments.split_segments')
+    @mock.patch('analysis_engine.split_hdf_to_segments.validate_aircraft')
+    @mock.patch('analysis_engine.split_hdf_to_segments.hdf_file')
+    def test_split_hdf_to_segments_parallel(self, hdf_file, validate_aircraft,
+                                            split_segments, calculate_fallback_dt):
+        calculate_fallback_dt.return_value = datetime(2012, 12, 12, 0, 0, 0, tzinfo=pytz.utc)
+        split_segments.return_value = [('START_AND_STOP', slice(0, 1000), 0),
+                                       ('GROUND_ONLY', slice(1000, 1500), 8),
+                                       ('START_AND_STOP', slice(1500, 3000), 4),
+                                       ('NO_MOVEMENT', slice(3000, 3200), 0)]
+        segments = {}
+        for processes in (1, 2):
+            dest_dir = tempfile.mkdtemp()
+            self.addCleanup(shutil.rmtree, dest_dir)
+            segments[processes] = split_hdf_to_segments(
+                os.path.join('data', 'flight.hdf5'), {}, dest_dir=dest_dir,
+                processes=processes)
+
+        def contents(segment):
+            with open(segment.path) as f:
+                return f.read()
+
+        serial, parallel = segments[1], segments[2]
+        self.assertEqual([os.path.basename(s.path) for s in parallel],
+                         ['flight.001.hdf5', 'flight.002.hdf5', 'flight.003.hdf5',
+                          'flight.004.hdf5'])
+        self.assertEqual([os.path.basename(s.path) for s in parallel],
+                         [os.path.basename(s.path) for s in serial])
+        self.assertEqual([contents(s) for s in parallel], [contents(s) for s in serial])
+        self.assertEqual([(s.slice, s.type, s.part, s.start_dt, s.stop_dt) for s in parallel],
+                         [(s.slice, s.type, s.part, s.start_dt, s.stop_dt) for s in serial])
+        pids = [int(s.hash.rsplit(' ', 1)[1]) for s in segments[2]]
+        self.assertEqual({int(s.hash.rsplit(' ', 1)[1]) for s in serial}, {os.getpid()})
+        self.assertNotIn(os.getpid(), pids)
+
+
 class TestSegmentInfo(unittest.TestCase):
     @mock.patch('analysis_engine.split_hdf_to_segments.logger')
-    @mock.patch('analysis_engine.split_hdf_to_segments.sha_hash_file')
+    @mock.patch('analysis_engine.split_hdf_to_segments.hash_file')
     @mock.patch('analysis_engine.split_hdf_to_segments.hdf_file',
                 new_callable=mocked_hdf)
-    def test_timestamps_in_past(self, hdf_file_patch, sha_hash_file_patch, logger_patch):
+    def test_timestamps_in_past(self, hdf_file_patch, hash_file_patch, logger_patch):
         # No longer raising exception, using epoch instead with exception logging,
         # allows segment to be created.
         # example where it goes fast
@@ -742,10 +912,10 @@ class TestSegmentInfo(unittest.TestCase):
         self.assertTrue(logger_patch.exception.called)
         self.assertEqual(logger_patch.exception.call_args[0], ('Unable to calculate timebase, using 1970-01-01 00:00:00+0000!',))
 
-    @mock.patch('analysis_engine.split_hdf_to_segments.sha_hash_file')
+    @mock.patch('analysis_engine.split_hdf_to_segments.hash_file')
     @mock.patch('analysis_engine.split_hdf_to_segments.hdf_file',
                 new_callable=mocked_hdf)
-    def test_timestamps_in_future_use_fallback_year(self, hdf_file_patch, sha_hash_file_patch):
+    def test_timestamps_in_future_use_fallback_year(self, hdf_file_patch, hash_file_patch):
         # Using fallback time is no longer recommended
         # example where it goes fast
         seg = append_segment_info('future timestamps', 'START_AND_STOP',
@@ -760,10 +930,10 @@ class TestSegmentInfo(unittest.TestCase):
         #                  'future timestamps', 'START_AND_STOP', slice(10,1000),
         #                  4, fallback_dt=datetime(2012,12,12,0,0,0))
 
-    @mock.patch('analysis_engine.split_hdf_to_segments.sha_hash_file')
+    @mock.patch('analysis_engine.split_hdf_to_segments.hash_file')
     @mock.patch('analysis_engine.split_hdf_to_segments.hdf_file',
                 new_callable=mocked_hdf)
-    def test_append_segment_info(self, hdf_file_patch, sha_hash_file_patch):
+    def test_append_segment_info(self, hdf_file_patch, hash_file_patch):
         # example where it goes fast
         # TODO: Increase slice to be realitic for duration of data
         seg = append_segment_info('fast', 'START_AND_STOP', slice(10, 1000), 4)
@@ -774,12 +944,12 @@ class TestSegmentInfo(unittest.TestCase):
         self.assertEqual(seg.go_fast_dt, datetime(2012, 12, 25, 0, 6, 52, tzinfo=pytz.utc))
         self.assertEqual(seg.stop_dt, datetime(2012, 12, 25, 11, 29, 56, tzinfo=pytz.utc))
 
-    @mock.patch('analysis_engine.split_hdf_to_segments.sha_hash_file')
+    @mock.patch('analysis_engine.split_hdf_to_segments.hash_file')
     @mock.patch('analysis_engine.split_hdf_to_segments.hdf_file',
                 new_callable=mocked_hdf)
     def test_append_segment_info_no_gofast(self, hdf_file_patch,
-                                           sha_hash_file_patch):
-        sha_hash_file_patch.return_value = 'ABCDEFG'
+                                           hash_file_patch):
+        hash_file_patch.return_value = 'ABCDEFG'
         # example where it does not go fast
         seg = append_segment_info('slow', 'GROUND_ONLY', slice(10, 110), 1)
         self.assertEqual(seg.path, 'slow')
@@ -791,10 +961,10 @@ class TestSegmentInfo(unittest.TestCase):
         self.assertEqual(seg.stop_dt, datetime(2012, 12, 25, 0, 0, 50, tzinfo=pytz.utc))  # +50 seconds of airspeed
 
     @mock.patch('analysis_engine.split_hdf_to_segments.logger')
-    @mock.patch('analysis_engine.split_hdf_to_segments.sha_hash_file')
+    @mock.patch('analysis_engine.split_hdf_to_segments.hash_file')
     @mock.patch('analysis_engine.split_hdf_to_segments.hdf_file',
                 new_callable=mocked_hdf)
-    def test_invalid_datetimes(self, hdf_file_patch, sha_hash_file_patch, logger_patch):
+    def test_invalid_datetimes(self, hdf_file_patch, hash_file_patch, logger_patch):
         # No longer raising exception, using epoch instead
         #seg = append_segment_info('invalid timestamps', 'START_AND_STOP', slice(10,110), 2)
 
@@ -0,0 +1,154 @@
+import numpy as np
+import os
+import shutil
+import tempfile
+import unittest
+
+from datetime import timedelta
+
+from hdfaccess.file import hdf_file
+
+from analysis_engine.synthetic_flight import (
+    ADDITIONAL_FREQUENCIES,
+    ALTITUDE_RADIO_RANGE,
+    FREQUENCIES,
+    MINIMUM_FLIGHT_DURATION,
+    SyntheticFlight,
+    dropout_mask,
+    flight_anchors,
+    interpolate_profile,
+)
+
+
+class TestInterpolateProfile(unittest.TestCase):
+    def test_interpolate_profile(self):
+        result = interpolate_profile([(0, 0), (10, 100), (20, 100)], np.arange(0, 25, 5))
+        self.assertEqual(result.tolist(), [0, 50, 100, 100, 100])
+
+
+class TestDropoutMask(unittest.TestCase):
+    def test_density(self):
+        mask = dropout_mask(100000, 0.01, np.random.RandomState(0))
+        self.assertAlmostEqual(mask.mean(), 0.01, delta=0.002)
+        # Dropouts are bursts of at most four samples, unless overlapping.
+        self.assertTrue(np.any(mask[1:] & mask[:-1]))
+
+    def test_no_dropouts(self):
+        self.assertFalse(dropout_mask(1000, 0, np.random.RandomState(0)).any())
+        self.assertEqual(len(dropout_mask(0, 0.1, np.random.RandomState(0))), 0)
+
+
+class TestFlightAnchors(unittest.TestCase):
+    def test_too_short(self):
+        self.assertRaises(ValueError, flight_anchors, MINIMUM_FLIGHT_DURATION - 1, 35000, (0, 0))
+
+    def test_event_order(self):
+        anchors, states, events = flight_anchors(2 * 3600, 35000, (90, 270))
+        order = ['engine_start', 'taxi_out', 'takeoff_roll', 'liftoff', 'top_of_climb',
+                 'top_of_descent', 'approach', 'touchdown', 'runway_exit',
+                 'taxi_in_stop', 'engine_stop']
+        times = [events[name] for name in order]
+        self.assertEqual(times, sorted(times))
+        for name, anchor in anchors.items():
+            anchor_times = [t for t, _ in anchor]
+            self.assertEqual(anchor_times, sorted(anchor_times), name)
+
+    def test_cruise_altitude(self):
+        anchors, _, _ = flight_anchors(MINIMUM_FLIGHT_DURATION, 35000, (0, 0))
+        self.assertLess(max(v for _, v in anchors['Altitude']), 35000)
+        anchors, _, _ = flight_anchors(3 * 3600, 35000, (0, 0))
+        self.assertEqual(max(v for _, v in anchors['Altitude']), 35000)
+        # Step climbs on long flights.
+        anchors, _, _ = flight_anchors(16 * 3600, 35000, (0, 0))
+        self.assertEqual(max(v for _, v in anchors['Altitude']), 39000)
+
+
+class TestSyntheticFlight(unittest.TestCase):
+    def test_parameters(self):
+        flight = SyntheticFlight(duration=3600, mask_density=0.01)
+        params = {p.name: p for p in flight.parameters()}
+        self.assertEqual(flight.duration, 3600)
+        for name in ('Airspeed', 'Altitude STD', 'Heading', 'Eng (1) N1',
+                     'Eng (2) N1', 'Gear Down', 'Frame Counter', 'Year'):
+            self.assertIn(name, params)
+        self.assertNotIn('Eng (3) N1', params)
+        for param in params.values():
+            self.assertEqual(len(param.array), flight.duration * param.frequency)
+            self.assertTrue(0 <= param.offset < 1 / param.frequency)
+        self.assertEqual(params['Pitch'].frequency, FREQUENCIES['Pitch'])
+        self.assertEqual(params['Eng (2) N2'].frequency, FREQUENCIES['Eng (*) N2'])
+        self.assertTrue(np.ma.count_masked(params['Airspeed'].array))
+        self.assertFalse(np.ma.count_masked(params['Second'].array))
+        self.assertFalse(np.ma.any(params['Altitude Radio'].array > ALTITUDE_RADIO_RANGE))
+        self.assertEqual(params['Gear On Ground'].values_mapping, {0: 'Air', 1: 'Ground'})
+
+    def test_profile(self):
+        flight = SyntheticFlight(duration=3600, noise=False)
+        events = flight.events[0]
+        airspeed = flight.profiles['Airspeed']
+        self.assertEqual(airspeed[0], 0)
+        self.assertGreater(airspeed[int(events['liftoff'])], 80)
+        self.assertEqual(flight.states['Gear On Ground'][int(events['liftoff']) - 1], 1)
+        self.assertEqual(flight.states['Gear On Ground'][int(events['liftoff']) + 1], 0)
+        self.assertEqual(flight.profiles['N1'][-1], 0)
+
+    def test_flights(self):
+        flight = SyntheticFlight(duration=3600, flights=3, turnaround=1800)
+        self.assertEqual(flight.duration, 3 * 3600 + 2 * 1800)
+        self.assertEqual(len(flight.events), 3)
+        self.assertEqual(flight.events[1]['liftoff'] - flight.events[0]['liftoff'], 3600 + 1800)
+        # Engines are shut down between flights.
+        self.assertEqual(flight.profiles['N1'][3600 + 900], 0)
+        self.assertEqual(flight.segment_info('x.hdf5', flight=1)['Start Datetime'],
+                         flight.start_datetime + timedelta(seconds=3600 + 1800))
+
+    def test_frequency(self):
+        flight = SyntheticFlight(duration=1800, frequency=16, arinc='767',
+                                 frequencies={'Frame Counter': 1})
+        for param in flight.parameters():
+            self.assertEqual(param.frequency, 1 if param.name == 'Frame Counter' else 16)
+
+    def test_parameter_count(self):
+        flight = SyntheticFlight(duration=1800, parameter_count=100, multistate_count=10)
+        params = list(flight.parameters())
+        self.assertEqual(len(params), 100)
+        multistates = [p for p in params if p.name.startswith('Synthetic Discrete')]
+        self.assertEqual(len(multistates), 10)
+        self.assertEqual(sorted(set(p.frequency for p in params if p.name.startswith('Synthetic'))),
+                         list(ADDITIONAL_FREQUENCIES))
+
+    def test_seed(self):
+        first = SyntheticFlight(duration=1800, seed=1)
+        second = SyntheticFlight(duration=1800, seed=1)
+        for a, b in zip(first.parameters(), second.parameters()):
+            self.assertEqual(a.name, b.name)
+            self.assertEqual(a.offset, b.offset)
+            self.assertTrue(np.ma.allequal(a.array, b.array))
+
+    def test_time_parameters(self):
+        flight = SyntheticFlight(duration=1800)
+        params = {p.name: p for p in flight.parameters()}
+        self.assertEqual(params['Year'].array[0], 2020)
+        self.assertEqual(params['Month'].array[0], 1)
+        self.assertEqual(params['Day'].array[0], 1)
+        self.assertEqual(params['Hour'].array[0], 8)
+        self.assertEqual(params['Minute'].array[-1], 29)
+        self.assertEqual(params['Frame Counter'].array[-1], len(params['Frame Counter'].array) - 1)
+
+
+class TestWriteSyntheticFlight(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_write(self):
+        path = os.path.join(self.temp_dir, 'synthetic.hdf5')
+        flight = SyntheticFlight(duration=1800, parameter_count=50)
+        self.assertEqual(flight.write(path), path)
+        with hdf_file(path) as hdf:
+            self.assertEqual(len(hdf.valid_param_names()), 50)
+            self.assertEqual(hdf.duration, 1800)
+            self.assertEqual(hdf.arinc, '717')
+            self.assertTrue(hdf.reliable_frame_counter)